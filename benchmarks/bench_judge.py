@@ -0,0 +1,90 @@
+"""
+Throughput benchmark: batch Judge at 100k Results.
+
+Compares the vectorised router (columns only, and full Decision objects)
+against judging the same Results one at a time in plain Python.
+
+    python benchmarks/bench_judge.py [n_results]
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+
+from skills.judge import Judge, PersonaPolicy
+from skills.models import Decision, Result
+
+PERSONAS = [None, "tech", "kids", "finance"]
+FLAGS = [[]] * 8 + [["political"], ["gambling"]]
+
+
+def make_results(n: int, seed: int = 11) -> list[Result]:
+    rng = random.Random(seed)
+    return [
+        Result(
+            task_id=f"task-{i}",
+            output="mcp://media/x",
+            confidence_score=rng.random(),
+            safety_flags=list(rng.choice(FLAGS)),
+            persona_id=rng.choice(PERSONAS),
+        )
+        for i in range(n)
+    ]
+
+
+def scalar_judge(policies: dict, results: list[Result]) -> list[Decision]:
+    default = PersonaPolicy()
+    out = []
+    for r in results:
+        p = policies.get(r.persona_id, default)
+        if set(r.safety_flags) & p.blocked_flags:
+            out.append(Decision(r.task_id, "reject", "blocked"))
+        elif r.safety_flags or not r.confidence_score >= p.human_review:
+            out.append(Decision(r.task_id, "escalate", "mandatory_review"))
+        elif r.confidence_score > p.auto_approve:
+            out.append(Decision(r.task_id, "approve", "auto_approved"))
+        else:
+            out.append(Decision(r.task_id, "escalate", "async_review"))
+    return out
+
+
+def timed(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(n: int = 100_000) -> None:
+    policies = {
+        "tech": PersonaPolicy(0.85, 0.65),
+        "kids": PersonaPolicy(0.95, 0.80, frozenset({"gambling", "political"})),
+        "finance": PersonaPolicy(0.92, 0.75),
+    }
+    judge = Judge(policies)
+    results = make_results(n)
+
+    confidence = np.array([r.confidence_score for r in results])
+    masks = np.array([judge.flag_mask(r.safety_flags) for r in results], dtype=np.uint64)
+    persona_idx = np.array([judge.persona_index(r.persona_id) for r in results])
+
+    rows = [
+        ("route_columns (vectorised)", timed(lambda: judge.route_columns(confidence, masks, persona_idx))),
+        ("judge -> Decisions", timed(lambda: judge.judge(results))),
+        ("scalar loop -> Decisions", timed(lambda: scalar_judge(policies, results))),
+    ]
+    print(f"{n:,} results")
+    print(f"{'path':<30}{'seconds':>10}{'results/s':>16}")
+    for name, seconds in rows:
+        print(f"{name:<30}{seconds:>10.4f}{n / seconds:>16,.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,77 @@
+"""
+Latency benchmark: pooled, multiplexed MCP sessions vs a session per call.
+
+Runs the local stand-in MCP server (tests/mcp_standin.py) with a simulated
+network round-trip, then issues the same tool calls two ways from a thread
+pool:
+
+* per-call - connect, ``initialize``, ``tools/list``, ``tools/call``, close
+* pooled - ``McpPool.list_tools`` (cached) + ``call_tool`` over shared sessions
+
+Reports p50/p99 call latency, throughput and server-side handshake counts.
+
+    python benchmarks/bench_mcp_client.py [calls] [rtt_ms]
+"""
+
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from skills.mcp_client import McpPool, McpSession, SocketTransport, tcp
+from tests.mcp_standin import McpStandIn
+
+CONCURRENCY = 16
+
+
+def percentile(samples: list[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def per_call(port: int, i: int) -> float:
+    started = time.perf_counter()
+    session = McpSession.open(SocketTransport("127.0.0.1", port))
+    try:
+        session.request("tools/list")
+        session.request("tools/call", {"name": "echo", "arguments": {"i": i}})
+    finally:
+        session.close()
+    return time.perf_counter() - started
+
+
+def pooled(pool: McpPool, i: int) -> float:
+    started = time.perf_counter()
+    pool.list_tools("git")
+    pool.call_tool("git", "echo", {"i": i})
+    return time.perf_counter() - started
+
+
+def run(name: str, fn, calls: int, server: McpStandIn) -> None:
+    before = dict(server.stats)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(CONCURRENCY) as pool:
+        latencies = list(pool.map(fn, range(calls)))
+    wall = time.perf_counter() - started
+    handshakes = server.stats["initializations"] - before["initializations"]
+    print(
+        f"{name:<10}{1000 * statistics.median(latencies):>9.2f}{1000 * percentile(latencies, 0.99):>9.2f}"
+        f"{calls / wall:>12.0f}{handshakes:>12}"
+    )
+
+
+def main(calls: int = 2000, rtt_ms: int = 2) -> None:
+    with McpStandIn(latency=rtt_ms / 1000) as server:
+        print(f"{calls} calls, {CONCURRENCY} threads, {rtt_ms} ms simulated RTT")
+        print(f"{'mode':<10}{'p50 ms':>9}{'p99 ms':>9}{'calls/s':>12}{'handshakes':>12}")
+        run("per-call", lambda i: per_call(server.port, i), calls, server)
+        with McpPool({"git": tcp("127.0.0.1", server.port)}, max_sessions=2) as pool:
+            run("pooled", lambda i: pooled(pool, i), calls, server)
+            print(f"pool stats: {pool.stats()}")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
@@ -0,0 +1,92 @@
+"""
+Memory and JSON throughput: spec-shaped dicts vs slotted models vs RecordBatch.
+
+For Task, Result and Trend, builds ``n`` records three ways and reports
+tracemalloc bytes scaled to 1M records. It also reports spec JSON encode and
+decode rates (records/s):
+
+* dict:   json.dumps / json.loads on the nested spec dicts
+* model:  Model.to_json / Model.from_json
+* batch:  RecordBatch.to_json_lines / RecordBatch.from_json_lines
+
+    python benchmarks/bench_models.py [records]
+"""
+
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from skills.models import RecordBatch, Result, Task, Trend
+
+OBSERVED_AT = "2026-01-01T00:00:00+00:00"
+
+
+def make(model: type, n: int) -> list:
+    if model is Task:
+        return [Task(f"task-{i:08d}", "generate_content", "medium", f"post {i}", created_at=OBSERVED_AT) for i in range(n)]
+    if model is Result:
+        return [Result(f"task-{i:08d}", f"mcp://media/{i}", (i % 100) / 100, "m", i % 500, persona_id=f"p{i % 50}") for i in range(n)]
+    return [Trend(f"#topic_{i:08d}", 100.0 / (i % 20 + 1), "tiktok", OBSERVED_AT) for i in range(n)]
+
+
+def traced(build) -> tuple[object, int]:
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    value = build()
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    return value, used
+
+
+def rate(n: int, fn) -> float:
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return n / best
+
+
+def main(n: int = 200_000) -> None:
+    scale = 1_000_000 / n
+    print(f"{n} records per model; memory scaled to 1M records")
+    print(f"{'model':>8}{'dict MB':>10}{'model MB':>10}{'batch MB':>10}   encode/decode k rec/s: dict | model | batch")
+    for model in (Task, Result, Trend):
+        source = make(model, n)
+        dicts = [r.to_dict() for r in source]
+        lines = [json.dumps(d) for d in dicts]
+
+        _, dict_bytes = traced(lambda lines=lines: [json.loads(line) for line in lines])
+        _, model_bytes = traced(lambda model=model, lines=lines: [model.from_json(line) for line in lines])
+        batch, batch_bytes = traced(lambda model=model, lines=lines: RecordBatch.from_json_lines(model, lines))
+
+        rates = [
+            (
+                rate(n, lambda dicts=dicts: [json.dumps(d) for d in dicts]),
+                rate(n, lambda lines=lines: [json.loads(line) for line in lines]),
+            ),
+            (
+                rate(n, lambda source=source: [r.to_json() for r in source]),
+                rate(n, lambda model=model, lines=lines: [model.from_json(line) for line in lines]),
+            ),
+            (
+                rate(n, lambda batch=batch: list(batch.to_json_lines())),
+                rate(n, lambda model=model, lines=lines: RecordBatch.from_json_lines(model, lines)),
+            ),
+        ]
+        print(
+            f"{model.__name__:>8}"
+            + "".join(f"{b * scale / 2**20:>10.0f}" for b in (dict_bytes, model_bytes, batch_bytes))
+            + "   "
+            + " | ".join(f"{enc / 1000:.0f}/{dec / 1000:.0f}" for enc, dec in rates)
+        )
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
@@ -0,0 +1,64 @@
+"""
+Contention benchmark: OCC commit throughput as concurrent Judges rise.
+
+Each Judge thread walks the same pool of hot videos, appending a version and
+committing a status transition, so commits on a video race with every other
+Judge. Reported per store and Judge count: commits/s and conflicts per commit.
+
+    python benchmarks/bench_occ.py [videos] [ops_per_judge]
+"""
+
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from skills.occ_store import MemoryVideoStore, SQLVideoStore, add_version, transition
+
+JUDGES = (1, 2, 4, 8, 16, 32)
+
+
+def run(store, judges: int, videos: int, ops: int) -> tuple[float, int, int]:
+    ids = [f"v{i}" for i in range(videos)]
+    for vid in ids:
+        store.create({"id": vid})
+    barrier = threading.Barrier(judges + 1)
+
+    def judge(offset: int):
+        barrier.wait()
+        for i in range(ops):
+            vid = ids[(offset + i) % videos]
+            add_version(store, vid, f"mcp://media/{vid}/{offset}-{i}", 0.9)
+            row, _ = store.get(vid)
+            transition(store, vid, "failed" if row["status"] != "failed" else "draft")
+
+    threads = [threading.Thread(target=judge, args=(j,)) for j in range(judges)]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    return elapsed, store.stats["commits"], store.stats["conflicts"]
+
+
+def main(videos: int = 16, ops: int = 500) -> None:
+    print(f"{videos} hot videos, {ops} ops (version + transition) per Judge")
+    print(f"{'store':<8}{'judges':>8}{'commits/s':>14}{'conflicts/commit':>20}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ("memory", "sqlite"):
+            for judges in JUDGES:
+                if name == "memory":
+                    store = MemoryVideoStore()
+                else:
+                    store = SQLVideoStore.sqlite(str(Path(tmp) / f"occ-{judges}.db"))
+                elapsed, commits, conflicts = run(store, judges, videos, ops if name == "memory" else ops // 5)
+                print(f"{name:<8}{judges:>8}{commits / elapsed:>14,.0f}{conflicts / max(commits, 1):>20.3f}")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
@@ -0,0 +1,88 @@
+"""
+Throughput benchmark: batched persistence vs one INSERT per message.
+
+Simulates agents writing Task/Result/Decision rows concurrently to SQLite
+and reports rows/s plus mean flush latency for the BatchWriter.
+
+    python benchmarks/bench_persistence.py [agents] [messages_per_agent]
+"""
+
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from skills.models import Decision, Result, Task
+from skills.persistence import (
+    BatchWriter,
+    ConnectionPool,
+    create_schema,
+    decision_row,
+    result_row,
+    task_row,
+)
+
+
+def messages(agent: int, n: int):
+    for i in range(n):
+        task = Task.new("generate_content", goal=f"agent {agent} post {i}")
+        yield "tasks", task_row(task, f"agent-{agent}")
+        yield "results", result_row(Result(task.task_id, "mcp://media/x", 0.91, model="m", latency_ms=40))
+        yield "decisions", decision_row(Decision(task.task_id, "approve", "auto_approved"))
+
+
+def run_agents(agents: int, n: int, write) -> float:
+    threads = [threading.Thread(target=lambda a=a: [write(t, r) for t, r in messages(a, n)]) for a in range(agents)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return started
+
+
+def row_at_a_time(pool: ConnectionPool, agents: int, n: int) -> float:
+    def write(table, row):
+        with pool.connection() as conn, conn:
+            conn.execute(
+                f"INSERT INTO {table} ({', '.join(row)}) VALUES ({', '.join('?' * len(row))})",  # nosec B608
+                tuple(row.values()),
+            )
+
+    started = run_agents(agents, n, write)
+    return time.perf_counter() - started
+
+
+def batched(pool: ConnectionPool, agents: int, n: int) -> tuple[float, dict]:
+    writer = BatchWriter(pool, batch_size=1000, flush_interval=0.05)
+    started = run_agents(agents, n, writer.write)
+    writer.flush()
+    elapsed = time.perf_counter() - started
+    writer.close()
+    return elapsed, writer.metrics()
+
+
+def main(agents: int = 50, n: int = 200) -> None:
+    rows = agents * n * 3
+    with tempfile.TemporaryDirectory() as tmp:
+        single = ConnectionPool.sqlite(str(Path(tmp) / "single.db"), size=agents)
+        create_schema(single)
+        single_s = row_at_a_time(single, agents, n)
+
+        pool = ConnectionPool.sqlite(str(Path(tmp) / "batched.db"))
+        create_schema(pool)
+        batched_s, metrics = batched(pool, agents, n)
+
+    flush = metrics["flush_seconds"]
+    print(f"{agents} agents x {n} tasks = {rows:,} rows")
+    print(f"{'path':<24}{'seconds':>10}{'rows/s':>14}")
+    print(f"{'INSERT per message':<24}{single_s:>10.3f}{rows / single_s:>14,.0f}")
+    print(f"{'BatchWriter':<24}{batched_s:>10.3f}{rows / batched_s:>14,.0f}")
+    print(f"flushes: {flush['count']}, mean flush latency {1000 * flush['sum'] / max(flush['count'], 1):.2f} ms")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
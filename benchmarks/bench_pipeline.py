@@ -0,0 +1,259 @@
+"""
+End-to-end throughput benchmark for the Planner -> Worker -> Judge loop.
+
+Synthetic agents each run ``tasks_per_agent`` content tasks through the real
+skills:
+
+    skill_fetch_trends -> skill_generate_script -> skill_generate_video
+        -> Judge -> skill_publish_video (approved only)
+
+External systems are stubbed MCP servers (tests/mcp_standin.py) reached
+through ``McpPool``, each answering after ``mcp_latency_ms``. Trend fetches
+go through the shared trend cache. Publishes are one ``tools/call`` each.
+Agents are asyncio tasks, and blocking stages run on a bounded worker pool,
+as a Worker process would run them.
+
+For each scale (10, 100, 1000, ... up to ``max_agents``) the suite reports:
+
+* tasks/sec and end-to-end task latency (p50/p99, including queueing)
+* per-stage service latency p50/p99, from skill telemetry spans
+* memory per agent (tracemalloc over agent set-up plus one task each)
+
+Results are written as JSON to ``benchmarks/results/pipeline.json`` (or
+``$BENCH_OUTPUT``). If a previous result file exists, the change in tasks/sec
+per scale is printed (when the config matches) before it is overwritten.
+
+    python benchmarks/bench_pipeline.py [max_agents] [tasks_per_agent] [mcp_latency_ms]
+"""
+
+import asyncio
+import gc
+import json
+import os
+import platform
+import subprocess  # nosec B404 - reads the git revision only
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from skills import invoke, publish_video, telemetry, trend_fetcher  # noqa: E402
+from skills.confidence import ConfidenceAggregator  # noqa: E402
+from skills.judge import Judge, PersonaPolicy  # noqa: E402
+from skills.mcp_client import McpPool, tcp  # noqa: E402
+from skills.models import Result  # noqa: E402
+from tests.mcp_standin import McpStandIn  # noqa: E402
+
+PLATFORMS = ("tiktok", "youtube", "instagram", "twitter")
+REGIONS = ("us", "gb", "de", "br")
+STAGES = ("skill_fetch_trends", "skill_generate_script", "skill_generate_video", "judge", "skill_publish_video")
+WORKERS = 64
+OUTPUT = Path(os.environ.get("BENCH_OUTPUT", ROOT / "benchmarks" / "results" / "pipeline.json"))
+
+
+class Agent:
+    """One synthetic influencer agent: persona, home platform and recent outcomes."""
+
+    __slots__ = ("agent_id", "persona_id", "platform", "region", "published", "escalated", "history")
+
+    def __init__(self, i: int):
+        self.agent_id = f"agent-{i}"
+        self.persona_id = f"persona-{i % 50}"
+        self.platform = PLATFORMS[i % len(PLATFORMS)]
+        self.region = REGIONS[(i // len(PLATFORMS)) % len(REGIONS)]
+        self.published = 0
+        self.escalated = 0
+        self.history: list[str] = []
+
+    def run_task(self, n: int, judge: Judge, confidence: ConfidenceAggregator) -> None:
+        trends = invoke("skill_fetch_trends", platform=self.platform, region=self.region, category=None, limit=5)
+        topic = trends["trends"][n % len(trends["trends"])]["topic"]
+        script = invoke(
+            "skill_generate_script", trend_topic=topic, persona_id=self.persona_id, target_duration_seconds=30, language="en"
+        )
+        video = invoke(
+            "skill_generate_video",
+            script_text=script["script"]["text"],
+            persona_id=self.persona_id,
+            video_style="modern",
+            aspect_ratio="9:16",
+            language="en",
+        )
+        result = Result(
+            task_id=f"{self.agent_id}:{n}",
+            output=video["video_asset_id"],
+            confidence_score=script["confidence_score"],
+            safety_flags=script["safety_flags"],
+            persona_id=self.persona_id,
+        )
+        with telemetry.span("stage", "judge"):
+            decision = judge.judge_one(result)
+        confidence.observe(self.agent_id, result.confidence_score)
+        if decision.decision == "approve":
+            invoke(
+                "skill_publish_video",
+                platform=self.platform,
+                video_asset_id=video["video_asset_id"],
+                caption=topic,
+                hashtags=[f"#{self.persona_id}"],
+                schedule_time=None,
+            )
+            self.published += 1
+        else:
+            self.escalated += 1
+        self.history = (self.history + [decision.decision])[-8:]
+
+
+def install_backends(pool: McpPool) -> None:
+    def trend_source(platform: str, region: str, category: str | None, limit: int) -> list[dict]:
+        pool.call_tool("trends", "echo", {"platform": platform, "region": region, "limit": limit})
+        return trend_fetcher.offline_trend_source(platform, region, category, limit)
+
+    def publisher(post: dict) -> str:
+        pool.call_tool("social", "echo", {"platform": post["platform"], "video_asset_id": post["video_asset_id"]})
+        return f"{post['platform']}-{post['video_asset_id']}"
+
+    trend_fetcher.default_cache.source = trend_source
+    trend_fetcher.default_cache.invalidate()
+    publish_video.set_publisher(publisher)
+
+
+def make_judge() -> Judge:
+    return Judge(default=PersonaPolicy(auto_approve=0.85, human_review=0.6))
+
+
+def percentile(samples: list[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+async def drive(agents: list[Agent], tasks_per_agent: int, judge: Judge, confidence: ConfidenceAggregator) -> list[float]:
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(WORKERS)
+    latencies: list[float] = []
+
+    async def agent_loop(agent: Agent) -> None:
+        for n in range(tasks_per_agent):
+            started = time.perf_counter()
+            await loop.run_in_executor(executor, agent.run_task, n, judge, confidence)
+            latencies.append(time.perf_counter() - started)
+
+    try:
+        await asyncio.gather(*(agent_loop(a) for a in agents))
+    finally:
+        executor.shutdown()
+    return latencies
+
+
+def memory_per_agent(count: int) -> float:
+    """Bytes allocated per agent for its state plus one completed task."""
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    judge, confidence = make_judge(), ConfidenceAggregator()
+    agents = [Agent(i) for i in range(count)]
+    for agent in agents:
+        agent.run_task(0, judge, confidence)
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return used / count
+
+
+def run_scale(agents_n: int, tasks_per_agent: int) -> dict:
+    tel = telemetry.Telemetry(max_spans=1)
+    telemetry.set_telemetry(tel)
+    agents = [Agent(i) for i in range(agents_n)]
+    judge, confidence = make_judge(), ConfidenceAggregator()
+    started = time.perf_counter()
+    latencies = asyncio.run(drive(agents, tasks_per_agent, judge, confidence))
+    wall = time.perf_counter() - started
+    tasks = len(latencies)
+
+    summary = tel.summary()
+    stages = {}
+    for stage in STAGES:
+        row = summary.get(f"{'stage' if stage == 'judge' else 'skill'}/{stage}", {})
+        stages[stage] = {key: row.get(key, 0) for key in ("count", "p50_ms", "p99_ms", "errors")}
+    return {
+        "agents": agents_n,
+        "tasks": tasks,
+        "wall_seconds": round(wall, 3),
+        "tasks_per_second": round(tasks / wall, 1),
+        "task_p50_ms": round(1000 * percentile(latencies, 0.5), 3),
+        "task_p99_ms": round(1000 * percentile(latencies, 0.99), 3),
+        "published": sum(a.published for a in agents),
+        "escalated": sum(a.escalated for a in agents),
+        "stages": stages,
+        "memory_per_agent_bytes": round(memory_per_agent(min(agents_n, 1000))),
+    }
+
+
+def git_revision() -> str | None:
+    try:
+        out = subprocess.run(  # nosec B603 B607 - fixed argv
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, timeout=10, check=True
+        )
+    except (OSError, subprocess.CalledProcessError, subprocess.TimeoutExpired):
+        return None
+    return out.stdout.strip() or None
+
+
+def compare(previous: dict, current: dict) -> None:
+    before = {r["agents"]: r["tasks_per_second"] for r in previous.get("scales", [])}
+    for row in current["scales"]:
+        old = before.get(row["agents"])
+        if old:
+            change = 100 * (row["tasks_per_second"] - old) / old
+            print(f"  {row['agents']:>6} agents: {old:>9.1f} -> {row['tasks_per_second']:>9.1f} tasks/s ({change:+.1f}%)")
+
+
+def main(max_agents: int = 2000, tasks_per_agent: int = 5, mcp_latency_ms: int = 2) -> None:
+    scales = [n for n in (10, 100, 1000, 2000, 5000, 10000) if n <= max_agents] or [max_agents]
+    with McpStandIn(latency=mcp_latency_ms / 1000) as trends, McpStandIn(latency=mcp_latency_ms / 1000) as social:
+        pool = McpPool({"trends": tcp("127.0.0.1", trends.port), "social": tcp("127.0.0.1", social.port)})
+        install_backends(pool)
+        try:
+            print(f"{tasks_per_agent} tasks/agent, {mcp_latency_ms} ms MCP latency, {WORKERS} workers")
+            print(f"{'agents':>7}{'tasks/s':>10}{'p50 ms':>9}{'p99 ms':>9}{'B/agent':>10}  slowest stage p99")
+            rows = []
+            for n in scales:
+                row = run_scale(n, tasks_per_agent)
+                rows.append(row)
+                slowest = max(row["stages"].items(), key=lambda kv: kv[1]["p99_ms"])
+                print(
+                    f"{n:>7}{row['tasks_per_second']:>10.1f}{row['task_p50_ms']:>9.2f}{row['task_p99_ms']:>9.2f}"
+                    f"{row['memory_per_agent_bytes']:>10}  {slowest[0]} {slowest[1]['p99_ms']:.2f} ms"
+                )
+        finally:
+            publish_video.set_publisher(None)
+            trend_fetcher.default_cache.source = trend_fetcher.offline_trend_source
+            trend_fetcher.default_cache.invalidate()
+            telemetry.set_telemetry(telemetry.Telemetry())
+            pool.close()
+
+    report = {
+        "benchmark": "pipeline",
+        "recorded_at": datetime.now(timezone.utc).isoformat(),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "machine": {"platform": platform.platform(), "cpus": os.cpu_count()},
+        "config": {"tasks_per_agent": tasks_per_agent, "mcp_latency_ms": mcp_latency_ms, "workers": WORKERS},
+        "scales": rows,
+    }
+    if OUTPUT.exists():
+        previous = json.loads(OUTPUT.read_text())
+        if previous.get("config") == report["config"]:
+            print(f"vs previous run ({previous.get('git_revision')}, {previous.get('recorded_at')}):")
+            compare(previous, report)
+    OUTPUT.parent.mkdir(parents=True, exist_ok=True)
+    OUTPUT.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"wrote {OUTPUT}")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:4]))
@@ -0,0 +1,127 @@
+"""
+Replanning cost: incremental RunningDag.replan vs restarting the DAG.
+
+Builds a content DAG of ``nodes`` tasks (per trend: script -> video ->
+publish, with every 50 trends feeding a roll-up report), runs it until about
+a third of the nodes have completed, then applies plans that change ``k``
+nodes (new goal for a script, a new thumbnail task, a dropped publish, a
+priority bump). For each change it reports:
+
+* restart: start a fresh run of the new plan (topological sort, bottom
+  levels, queue), which also redoes every completed node
+* diff+apply: ``replan(new_graph)``, diffing the whole plan against the run
+* apply: ``replan(delta)`` with the Planner handing over only the edits
+
+    python benchmarks/bench_replan.py [max_nodes]
+"""
+
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from skills.dag_executor import DagExecutor, PlanDelta, TaskGraph
+from skills.models import Task
+
+CHANGES = (1, 10, 100, 1000)
+
+
+def content_dag(nodes: int) -> TaskGraph:
+    graph = TaskGraph()
+    trends = nodes // 3
+    for i in range(trends):
+        graph.add(Task(f"script-{i}", "generate_content", goal=f"script {i}"))
+        graph.add(Task(f"video-{i}", "render_video", goal=f"video {i}"), [f"script-{i}"], cost=5)
+        graph.add(Task(f"publish-{i}", "reply", goal=f"publish {i}"), [f"video-{i}"])
+        if i % 50 == 49:
+            graph.add(Task(f"report-{i}", "generate_content", goal="report"), [f"publish-{j}" for j in range(i - 49, i + 1)])
+    return graph
+
+
+def copy_graph(graph: TaskGraph) -> TaskGraph:
+    new = TaskGraph()
+    for tid, task in graph.tasks.items():
+        new.add(task, graph.deps[tid], graph.cost[tid])
+    return new
+
+
+def edit(graph: TaskGraph, k: int, rng: random.Random, version: int) -> tuple[TaskGraph, PlanDelta]:
+    """A new plan with ``k`` edits, and the same edits as a PlanDelta."""
+    plan = copy_graph(graph)
+    fragment = TaskGraph()
+    scripts = [tid for tid in graph.tasks if tid.startswith("script-")]
+    added, changed, reprioritised, removed = [], [], [], []
+    for n, tid in enumerate(rng.sample(scripts, k)):
+        i = tid.split("-")[1]
+        kind = n % 4
+        if kind == 0:
+            task = Task(tid, "generate_content", goal=f"script {i} v{version}")
+            plan.replace(task, plan.deps[tid], plan.cost[tid])
+            fragment.add(task, plan.deps[tid], plan.cost[tid])
+            changed.append(tid)
+        elif kind == 1:
+            thumb = Task(f"thumb-{i}-{version}", "generate_content", goal="thumbnail")
+            plan.add(thumb, [tid])
+            fragment.add(thumb, [tid])
+            added.append(thumb.task_id)
+        elif kind == 2 and not plan.children[f"publish-{i}"]:
+            plan.remove([f"publish-{i}"])
+            removed.append(f"publish-{i}")
+        else:
+            task = Task(tid, "generate_content", priority="high", goal=plan.tasks[tid].goal)
+            plan.replace(task, plan.deps[tid], plan.cost[tid])
+            fragment.add(task, plan.deps[tid], plan.cost[tid])
+            reprioritised.append(tid)
+    return plan, PlanDelta(fragment, added=added, changed=changed, reprioritised=reprioritised, removed=removed)
+
+
+def timed(fn) -> tuple[float, object]:
+    started = time.perf_counter()
+    out = fn()
+    return 1000 * (time.perf_counter() - started), out
+
+
+async def bench(nodes: int, rng: random.Random) -> None:
+    async def handler(task):
+        return task.goal
+
+    graph = content_dag(nodes)
+    executor = DagExecutor({"generate_content": handler, "render_video": handler, "reply": handler})
+    running = executor.start(graph)
+    waiter = asyncio.ensure_future(running.wait())
+    while len(running.report.results) < len(graph) // 3:
+        await asyncio.sleep(0)
+
+    for version, k in enumerate(CHANGES, 1):
+        plan, _ = edit(running.graph, k, rng, 2 * version)
+        fresh = copy_graph(plan)
+        restart_ms, _ = timed(lambda fresh=fresh: executor.start(fresh))
+        diff_ms, _ = timed(lambda plan=plan: running.replan(plan))
+        _, delta = edit(running.graph, k, rng, 2 * version + 1)
+        apply_ms, stats = timed(lambda delta=delta: running.replan(delta))
+        done = len(running.report.results)
+        print(
+            f"{len(running.graph):>8}{k:>7}{restart_ms:>11.2f}{diff_ms:>13.2f}{apply_ms:>9.2f}"
+            f"{done:>10}{stats['invalidated']:>10}"
+        )
+    waiter.cancel()
+    try:
+        await waiter
+    except asyncio.CancelledError:
+        pass
+
+
+def main(max_nodes: int = 100_000) -> None:
+    rng = random.Random(3)
+    print("times in ms; 'redone' = completed nodes a restart repeats vs nodes a replan invalidates")
+    print(f"{'nodes':>8}{'change':>7}{'restart':>11}{'diff+apply':>13}{'apply':>9}{'redone':>10}{'replan':>10}")
+    for nodes in (10_000, 30_000, 100_000):
+        if nodes <= max_nodes:
+            asyncio.run(bench(nodes, rng))
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
@@ -0,0 +1,80 @@
+"""
+Recall/latency benchmark: IVF PostMemory vs exact brute force.
+
+Clustered random embeddings stand in for real post vectors. For each nprobe
+setting, reports recall@k against the exact scan and per-query latency for
+single and batched queries. Also times a cold load (mmap) of the saved index.
+
+    python benchmarks/bench_semantic_memory.py [n_posts] [dim]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+
+from skills.semantic_memory import PostMemory
+
+K = 10
+N_QUERIES = 200
+
+
+def clustered(n: int, dim: int, rng: np.random.Generator, centers: int = 256) -> np.ndarray:
+    c = rng.standard_normal((centers, dim)).astype(np.float32)
+    return (c[rng.integers(centers, size=n)] + 0.4 * rng.standard_normal((n, dim))).astype(np.float32)
+
+
+def ids(hits: list[list[dict]]) -> list[set[str]]:
+    return [{h["post_id"] for h in row} for row in hits]
+
+
+def per_query_ms(fn, queries: np.ndarray) -> float:
+    started = time.perf_counter()
+    for q in queries:
+        fn(q)
+    return 1000 * (time.perf_counter() - started) / len(queries)
+
+
+def main(n: int = 100_000, dim: int = 128) -> None:
+    rng = np.random.default_rng(0)
+    vectors = clustered(n, dim, rng)
+    queries = clustered(N_QUERIES, dim, rng)
+
+    memory = PostMemory(dim)
+    for i, v in enumerate(vectors):
+        memory.add(f"p{i}", "", ("a", "b", "c")[i % 3], float(i % 100) / 100, v)
+    started = time.perf_counter()
+    memory.build()
+    print(f"{n:,} posts, dim {dim}, nlist {memory.nlist}, build {time.perf_counter() - started:.2f}s")
+
+    truth = ids(memory.search(queries, K, exact=True))
+    exact_ms = per_query_ms(lambda q: memory.search(q, K, exact=True), queries)
+    print(f"{'mode':<16}{'recall@10':>10}{'ms/query':>10}{'batched ms/q':>14}")
+    started = time.perf_counter()
+    memory.search(queries, K, exact=True)
+    print(f"{'brute force':<16}{1.0:>10.3f}{exact_ms:>10.3f}{1000 * (time.perf_counter() - started) / N_QUERIES:>14.3f}")
+    for nprobe in (1, 4, 8, 16, 32):
+        found = ids(memory.search(queries, K, nprobe=nprobe))
+        recall = np.mean([len(a & b) / K for a, b in zip(found, truth)])
+        ms = per_query_ms(lambda q, nprobe=nprobe: memory.search(q, K, nprobe=nprobe), queries)
+        started = time.perf_counter()
+        memory.search(queries, K, nprobe=nprobe)
+        batched = 1000 * (time.perf_counter() - started) / N_QUERIES
+        print(f"{f'ivf nprobe={nprobe}':<16}{recall:>10.3f}{ms:>10.3f}{batched:>14.3f}")
+
+    filtered_ms = per_query_ms(lambda q: memory.search(q, K, persona_id="b", min_engagement=0.5), queries)
+    print(f"filtered (persona + engagement) ivf: {filtered_ms:.3f} ms/query")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        memory.save(tmp)
+        started = time.perf_counter()
+        PostMemory.load(tmp).search(queries[0], K)
+        print(f"mmap warm start + first query: {1000 * (time.perf_counter() - started):.1f} ms")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
@@ -0,0 +1,116 @@
+"""
+Budget reservation throughput under contention: SpendLedger vs a database.
+
+``threads`` workers reserve and commit small credit purchases against
+``agents`` shared budgets for ``seconds`` seconds. Reported per thread count:
+
+* ledger:  SpendLedger.reserve + commit, with the audit ledger in a temp
+  directory and a background flusher submitting to the mock wallet
+* sqlite:  one ``BEGIN IMMEDIATE`` read-check-update transaction per
+  reservation, the shape of a per-request budget check in a shared database
+
+plus wallet submissions per committed spend, which batching is there to cut.
+
+    python benchmarks/bench_spend_ledger.py [max_threads] [agents]
+"""
+
+import asyncio
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from skills.spend_ledger import BudgetError, SpendLedger
+from tests.wallet_standin import MockWallet
+
+SECONDS = 1.0
+PAYEES = ("openai", "runway", "ideogram")
+
+
+def hammer(threads: int, step) -> int:
+    """Run ``step(worker, i)`` in ``threads`` threads for SECONDS; return total steps."""
+    counts = [0] * threads
+    deadline = time.perf_counter() + SECONDS
+
+    def worker(w: int) -> None:
+        i = 0
+        while time.perf_counter() < deadline:
+            step(w, i)
+            i += 1
+        counts[w] = i
+
+    pool = [threading.Thread(target=worker, args=(w,)) for w in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return sum(counts)
+
+
+def bench_ledger(threads: int, agents: int, tmp: Path) -> tuple[float, int]:
+    wallet = MockWallet({f"a{i}": 10**15 for i in range(agents)})
+    ledger = SpendLedger(wallet, ledger=tmp / f"ledger-{threads}.jsonl", batch_size=500, max_delay=0.1)
+    for i in range(agents):
+        ledger.set_budget(f"a{i}", 10**15)
+    stop = asyncio.Event()
+    flusher = threading.Thread(target=asyncio.run, args=(ledger.run(stop, interval=0.05),))
+    flusher.start()
+
+    def step(w: int, i: int) -> None:
+        try:
+            hold = ledger.reserve(f"a{(w + i) % agents}", 1000, payee=PAYEES[i % 3])
+        except BudgetError:
+            return
+        ledger.commit(hold)
+
+    done = hammer(threads, step)
+    stop.set()
+    flusher.join()
+    ledger.close()
+    return done / SECONDS, ledger.stats()["submissions"]
+
+
+def bench_sqlite(threads: int, agents: int, tmp: Path) -> float:
+    path = tmp / f"budget-{threads}.db"
+    with sqlite3.connect(path) as db:
+        db.execute("CREATE TABLE budget (agent TEXT PRIMARY KEY, lim INTEGER, spent INTEGER)")
+        db.executemany("INSERT INTO budget VALUES (?, ?, 0)", [(f"a{i}", 10**15) for i in range(agents)])
+    local = threading.local()
+
+    def step(w: int, i: int) -> None:
+        db = getattr(local, "db", None)
+        if db is None:
+            db = local.db = sqlite3.connect(path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+        agent = f"a{(w + i) % agents}"
+        db.execute("BEGIN IMMEDIATE")
+        lim, spent = db.execute("SELECT lim, spent FROM budget WHERE agent = ?", (agent,)).fetchone()
+        if spent + 1000 <= lim:
+            db.execute("UPDATE budget SET spent = spent + 1000 WHERE agent = ?", (agent,))
+        db.execute("COMMIT")
+
+    return hammer(threads, step) / SECONDS
+
+
+def main(max_threads: int = 64, agents: int = 8) -> None:
+    print(f"{agents} shared budgets, {SECONDS:.0f}s per run; rates in reservations/s")
+    print(f"{'threads':>8}{'ledger':>12}{'sqlite':>12}{'speedup':>9}{'spends/submission':>19}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for threads in (1, 4, 16, 64):
+            if threads > max_threads:
+                break
+            ledger_rate, submissions = bench_ledger(threads, agents, Path(tmp))
+            sqlite_rate = bench_sqlite(threads, agents, Path(tmp))
+            per_submission = ledger_rate * SECONDS / max(submissions, 1)
+            print(
+                f"{threads:>8}{ledger_rate:>12,.0f}{sqlite_rate:>12,.0f}"
+                f"{ledger_rate / sqlite_rate:>8.0f}x{per_submission:>19,.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
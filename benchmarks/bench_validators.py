@@ -0,0 +1,84 @@
+"""
+Micro-benchmark: per-call cost of compiled contract validators.
+
+Compares the validators compiled once from skills/README.md against a naive
+validator that re-interprets the contract schema on every call.
+
+    python benchmarks/bench_validators.py
+"""
+
+import sys
+import timeit
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from skills import CONTRACTS
+
+CALLS = {
+    "skill_fetch_trends": {"platform": "twitter", "region": "us", "category": None, "limit": 10},
+    "skill_generate_script": {"trend_topic": "AI", "persona_id": "p1", "target_duration_seconds": 60, "language": "en"},
+    "skill_publish_video": {
+        "platform": "youtube",
+        "video_asset_id": "asset_123",
+        "caption": "Check this out",
+        "hashtags": ["tech", "ai"],
+        "schedule_time": "2026-02-05T12:00:00Z",
+    },
+}
+
+
+def naive_validate(fields: dict, params: dict) -> dict:
+    """Walk the raw contract schema for every call (the approach being replaced)."""
+    for name, spec in fields.items():
+        if name not in params:
+            if isinstance(spec, str) and "null" in spec:
+                params[name] = None
+                continue
+            raise TypeError(f"missing required parameter: {name}")
+        naive_check(spec, params[name], name)
+    return params
+
+
+def naive_check(spec, value, path):
+    if isinstance(spec, list):
+        if not isinstance(value, list):
+            raise TypeError(path)
+        for element in value:
+            naive_check(spec[0], element, path)
+        return
+    options = [token.strip() for token in spec.split("|")]
+    for option in options:
+        if option == "null" and value is None:
+            return
+        if option == "string" and isinstance(value, str):
+            return
+        if option == "number" and isinstance(value, (int, float)) and not isinstance(value, bool):
+            return
+        if option == "ISO-8601 timestamp" and isinstance(value, str):
+            try:
+                datetime.fromisoformat(value.replace("Z", "+00:00"))
+                return
+            except ValueError:
+                pass
+    raise TypeError(path)
+
+
+def per_call_ns(fn, number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e9
+
+
+def main(number: int = 200_000) -> None:
+    print(f"{'skill':<24}{'compiled ns':>14}{'naive ns':>12}{'speedup':>10}")
+    for name, params in CALLS.items():
+        contract = CONTRACTS[name]
+        compiled = per_call_ns(lambda contract=contract, params=params: contract.validate_input(dict(params)), number)
+        naive = per_call_ns(
+            lambda contract=contract, params=params: naive_validate(contract.inputs, dict(params)), number
+        )
+        print(f"{name:<24}{compiled:>14.0f}{naive:>12.0f}{naive / compiled:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
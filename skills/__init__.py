@@ -1 +1,96 @@
 # Chimera skills package - contracts defined in skills/README.md
+"""
+Skill registry.
+
+Contracts are parsed from skills/README.md once, at import, and compiled into
+per-skill validators (see skills/contracts.py). Implementations register with
+``@skill("skill_name")``; the returned callable validates its keyword
+arguments against the contract before running and the returned dict against
+the contract's outputs after, so every skill call goes through the same
+cached validators, inside a ``skill`` span (skills/telemetry.py).
+
+Skills are declared by their contracts; an implementation module
+(``skills/<name without skill_>.py``) is imported the first time
+``get_skill``/``invoke`` asks for it, so a Worker only pays for the backends it
+uses. ``warm_up`` imports a Worker role's skills ahead of the first task
+(``WORKER_ROLES``, or ``$CHIMERA_WORKER_ROLE`` when no role is given). Keep
+this module and skills/contracts.py free of heavy imports: they are on every
+Worker's start path.
+"""
+
+import functools
+import importlib
+import os
+from collections.abc import Iterable
+
+from skills import telemetry
+from skills.contracts import SkillContract, SkillError, load_contracts
+
+__all__ = ["CONTRACTS", "WORKER_ROLES", "SkillContract", "SkillError", "get_skill", "invoke", "loaded_skills", "skill", "warm_up"]
+
+CONTRACTS: dict[str, SkillContract] = load_contracts(os.path.join(os.path.dirname(__file__), "README.md"))
+
+# Skills each Worker role imports up front; anything else still loads on first call.
+WORKER_ROLES: dict[str, tuple[str, ...]] = {
+    "trends": ("skill_fetch_trends",),
+    "content": ("skill_fetch_trends", "skill_generate_script"),
+    "render": ("skill_generate_video",),
+    "publisher": ("skill_publish_video",),
+    "all": tuple(CONTRACTS),
+}
+
+_REGISTRY: dict[str, object] = {}
+
+
+def skill(name: str):
+    """Register a skill implementation behind its compiled input and output validators."""
+    try:
+        contract = CONTRACTS[name]
+    except KeyError:
+        raise KeyError(f"no contract for {name!r} in skills/README.md") from None
+    validate, validate_output = contract.validate_input, contract.validate_output
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **params):
+            if args:
+                raise TypeError(f"{name}() accepts keyword arguments only")
+            with telemetry.span("skill", name):
+                return validate_output(fn(**validate(params)))
+
+        wrapper.contract = contract
+        _REGISTRY[name] = wrapper
+        return wrapper
+
+    return decorator
+
+
+def get_skill(name: str):
+    """Return the registered callable for ``name``, importing ``skills.<name>`` if needed."""
+    impl = _REGISTRY.get(name)
+    if impl is None:
+        if name not in CONTRACTS:
+            raise KeyError(f"unknown skill {name!r}")
+        importlib.import_module(f"skills.{name.removeprefix('skill_')}")
+        impl = _REGISTRY[name]
+    return impl
+
+
+def invoke(name: str, /, **params):
+    """Call a skill by contract name."""
+    return get_skill(name)(**params)
+
+
+def warm_up(role: str | None = None, skills: Iterable[str] = ()) -> list[str]:
+    """Import the skills of ``role`` (default ``$CHIMERA_WORKER_ROLE``) plus ``skills``; return their names."""
+    role = role or os.environ.get("CHIMERA_WORKER_ROLE")
+    names = list(WORKER_ROLES[role]) if role else []
+    names += [name for name in skills if name not in names]
+    for name in names:
+        get_skill(name)
+    return names
+
+
+def loaded_skills() -> list[str]:
+    """Names of skills whose implementation modules have been imported."""
+    return sorted(_REGISTRY)
@@ -0,0 +1,372 @@
+"""
+Content-addressed, deduplicated media asset store.
+
+Media is split with content-defined chunking (a gear rolling hash, as in
+FastCDC): boundaries depend on the bytes around them, not on offsets, so an
+edit early in a file only changes the chunks it touches and every other
+chunk deduplicates against the previous render. Each unique chunk is stored
+once under its SHA-256; an asset is a manifest listing its chunks.
+
+The gear hash keeps 32 bits and shifts one bit per byte, so the hash at a
+position depends only on the last 32 bytes. That lets ``chunk_boundaries``
+compute it for a whole block by doubling the window (five vectorised NumPy
+shift-and-add passes for 32 bytes) instead of a Python loop per byte.
+
+Reads are zero-copy: ``AssetReader`` memory-maps chunk files and hands out
+``memoryview`` slices, so bytes are never copied into Python objects.
+
+Unreferenced chunks are removed by ``gc`` (mark from manifests, then sweep).
+Within one ``AssetStore``, ``put`` and ``gc`` exclude each other: any number of
+puts run at once, but gc waits for them to finish and holds new ones back
+until its sweep is done, so a chunk a put has reused is always covered by a
+manifest by the time gc marks. Chunks newer than ``grace_seconds`` survive as
+well, for puts from other processes sharing the directory.
+
+``pin`` holds an asset for a later reader (e.g. a scheduled publish): while it
+is pinned, ``delete`` only marks it and the manifest is dropped, freeing its
+chunks for ``gc``, when the last pin is released. Pins live in this process.
+
+Layout under ``root`` (``FilesystemBackend``)::
+
+    chunks/ab/abcdef...            chunk bytes, named by SHA-256
+    assets/{asset_id}.json         {"asset_id", "size", "chunks": [[sha256, length], ...]}
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+import numpy as np
+
+DEFAULT_AVG_CHUNK = 64 * 1024
+DEFAULT_MIN_CHUNK = 16 * 1024
+DEFAULT_MAX_CHUNK = 256 * 1024
+DEFAULT_GC_GRACE = 300.0
+
+ASSET_URL = "mcp://media/assets/{asset_id}"
+
+_WINDOW = 32
+_BLOCK = 8 * 1024 * 1024
+_GEAR = np.random.default_rng(0x43484D52).integers(0, 2**32, 256, dtype=np.uint64).astype(np.uint32)
+
+
+def _gear_hashes(block: np.ndarray) -> np.ndarray:
+    """Rolling gear hash after every byte of ``block`` (uint32, wraps mod 2**32)."""
+    h = _GEAR[block]
+    span = 1
+    while span < _WINDOW:  # H_2k[i] = H_k[i] + (H_k[i-k] << k): log2(window) passes
+        h[span:] += h[:-span] << np.uint32(span)
+        span *= 2
+    return h
+
+
+def chunk_boundaries(
+    data,
+    *,
+    avg_size: int = DEFAULT_AVG_CHUNK,
+    min_size: int = DEFAULT_MIN_CHUNK,
+    max_size: int = DEFAULT_MAX_CHUNK,
+) -> list[int]:
+    """End offsets of content-defined chunks covering ``data`` (bytes-like)."""
+    if not (0 < min_size <= avg_size <= max_size) or avg_size & (avg_size - 1):
+        raise ValueError("need 0 < min_size <= avg_size <= max_size with avg_size a power of two")
+    buf = np.frombuffer(data, dtype=np.uint8)
+    n = len(buf)
+    bits = avg_size.bit_length() - 1
+    mask = np.uint32(((1 << bits) - 1) << (32 - bits))  # high bits mix the whole window
+
+    candidates = []
+    for start in range(0, n, _BLOCK):
+        lo = max(0, start - _WINDOW + 1)
+        hashes = _gear_hashes(buf[lo : start + _BLOCK])[start - lo :]
+        candidates.append(np.flatnonzero((hashes & mask) == 0) + start + 1)
+    cuts = np.concatenate(candidates) if candidates else np.empty(0, dtype=np.int64)
+
+    ends, last = [], 0
+    while last < n:
+        lower, upper = last + min_size, min(last + max_size, n)
+        i = int(np.searchsorted(cuts, lower, side="left"))
+        end = int(cuts[i]) if i < len(cuts) and cuts[i] <= upper else upper
+        ends.append(end)
+        last = end
+    return ends
+
+
+class FilesystemBackend:
+    """Chunk and manifest files under one directory."""
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+        (self.root / "chunks").mkdir(parents=True, exist_ok=True)
+        (self.root / "assets").mkdir(parents=True, exist_ok=True)
+
+    def chunk_path(self, digest: str) -> Path:
+        return self.root / "chunks" / digest[:2] / digest
+
+    def has_chunk(self, digest: str) -> bool:
+        return self.chunk_path(digest).is_file()
+
+    def write_chunk(self, digest: str, data) -> None:
+        path = self.chunk_path(digest)
+        path.parent.mkdir(exist_ok=True)
+        _atomic_write(path, data)
+
+    def touch_chunk(self, digest: str) -> None:
+        os.utime(self.chunk_path(digest))
+
+    def chunks(self) -> Iterator[tuple[str, int, float]]:
+        """Every stored chunk as ``(digest, size, mtime)``."""
+        for path in (self.root / "chunks").glob("*/*"):
+            if not path.name.startswith("."):
+                st = path.stat()
+                yield path.name, st.st_size, st.st_mtime
+
+    def delete_chunk(self, digest: str) -> None:
+        self.chunk_path(digest).unlink(missing_ok=True)
+
+    def manifest_path(self, asset_id: str) -> Path:
+        if not asset_id or "/" in asset_id or asset_id.startswith("."):
+            raise ValueError(f"invalid asset_id {asset_id!r}")
+        return self.root / "assets" / f"{asset_id}.json"
+
+    def write_manifest(self, asset_id: str, manifest: dict) -> None:
+        _atomic_write(self.manifest_path(asset_id), json.dumps(manifest).encode())
+
+    def read_manifest(self, asset_id: str) -> dict | None:
+        try:
+            return json.loads(self.manifest_path(asset_id).read_bytes())
+        except FileNotFoundError:
+            return None
+
+    def delete_manifest(self, asset_id: str) -> bool:
+        try:
+            self.manifest_path(asset_id).unlink()
+        except FileNotFoundError:
+            return False
+        return True
+
+    def manifests(self) -> Iterator[dict]:
+        for path in (self.root / "assets").glob("*.json"):
+            yield json.loads(path.read_bytes())
+
+
+class AssetReader:
+    """Zero-copy view of one asset: mmap-backed ``memoryview`` per chunk."""
+
+    def __init__(self, backend: FilesystemBackend, manifest: dict):
+        self.asset_id = manifest["asset_id"]
+        self.size = manifest["size"]
+        self._backend = backend
+        self._chunks = manifest["chunks"]
+        self._maps: list[mmap.mmap | None] = [None] * len(self._chunks)
+        self._offsets = np.cumsum([0] + [length for _, length in self._chunks])
+
+    def __enter__(self) -> "AssetReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def chunks(self) -> Iterator[memoryview]:
+        """The asset as a sequence of read-only memoryviews, in order."""
+        for i in range(len(self._chunks)):
+            yield self._view(i)
+
+    def read(self, offset: int = 0, length: int | None = None) -> Iterator[memoryview]:
+        """Memoryviews covering ``[offset, offset + length)``."""
+        end = self.size if length is None else min(self.size, offset + length)
+        i = max(0, int(np.searchsorted(self._offsets, offset, side="right")) - 1)
+        while offset < end and i < len(self._chunks):
+            base = int(self._offsets[i])
+            view = self._view(i)
+            yield view[offset - base : min(end - base, len(view))]
+            offset = base + len(view)
+            i += 1
+
+    def copy_to(self, fileobj) -> int:
+        """Stream the whole asset into a binary file object without intermediate copies."""
+        written = 0
+        for view in self.chunks():
+            fileobj.write(view)
+            written += len(view)
+        return written
+
+    def close(self) -> None:
+        for i, m in enumerate(self._maps):
+            if m is not None:
+                self._maps[i] = None
+                try:
+                    m.close()
+                except BufferError:
+                    pass  # a caller still holds a view; the map is freed with it
+
+    def _view(self, i: int) -> memoryview:
+        m = self._maps[i]
+        if m is None:
+            with open(self._backend.chunk_path(self._chunks[i][0]), "rb") as fh:
+                m = self._maps[i] = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            if hasattr(m, "madvise"):
+                m.madvise(mmap.MADV_WILLNEED)  # fault the chunk in with one readahead, not per page
+        return memoryview(m)
+
+
+class AssetStore:
+    """Deduplicating asset store over a ``FilesystemBackend``."""
+
+    def __init__(
+        self,
+        backend: FilesystemBackend | str | Path,
+        *,
+        avg_chunk: int = DEFAULT_AVG_CHUNK,
+        min_chunk: int = DEFAULT_MIN_CHUNK,
+        max_chunk: int = DEFAULT_MAX_CHUNK,
+    ):
+        self.backend = backend if isinstance(backend, FilesystemBackend) else FilesystemBackend(backend)
+        self.avg_chunk = avg_chunk
+        self.min_chunk = min_chunk
+        self.max_chunk = max_chunk
+        self._lock = threading.Lock()
+        self._gate = threading.Condition()  # puts share it, gc takes it alone
+        self._puts = 0
+        self._collecting = False
+        self._pins: dict[str, int] = {}
+        self._doomed: set[str] = set()  # deleted while pinned
+        self.counters = {"puts": 0, "logical_bytes": 0, "new_bytes": 0, "chunks_written": 0, "chunks_reused": 0}
+
+    def url(self, asset_id: str) -> str:
+        return ASSET_URL.format(asset_id=asset_id)
+
+    def put(self, asset_id: str, data) -> dict:
+        """Store ``data`` (any bytes-like, incl. mmap) as ``asset_id``; returns what was new."""
+        with self._gate:
+            while self._collecting:
+                self._gate.wait()
+            self._puts += 1
+        try:
+            return self._put(asset_id, data)
+        finally:
+            with self._gate:
+                self._puts -= 1
+                self._gate.notify_all()
+
+    def _put(self, asset_id: str, data) -> dict:
+        view = memoryview(data).cast("B")
+        chunks, new_bytes, written = [], 0, 0
+        start = 0
+        for end in chunk_boundaries(view, avg_size=self.avg_chunk, min_size=self.min_chunk, max_size=self.max_chunk):
+            piece = view[start:end]
+            digest = hashlib.sha256(piece).hexdigest()
+            if self.backend.has_chunk(digest):
+                self.backend.touch_chunk(digest)  # keeps it clear of another process's gc sweep
+            else:
+                self.backend.write_chunk(digest, piece)
+                new_bytes += len(piece)
+                written += 1
+            chunks.append([digest, len(piece)])
+            start = end
+        self.backend.write_manifest(asset_id, {"asset_id": asset_id, "size": len(view), "chunks": chunks})
+        with self._lock:
+            self.counters["puts"] += 1
+            self.counters["logical_bytes"] += len(view)
+            self.counters["new_bytes"] += new_bytes
+            self.counters["chunks_written"] += written
+            self.counters["chunks_reused"] += len(chunks) - written
+        return {"asset_id": asset_id, "size": len(view), "chunks": len(chunks), "new_chunks": written, "new_bytes": new_bytes}
+
+    def put_file(self, asset_id: str, path: str | Path) -> dict:
+        """Chunk a file through mmap rather than reading it into memory."""
+        with open(path, "rb") as fh:
+            if os.fstat(fh.fileno()).st_size == 0:
+                return self.put(asset_id, b"")
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                return self.put(asset_id, m)
+
+    def put_parts(self, asset_id: str, parts: Iterable[bytes]) -> dict:
+        """Store an asset delivered in pieces (e.g. render chunks)."""
+        return self.put(asset_id, b"".join(parts))
+
+    def open(self, asset_id: str) -> AssetReader:
+        manifest = self.backend.read_manifest(asset_id)
+        if manifest is None:
+            raise KeyError(f"unknown asset {asset_id!r}")
+        return AssetReader(self.backend, manifest)
+
+    def exists(self, asset_id: str) -> bool:
+        return self.backend.read_manifest(asset_id) is not None
+
+    def delete(self, asset_id: str) -> bool:
+        """Drop the manifest; its chunks go at the next ``gc`` if nothing else uses them."""
+        with self._lock:
+            if asset_id in self._pins:
+                if asset_id in self._doomed or not self.exists(asset_id):
+                    return False
+                self._doomed.add(asset_id)  # dropped by the last unpin
+                return True
+            return self.backend.delete_manifest(asset_id)
+
+    def pin(self, asset_id: str) -> None:
+        """Keep ``asset_id`` readable, and its chunks out of ``gc``, until ``unpin``."""
+        with self._lock:
+            self._pins[asset_id] = self._pins.get(asset_id, 0) + 1
+
+    def unpin(self, asset_id: str) -> None:
+        with self._lock:
+            held = self._pins.get(asset_id, 0) - 1
+            if held > 0:
+                self._pins[asset_id] = held
+                return
+            self._pins.pop(asset_id, None)
+            if asset_id in self._doomed:
+                self._doomed.discard(asset_id)
+                self.backend.delete_manifest(asset_id)
+
+    def gc(self, *, grace_seconds: float = DEFAULT_GC_GRACE) -> dict:
+        """Mark chunks referenced by any manifest, sweep the rest (past the grace period)."""
+        with self._gate:
+            while self._collecting:
+                self._gate.wait()
+            self._collecting = True  # no new puts from here on
+            while self._puts:
+                self._gate.wait()
+        try:
+            return self._collect(grace_seconds)
+        finally:
+            with self._gate:
+                self._collecting = False
+                self._gate.notify_all()
+
+    def _collect(self, grace_seconds: float) -> dict:
+        started = time.time()
+        live = {digest for manifest in self.backend.manifests() for digest, _ in manifest["chunks"]}
+        deleted = freed = 0
+        for digest, size, mtime in list(self.backend.chunks()):
+            if digest not in live and mtime < started - grace_seconds:
+                self.backend.delete_chunk(digest)
+                deleted += 1
+                freed += size
+        return {"deleted_chunks": deleted, "freed_bytes": freed, "live_chunks": len(live)}
+
+    def stats(self) -> dict:
+        """Logical vs physical bytes across every asset currently stored."""
+        logical = sum(m["size"] for m in self.backend.manifests())
+        stored = sum(size for _, size, _ in self.backend.chunks())
+        return {
+            "logical_bytes": logical,
+            "stored_bytes": stored,
+            "dedup_ratio": round(logical / stored, 3) if stored else 1.0,
+        }
+
+
+def _atomic_write(path: Path, data) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp, path)
@@ -0,0 +1,177 @@
+"""
+Incremental ``agent_status.confidence_avg`` (the OpenClaw trust level).
+
+Instead of averaging every ``results`` row for an agent, each new
+``Result.confidence_score`` is folded into fixed-size per-agent state:
+
+* a ring of the last ``window`` scores with a running sum, so the windowed
+  mean is O(1) per update (the sum is re-totalled with ``math.fsum`` each
+  time the ring wraps, which bounds floating-point drift at amortised O(1))
+* an EWMA with smoothing ``alpha`` (default ``2 / (window + 1)``)
+
+State lives in ``array`` slabs indexed by agent slot, like
+``TrendVelocityIndex``. ``checkpoint`` writes the slabs as raw bytes together
+with a caller-supplied watermark: whatever identifies the last result folded
+in, e.g. its ``(created_at, id)``. ``ConfidenceAggregator.restore`` loads the
+state back and returns that watermark, so the caller replays exactly the
+results past it, with no gap and nothing counted twice.
+"""
+
+import json
+import math
+import os
+import sys
+from array import array
+from collections.abc import Iterable
+from pathlib import Path
+
+DEFAULT_WINDOW = 100
+KINDS = ("window", "ewma")
+
+_MAGIC = b"CHCF1"
+
+
+class ConfidenceAggregator:
+    """Per-agent rolling mean and EWMA of Result confidence scores."""
+
+    def __init__(self, *, window: int = DEFAULT_WINDOW, alpha: float | None = None, kind: str = "window"):
+        if window < 1:
+            raise ValueError("window must be >= 1")
+        if kind not in KINDS:
+            raise ValueError(f"kind must be one of {', '.join(KINDS)}, got {kind!r}")
+        self.window = window
+        self.alpha = 2.0 / (window + 1) if alpha is None else alpha
+        if not 0.0 < self.alpha <= 1.0:
+            raise ValueError("alpha must be in (0, 1]")
+        self.kind = kind
+
+        self._slots: dict[str, int] = {}
+        self._agents: list[str] = []
+        self._ring = array("d")
+        self._sum = array("d")
+        self._ewma = array("d")
+        self._pos = array("q")
+        self._count = array("q")
+        self.observations = 0
+
+    def __len__(self) -> int:
+        return len(self._agents)
+
+    def __contains__(self, agent_id: str) -> bool:
+        return agent_id in self._slots
+
+    def observe(self, agent_id: str, confidence_score: float) -> float:
+        """Fold one score in O(1); returns the agent's new ``confidence_avg``."""
+        if not 0.0 <= confidence_score <= 1.0:  # also rejects NaN
+            raise ValueError(f"confidence_score must be in [0, 1], got {confidence_score!r}")
+        slot = self._slots.get(agent_id)
+        if slot is None:
+            slot = self._allocate(agent_id)
+            self._ewma[slot] = confidence_score
+        else:
+            self._ewma[slot] += self.alpha * (confidence_score - self._ewma[slot])
+
+        base = slot * self.window
+        pos = self._pos[slot]
+        if self._count[slot] < self.window:
+            self._count[slot] += 1
+            self._sum[slot] += confidence_score
+        else:
+            self._sum[slot] += confidence_score - self._ring[base + pos]
+        self._ring[base + pos] = confidence_score
+        pos = (pos + 1) % self.window
+        self._pos[slot] = pos
+        if pos == 0:
+            self._sum[slot] = math.fsum(self._ring[base : base + self.window])
+        self.observations += 1
+        return self.confidence_avg(agent_id)
+
+    def observe_many(self, scores: Iterable[tuple[str, float]]) -> None:
+        for agent_id, confidence_score in scores:
+            self.observe(agent_id, confidence_score)
+
+    def confidence_avg(self, agent_id: str) -> float | None:
+        """The configured aggregate (``kind``), or None for an unseen agent."""
+        return self.mean(agent_id) if self.kind == "window" else self.ewma(agent_id)
+
+    def mean(self, agent_id: str) -> float | None:
+        slot = self._slots.get(agent_id)
+        return None if slot is None else self._sum[slot] / self._count[slot]
+
+    def ewma(self, agent_id: str) -> float | None:
+        slot = self._slots.get(agent_id)
+        return None if slot is None else self._ewma[slot]
+
+    def count(self, agent_id: str) -> int:
+        """Scores currently in the agent's window (at most ``window``)."""
+        slot = self._slots.get(agent_id)
+        return 0 if slot is None else self._count[slot]
+
+    def snapshot(self) -> dict[str, float]:
+        """``confidence_avg`` for every agent, e.g. for a status refresh."""
+        return {agent_id: self.confidence_avg(agent_id) for agent_id in self._agents}
+
+    def checkpoint(self, path: str | Path, watermark=None) -> None:
+        """Write all state and ``watermark`` (any JSON value) atomically (temp file + rename)."""
+        path = Path(path)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "wb") as fh:
+            fh.write(self.to_bytes(watermark))
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, path)
+
+    @classmethod
+    def restore(cls, path: str | Path) -> tuple["ConfidenceAggregator", object]:
+        """Load a checkpoint; returns the aggregator and the watermark it was written with."""
+        return cls.from_bytes(Path(path).read_bytes())
+
+    def to_bytes(self, watermark=None) -> bytes:
+        header = json.dumps(
+            {
+                "window": self.window,
+                "alpha": self.alpha,
+                "kind": self.kind,
+                "agents": self._agents,
+                "observations": self.observations,
+                "watermark": watermark,
+                "byteorder": sys.byteorder,
+            }
+        ).encode()
+        slabs = (self._ring, self._sum, self._ewma, self._pos, self._count)
+        return b"".join((_MAGIC, len(header).to_bytes(4, "little"), header, *(s.tobytes() for s in slabs)))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> tuple["ConfidenceAggregator", object]:
+        if not data.startswith(_MAGIC):
+            raise ValueError("not a confidence checkpoint")
+        offset = len(_MAGIC)
+        size = int.from_bytes(data[offset : offset + 4], "little")
+        offset += 4
+        header = json.loads(data[offset : offset + size])
+        offset += size
+
+        agg = cls(window=header["window"], alpha=header["alpha"], kind=header["kind"])
+        n = len(header["agents"])
+        for name, length in (("_ring", n * agg.window), ("_sum", n), ("_ewma", n), ("_pos", n), ("_count", n)):
+            slab = getattr(agg, name)
+            end = offset + length * slab.itemsize
+            slab.frombytes(data[offset:end])
+            if header["byteorder"] != sys.byteorder:
+                slab.byteswap()
+            offset = end
+        if offset != len(data):
+            raise ValueError("truncated or oversized confidence checkpoint")
+        agg._agents = list(header["agents"])
+        agg._slots = {agent_id: slot for slot, agent_id in enumerate(agg._agents)}
+        agg.observations = header["observations"]
+        return agg, header.get("watermark")
+
+    def _allocate(self, agent_id: str) -> int:
+        slot = len(self._agents)
+        self._agents.append(agent_id)
+        self._slots[agent_id] = slot
+        self._ring.frombytes(bytes(8 * self.window))
+        for slab in (self._sum, self._ewma, self._pos, self._count):
+            slab.append(0)
+        return slot
@@ -0,0 +1,257 @@
+"""
+Skill I/O contracts parsed from skills/README.md and compiled into validators.
+
+The README is the single source of truth for skill inputs and outputs. It is
+read once, and every field type is turned into a specialised check up front:
+plain scalar fields become a ``type(value) in {...}`` membership test, while
+timestamps, enums, arrays and nested objects get a dedicated closure. Per
+call, a validator only runs those prebuilt checks; the schema is never
+re-interpreted on the hot path.
+
+Type vocabulary used by the README contracts:
+
+* ``"string"``, ``"number"`` and ``"ISO-8601 timestamp"``
+* ``"A | B"`` unions, where ``null`` makes a field nullable and upper-case
+  tokens (``SUCCESS | FAILED``) are enum literals
+* ``["string"]`` arrays and nested ``{...}`` objects, optionally ``| null``
+"""
+
+import json
+import os
+import re
+from collections.abc import Callable
+from datetime import datetime, timezone
+
+Validator = Callable[[dict], dict]
+Check = Callable[[object, str], None]
+
+_SKILL_HEADING = re.compile(r"^## Skill \d+: `(\w+)`\s*$", re.MULTILINE)
+_JSON_BLOCK = re.compile(r"### (Inputs|Outputs)\s*```json\s*(.*?)```", re.DOTALL)
+_NULLABLE_OBJECT = re.compile(r"}\s*\|\s*null")
+_NULLABLE_MARKER = "__nullable__"
+
+_SCALAR_TYPES: dict[str, frozenset[type]] = {
+    "string": frozenset({str}),
+    "number": frozenset({int, float}),
+}
+
+
+class SkillError(RuntimeError):
+    """Structured skill failure: a machine-readable ``code`` plus a message."""
+
+    def __init__(self, code: str, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+    def to_dict(self) -> dict:
+        return {"code": self.code, "message": self.message}
+
+
+class SkillContract:
+    """Parsed contract for one skill, with its compiled validators.
+
+    A plain slotted class rather than a dataclass: this module is on every
+    Worker's import path, and ``dataclasses`` pulls in ``inspect``.
+    """
+
+    __slots__ = ("name", "inputs", "outputs", "validate_input", "validate_output")
+
+    def __init__(self, name: str, inputs: dict, outputs: dict, validate_input: Validator, validate_output: Validator):
+        self.name = name
+        self.inputs = inputs
+        self.outputs = outputs
+        self.validate_input = validate_input
+        self.validate_output = validate_output
+
+    def __repr__(self) -> str:
+        return f"SkillContract(name={self.name!r}, inputs={self.inputs!r}, outputs={self.outputs!r})"
+
+
+def load_contracts(path: str | os.PathLike) -> dict[str, SkillContract]:
+    """Parse every ``## Skill N: `name``` section of the README at ``path``."""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    headings = list(_SKILL_HEADING.finditer(text))
+    contracts = {}
+    for i, heading in enumerate(headings):
+        end = headings[i + 1].start() if i + 1 < len(headings) else len(text)
+        blocks = {kind: _parse_block(body) for kind, body in _JSON_BLOCK.findall(text[heading.end():end])}
+        name = heading.group(1)
+        if "Inputs" not in blocks or "Outputs" not in blocks:
+            raise ValueError(f"{name}: contract must define Inputs and Outputs JSON blocks")
+        contracts[name] = SkillContract(
+            name=name,
+            inputs=blocks["Inputs"],
+            outputs=blocks["Outputs"],
+            validate_input=compile_validator(name, blocks["Inputs"]),
+            validate_output=compile_validator(f"{name} output", blocks["Outputs"]),
+        )
+    return contracts
+
+
+def _parse_block(body: str) -> dict:
+    # "{...} | null" is not JSON; fold it into a marker key on the object.
+    return json.loads(_NULLABLE_OBJECT.sub(f', "{_NULLABLE_MARKER}": true}}', body))
+
+
+def compile_validator(owner: str, fields: dict) -> Validator:
+    """
+    Build a validator for a top-level parameter object.
+
+    Missing required fields and wrong types raise ``TypeError``; well-typed
+    but malformed values (bad timestamps, unknown enum members) raise
+    ``ValueError``. Nullable fields may be omitted and are filled with None.
+    The (possibly completed) params dict is returned.
+    """
+    names = frozenset(fields)
+    nullable = frozenset(name for name, spec in fields.items() if _is_nullable(spec))
+    scalar: list[tuple[str, frozenset[type], str]] = []
+    complex_: list[tuple[str, Check]] = []
+    for name, spec in fields.items():
+        types = _scalar_types(spec)
+        if types is not None:
+            scalar.append((name, types, spec))
+        else:
+            complex_.append((name, _compile_check(spec)))
+    scalar_t = tuple(scalar)
+    complex_t = tuple(complex_)
+
+    def fix_keys(params: dict) -> None:
+        unknown = params.keys() - names
+        if unknown:
+            raise TypeError(f"{owner}() got unexpected parameter(s): {', '.join(sorted(unknown))}")
+        missing = sorted(names - params.keys() - nullable)
+        if missing:
+            raise TypeError(f"{owner}() missing required parameter(s): {', '.join(missing)}")
+        for name in nullable - params.keys():
+            params[name] = None
+
+    def validate(params: dict) -> dict:
+        if params.keys() != names:
+            fix_keys(params)
+        for name, types, spec in scalar_t:
+            value = params[name]
+            if type(value) not in types:
+                raise TypeError(f"{owner}(): parameter '{name}' must be {spec}, got {type(value).__name__}")
+        for name, check in complex_t:
+            check(params[name], name)
+        return params
+
+    validate.__name__ = f"validate_{owner.replace(' ', '_')}"
+    return validate
+
+
+def _is_nullable(spec) -> bool:
+    if isinstance(spec, str):
+        return "null" in _tokens(spec)
+    if isinstance(spec, dict):
+        return bool(spec.get(_NULLABLE_MARKER))
+    return False
+
+
+def _tokens(spec: str) -> list[str]:
+    return [token.strip() for token in spec.split("|")]
+
+
+def _scalar_types(spec) -> frozenset[type] | None:
+    """Exact-type set for specs that reduce to a plain type test, else None."""
+    if not isinstance(spec, str):
+        return None
+    types: set[type] = set()
+    for token in _tokens(spec):
+        if token == "null":
+            types.add(type(None))
+        elif token in _SCALAR_TYPES:
+            types |= _SCALAR_TYPES[token]
+        else:
+            return None
+    return frozenset(types)
+
+
+def _compile_check(spec) -> Check:
+    if isinstance(spec, list):
+        return _array_check(spec)
+    if isinstance(spec, dict):
+        return _object_check(spec)
+    return _union_check(spec)
+
+
+def _union_check(spec: str) -> Check:
+    types: set[type] = set()
+    literals: set[str] = set()
+    timestamp = False
+    for token in _tokens(spec):
+        if token == "null":
+            types.add(type(None))
+        elif token in _SCALAR_TYPES:
+            types |= _SCALAR_TYPES[token]
+        elif token == "ISO-8601 timestamp":
+            timestamp = True
+        else:
+            literals.add(token)
+    types_f = frozenset(types)
+    literals_f = frozenset(literals)
+
+    def check(value, path: str) -> None:
+        if type(value) in types_f:
+            return
+        if type(value) is not str:
+            raise TypeError(f"'{path}' must be {spec}, got {type(value).__name__}")
+        if value in literals_f:
+            return
+        if timestamp and _is_timestamp(value):
+            return
+        raise ValueError(f"'{path}' must be {spec}, got {value!r}")
+
+    return check
+
+
+def _array_check(spec: list) -> Check:
+    item = _scalar_types(spec[0]) if spec else None
+    item_check = None if item is not None or not spec else _compile_check(spec[0])
+
+    def check(value, path: str) -> None:
+        if type(value) is not list:
+            raise TypeError(f"'{path}' must be an array, got {type(value).__name__}")
+        if item is not None:
+            for i, element in enumerate(value):
+                if type(element) not in item:
+                    raise TypeError(f"'{path}[{i}]' must be {spec[0]}, got {type(element).__name__}")
+        elif item_check is not None:
+            for i, element in enumerate(value):
+                item_check(element, f"{path}[{i}]")
+
+    return check
+
+
+def _object_check(spec: dict) -> Check:
+    nullable = bool(spec.get(_NULLABLE_MARKER))
+    fields = {name: sub for name, sub in spec.items() if name != _NULLABLE_MARKER}
+    checks = tuple((name, _compile_check(sub)) for name, sub in fields.items())
+
+    def check(value, path: str) -> None:
+        if value is None and nullable:
+            return
+        if type(value) is not dict:
+            raise TypeError(f"'{path}' must be an object, got {type(value).__name__}")
+        for name, sub_check in checks:
+            if name not in value:
+                raise TypeError(f"'{path}.{name}' is required")
+            sub_check(value[name], f"{path}.{name}")
+
+    return check
+
+
+def parse_timestamp(value: str) -> datetime:
+    """An ISO-8601 timestamp as an aware datetime; one without an offset is taken as UTC."""
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=timezone.utc)
+
+
+def _is_timestamp(value: str) -> bool:
+    try:
+        parse_timestamp(value)
+    except ValueError:
+        return False
+    return True
@@ -0,0 +1,619 @@
+"""
+Bounded-concurrency execution of Planner task DAGs.
+
+The Planner decomposes a goal into a DAG of ``Task``s (specs/technical.md);
+Workers execute them. ``DagExecutor`` starts every node as soon as its
+dependencies have finished, subject to a concurrency limit per
+``task_type`` (``render_video`` is heavy, ``reply`` is cheap). Among ready
+nodes of a type, the one with the longest remaining critical path (its
+"bottom level": own cost plus the costliest chain of descendants) starts
+first, then higher ``priority``, then insertion order.
+
+A failed node does not abort the run: its descendants are skipped and the
+failure is reported as a structured error next to the successful results.
+
+Each node runs in a ``task`` span (skills/telemetry.py); a handler returning
+a ``Result`` without ``latency_ms`` gets the span's duration filled in.
+Synchronous handlers run on the executor's own thread pool, sized to the sum
+of their types' limits (capped by ``max_concurrency``), so a limit such as
+``reply: 128`` is reachable; the loop's default executor is far smaller.
+
+Replanning. ``DagExecutor.start`` returns a ``RunningDag`` that the Planner
+can ``replan`` while it runs, with a new decomposition of the goal (a
+``TaskGraph``) or a ready-made ``PlanDelta``. ``diff`` compares node ids.
+Nodes whose work fields (``WORK_FIELDS``) or dependencies are unchanged keep
+their state: completed results stay, and in-progress nodes keep running. A
+changed or removed node is cancelled if running and its result is dropped.
+The same happens to every dependant that had already started on top of it;
+pending work downstream is simply held back again. A priority or cost change
+only re-orders the ready queue: heap entries are replaced lazily, and
+bottom levels are recomputed for the changed nodes' ancestors only. The cost
+of applying a delta therefore follows the size of the change and the
+subtrees it touches, not the size of the DAG. A cancelled handler running
+in a thread cannot be interrupted; its result is discarded.
+"""
+
+import asyncio
+import contextvars
+import functools
+import heapq
+import inspect
+import itertools
+import os
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+
+from skills import telemetry
+from skills.contracts import SkillError
+from skills.models import Result, Task
+
+# Handler signature: Task -> result; may be a coroutine function.
+Handler = Callable[[Task], object]
+
+PRIORITY_RANK = {"high": 0, "medium": 1, "low": 2}
+DEFAULT_TYPE_LIMIT = 8
+
+# Task fields whose change means a node's work must be redone; priority and
+# cost only re-order the queue.
+WORK_FIELDS = ("task_type", "goal", "persona_constraints", "resources")
+
+PENDING, READY, RUNNING, DONE, FAILED, SKIPPED = "pending", "ready", "running", "done", "failed", "skipped"
+
+
+def default_limits() -> dict[str, int]:
+    """Per-task_type concurrency caps sized to this node."""
+    cores = os.cpu_count() or 1
+    return {"render_video": cores, "generate_content": 32, "reply": 128, "transact": 4}
+
+
+class TaskGraph:
+    """A DAG of Tasks with optional per-node cost estimates (seconds or any unit)."""
+
+    def __init__(self):
+        self.tasks: dict[str, Task] = {}
+        self.deps: dict[str, tuple[str, ...]] = {}
+        self.children: dict[str, list[str]] = {}
+        self.cost: dict[str, float] = {}
+
+    def add(self, task: Task, depends_on: Iterable[str] = (), cost: float = 1.0) -> Task:
+        if task.task_id in self.tasks:
+            raise ValueError(f"duplicate task_id {task.task_id!r}")
+        self.tasks[task.task_id] = task
+        self.deps[task.task_id] = tuple(depends_on)
+        self.children.setdefault(task.task_id, [])
+        self.cost[task.task_id] = cost
+        for dep in self.deps[task.task_id]:
+            self.children.setdefault(dep, []).append(task.task_id)
+        return task
+
+    def replace(self, task: Task, depends_on: Iterable[str] = (), cost: float = 1.0) -> Task:
+        """Swap in a new definition for an existing node, rewiring its dependency edges."""
+        tid = task.task_id
+        old, new = self.deps[tid], tuple(depends_on)
+        for dep in old:
+            if dep not in new:
+                self.children[dep].remove(tid)
+        for dep in new:
+            if dep not in old:
+                self.children.setdefault(dep, []).append(tid)
+        self.tasks[tid], self.deps[tid], self.cost[tid] = task, new, cost
+        return task
+
+    def remove(self, task_ids: Iterable[str]) -> None:
+        """Drop a set of nodes; no remaining node may depend on them."""
+        doomed = set(task_ids)
+        for tid in doomed:
+            if any(child not in doomed for child in self.children[tid]):
+                raise ValueError(f"task {tid!r} still has dependants")
+        for tid in doomed:
+            for dep in self.deps[tid]:
+                if dep not in doomed:
+                    self.children[dep].remove(tid)
+        for tid in doomed:
+            del self.tasks[tid], self.deps[tid], self.children[tid], self.cost[tid]
+
+    def __len__(self) -> int:
+        return len(self.tasks)
+
+    def topological_order(self) -> list[str]:
+        """Kahn's algorithm; raises ValueError on unknown dependencies or cycles."""
+        for tid, deps in self.deps.items():
+            for dep in deps:
+                if dep not in self.tasks:
+                    raise ValueError(f"task {tid!r} depends on unknown task {dep!r}")
+        indegree = {tid: len(deps) for tid, deps in self.deps.items()}
+        frontier = [tid for tid, n in indegree.items() if n == 0]
+        order = []
+        while frontier:
+            tid = frontier.pop()
+            order.append(tid)
+            for child in self.children[tid]:
+                indegree[child] -= 1
+                if indegree[child] == 0:
+                    frontier.append(child)
+        if len(order) != len(self.tasks):
+            raise ValueError("task graph contains a cycle")
+        return order
+
+    def bottom_levels(self, order: list[str] | None = None) -> dict[str, float]:
+        """Cost of the longest path from each node to a sink, inclusive."""
+        order = self.topological_order() if order is None else order
+        level: dict[str, float] = {}
+        for tid in reversed(order):
+            level[tid] = self.cost[tid] + max((level[c] for c in self.children[tid]), default=0.0)
+        return level
+
+    def descendants(self, tid: str) -> set[str]:
+        seen: set[str] = set()
+        stack = list(self.children[tid])
+        while stack:
+            node = stack.pop()
+            if node not in seen:
+                seen.add(node)
+                stack.extend(self.children[node])
+        return seen
+
+
+class DagRun:
+    """Outcome of one DAG execution."""
+
+    def __init__(self):
+        self.results: dict[str, object] = {}
+        self.errors: dict[str, dict] = {}
+        self.skipped: set[str] = set()
+        self.started: list[str] = []
+        self.durations: dict[str, float] = {}
+        self.peak_concurrency: dict[str, int] = {}
+        self.cancelled: set[str] = set()
+        self.removed: set[str] = set()
+        self.replans = 0
+        self.elapsed = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors and not self.skipped
+
+
+class DagExecutor:
+    """Runs TaskGraphs with per-task_type concurrency limits."""
+
+    def __init__(
+        self,
+        handlers: dict[str, Handler],
+        *,
+        limits: dict[str, int] | None = None,
+        default_limit: int = DEFAULT_TYPE_LIMIT,
+        max_concurrency: int | None = None,
+    ):
+        self.handlers = dict(handlers)
+        self.limits = default_limits() if limits is None else dict(limits)
+        self.default_limit = default_limit
+        self.max_concurrency = max_concurrency
+        if any(limit < 1 for limit in self.limits.values()) or default_limit < 1:
+            raise ValueError("concurrency limits must be at least 1")
+        self._threads: ThreadPoolExecutor | None = None
+
+    def __enter__(self) -> "DagExecutor":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Shut down the thread pool used by synchronous handlers."""
+        if self._threads is not None:
+            self._threads.shutdown(wait=True, cancel_futures=True)
+            self._threads = None
+
+    def limit_for(self, task_type: str) -> int:
+        return self.limits.get(task_type, self.default_limit)
+
+    async def run(self, graph: TaskGraph) -> DagRun:
+        return await self.start(graph).wait()
+
+    def start(self, graph: TaskGraph) -> "RunningDag":
+        """Prepare ``graph`` for execution; ``await .wait()`` runs it, ``.replan`` edits it."""
+        return RunningDag(self, graph)
+
+    async def _execute(self, task: Task):
+        handler = self.handlers.get(task.task_type)
+        if handler is None:
+            raise SkillError("NO_HANDLER", f"no handler registered for task_type {task.task_type!r}")
+        with telemetry.span("task", task.task_type, {"task_id": task.task_id}) as span:
+            if _is_async(handler):
+                out = await handler(task)
+            else:
+                # Like asyncio.to_thread, but on our own pool; the context copy keeps the span current.
+                call = functools.partial(contextvars.copy_context().run, handler, task)
+                out = await asyncio.get_running_loop().run_in_executor(self._thread_pool(), call)
+        if isinstance(out, Result) and not out.latency_ms:
+            out.latency_ms = round(span.duration_ms)
+        return out
+
+    def _thread_pool(self) -> ThreadPoolExecutor:
+        if self._threads is None:
+            size = sum(self.limit_for(t) for t, handler in self.handlers.items() if not _is_async(handler))
+            if self.max_concurrency is not None:
+                size = min(size, self.max_concurrency)
+            self._threads = ThreadPoolExecutor(max_workers=max(size, 1), thread_name_prefix="dag-task")
+        return self._threads
+
+
+def _is_async(handler: Handler) -> bool:
+    return inspect.iscoroutinefunction(handler) or (
+        callable(handler) and inspect.iscoroutinefunction(type(handler).__call__)
+    )
+
+
+class PlanDelta:
+    """
+    Edits that turn a running DAG into a new plan. Definitions for ``added``,
+    ``changed`` and ``reprioritised`` ids are read from ``graph``, which only
+    needs to hold those nodes.
+    """
+
+    def __init__(
+        self,
+        graph: TaskGraph,
+        *,
+        added: Iterable[str] = (),
+        changed: Iterable[str] = (),
+        reprioritised: Iterable[str] = (),
+        removed: Iterable[str] = (),
+    ):
+        self.graph = graph
+        self.added = list(added)
+        self.changed = list(changed)
+        self.reprioritised = list(reprioritised)
+        self.removed = list(removed)
+
+    def __len__(self) -> int:
+        return len(self.added) + len(self.changed) + len(self.reprioritised) + len(self.removed)
+
+    def __repr__(self) -> str:
+        return (
+            f"PlanDelta(added={len(self.added)}, changed={len(self.changed)}, "
+            f"reprioritised={len(self.reprioritised)}, removed={len(self.removed)})"
+        )
+
+
+def diff(old: TaskGraph, new: TaskGraph) -> PlanDelta:
+    """Node-by-node comparison of two decompositions of the same goal, keyed by task_id."""
+    added, changed, reprioritised = [], [], []
+    old_tasks, old_deps, old_cost = old.tasks, old.deps, old.cost
+    for tid, task in new.tasks.items():
+        prev = old_tasks.get(tid)
+        if prev is None:
+            added.append(tid)
+            continue
+        deps, prev_deps = new.deps[tid], old_deps[tid]
+        if (deps != prev_deps and set(deps) != set(prev_deps)) or (
+            task is not prev and any(getattr(task, f) != getattr(prev, f) for f in WORK_FIELDS)
+        ):
+            changed.append(tid)
+        elif task.priority != prev.priority or new.cost[tid] != old_cost[tid]:
+            reprioritised.append(tid)
+    removed = [tid for tid in old_tasks if tid not in new.tasks]
+    return PlanDelta(new, added=added, changed=changed, reprioritised=reprioritised, removed=removed)
+
+
+class RunningDag:
+    """One execution of a TaskGraph that can be replanned while it runs. Owns and edits ``graph``."""
+
+    def __init__(self, executor: DagExecutor, graph: TaskGraph):
+        order = graph.topological_order()
+        self.executor = executor
+        self.graph = graph
+        self.report = DagRun()
+        self._rank = graph.bottom_levels(order)
+        self._seq = {tid: i for i, tid in enumerate(graph.tasks)}
+        self._next_seq = itertools.count(len(graph.tasks))
+        self._state = dict.fromkeys(graph.tasks, PENDING)
+        self._waiting = {tid: len(deps) for tid, deps in graph.deps.items()}
+        self._blocked = dict.fromkeys(graph.tasks, 0)
+        self._ready: dict[str, list] = {}
+        self._queued: dict[str, tuple] = {}
+        self._active: dict[str, int] = {}
+        self._running: dict[asyncio.Future, tuple[str, float]] = {}
+        self._future: dict[str, asyncio.Future] = {}
+        self._poke: asyncio.Future | None = None
+        self._finished = False
+        for tid in order:
+            if self._waiting[tid] == 0:
+                self._push(tid)
+
+    def state(self, task_id: str) -> str:
+        return self._state[task_id]
+
+    async def wait(self) -> DagRun:
+        loop = asyncio.get_running_loop()
+        report = self.report
+        started_at = time.perf_counter()
+        try:
+            while True:
+                while (tid := self._next_ready()) is not None:
+                    self._start(tid)
+                if not self._running:
+                    break
+                if self._poke is None or self._poke.done():
+                    self._poke = loop.create_future()
+                done, _ = await asyncio.wait([*self._running, self._poke], return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    entry = self._running.pop(future, None)
+                    if entry is None:  # the replan wake-up, or cancelled by a replan
+                        continue
+                    tid, t0 = entry
+                    del self._future[tid]
+                    self._active[self.graph.tasks[tid].task_type] -= 1
+                    report.durations[tid] = time.perf_counter() - t0
+                    exc = future.exception()
+                    if exc is not None:
+                        self._state[tid] = FAILED
+                        report.errors[tid] = _error(exc)
+                        for child in self.graph.children[tid]:
+                            self._blocked[child] += 1
+                            self._settle(child)
+                        continue
+                    self._state[tid] = DONE
+                    report.results[tid] = future.result()
+                    for child in self.graph.children[tid]:
+                        self._waiting[child] -= 1
+                        if self._waiting[child] == 0 and self._state[child] is PENDING:
+                            self._push(child)
+        finally:
+            self._finished = True
+            for future in self._running:
+                future.cancel()
+        report.skipped = {tid for tid, state in self._state.items() if state is SKIPPED}
+        report.elapsed = time.perf_counter() - started_at
+        return report
+
+    # -- replanning --------------------------------------------------------
+
+    def replan(self, plan: "TaskGraph | PlanDelta") -> dict:
+        """Apply a new plan (diffed against the running DAG) or a delta; return what it touched."""
+        if self._finished:
+            raise RuntimeError("DAG run has finished")
+        delta = plan if isinstance(plan, PlanDelta) else diff(self.graph, plan)
+        self._validate(delta)
+        graph, source = self.graph, delta.graph
+        stats = {
+            "added": len(delta.added),
+            "changed": len(delta.changed),
+            "reprioritised": len(delta.reprioritised),
+            "removed": len(delta.removed),
+            "invalidated": 0,
+            "cancelled": 0,
+            "reranked": 0,
+        }
+
+        for tid in itertools.chain(delta.changed, delta.removed):
+            self._reset(tid, stats)
+        for tid in delta.added:
+            graph.add(source.tasks[tid], source.deps[tid], source.cost[tid])
+            self._state[tid] = PENDING
+            self._seq[tid] = next(self._next_seq)
+        for tid in delta.changed:
+            self._rewire(tid, source.deps[tid])
+            graph.replace(source.tasks[tid], source.deps[tid], source.cost[tid])
+        for tid in delta.added:
+            deps = graph.deps[tid]
+            self._waiting[tid] = sum(self._state[d] is not DONE for d in deps)
+            self._blocked[tid] = sum(self._state[d] is FAILED or self._state[d] is SKIPPED for d in deps)
+        for tid in delta.reprioritised:
+            graph.tasks[tid], graph.cost[tid] = source.tasks[tid], source.cost[tid]
+
+        touched = set(delta.added) | set(delta.changed) | set(delta.reprioritised)
+        if delta.removed:
+            doomed = set(delta.removed)
+            touched |= {d for tid in doomed for d in graph.deps[tid] if d not in doomed}
+            graph.remove(doomed)
+            for tid in doomed:
+                self._forget(tid)
+            self.report.removed |= doomed
+            touched -= doomed
+
+        reranked = self._rerank(touched)
+        stats["reranked"] = len(reranked)
+        for tid in itertools.chain(delta.added, delta.changed):
+            self._settle(tid)
+        for tid in (reranked | set(delta.reprioritised)) - set(delta.added) - set(delta.changed):
+            if self._state[tid] is READY:
+                self._push(tid)  # the old heap entry goes stale and is dropped when it surfaces
+
+        self.report.replans += 1
+        if self._poke is not None and not self._poke.done():
+            self._poke.set_result(None)
+        return stats
+
+    def _validate(self, delta: PlanDelta) -> None:
+        graph, source = self.graph, delta.graph
+        added, changed, removed = set(delta.added), set(delta.changed), set(delta.removed)
+        for tid in added:
+            if tid in graph.tasks:
+                raise ValueError(f"task {tid!r} already in the running DAG")
+        for tid in itertools.chain(changed, delta.reprioritised, removed):
+            if tid not in graph.tasks:
+                raise ValueError(f"task {tid!r} is not in the running DAG")
+        new_children: dict[str, list[str]] = {}
+        for tid in itertools.chain(added, changed):
+            for dep in source.deps[tid]:
+                if dep in removed or (dep not in graph.tasks and dep not in added):
+                    raise ValueError(f"task {tid!r} depends on unknown task {dep!r}")
+                new_children.setdefault(dep, []).append(tid)
+        for tid in removed:
+            for child in graph.children[tid]:
+                if child not in removed and child not in changed:
+                    raise ValueError(f"task {child!r} still depends on removed task {tid!r}")
+
+        def children_after(node: str):
+            for child in graph.children.get(node, ()):
+                if child not in removed and child not in changed:
+                    yield child
+            yield from new_children.get(node, ())
+
+        # Any new cycle runs through a new edge, so it lies among the descendants of added/changed nodes.
+        reach, stack = set(), list(added | changed)
+        while stack:
+            node = stack.pop()
+            if node not in reach:
+                reach.add(node)
+                stack.extend(children_after(node))
+        indegree = dict.fromkeys(reach, 0)
+        for node in reach:
+            for child in children_after(node):
+                indegree[child] += 1
+        frontier = [node for node, n in indegree.items() if n == 0]
+        seen = 0
+        while frontier:
+            node = frontier.pop()
+            seen += 1
+            for child in children_after(node):
+                indegree[child] -= 1
+                if indegree[child] == 0:
+                    frontier.append(child)
+        if seen != len(reach):
+            raise ValueError("replan would create a cycle")
+
+    def _reset(self, root: str, stats: dict) -> None:
+        """Return ``root`` to PENDING, undoing its outcome and that of dependants built on it."""
+        report, children = self.report, self.graph.children
+        stack = [root]
+        while stack:
+            tid = stack.pop()
+            state = self._state[tid]
+            if state is PENDING or state is SKIPPED:
+                continue
+            self._state[tid] = PENDING
+            if state is READY:
+                del self._queued[tid]
+                continue
+            stats["invalidated"] += 1
+            if state is RUNNING:
+                future = self._future.pop(tid)
+                del self._running[future]
+                if future.done() and not future.cancelled():
+                    future.exception()  # retrieved, so asyncio does not log it
+                future.cancel()
+                self._active[self.graph.tasks[tid].task_type] -= 1
+                report.cancelled.add(tid)
+                stats["cancelled"] += 1
+            elif state is DONE:
+                report.results.pop(tid, None)
+                for child in children[tid]:
+                    self._waiting[child] += 1
+                    stack.append(child)
+            else:
+                report.errors.pop(tid, None)
+                for child in children[tid]:
+                    self._blocked[child] -= 1
+                    self._settle(child)
+
+    def _rewire(self, tid: str, depends_on: tuple[str, ...]) -> None:
+        old, new = set(self.graph.deps[tid]), set(depends_on)
+        for deps, sign in ((old - new, -1), (new - old, 1)):
+            for dep in deps:
+                state = self._state[dep]
+                self._waiting[tid] += sign * (state is not DONE)
+                self._blocked[tid] += sign * (state is FAILED or state is SKIPPED)
+
+    def _forget(self, tid: str) -> None:
+        if self._state.pop(tid) is READY:
+            del self._queued[tid]
+        for table in (self._waiting, self._blocked, self._rank, self._seq):
+            table.pop(tid, None)
+
+    def _settle(self, root: str) -> None:
+        """Bring not-yet-started nodes in line with their waiting/blocked counts."""
+        children = self.graph.children
+        stack = [root]
+        while stack:
+            tid = stack.pop()
+            state = self._state[tid]
+            if self._blocked[tid]:
+                if state is SKIPPED:
+                    continue
+                if state is READY:
+                    del self._queued[tid]
+                self._state[tid] = SKIPPED
+                for child in children[tid]:
+                    self._blocked[child] += 1
+                    stack.append(child)
+                continue
+            if state is SKIPPED:
+                self._state[tid] = state = PENDING
+                for child in children[tid]:
+                    self._blocked[child] -= 1
+                    stack.append(child)
+            if state is PENDING and self._waiting[tid] == 0:
+                self._push(tid)
+
+    def _rerank(self, seeds: set[str]) -> set[str]:
+        """Recompute bottom levels of ``seeds`` and their ancestors; return nodes whose level changed."""
+        graph, rank = self.graph, self._rank
+        affected, stack = set(), list(seeds)
+        while stack:
+            tid = stack.pop()
+            if tid not in affected:
+                affected.add(tid)
+                stack.extend(graph.deps[tid])
+        pending = {tid: sum(child in affected for child in graph.children[tid]) for tid in affected}
+        frontier = [tid for tid, n in pending.items() if n == 0]
+        changed = set()
+        while frontier:
+            tid = frontier.pop()
+            level = graph.cost[tid] + max((rank[c] for c in graph.children[tid]), default=0.0)
+            if rank.get(tid) != level:
+                rank[tid] = level
+                changed.add(tid)
+            for dep in graph.deps[tid]:
+                pending[dep] -= 1
+                if pending[dep] == 0:
+                    frontier.append(dep)
+        return changed
+
+    # -- scheduling --------------------------------------------------------
+
+    def _push(self, tid: str) -> None:
+        task = self.graph.tasks[tid]
+        entry = (-self._rank[tid], PRIORITY_RANK[task.priority], self._seq[tid], tid)
+        self._queued[tid] = entry
+        self._state[tid] = READY
+        heapq.heappush(self._ready.setdefault(task.task_type, []), entry)
+
+    def _next_ready(self) -> str | None:
+        executor = self.executor
+        if executor.max_concurrency is not None and len(self._running) >= executor.max_concurrency:
+            return None
+        queued, best = self._queued, None
+        for task_type, heap in self._ready.items():
+            while heap and queued.get(heap[0][3]) is not heap[0]:
+                heapq.heappop(heap)  # superseded by a re-prioritised entry, or no longer ready
+            if heap and self._active.get(task_type, 0) < executor.limit_for(task_type):
+                if best is None or heap[0] < self._ready[best][0]:
+                    best = task_type
+        if best is None:
+            return None
+        tid = heapq.heappop(self._ready[best])[3]
+        del queued[tid]
+        return tid
+
+    def _start(self, tid: str) -> None:
+        task = self.graph.tasks[tid]
+        report = self.report
+        self._state[tid] = RUNNING
+        self._active[task.task_type] = self._active.get(task.task_type, 0) + 1
+        report.peak_concurrency[task.task_type] = max(
+            report.peak_concurrency.get(task.task_type, 0), self._active[task.task_type]
+        )
+        report.started.append(tid)
+        future = asyncio.ensure_future(self.executor._execute(task))
+        self._running[future] = (tid, time.perf_counter())
+        self._future[tid] = future
+
+
+def _error(exc: BaseException) -> dict:
+    if isinstance(exc, SkillError):
+        return exc.to_dict()
+    return {"code": type(exc).__name__, "message": str(exc)}
@@ -0,0 +1,14 @@
+"""
+skill_fetch_trends - Skill 1 in skills/README.md.
+"""
+
+from skills import skill
+from skills.trend_fetcher import fetch_trends
+
+
+@skill("skill_fetch_trends")
+def skill_fetch_trends(platform: str, region: str, category: str | None, limit: int | float) -> dict:
+    """Fetch trending topics for a platform and region (served from the shared trend cache)."""
+    if limit < 0:
+        raise ValueError("skill_fetch_trends(): parameter 'limit' must not be negative")
+    return fetch_trends(platform=platform, region=region, category=category, limit=int(limit))
@@ -0,0 +1,139 @@
+"""
+skill_generate_script - Skill 2 in skills/README.md.
+
+Template-based generator used until an MCP language-model tool is wired in.
+It is deterministic, so identical inputs give identical scripts, and it runs
+the same safety screening and confidence scoring the Judge relies on.
+
+When a ``PostMemory`` is installed with ``set_memory``, the most similar
+past high-performing post for the persona is recalled and its hook opens
+the script ("remember past high-performing posts", functional.md).
+
+``set_cache`` puts a ``ScriptCache`` in front of generation so agents asking
+for the same (topic, persona, language, duration) share one result.
+"""
+
+from typing import TYPE_CHECKING
+
+from skills import SkillError, skill
+
+if TYPE_CHECKING:
+    from skills.script_cache import ScriptCache
+    from skills.semantic_memory import PostMemory
+
+SUPPORTED_LANGUAGES = frozenset({"en", "es", "fr", "de", "pt", "it", "am"})
+WORDS_PER_SECOND = 2.5
+
+# Lower-cased substrings that make a topic sensitive, mapped to the flag raised.
+SENSITIVE_TERMS: dict[str, str] = {
+    "election": "political",
+    "vote": "political",
+    "vaccine": "medical",
+    "diagnosis": "medical",
+    "crypto": "financial_advice",
+    "invest": "financial_advice",
+    "gambling": "gambling",
+    "weapon": "violence",
+}
+
+_BODY_LINES = (
+    "Here is what you need to know about {topic}.",
+    "People keep asking me about {topic}, so let's break it down.",
+    "The short version: {topic} is moving fast and it matters.",
+    "Let me know in the comments what you think about {topic}.",
+)
+
+
+_memory: "PostMemory | None" = None
+_memory_version = 0
+_min_engagement = 0.0
+_cache: "ScriptCache | None" = None
+
+
+def set_memory(memory: "PostMemory | None", *, min_engagement: float = 0.0) -> None:
+    """Install the semantic memory consulted for past high performers (None to disable)."""
+    global _memory, _memory_version, _min_engagement
+    _memory = memory
+    _memory_version = 0 if memory is None else memory.version
+    _min_engagement = min_engagement
+    if _cache is not None:
+        _cache.clear()  # cached scripts were written against the old memory
+
+
+def set_cache(cache: "ScriptCache | None") -> None:
+    """Install the result cache in front of generation (None to disable)."""
+    global _cache
+    _cache = cache
+
+
+def recall_hook(trend_topic: str, persona_id: str) -> str | None:
+    """First sentence of the closest past post by ``persona_id`` above the engagement bar."""
+    if _memory is None:
+        return None
+    hits = _memory.search(trend_topic, 1, persona_id=persona_id, min_engagement=_min_engagement)
+    if not hits or hits[0]["score"] <= 0:
+        return None
+    return hits[0]["text"].split(". ")[0].rstrip(".") + "."
+
+
+def safety_flags_for(text: str) -> list[str]:
+    lowered = text.lower()
+    return sorted({flag for term, flag in SENSITIVE_TERMS.items() if term in lowered})
+
+
+@skill("skill_generate_script")
+def skill_generate_script(
+    trend_topic: str, persona_id: str, target_duration_seconds: int | float, language: str
+) -> dict:
+    """Turn a trend into a short-form script sized to ``target_duration_seconds``."""
+    if language not in SUPPORTED_LANGUAGES:
+        raise SkillError("UNSUPPORTED_LANGUAGE", f"language {language!r} is not supported")
+    if target_duration_seconds <= 0:
+        raise ValueError("skill_generate_script(): parameter 'target_duration_seconds' must be positive")
+    if _cache is not None:
+        if _memory is not None and _memory.version != _memory_version:
+            _memory_changed()
+        return _cache.get(
+            generate_script,
+            trend_topic=trend_topic,
+            persona_id=persona_id,
+            target_duration_seconds=target_duration_seconds,
+            language=language,
+        )
+    return generate_script(
+        trend_topic=trend_topic, persona_id=persona_id, target_duration_seconds=target_duration_seconds, language=language
+    )
+
+
+def _memory_changed() -> None:
+    # A post was added (or the index rebuilt) since scripts were cached: recalled hooks may differ.
+    global _memory_version
+    _memory_version = _memory.version
+    _cache.clear()
+
+
+def generate_script(*, trend_topic: str, persona_id: str, target_duration_seconds: float, language: str) -> dict:
+    """Uncached generation for already-validated inputs."""
+    budget = max(1, round(target_duration_seconds * WORDS_PER_SECOND))
+    lines = [f"Quick take on {trend_topic}."]
+    hook = recall_hook(trend_topic, persona_id)
+    if hook:
+        lines.insert(0, hook)
+    words = sum(len(line.split()) for line in lines)
+    i = 0
+    while words < budget:
+        line = _BODY_LINES[i % len(_BODY_LINES)].format(topic=trend_topic)
+        lines.append(line)
+        words += len(line.split())
+        i += 1
+    text = " ".join(lines)
+    estimated = round(len(text.split()) / WORDS_PER_SECOND, 1)
+
+    flags = safety_flags_for(f"{trend_topic} {hook or ''}")
+    fit = min(estimated, target_duration_seconds) / max(estimated, target_duration_seconds)
+    confidence = round(max(0.0, 0.95 * fit - 0.2 * len(flags)), 3)
+    return {
+        "script": {"text": text, "estimated_duration_seconds": estimated},
+        "safety_flags": flags,
+        "confidence_score": confidence,
+    }
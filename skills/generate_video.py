@@ -0,0 +1,90 @@
+"""
+skill_generate_video - Skill 3 in skills/README.md.
+
+Without a render engine the skill returns template metadata only. With one
+installed via ``set_render_engine`` (skills/render.py), segments render in a
+process pool and the skill returns as soon as the preview exists (or after
+the full render with ``wait="complete"``); progress and per-stage timings
+are reported in ``generation_metadata``. A render that fails after the skill
+returned at the preview is reported by ``render_status``.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING
+
+from skills import SkillError, skill
+from skills.generate_script import WORDS_PER_SECOND
+
+if TYPE_CHECKING:
+    from skills.render import RenderEngine
+
+SUPPORTED_STYLES = frozenset({"modern", "minimal", "vlog", "news", "animated"})
+SUPPORTED_ASPECT_RATIOS = frozenset({"9:16", "16:9", "1:1", "4:5"})
+ENGINE = "template"
+WAIT_MODES = ("preview", "complete")
+
+_engine: "RenderEngine | None" = None
+_wait = "preview"
+_timeout: float | None = None
+
+
+def set_render_engine(engine: "RenderEngine | None", *, wait: str = "preview", timeout: float | None = None) -> None:
+    """Install the render backend (None for template metadata only)."""
+    global _engine, _wait, _timeout
+    if wait not in WAIT_MODES:
+        raise ValueError(f"wait must be one of {', '.join(WAIT_MODES)}, got {wait!r}")
+    _engine, _wait, _timeout = engine, wait, timeout
+
+
+def render_status(video_asset_id: str) -> dict | None:
+    """
+    Progress of a render started by the skill: ``render_status`` is
+    ``RENDERING``, ``COMPLETE`` or ``FAILED`` with a structured ``error``.
+    None without an engine or once the engine has dropped the job.
+    """
+    return None if _engine is None else _engine.status(video_asset_id)
+
+
+def asset_id_for(script_text: str, persona_id: str, video_style: str, aspect_ratio: str, language: str) -> str:
+    """Content-addressed asset id: identical inputs always map to the same asset."""
+    digest = hashlib.sha256("\x1f".join((persona_id, video_style, aspect_ratio, language, script_text)).encode())
+    return f"vid_{digest.hexdigest()[:24]}"
+
+
+@skill("skill_generate_video")
+def skill_generate_video(script_text: str, persona_id: str, video_style: str, aspect_ratio: str, language: str) -> dict:
+    """Generate a short-form video asset from an approved script."""
+    if video_style not in SUPPORTED_STYLES:
+        raise SkillError("UNSUPPORTED_STYLE", f"video_style {video_style!r} is not supported")
+    if aspect_ratio not in SUPPORTED_ASPECT_RATIOS:
+        raise SkillError("UNSUPPORTED_ASPECT_RATIO", f"aspect_ratio {aspect_ratio!r} is not supported")
+
+    asset_id = asset_id_for(script_text, persona_id, video_style, aspect_ratio, language)
+    duration = round(max(1, len(script_text.split())) / WORDS_PER_SECOND, 1)
+    if _engine is None:
+        return {
+            "video_asset_id": asset_id,
+            "duration_seconds": duration,
+            "preview_url": f"mcp://media/previews/{asset_id}",
+            "generation_metadata": {
+                "engine": ENGINE,
+                "generated_at": datetime.now(timezone.utc).isoformat(),
+            },
+        }
+
+    job = _engine.start(asset_id, script_text, duration)
+    try:
+        if _wait == "complete":
+            job.result(_timeout)
+        preview_url = job.wait_preview(_timeout)
+    except TimeoutError as exc:
+        raise SkillError("TIMEOUT", str(exc)) from None
+    except Exception as exc:
+        raise SkillError("BACKEND_UNAVAILABLE", f"render failed: {exc}") from exc
+    return {
+        "video_asset_id": asset_id,
+        "duration_seconds": duration,
+        "preview_url": preview_url,
+        "generation_metadata": job.generation_metadata(),
+    }
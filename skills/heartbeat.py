@@ -0,0 +1,276 @@
+"""
+OpenClaw status heartbeat for many agents (specs/openclaw_integration.md).
+
+One ``HeartbeatService`` replaces a timer per agent:
+
+* every agent sits on a single ``TimingWheel``; its first slot is spread
+  uniformly over the interval and each re-arm adds +/- ``jitter`` so agents
+  never line up into a herd
+* when an agent's slot comes round, it publishes only if ``state``,
+  ``capabilities``, ``confidence_avg`` or ``current_bid_price`` changed since
+  the last publish, or ``keepalive`` seconds have passed
+* everything due in a tick is signed as one batch: the signature covers the
+  concatenated SHA-256 digests of the payloads, so one signing operation
+  covers up to ``batch_size`` agents
+* ``read("agent://status/{agent_id}")`` and ``read("agent://status/*")``
+  return pre-serialised bytes from an immutable snapshot that is swapped
+  once per tick, so readers never wait on agents or on the wheel
+
+Agents push changes with ``update``; that is a dict write, not I/O. Operators
+can switch broadcasting off per agent with ``set_broadcast`` (Governance).
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import random
+import time
+import uuid
+from collections.abc import Callable, Hashable
+from datetime import datetime, timezone
+from types import MappingProxyType
+
+from skills.models import AGENT_STATES
+
+STATUS_URI_PREFIX = "agent://status/"
+STATUS_FIELDS = ("state", "capabilities", "confidence_avg", "current_bid_price")
+
+# Signer: bytes -> signature string. Publisher: receives one signed batch envelope.
+Signer = Callable[[bytes], str]
+Publisher = Callable[[dict], None]
+
+
+def hmac_signer(key: bytes) -> Signer:
+    def sign(message: bytes) -> str:
+        return hmac.new(key, message, hashlib.sha256).hexdigest()
+
+    return sign
+
+
+def batch_message(payloads: list[dict]) -> bytes:
+    """Bytes covered by a batch signature: concatenated payload digests."""
+    return b"".join(hashlib.sha256(_encode(p)).digest() for p in payloads)
+
+
+def verify_batch(envelope: dict, sign: Signer) -> bool:
+    """Check a batch envelope produced with a deterministic signer (e.g. HMAC)."""
+    expected = sign(envelope["signed_at"].encode() + batch_message(envelope["payloads"]))
+    return hmac.compare_digest(expected, envelope["signature"])
+
+
+class TimingWheel:
+    """Hashed timing wheel: O(1) schedule and cancel, O(slot) per tick."""
+
+    def __init__(self, slots: int = 60):
+        if slots < 1:
+            raise ValueError("slots must be >= 1")
+        self._slots: list[dict[Hashable, int]] = [{} for _ in range(slots)]
+        self._where: dict[Hashable, int] = {}
+        self.cursor = 0
+
+    def schedule(self, item: Hashable, delay_ticks: int) -> None:
+        """Fire ``item`` after ``delay_ticks`` (>= 1) calls to ``advance``."""
+        delay_ticks = max(1, delay_ticks)
+        self.cancel(item)
+        slot = (self.cursor + delay_ticks) % len(self._slots)
+        self._slots[slot][item] = (delay_ticks - 1) // len(self._slots)
+        self._where[item] = slot
+
+    def cancel(self, item: Hashable) -> None:
+        slot = self._where.pop(item, None)
+        if slot is not None:
+            del self._slots[slot][item]
+
+    def advance(self) -> list[Hashable]:
+        """Move one tick forward and return the items that fire."""
+        self.cursor = (self.cursor + 1) % len(self._slots)
+        bucket = self._slots[self.cursor]
+        due = []
+        for item, rounds in list(bucket.items()):
+            if rounds:
+                bucket[item] = rounds - 1
+            else:
+                del bucket[item]
+                del self._where[item]
+                due.append(item)
+        return due
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self._where
+
+
+class HeartbeatService:
+    """Coalesced, batch-signed status heartbeats for every registered agent."""
+
+    def __init__(
+        self,
+        publish: Publisher,
+        sign: Signer,
+        *,
+        interval: float = 60.0,
+        keepalive: float = 600.0,
+        tick_seconds: float = 1.0,
+        jitter: float = 0.1,
+        batch_size: int = 256,
+        clock: Callable[[], float] = time.time,
+        rng: random.Random | None = None,
+    ):
+        if tick_seconds <= 0 or interval < tick_seconds:
+            raise ValueError("need 0 < tick_seconds <= interval")
+        self.publish = publish
+        self.sign = sign
+        self.keepalive = keepalive
+        self.tick_seconds = tick_seconds
+        self.batch_size = batch_size
+        self._clock = clock
+        self._rng = rng or random.Random()
+        self._interval_ticks = round(interval / tick_seconds)
+        self._jitter_ticks = int(jitter * self._interval_ticks)
+        self._wheel = TimingWheel(self._interval_ticks)
+
+        self._status: dict[str, dict] = {}
+        self._disabled: set[str] = set()
+        self._dirty: set[str] = set()
+        self._published: dict[str, tuple[bytes, float]] = {}  # agent -> (bytes, published_at)
+        self._snapshot: MappingProxyType = MappingProxyType({})
+        self._all = b"[]"
+        self._next_tick_at = clock() + tick_seconds
+        self.counters = {"ticks": 0, "published": 0, "unchanged": 0, "keepalives": 0, "batches": 0}
+
+    # agent side
+
+    def register(self, agent_id: str, state: str = "idle", capabilities=(), confidence_avg=None, current_bid_price=None):
+        self._status[agent_id] = {}
+        self.update(
+            agent_id,
+            state=state,
+            capabilities=capabilities,
+            confidence_avg=confidence_avg,
+            current_bid_price=current_bid_price,
+        )
+        self._wheel.schedule(agent_id, 1 + self._rng.randrange(self._interval_ticks))
+
+    def update(self, agent_id: str, **fields) -> None:
+        unknown = set(fields) - set(STATUS_FIELDS)
+        if unknown:
+            raise ValueError(f"unknown status fields: {', '.join(sorted(unknown))}")
+        if "state" in fields and fields["state"] not in AGENT_STATES:
+            raise ValueError(f"state must be one of {', '.join(AGENT_STATES)}, got {fields['state']!r}")
+        if "capabilities" in fields:
+            fields["capabilities"] = sorted(fields["capabilities"])
+        status = self._status[agent_id]
+        if any(status.get(k, ...) != v for k, v in fields.items()):
+            status.update(fields)
+            self._dirty.add(agent_id)
+
+    def unregister(self, agent_id: str) -> None:
+        self._status.pop(agent_id, None)
+        self._published.pop(agent_id, None)
+        self._wheel.cancel(agent_id)
+        self._dirty.add(agent_id)
+
+    def set_broadcast(self, agent_id: str, enabled: bool) -> None:
+        """Operator switch: disabled agents are neither published nor readable."""
+        (self._disabled.discard if enabled else self._disabled.add)(agent_id)
+        self._dirty.add(agent_id)
+
+    # reads
+
+    def read(self, uri: str) -> bytes | None:
+        """Serve ``agent://status/{agent_id}`` or ``agent://status/*`` from the snapshot."""
+        if not uri.startswith(STATUS_URI_PREFIX):
+            raise ValueError(f"not a status resource: {uri!r}")
+        agent_id = uri[len(STATUS_URI_PREFIX) :]
+        if agent_id == "*":
+            return self._all
+        return self._snapshot.get(agent_id)
+
+    # scheduling
+
+    def tick(self) -> int:
+        """Process every wheel tick that is due by the clock; returns payloads published."""
+        published = 0
+        now = self._clock()
+        while now >= self._next_tick_at:
+            published += self._tick(self._next_tick_at)
+            self._next_tick_at += self.tick_seconds
+        return published
+
+    async def run(self, stop: asyncio.Event) -> None:
+        """Drive the wheel from one asyncio task until ``stop`` is set."""
+        while not stop.is_set():
+            self.tick()
+            delay = max(0.0, self._next_tick_at - self._clock())
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> dict:
+        return {**self.counters, "agents": len(self._status), "scheduled": len(self._wheel)}
+
+    def _tick(self, now: float) -> int:
+        self.counters["ticks"] += 1
+        self._refresh_snapshot()
+        snapshot = self._snapshot
+        batch = []
+        for agent_id in self._wheel.advance():
+            if agent_id not in self._status:
+                continue
+            delay = self._interval_ticks + self._rng.randint(-self._jitter_ticks, self._jitter_ticks)
+            self._wheel.schedule(agent_id, delay)
+            body = snapshot.get(agent_id)
+            if body is None:  # broadcasting disabled
+                continue
+            last = self._published.get(agent_id)
+            if last is not None and last[0] == body:
+                if now - last[1] < self.keepalive:
+                    self.counters["unchanged"] += 1
+                    continue
+                self.counters["keepalives"] += 1
+            self._published[agent_id] = (body, now)
+            batch.append(agent_id)
+        for i in range(0, len(batch), self.batch_size):
+            self._publish_batch([self._payload(a) for a in batch[i : i + self.batch_size]], now)
+        self.counters["published"] += len(batch)
+        return len(batch)
+
+    def _refresh_snapshot(self) -> None:
+        if not self._dirty:
+            return
+        snapshot = dict(self._snapshot)
+        for agent_id in self._dirty:
+            status = self._status.get(agent_id)
+            if status is None or agent_id in self._disabled:
+                snapshot.pop(agent_id, None)
+            else:
+                snapshot[agent_id] = _encode({"agent_id": agent_id, **status})
+        self._dirty.clear()
+        self._snapshot = MappingProxyType(snapshot)
+        self._all = b"[" + b",".join(snapshot.values()) + b"]"
+
+    def _payload(self, agent_id: str) -> dict:
+        return {"agent_id": agent_id, **self._status[agent_id]}
+
+    def _publish_batch(self, payloads: list[dict], now: float) -> None:
+        signed_at = _iso(now)
+        envelope = {
+            "batch_id": str(uuid.uuid4()),
+            "signed_at": signed_at,
+            "payloads": payloads,
+            "signature": self.sign(signed_at.encode() + batch_message(payloads)),
+        }
+        self.counters["batches"] += 1
+        self.publish(envelope)
+
+
+def _encode(payload: dict) -> bytes:
+    return json.dumps(payload, sort_keys=True, separators=(",", ":")).encode()
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat()
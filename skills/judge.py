@@ -0,0 +1,159 @@
+"""
+Batch Judge: HITL routing of Worker Results (research/architecture_strategy.md).
+
+Approval logic, per persona policy:
+
+| Condition                               | Decision | Reason prefix      |
+| --------------------------------------- | -------- | ------------------ |
+| Any safety flag the persona blocks      | reject   | ``blocked``        |
+| Any other safety flag (sensitive topic) | escalate | ``mandatory_review`` |
+| Confidence < ``human_review`` (or NaN)  | escalate | ``mandatory_review`` |
+| Confidence > ``auto_approve``           | approve  | ``auto_approved``  |
+| Otherwise (0.70-0.90 by default)        | escalate | ``async_review``   |
+
+A batch is turned into columns once (confidence float64, persona index,
+safety-flag bitmask) and every rule above runs as a NumPy array operation
+over the whole batch. ``route_columns`` exposes that core for callers that
+already hold columnar data; ``judge`` wraps it into ``Decision`` objects.
+
+Only flags some persona blocks get a bit of their own (at most 63 of them);
+every other flag shares the top bit, which no persona blocks, so it can only
+force a review. A policy that would need a 64th blocked flag is rejected.
+"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from skills.models import Decision, Result
+
+# Route codes, in the order returned by route_columns.
+AUTO_APPROVED, ASYNC_REVIEW, MANDATORY_REVIEW, BLOCKED = 0, 1, 2, 3
+ROUTES = ("auto_approved", "async_review", "mandatory_review", "blocked")
+_DECISION_FOR = ("approve", "escalate", "escalate", "reject")
+
+_MAX_FLAG_BITS = 63  # dedicated bits, one per blocked flag
+_SHARED_BIT = 63  # every flag no persona blocks
+_MASK_CACHE_SIZE = 4096
+
+
+@dataclass(frozen=True)
+class PersonaPolicy:
+    """Thresholds and hard blocks for one persona."""
+
+    auto_approve: float = 0.90
+    human_review: float = 0.70
+    blocked_flags: frozenset[str] = field(default_factory=frozenset)
+
+    def __post_init__(self):
+        if not 0.0 <= self.human_review <= self.auto_approve <= 1.0:
+            raise ValueError("thresholds must satisfy 0 <= human_review <= auto_approve <= 1")
+
+
+class Judge:
+    """Vectorised Result router with per-persona policies."""
+
+    def __init__(self, policies: dict[str, PersonaPolicy] | None = None, default: PersonaPolicy | None = None):
+        self.default = default or PersonaPolicy()
+        self._flag_bits: dict[str, int] = {}
+        self._mask_cache: dict[tuple[str, ...], int] = {}
+        self._persona_index: dict[str | None, int] = {None: 0}
+        self._policies: list[PersonaPolicy] = [self.default]
+        self._tables = None
+        for persona_id, policy in (policies or {}).items():
+            self.set_policy(persona_id, policy)
+
+    def set_policy(self, persona_id: str, policy: PersonaPolicy) -> None:
+        """
+        Install ``policy`` for ``persona_id``.
+
+        Raises ValueError if its blocked flags would take the vocabulary past
+        63 distinct blocked flags. Masks from ``flag_mask`` taken before a
+        policy blocks a new flag must be recomputed.
+        """
+        new = sorted(policy.blocked_flags - self._flag_bits.keys())
+        if len(self._flag_bits) + len(new) > _MAX_FLAG_BITS:
+            raise ValueError(f"blocked-flag vocabulary is full ({_MAX_FLAG_BITS} distinct flags)")
+        for flag in new:
+            self._flag_bits[flag] = len(self._flag_bits)
+        if new:
+            self._mask_cache.clear()  # those flags were on the shared bit until now
+        idx = self._persona_index.get(persona_id)
+        if idx is None:
+            self._persona_index[persona_id] = len(self._policies)
+            self._policies.append(policy)
+        else:
+            self._policies[idx] = policy
+        self._tables = None
+
+    def persona_index(self, persona_id: str | None) -> int:
+        """Column index for ``persona_id``; unknown personas use the default policy."""
+        return self._persona_index.get(persona_id, 0)
+
+    def flag_mask(self, flags: Sequence[str]) -> int:
+        key = tuple(flags)
+        mask = self._mask_cache.get(key)
+        if mask is None:
+            bits = self._flag_bits
+            mask = 0
+            for flag in key:
+                mask |= 1 << bits.get(flag, _SHARED_BIT)
+            if len(self._mask_cache) >= _MASK_CACHE_SIZE:
+                del self._mask_cache[next(iter(self._mask_cache))]  # oldest first
+            self._mask_cache[key] = mask
+        return mask
+
+    def route_columns(self, confidence: np.ndarray, flag_masks: np.ndarray, persona_idx: np.ndarray) -> np.ndarray:
+        """Route code (``AUTO_APPROVED`` ... ``BLOCKED``) for every row, as uint8."""
+        auto, review, blocked_bits = self._policy_tables()
+        confidence = np.asarray(confidence, dtype=np.float64)
+        flag_masks = np.asarray(flag_masks, dtype=np.uint64)
+        persona_idx = np.asarray(persona_idx, dtype=np.intp)
+
+        codes = np.full(confidence.shape, ASYNC_REVIEW, dtype=np.uint8)
+        codes[confidence > auto[persona_idx]] = AUTO_APPROVED
+        codes[~(confidence >= review[persona_idx]) | (flag_masks != 0)] = MANDATORY_REVIEW
+        codes[(flag_masks & blocked_bits[persona_idx]) != 0] = BLOCKED
+        return codes
+
+    def judge(self, results: Sequence[Result]) -> list[Decision]:
+        """Decide a batch of Results."""
+        n = len(results)
+        confidence = np.fromiter((r.confidence_score for r in results), dtype=np.float64, count=n)
+        masks = np.fromiter(
+            (self.flag_mask(r.safety_flags) if r.safety_flags else 0 for r in results), dtype=np.uint64, count=n
+        )
+        index = self._persona_index
+        persona_idx = np.fromiter((index.get(r.persona_id, 0) for r in results), dtype=np.intp, count=n)
+
+        codes = self.route_columns(confidence, masks, persona_idx)
+        reasons = self._reasons()
+        return [
+            Decision(r.task_id, _DECISION_FOR[code], reasons[p][code])
+            for r, code, p in zip(results, codes.tolist(), persona_idx.tolist())
+        ]
+
+    def judge_one(self, result: Result) -> Decision:
+        return self.judge([result])[0]
+
+    def _policy_tables(self):
+        if self._tables is None:
+            auto = np.array([p.auto_approve for p in self._policies], dtype=np.float64)
+            review = np.array([p.human_review for p in self._policies], dtype=np.float64)
+            blocked = np.array([self.flag_mask(sorted(p.blocked_flags)) for p in self._policies], dtype=np.uint64)
+            reasons = [
+                (
+                    f"auto_approved: confidence above {p.auto_approve:.2f}",
+                    f"async_review: confidence between {p.human_review:.2f} and {p.auto_approve:.2f}",
+                    f"mandatory_review: confidence below {p.human_review:.2f} or sensitive topic",
+                    "blocked: safety flag not allowed for persona",
+                )
+                for p in self._policies
+            ]
+            self._tables = (auto, review, blocked, reasons)
+        return self._tables[:3]
+
+    def _reasons(self) -> list[tuple[str, ...]]:
+        self._policy_tables()
+        return self._tables[3]
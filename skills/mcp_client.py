@@ -0,0 +1,534 @@
+"""
+Pooled, multiplexed MCP client (specs/_meta.md: all external interactions go
+through MCP).
+
+Opening a session per tool call costs a transport connect, the
+``initialize`` handshake and usually a ``tools/list`` before any work is
+done. ``McpPool`` pays that once per session instead:
+
+* sessions are pooled per server (up to ``max_sessions``) and reused
+* each session multiplexes concurrent calls: requests carry JSON-RPC ids and
+  a reader thread routes each response to its waiting caller, so callers
+  never queue behind each other's round-trips. A new session is opened only
+  when every live one already has ``streams_per_session`` calls in flight
+* ``tools/list`` results are cached per server for ``tools_ttl`` seconds;
+  the cache is dropped when the server sends
+  ``notifications/tools/list_changed``, when a session is replaced, or when
+  ``invalidate`` is called. Concurrent misses share one request
+* every server has a concurrency cap (``max_concurrency`` calls in flight)
+  and a ``CircuitBreaker``: after ``failure_threshold`` consecutive transport
+  failures or timeouts, calls fail fast with ``CIRCUIT_OPEN`` for
+  ``reset_timeout`` seconds, then a single probe decides whether it closes
+
+A tool result with ``isError`` means the server is healthy and the tool said
+no, so it raises ``TOOL_ERROR`` without tripping the breaker. A JSON-RPC
+``error`` reply (method not found, invalid params, internal error) raises
+``PROTOCOL_ERROR`` and counts as a failure: a server that cannot answer the
+protocol is broken, whatever the transport says.
+
+Opening a session (connect plus ``initialize``) is bounded by the deadline of
+the call that needed it; callers that find another thread already connecting
+wait on a condition for it rather than polling.
+
+The wire format is MCP's: newline-delimited JSON-RPC 2.0 over stdio (``stdio``
+spawns a server such as ``mcp-server-git``) or over a TCP stream (``tcp``).
+As with ``RespClient`` in skills/task_queue.py, no client library is needed.
+"""
+
+import itertools
+import json
+import socket
+import subprocess  # nosec B404 - spawns configured MCP servers only
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from skills import telemetry
+from skills.contracts import SkillError
+
+PROTOCOL_VERSION = "2025-06-18"
+CLIENT_INFO = {"name": "project-chimera", "version": "0.1.0"}
+
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_MAX_SESSIONS = 4
+DEFAULT_STREAMS_PER_SESSION = 32
+DEFAULT_MAX_CONCURRENCY = 64
+DEFAULT_TOOLS_TTL = 300.0
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = 30.0
+
+
+class McpError(SkillError):
+    """Structured failure from an MCP server or the transport to it."""
+
+    BACKEND_UNAVAILABLE = "BACKEND_UNAVAILABLE"
+    TIMEOUT = "TIMEOUT"
+    CIRCUIT_OPEN = "CIRCUIT_OPEN"
+    TOOL_ERROR = "TOOL_ERROR"
+    PROTOCOL_ERROR = "PROTOCOL_ERROR"
+    UNKNOWN_SERVER = "UNKNOWN_SERVER"
+
+    def __init__(self, code: str, message: str, server: str | None = None):
+        super().__init__(code, message)
+        self.server = server
+
+    def to_dict(self) -> dict:
+        return {"code": self.code, "message": self.message, "server": self.server}
+
+
+class SocketTransport:
+    """Newline-delimited JSON-RPC over a TCP stream."""
+
+    def __init__(self, host: str, port: int, timeout: float = DEFAULT_TIMEOUT):
+        self._sock = socket.create_connection((host, port), timeout=timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._sock.settimeout(None)  # the reader thread blocks; callers time out on futures
+        self._reader = self._sock.makefile("rb")
+
+    def send(self, data: bytes) -> None:
+        self._sock.sendall(data)
+
+    def readline(self) -> bytes:
+        return self._reader.readline()
+
+    def close(self) -> None:
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._reader.close()
+        self._sock.close()
+
+
+class StdioTransport:
+    """Newline-delimited JSON-RPC over a child process's stdin/stdout."""
+
+    def __init__(self, argv: list[str]):
+        self._proc = subprocess.Popen(  # nosec B603 - argv comes from server configuration
+            argv, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        )
+
+    def send(self, data: bytes) -> None:
+        self._proc.stdin.write(data)
+        self._proc.stdin.flush()
+
+    def readline(self) -> bytes:
+        return self._proc.stdout.readline()
+
+    def close(self) -> None:
+        for stream in (self._proc.stdin, self._proc.stdout):
+            try:
+                stream.close()
+            except OSError:
+                pass
+        self._proc.terminate()
+        try:
+            self._proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self._proc.kill()
+
+
+# Connector: opens a fresh transport to one server.
+Connector = Callable[[], "SocketTransport | StdioTransport"]
+
+
+def tcp(host: str, port: int, timeout: float = DEFAULT_TIMEOUT) -> Connector:
+    return lambda: SocketTransport(host, port, timeout)
+
+
+def stdio(*argv: str) -> Connector:
+    return lambda: StdioTransport(list(argv))
+
+
+class McpSession:
+    """One initialised MCP connection; any number of requests may be in flight."""
+
+    def __init__(
+        self,
+        transport,
+        *,
+        server: str = "",
+        timeout: float = DEFAULT_TIMEOUT,
+        on_notification: Callable[[str, dict], None] | None = None,
+    ):
+        self.server = server
+        self.timeout = timeout
+        self._transport = transport
+        self._on_notification = on_notification
+        self._ids = itertools.count(1)
+        self._pending: dict[int, Future] = {}
+        self._write_lock = threading.Lock()
+        self.alive = True
+        self.server_info: dict = {}
+        threading.Thread(target=self._read_loop, name=f"mcp-{server}", daemon=True).start()
+
+    @classmethod
+    def open(cls, transport, *, handshake_timeout: float | None = None, **kwargs) -> "McpSession":
+        """Connect and complete the ``initialize`` handshake (within ``handshake_timeout``, default ``timeout``)."""
+        session = cls(transport, **kwargs)
+        try:
+            result = session.request(
+                "initialize",
+                {"protocolVersion": PROTOCOL_VERSION, "capabilities": {}, "clientInfo": CLIENT_INFO},
+                timeout=handshake_timeout,
+            )
+            session.server_info = result.get("serverInfo", {})
+            session.notify("notifications/initialized")
+        except BaseException:
+            session.close()
+            raise
+        return session
+
+    @property
+    def inflight(self) -> int:
+        return len(self._pending)
+
+    def request(self, method: str, params: dict | None = None, timeout: float | None = None) -> dict:
+        request_id = next(self._ids)
+        future: Future = Future()
+        self._pending[request_id] = future
+        try:
+            self._send({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params or {}})
+            return future.result(self.timeout if timeout is None else timeout)
+        except FutureTimeout:
+            raise McpError(McpError.TIMEOUT, f"{method} timed out", self.server) from None
+        finally:
+            self._pending.pop(request_id, None)
+
+    def notify(self, method: str, params: dict | None = None) -> None:
+        self._send({"jsonrpc": "2.0", "method": method, "params": params or {}})
+
+    def close(self) -> None:
+        self.alive = False
+        self._transport.close()
+
+    def _send(self, message: dict) -> None:
+        if not self.alive:
+            raise McpError(McpError.BACKEND_UNAVAILABLE, "session closed", self.server)
+        data = json.dumps(message, separators=(",", ":")).encode() + b"\n"
+        try:
+            with self._write_lock:
+                self._transport.send(data)
+        except OSError as exc:
+            self._fail(exc)
+            raise McpError(McpError.BACKEND_UNAVAILABLE, f"send failed: {exc}", self.server) from exc
+
+    def _read_loop(self) -> None:
+        try:
+            while True:
+                line = self._transport.readline()
+                if not line:
+                    raise ConnectionError("server closed the connection")
+                message = json.loads(line)
+                if "method" not in message:
+                    future = self._pending.get(message.get("id"))
+                    if future is None:
+                        continue  # caller already timed out
+                    if "error" in message:
+                        err = message["error"]
+                        text = f"{err.get('message', err)} (JSON-RPC {err.get('code')})" if isinstance(err, dict) else str(err)
+                        future.set_exception(McpError(McpError.PROTOCOL_ERROR, text, self.server))
+                    else:
+                        future.set_result(message.get("result", {}))
+                elif "id" in message:  # server -> client request; only ping is expected
+                    self._send({"jsonrpc": "2.0", "id": message["id"], "result": {}})
+                elif self._on_notification is not None:
+                    self._on_notification(message["method"], message.get("params") or {})
+        except Exception as exc:  # transport gone or garbage on the wire
+            self._fail(exc)
+
+    def _fail(self, exc: BaseException) -> None:
+        self.alive = False
+        error = McpError(McpError.BACKEND_UNAVAILABLE, f"connection lost: {exc}", self.server)
+        for future in list(self._pending.values()):
+            if not future.done():
+                future.set_exception(error)
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker: closed -> open -> half-open (one probe) -> closed."""
+
+    def __init__(
+        self,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if self._clock() - self.opened_at >= self.reset_timeout else "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._probing or self.failures >= self.failure_threshold:
+                self.opened_at = self._clock()
+            self._probing = False
+
+    def record_skipped(self) -> None:
+        """The admitted call never reached the server: free the probe slot, judge nothing."""
+        with self._lock:
+            self._probing = False
+
+
+class _Server:
+    """Per-server pool state."""
+
+    def __init__(self, name: str, connector: Connector, max_concurrency: int, breaker: CircuitBreaker):
+        self.name = name
+        self.connector = connector
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+        self.breaker = breaker
+        self.sessions: list[McpSession] = []
+        self.opening = 0
+        self.tools: tuple[float, list[dict]] | None = None  # (fetched_at, tools)
+        self.tools_inflight: Future | None = None
+
+
+class McpPool:
+    """Session pool with multiplexing, tool-discovery caching, caps and breakers."""
+
+    def __init__(
+        self,
+        servers: dict[str, Connector],
+        *,
+        max_sessions: int = DEFAULT_MAX_SESSIONS,
+        streams_per_session: int = DEFAULT_STREAMS_PER_SESSION,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        tools_ttl: float = DEFAULT_TOOLS_TTL,
+        timeout: float = DEFAULT_TIMEOUT,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_sessions < 1 or streams_per_session < 1 or max_concurrency < 1:
+            raise ValueError("max_sessions, streams_per_session and max_concurrency must be >= 1")
+        self.max_sessions = max_sessions
+        self.streams_per_session = streams_per_session
+        self.tools_ttl = tools_ttl
+        self.timeout = timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._session_ready = threading.Condition(self._lock)  # a session opened, or an open attempt ended
+        self._servers = {
+            name: _Server(name, connector, max_concurrency, CircuitBreaker(failure_threshold, reset_timeout, clock))
+            for name, connector in servers.items()
+        }
+        self.counters = {
+            "calls": 0,
+            "sessions_opened": 0,
+            "sessions_dropped": 0,
+            "discovery_hits": 0,
+            "discovery_misses": 0,
+            "failures": 0,
+            "rejected_open_circuit": 0,
+        }
+
+    def __enter__(self) -> "McpPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            sessions = [s for server in self._servers.values() for s in server.sessions]
+            for server in self._servers.values():
+                server.sessions.clear()
+        for session in sessions:
+            session.close()
+
+    def call_tool(self, server: str, tool: str, arguments: dict | None = None, *, timeout: float | None = None) -> dict:
+        """``tools/call`` on ``server``; returns the MCP result (``content``, ...)."""
+        result = self.request(server, "tools/call", {"name": tool, "arguments": arguments or {}}, timeout=timeout)
+        if result.get("isError"):
+            text = " ".join(c.get("text", "") for c in result.get("content", []) if c.get("type") == "text")
+            raise McpError(McpError.TOOL_ERROR, text or f"{tool} failed", server)
+        return result
+
+    def list_tools(self, server: str, *, refresh: bool = False) -> list[dict]:
+        """Cached ``tools/list``; concurrent misses share one request."""
+        state = self._server(server)
+        with self._lock:
+            cached = state.tools
+            if not refresh and cached is not None and self._clock() - cached[0] < self.tools_ttl:
+                self.counters["discovery_hits"] += 1
+                return cached[1]
+            future = state.tools_inflight
+            owner = future is None
+            if owner:
+                future = state.tools_inflight = Future()
+                self.counters["discovery_misses"] += 1
+            else:
+                self.counters["discovery_hits"] += 1
+        if not owner:
+            return future.result()
+        try:
+            tools = self.request(server, "tools/list").get("tools", [])
+        except BaseException as exc:
+            with self._lock:
+                state.tools_inflight = None
+            future.set_exception(exc)
+            raise
+        with self._lock:
+            state.tools = (self._clock(), tools)
+            state.tools_inflight = None
+        future.set_result(tools)
+        return tools
+
+    def invalidate(self, server: str | None = None) -> None:
+        """Forget cached tool lists (one server, or all)."""
+        with self._lock:
+            for state in self._servers.values():
+                if server is None or state.name == server:
+                    state.tools = None
+
+    def request(self, server: str, method: str, params: dict | None = None, *, timeout: float | None = None) -> dict:
+        """Send one JSON-RPC request through the pool, under the server's cap and breaker."""
+        state = self._server(server)
+        operation = params["name"] if method == "tools/call" and params else method
+        with telemetry.span("mcp", f"{server}/{operation}"):
+            return self._request(state, method, params, timeout)
+
+    def _request(self, state: _Server, method: str, params: dict | None, timeout: float | None) -> dict:
+        server = state.name
+        timeout = self.timeout if timeout is None else timeout
+        if not state.breaker.allow():
+            with self._lock:
+                self.counters["rejected_open_circuit"] += 1
+            raise McpError(McpError.CIRCUIT_OPEN, f"circuit open for {server}", server)
+        deadline = time.monotonic() + timeout
+        if not state.slots.acquire(timeout=timeout):
+            state.breaker.record_skipped()  # our own cap, not the server's health
+            raise McpError(McpError.TIMEOUT, f"{server} concurrency cap reached", server)
+        try:
+            session = self._session(state, deadline)
+            result = session.request(method, params, timeout=max(0.0, deadline - time.monotonic()))
+        except McpError as exc:
+            if exc.code == McpError.TOOL_ERROR:
+                state.breaker.record_success()
+            else:
+                state.breaker.record_failure()
+                with self._lock:
+                    self.counters["failures"] += 1
+            raise
+        except OSError as exc:  # connect failed
+            state.breaker.record_failure()
+            with self._lock:
+                self.counters["failures"] += 1
+            raise McpError(McpError.BACKEND_UNAVAILABLE, f"cannot reach {server}: {exc}", server) from exc
+        except BaseException:  # e.g. a broken connector; never leave a half-open probe outstanding
+            state.breaker.record_failure()
+            with self._lock:
+                self.counters["failures"] += 1
+            raise
+        finally:
+            state.slots.release()
+        state.breaker.record_success()
+        with self._lock:
+            self.counters["calls"] += 1
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self.counters,
+                "servers": {
+                    name: {
+                        "sessions": len(s.sessions),
+                        "inflight": sum(x.inflight for x in s.sessions),
+                        "circuit": s.breaker.state,
+                    }
+                    for name, s in self._servers.items()
+                },
+            }
+
+    def _server(self, name: str) -> _Server:
+        try:
+            return self._servers[name]
+        except KeyError:
+            raise McpError(McpError.UNKNOWN_SERVER, f"no MCP server named {name!r}", name) from None
+
+    def _session(self, state: _Server, deadline: float) -> McpSession:
+        """Least-loaded live session; opens another only when all are saturated."""
+        with self._lock:
+            dead = [s for s in state.sessions if not s.alive]
+            if dead:
+                state.sessions = [s for s in state.sessions if s.alive]
+                state.tools = None  # a new session may see a different server build
+                self.counters["sessions_dropped"] += len(dead)
+            best = min(state.sessions, key=lambda s: s.inflight, default=None)
+            grow = (best is None or best.inflight >= self.streams_per_session) and (
+                len(state.sessions) + state.opening < self.max_sessions
+            )
+            if not grow and best is not None:
+                return best
+            if not grow:  # nothing live yet, but another thread is already connecting
+                grow = state.opening == 0
+            if grow:
+                state.opening += 1
+        if not grow:
+            return self._await_session(state, deadline)
+        session = None
+        try:
+            session = McpSession.open(
+                state.connector(),
+                server=state.name,
+                timeout=self.timeout,
+                handshake_timeout=max(0.0, deadline - time.monotonic()),
+                on_notification=lambda method, params: self._notified(state, method),
+            )
+        finally:
+            with self._lock:
+                state.opening -= 1
+                if session is not None:
+                    state.sessions.append(session)
+                    self.counters["sessions_opened"] += 1
+                self._session_ready.notify_all()
+        return session
+
+    def _await_session(self, state: _Server, deadline: float) -> McpSession:
+        with self._lock:
+            self._session_ready.wait_for(
+                lambda: any(s.alive for s in state.sessions) or state.opening == 0,
+                timeout=max(0.0, deadline - time.monotonic()),
+            )
+            live = [s for s in state.sessions if s.alive]
+            if live:
+                return min(live, key=lambda s: s.inflight)
+            if state.opening:
+                raise McpError(McpError.TIMEOUT, f"{state.name} session still opening", state.name)
+        return self._session(state, deadline)
+
+    def _notified(self, state: _Server, method: str) -> None:
+        if method == "notifications/tools/list_changed":
+            with self._lock:
+                state.tools = None
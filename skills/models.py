@@ -0,0 +1,484 @@
+"""
+In-memory models for the agent API contracts in specs/technical.md.
+
+Each model mirrors one JSON contract and converts to and from it with
+``to_dict``/``from_dict`` (or straight to text with ``to_json``/``from_json``).
+Models are slotted dataclasses: no per-instance ``__dict__``, so a live
+Result costs about a third of the equivalent nested dict.
+
+For large batches, ``RecordBatch`` keeps records of one model as columns:
+
+* float and int fields in ``array`` buffers, exposed to numpy without a copy
+  via ``column(name)``
+* low-cardinality strings (``CATEGORICAL`` on each model: task_type,
+  priority, decision, state, ...) as int32 codes into a shared level list
+* other strings and string lists as plain lists, sharing one empty tuple for
+  the common empty case
+
+``RecordBatch.from_dicts``/``from_json_lines`` write spec dicts directly into
+the columns; no model instance is built per record. Rows come back as model
+instances on indexing.
+"""
+
+import json
+import math
+import uuid
+from array import array
+from collections import namedtuple
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field, fields
+from datetime import datetime, timezone
+from typing import ClassVar
+
+import numpy as np
+
+TASK_TYPES = ("generate_content", "reply", "render_video", "transact")
+PRIORITIES = ("high", "medium", "low")
+
+_dumps = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+
+
+def utc_now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _check_choice(name: str, value: str, choices: tuple[str, ...]) -> None:
+    if value not in choices:
+        raise ValueError(f"{name} must be one of {', '.join(choices)}, got {value!r}")
+
+
+class _SpecModel:
+    """Shared JSON helpers; subclasses provide ``to_dict``/``from_dict``."""
+
+    __slots__ = ()
+    CATEGORICAL: ClassVar[tuple[str, ...]] = ()
+
+    def to_json(self) -> str:
+        return _dumps(self.to_dict())
+
+    @classmethod
+    def from_json(cls, text: str | bytes):
+        return cls.from_dict(json.loads(text))
+
+
+@dataclass(slots=True)
+class Task(_SpecModel):
+    """Task (Planner → Worker)."""
+
+    CATEGORICAL: ClassVar[tuple[str, ...]] = ("task_type", "priority")
+
+    task_id: str
+    task_type: str
+    priority: str = "medium"
+    goal: str = ""
+    persona_constraints: list[str] = field(default_factory=list)
+    resources: list[str] = field(default_factory=list)
+    created_at: str = field(default_factory=utc_now_iso)
+
+    def __post_init__(self):
+        _check_choice("task_type", self.task_type, TASK_TYPES)
+        _check_choice("priority", self.priority, PRIORITIES)
+
+    @classmethod
+    def new(cls, task_type: str, goal: str = "", priority: str = "medium", **context) -> "Task":
+        return cls(str(uuid.uuid4()), task_type, priority, goal, **context)
+
+    def to_dict(self) -> dict:
+        return {
+            "task_id": self.task_id,
+            "task_type": self.task_type,
+            "priority": self.priority,
+            "context": {
+                "goal": self.goal,
+                "persona_constraints": list(self.persona_constraints),
+                "resources": list(self.resources),
+            },
+            "created_at": self.created_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Task":
+        context = data.get("context") or {}
+        return cls(
+            task_id=data["task_id"],
+            task_type=data["task_type"],
+            priority=data.get("priority", "medium"),
+            goal=context.get("goal", ""),
+            persona_constraints=list(context.get("persona_constraints", ())),
+            resources=list(context.get("resources", ())),
+            created_at=data.get("created_at") or utc_now_iso(),
+        )
+
+
+@dataclass(slots=True)
+class Result(_SpecModel):
+    """Result (Worker → Judge).
+
+    ``safety_flags`` and ``persona_id`` travel in ``metadata``; the Judge
+    routes on them alongside ``confidence_score``.
+    """
+
+    CATEGORICAL: ClassVar[tuple[str, ...]] = ("model", "persona_id")
+
+    task_id: str
+    output: str
+    confidence_score: float
+    model: str = ""
+    latency_ms: int = 0
+    safety_flags: list[str] = field(default_factory=list)
+    persona_id: str | None = None
+
+    def to_dict(self) -> dict:
+        metadata = {"model": self.model, "latency_ms": self.latency_ms}
+        if self.safety_flags:
+            metadata["safety_flags"] = list(self.safety_flags)
+        if self.persona_id is not None:
+            metadata["persona_id"] = self.persona_id
+        return {
+            "task_id": self.task_id,
+            "output": self.output,
+            "confidence_score": self.confidence_score,
+            "metadata": metadata,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Result":
+        metadata = data.get("metadata") or {}
+        return cls(
+            task_id=data["task_id"],
+            output=data["output"],
+            confidence_score=float(data["confidence_score"]),
+            model=metadata.get("model", ""),
+            latency_ms=int(metadata.get("latency_ms", 0)),
+            safety_flags=list(metadata.get("safety_flags", ())),
+            persona_id=metadata.get("persona_id"),
+        )
+
+
+DECISIONS = ("approve", "reject", "escalate")
+
+
+@dataclass(slots=True)
+class Decision(_SpecModel):
+    """Decision (Judge → Orchestrator)."""
+
+    CATEGORICAL: ClassVar[tuple[str, ...]] = ("decision", "reason")
+
+    task_id: str
+    decision: str
+    reason: str
+
+    def __post_init__(self):
+        _check_choice("decision", self.decision, DECISIONS)
+
+    def to_dict(self) -> dict:
+        return {"task_id": self.task_id, "decision": self.decision, "reason": self.reason}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Decision":
+        return cls(data["task_id"], data["decision"], data["reason"])
+
+
+@dataclass(slots=True)
+class Trend(_SpecModel):
+    """One entry of ``skill_fetch_trends`` output (skills/README.md)."""
+
+    CATEGORICAL: ClassVar[tuple[str, ...]] = ("source",)
+
+    topic: str
+    score: float
+    source: str
+    observed_at: str = field(default_factory=utc_now_iso)
+
+    def to_dict(self) -> dict:
+        return {"topic": self.topic, "score": self.score, "source": self.source, "observed_at": self.observed_at}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Trend":
+        return cls(data["topic"], float(data["score"]), data["source"], data["observed_at"])
+
+
+AGENT_STATES = ("idle", "working", "awaiting_review")
+
+
+@dataclass(slots=True)
+class AgentStatus(_SpecModel):
+    """Agent status (``agent_status`` table and ``agent://status/{agent_id}``)."""
+
+    CATEGORICAL: ClassVar[tuple[str, ...]] = ("state",)
+
+    agent_id: str
+    state: str
+    capabilities: list[str] = field(default_factory=list)
+    confidence_avg: float | None = None
+    current_bid_price: float | None = None
+    updated_at: str = field(default_factory=utc_now_iso)
+
+    def __post_init__(self):
+        _check_choice("state", self.state, AGENT_STATES)
+
+    def to_dict(self) -> dict:
+        return {
+            "agent_id": self.agent_id,
+            "state": self.state,
+            "capabilities": list(self.capabilities),
+            "confidence_avg": self.confidence_avg,
+            "current_bid_price": self.current_bid_price,
+            "updated_at": self.updated_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "AgentStatus":
+        return cls(
+            agent_id=data["agent_id"],
+            state=data["state"],
+            capabilities=list(data.get("capabilities") or ()),
+            confidence_avg=data.get("confidence_avg"),
+            current_bid_price=data.get("current_bid_price"),
+            updated_at=data.get("updated_at") or utc_now_iso(),
+        )
+
+
+# -- columnar batches ---------------------------------------------------------
+
+_FLOAT, _OPT_FLOAT, _INT, _CAT, _STR, _LIST = range(6)
+_EMPTY: tuple = ()
+
+
+def _column_kind(model: type, f) -> int:
+    if f.type is float:
+        return _FLOAT
+    if f.type == float | None:
+        return _OPT_FLOAT
+    if f.type is int:
+        return _INT
+    if f.name in model.CATEGORICAL:
+        return _CAT
+    if f.type == list[str]:
+        return _LIST
+    return _STR
+
+
+def _view(column: array, dtype) -> np.ndarray:
+    view = np.frombuffer(column, dtype=dtype) if len(column) else np.empty(0, dtype)
+    view.flags.writeable = False
+    return view
+
+
+class _Categorical:
+    __slots__ = ("codes", "levels", "index")
+
+    def __init__(self):
+        self.codes = array("i")
+        self.levels: list = []
+        self.index: dict = {}
+
+    def append(self, value) -> None:
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.levels)
+            self.levels.append(value)
+        self.codes.append(code)
+
+    def pop(self) -> None:
+        code = self.codes.pop()
+        if code == len(self.levels) - 1 and code not in self.codes:
+            del self.index[self.levels.pop()]
+
+
+class RecordBatch:
+    """Append-only columnar store for records of one model class."""
+
+    def __init__(self, model: type, records: Iterable = ()):
+        self.model = model
+        self._fields = tuple(f.name for f in fields(model))
+        self._kinds = tuple(_column_kind(model, f) for f in fields(model))
+        self._columns = [
+            array("d") if kind in (_FLOAT, _OPT_FLOAT) else array("q") if kind == _INT else _Categorical() if kind == _CAT else []
+            for kind in self._kinds
+        ]
+        self._len = 0
+        self.extend(records)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def append(self, record) -> None:
+        self._append_values([getattr(record, name) for name in self._fields])
+
+    def extend(self, records: Iterable) -> None:
+        for record in records:
+            self.append(record)
+
+    def _append_values(self, values: list) -> None:
+        written = 0
+        try:
+            for kind, column, value in zip(self._kinds, self._columns, values):
+                if kind == _OPT_FLOAT:
+                    column.append(math.nan if value is None else value)
+                elif kind == _LIST:
+                    column.append(tuple(value) if value else _EMPTY)
+                else:
+                    column.append(value)
+                written += 1
+        except BaseException:
+            # A bad value or a pinned column (BufferError): undo the columns already written.
+            for column in self._columns[:written]:
+                column.pop()
+            raise
+        self._len += 1
+
+    def __getitem__(self, i: int):
+        if i < 0:
+            i += self._len
+        if not 0 <= i < self._len:
+            raise IndexError("record index out of range")
+        values = []
+        for kind, column in zip(self._kinds, self._columns):
+            if kind == _CAT:
+                values.append(column.levels[column.codes[i]])
+            elif kind == _OPT_FLOAT:
+                value = column[i]
+                values.append(None if math.isnan(value) else value)
+            elif kind == _LIST:
+                values.append(list(column[i]))
+            else:
+                values.append(column[i])
+        return self.model(*values)
+
+    def __iter__(self) -> Iterator:
+        model = self.model
+        for values in zip(*self._plain_columns(lists=True)):
+            yield model(*values)
+
+    def _plain_columns(self, *, lists: bool) -> list:
+        """Every column as a Python sequence of field values, built column-at-a-time."""
+        out = []
+        for kind, column in zip(self._kinds, self._columns):
+            if kind == _CAT:
+                levels = column.levels
+                out.append([levels[code] for code in column.codes])
+            elif kind == _OPT_FLOAT:
+                out.append([None if math.isnan(value) else value for value in column])
+            elif kind == _LIST and lists:
+                out.append([list(value) for value in column])
+            else:
+                out.append(column)
+        return out
+
+    # -- analytics views ---------------------------------------------------
+
+    def column(self, name: str):
+        """
+        Numeric fields as a read-only numpy view over the column (NaN for
+        None); other fields as a list. While a view is alive the batch cannot
+        grow (``append`` raises ``BufferError``); copy it to keep it longer.
+        """
+        kind, column = self._column(name)
+        if kind in (_FLOAT, _OPT_FLOAT):
+            return _view(column, np.float64)
+        if kind == _INT:
+            return _view(column, np.int64)
+        if kind == _CAT:
+            levels = column.levels
+            return [levels[code] for code in column.codes]
+        return list(column)
+
+    def codes(self, name: str) -> tuple[np.ndarray, list]:
+        """``(codes, levels)`` of a categorical field, for group-by and counting."""
+        kind, column = self._column(name)
+        if kind != _CAT:
+            raise ValueError(f"{self.model.__name__}.{name} is not categorical")
+        return _view(column.codes, np.int32), list(column.levels)
+
+    def _column(self, name: str):
+        try:
+            i = self._fields.index(name)
+        except ValueError:
+            raise KeyError(f"{self.model.__name__} has no field {name!r}") from None
+        return self._kinds[i], self._columns[i]
+
+    # -- spec JSON ---------------------------------------------------------
+
+    @classmethod
+    def from_dicts(cls, model: type, items: Iterable[dict]) -> "RecordBatch":
+        """Load spec-shaped dicts straight into columns."""
+        batch = cls(model)
+        flatten = _FLATTEN[model]
+        for data in items:
+            batch._append_values(flatten(data))
+        return batch
+
+    @classmethod
+    def from_json_lines(cls, model: type, lines: Iterable[str | bytes]) -> "RecordBatch":
+        return cls.from_dicts(model, (json.loads(line) for line in lines if line.strip()))
+
+    def to_dicts(self) -> Iterator[dict]:
+        """Spec dicts, built by the model's own ``to_dict`` over lightweight row tuples."""
+        row = namedtuple(self.model.__name__ + "Row", self._fields)._make
+        to_dict = self.model.to_dict
+        for values in zip(*self._plain_columns(lists=False)):
+            yield to_dict(row(values))
+
+    def to_json_lines(self) -> Iterator[str]:
+        for data in self.to_dicts():
+            yield _dumps(data)
+
+
+def _task_values(data: dict) -> list:
+    context = data.get("context") or {}
+    task_type, priority = data["task_type"], data.get("priority", "medium")
+    _check_choice("task_type", task_type, TASK_TYPES)
+    _check_choice("priority", priority, PRIORITIES)
+    return [
+        data["task_id"],
+        task_type,
+        priority,
+        context.get("goal", ""),
+        context.get("persona_constraints"),
+        context.get("resources"),
+        data.get("created_at") or utc_now_iso(),
+    ]
+
+
+def _result_values(data: dict) -> list:
+    metadata = data.get("metadata") or {}
+    return [
+        data["task_id"],
+        data["output"],
+        float(data["confidence_score"]),
+        metadata.get("model", ""),
+        int(metadata.get("latency_ms", 0)),
+        metadata.get("safety_flags"),
+        metadata.get("persona_id"),
+    ]
+
+
+def _decision_values(data: dict) -> list:
+    _check_choice("decision", data["decision"], DECISIONS)
+    return [data["task_id"], data["decision"], data["reason"]]
+
+
+def _trend_values(data: dict) -> list:
+    return [data["topic"], float(data["score"]), data["source"], data["observed_at"]]
+
+
+def _agent_status_values(data: dict) -> list:
+    _check_choice("state", data["state"], AGENT_STATES)
+    return [
+        data["agent_id"],
+        data["state"],
+        data.get("capabilities"),
+        data.get("confidence_avg"),
+        data.get("current_bid_price"),
+        data.get("updated_at") or utc_now_iso(),
+    ]
+
+
+_FLATTEN = {
+    Task: _task_values,
+    Result: _result_values,
+    Decision: _decision_values,
+    Trend: _trend_values,
+    AgentStatus: _agent_status_values,
+}
@@ -0,0 +1,521 @@
+"""
+Batched persistence for the specs/technical.md tables: tasks, results,
+decisions and agent_status.
+
+Writers call ``BatchWriter.write_*`` and return immediately; rows are
+buffered per table and flushed as multi-row ``INSERT ... VALUES (...), (...)``
+statements when a table reaches ``batch_size`` rows or its oldest row is
+``flush_interval`` seconds old. Flushes run on ``workers`` background threads,
+each borrowing a connection from a ``ConnectionPool``.
+
+When ``max_buffered`` rows are waiting, ``write`` blocks until a flush makes
+room (backpressure) and raises ``BufferFull`` if ``timeout`` runs out.
+
+``agent_status`` is keyed by ``agent_id``: buffered updates for the same agent
+coalesce to the latest one and are written with ``ON CONFLICT ... DO UPDATE``.
+The update only applies when the incoming ``updated_at`` is not older than the
+stored one, so two workers committing batches out of order cannot regress an
+agent's status.
+
+Transient errors (a DB-API ``OperationalError``/``InterfaceError``, or no
+pooled connection) put the rows back in the buffer and the table is retried
+with exponential backoff. If a batch fails any other way, its rows are retried
+one by one so a single bad row cannot sink the batch; rows that still fail
+(constraint violations and the like) land in ``rejected``.
+
+Works with any DB-API connection whose placeholder is ``?`` (qmark, sqlite3)
+or ``%s`` (format, psycopg); tests run against SQLite. Transactions go
+through the connection's ``transaction()`` block when it has one (psycopg 3,
+whose ``with conn:`` would close a pooled connection), else commit/rollback.
+"""
+
+import json
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+from skills.models import AGENT_STATES, Decision, Result, Task, utc_now_iso
+from skills.task_queue import WaitHistogram
+
+FLUSH_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+DEFAULT_RETRY_BACKOFF = 0.1
+MAX_RETRY_BACKOFF = 5.0
+
+# Column order per table; ``key`` marks upsert tables, ``version`` the column
+# an upsert must not move backwards.
+TABLES: dict[str, dict] = {
+    "tasks": {
+        "columns": ("id", "agent_id", "task_type", "priority", "goal", "persona_constraints", "resources", "created_at"),
+    },
+    "results": {
+        "columns": ("id", "task_id", "output", "confidence_score", "model", "latency_ms", "created_at"),
+    },
+    "decisions": {
+        "columns": ("id", "task_id", "decision", "reason", "decided_at"),
+    },
+    "agent_status": {
+        "columns": ("agent_id", "state", "capabilities", "confidence_avg", "current_bid_price", "updated_at"),
+        "key": "agent_id",
+        "version": "updated_at",
+    },
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    agent_id TEXT,
+    task_type TEXT NOT NULL,
+    priority TEXT NOT NULL,
+    goal TEXT,
+    persona_constraints TEXT,
+    resources TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    id TEXT PRIMARY KEY,
+    task_id TEXT NOT NULL,
+    output TEXT,
+    confidence_score REAL,
+    model TEXT,
+    latency_ms INTEGER,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS decisions (
+    id TEXT PRIMARY KEY,
+    task_id TEXT NOT NULL,
+    decision TEXT NOT NULL CHECK (decision IN ('approve', 'reject', 'escalate')),
+    reason TEXT,
+    decided_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS agent_status (
+    agent_id TEXT PRIMARY KEY,
+    state TEXT NOT NULL CHECK (state IN ('idle', 'working', 'awaiting_review')),
+    capabilities TEXT,
+    confidence_avg REAL,
+    current_bid_price NUMERIC,
+    updated_at TEXT NOT NULL
+);
+"""
+
+
+class BufferFull(RuntimeError):
+    """``write`` timed out waiting for the buffer to drain."""
+
+
+class ConnectionPool:
+    """Fixed-size pool of DB-API connections, created lazily."""
+
+    def __init__(self, connect: Callable[[], object], size: int = 4, timeout: float = 30.0):
+        if size < 1:
+            raise ValueError("size must be >= 1")
+        self._connect = connect
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self.size = size
+        self.timeout = timeout
+
+    @classmethod
+    def sqlite(cls, path: str, size: int = 4) -> "ConnectionPool":
+        import sqlite3
+
+        def connect():
+            conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            return conn
+
+        return cls(connect, size)
+
+    @contextmanager
+    def connection(self) -> Iterator[object]:
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            reserved = self._created < self.size
+            if reserved:
+                self._created += 1
+        if reserved:
+            try:
+                return self._connect()
+            except BaseException:
+                with self._lock:
+                    self._created -= 1  # a failed connect gives its slot back
+                raise
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(f"no pooled connection within {self.timeout}s") from None
+
+
+def is_transient(exc: BaseException) -> bool:
+    """True for errors worth retrying: lost connections, lock timeouts, an exhausted pool."""
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    # DB-API drivers each define their own classes; match on the standard names.
+    return any(cls.__name__ in ("OperationalError", "InterfaceError") for cls in type(exc).__mro__)
+
+
+@contextmanager
+def transaction(conn) -> Iterator[object]:
+    """Commit on success, roll back on error, and leave ``conn`` open for the pool."""
+    if hasattr(conn, "transaction"):
+        with conn.transaction():
+            yield conn
+        return
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+def create_schema(pool: ConnectionPool) -> None:
+    """Create the tables on SQLite (Postgres deployments use migrations)."""
+    with pool.connection() as conn:
+        conn.executescript(SCHEMA)
+
+
+def task_row(task: Task, agent_id: str | None = None) -> dict:
+    return {
+        "id": task.task_id,
+        "agent_id": agent_id,
+        "task_type": task.task_type,
+        "priority": task.priority,
+        "goal": task.goal,
+        "persona_constraints": json.dumps(task.persona_constraints),
+        "resources": json.dumps(task.resources),
+        "created_at": task.created_at,
+    }
+
+
+def result_row(result: Result) -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "task_id": result.task_id,
+        "output": result.output,
+        "confidence_score": result.confidence_score,
+        "model": result.model,
+        "latency_ms": result.latency_ms,
+        "created_at": utc_now_iso(),
+    }
+
+
+def decision_row(decision: Decision) -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "task_id": decision.task_id,
+        "decision": decision.decision,
+        "reason": decision.reason,
+        "decided_at": utc_now_iso(),
+    }
+
+
+def agent_status_row(
+    agent_id: str,
+    state: str,
+    capabilities: list[str] | None = None,
+    confidence_avg: float | None = None,
+    current_bid_price: float | None = None,
+) -> dict:
+    if state not in AGENT_STATES:
+        raise ValueError(f"state must be one of {', '.join(AGENT_STATES)}, got {state!r}")
+    return {
+        "agent_id": agent_id,
+        "state": state,
+        "capabilities": json.dumps(list(capabilities or ())),
+        "confidence_avg": confidence_avg,
+        "current_bid_price": current_bid_price,
+        "updated_at": utc_now_iso(),
+    }
+
+
+class BatchWriter:
+    """Buffers rows per table and bulk-inserts them from background threads."""
+
+    def __init__(
+        self,
+        pool: ConnectionPool,
+        *,
+        batch_size: int = 500,
+        flush_interval: float = 0.05,
+        max_buffered: int = 10_000,
+        workers: int | None = None,
+        paramstyle: str = "qmark",
+        max_params: int = 999,
+        retry_backoff: float = DEFAULT_RETRY_BACKOFF,
+        transient: Callable[[BaseException], bool] = is_transient,
+    ):
+        if paramstyle not in ("qmark", "format"):
+            raise ValueError("paramstyle must be 'qmark' or 'format'")
+        if max_buffered < batch_size:
+            raise ValueError("max_buffered must be >= batch_size")
+        self.pool = pool
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffered = max_buffered
+        self._placeholder = "?" if paramstyle == "qmark" else "%s"
+        self._max_params = max_params
+        self.retry_backoff = retry_backoff
+        self._transient = transient
+
+        self._cond = threading.Condition()
+        # append tables buffer a deque; keyed tables a dict (latest row wins)
+        self._buffers = {name: {} if "key" in spec else deque() for name, spec in TABLES.items()}
+        self._oldest: dict[str, float | None] = dict.fromkeys(TABLES)
+        self._retry_at: dict[str, float] = dict.fromkeys(TABLES, 0.0)
+        self._failures: dict[str, int] = dict.fromkeys(TABLES, 0)
+        self._buffered = 0
+        self._in_flight = 0
+        self._closed = False
+
+        self.rejected: list[tuple[str, tuple, str]] = []
+        self.flush_seconds = WaitHistogram(FLUSH_BUCKETS)
+        self.counters = {"rows_written": 0, "batches": 0, "coalesced": 0, "backpressure_waits": 0, "batch_errors": 0, "retries": 0}
+        self._first_write: float | None = None
+        self._last_flush: float | None = None
+
+        self._threads = [
+            threading.Thread(target=self._run, name=f"batch-writer-{i}", daemon=True)
+            for i in range(workers or pool.size)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def write(self, table: str, row: dict, *, timeout: float | None = None) -> None:
+        """Buffer one row; blocks while the buffer is full."""
+        spec = TABLES.get(table)
+        if spec is None:
+            raise ValueError(f"unknown table {table!r}")
+        values = tuple(row.get(column) for column in spec["columns"])
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("writer is closed")
+            if self._buffered >= self.max_buffered:
+                self.counters["backpressure_waits"] += 1
+                while self._buffered >= self.max_buffered:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise BufferFull(f"{self._buffered} rows buffered")
+                    self._cond.wait(remaining)
+            buffer = self._buffers[table]
+            if "key" in spec:
+                key = row[spec["key"]]
+                if key in buffer:
+                    del buffer[key]  # re-insert so dict order tracks recency
+                    self.counters["coalesced"] += 1
+                    self._buffered -= 1
+                buffer[key] = values
+            else:
+                buffer.append(values)
+            now = time.monotonic()
+            if self._first_write is None:
+                self._first_write = now
+            self._buffered += 1
+            if self._oldest[table] is None:
+                self._oldest[table] = now
+                self._cond.notify_all()  # workers arm the flush_interval timer
+            elif len(buffer) >= self.batch_size:
+                self._cond.notify_all()
+
+    def write_task(self, task: Task, agent_id: str | None = None, **kwargs) -> None:
+        self.write("tasks", task_row(task, agent_id), **kwargs)
+
+    def write_result(self, result: Result, **kwargs) -> None:
+        self.write("results", result_row(result), **kwargs)
+
+    def write_decision(self, decision: Decision, **kwargs) -> None:
+        self.write("decisions", decision_row(decision), **kwargs)
+
+    def write_agent_status(self, agent_id: str, state: str, **fields) -> None:
+        timeout = fields.pop("timeout", None)
+        self.write("agent_status", agent_status_row(agent_id, state, **fields), timeout=timeout)
+
+    def flush(self, timeout: float | None = None) -> None:
+        """Block until every row buffered so far has been written."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            for table in TABLES:
+                if self._buffers[table]:
+                    self._oldest[table] = float("-inf")
+            self._cond.notify_all()
+            while self._buffered or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f"{self._buffered + self._in_flight} rows not flushed")
+                self._cond.wait(remaining)
+
+    def close(self, timeout: float | None = None) -> None:
+        """Flush, then stop the worker threads."""
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join()
+
+    def metrics(self) -> dict:
+        with self._cond:
+            buffered = {name: len(buffer) for name, buffer in self._buffers.items()}
+            elapsed = (self._last_flush or 0.0) - (self._first_write or 0.0)
+            rows = self.counters["rows_written"]
+            return {
+                "buffered": buffered,
+                "rows_per_second": round(rows / elapsed, 1) if elapsed > 0 else 0.0,
+                "flush_seconds": self.flush_seconds.snapshot(),
+                "counters": {**self.counters, "rejected": len(self.rejected)},
+            }
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    table, wait = self._ready(time.monotonic())
+                    if table is not None or (self._closed and not self._buffered):
+                        break
+                    self._cond.wait(wait)
+                if table is None:
+                    return
+                rows = self._take(table)
+                self._in_flight += len(rows)
+                self._buffered -= len(rows)
+                self._cond.notify_all()  # room for blocked writers
+            started = time.monotonic()
+            try:
+                written, unwritten = self._insert(table, rows)
+            except Exception as exc:  # e.g. no pooled connection; never lose track of rows
+                written, unwritten = 0, rows
+                if not self._transient(exc):
+                    unwritten = []
+                    with self._cond:
+                        self.rejected.extend((table, row, str(exc)) for row in rows)
+            finished = time.monotonic()
+            with self._cond:
+                self._in_flight -= len(rows)
+                if unwritten:
+                    self._requeue(table, unwritten, finished)
+                else:
+                    self._failures[table] = 0
+                self.counters["batches"] += 1
+                self.counters["rows_written"] += written
+                self._last_flush = finished
+                self.flush_seconds.observe(finished - started)
+                self._cond.notify_all()
+
+    def _ready(self, now: float) -> tuple[str | None, float | None]:
+        """Pick the most urgent flushable table, or how long to sleep."""
+        wait = None
+        best, best_age = None, -1.0
+        for table, buffer in self._buffers.items():
+            if not buffer:
+                continue
+            if now < self._retry_at[table]:
+                remaining = self._retry_at[table] - now
+                wait = remaining if wait is None else min(wait, remaining)
+                continue
+            age = now - self._oldest[table]
+            if len(buffer) >= self.batch_size or age >= self.flush_interval or self._closed:
+                if age > best_age:
+                    best, best_age = table, age
+            else:
+                remaining = self.flush_interval - age
+                wait = remaining if wait is None else min(wait, remaining)
+        return best, wait
+
+    def _take(self, table: str) -> list[tuple]:
+        buffer = self._buffers[table]
+        n = min(len(buffer), self.batch_size)
+        if isinstance(buffer, dict):
+            keys = [key for key, _ in zip(buffer, range(n))]
+            rows = [buffer.pop(key) for key in keys]
+        else:
+            rows = [buffer.popleft() for _ in range(n)]
+        if not buffer:
+            self._oldest[table] = None
+        return rows
+
+    def _requeue(self, table: str, rows: list[tuple], now: float) -> None:
+        """Put rows that hit a transient error back at the front and back the table off."""
+        # Caller holds self._cond.
+        buffer = self._buffers[table]
+        if isinstance(buffer, dict):
+            index = TABLES[table]["columns"].index(TABLES[table]["key"])
+            requeued = {row[index]: row for row in rows if row[index] not in buffer}  # newer writes win
+            self.counters["coalesced"] += len(rows) - len(requeued)
+            self._buffers[table] = {**requeued, **buffer}
+        else:
+            buffer.extendleft(reversed(rows))
+            requeued = rows
+        self._buffered += len(requeued)
+        if self._oldest[table] is None:
+            self._oldest[table] = now
+        self._failures[table] += 1
+        backoff = self.retry_backoff * 2 ** (self._failures[table] - 1)
+        self._retry_at[table] = now + min(MAX_RETRY_BACKOFF, backoff)
+        self.counters["retries"] += 1
+
+    def _insert(self, table: str, rows: list[tuple]) -> tuple[int, list[tuple]]:
+        """Write ``rows``; returns how many were written and those that hit a transient error."""
+        spec = TABLES[table]
+        per_statement = max(1, self._max_params // len(spec["columns"]))
+        try:
+            with self.pool.connection() as conn:
+                with transaction(conn):
+                    cursor = conn.cursor()
+                    for i in range(0, len(rows), per_statement):
+                        chunk = rows[i : i + per_statement]
+                        cursor.execute(self._statement(table, len(chunk)), [v for row in chunk for v in row])
+            return len(rows), []
+        except Exception as exc:
+            if self._transient(exc):
+                return 0, rows
+            with self._cond:
+                self.counters["batch_errors"] += 1
+        written = 0
+        with self.pool.connection() as conn:
+            for i, row in enumerate(rows):
+                try:
+                    with transaction(conn):
+                        conn.cursor().execute(self._statement(table, 1), row)
+                except Exception as exc:
+                    if self._transient(exc):
+                        return written, rows[i:]
+                    with self._cond:
+                        self.rejected.append((table, row, str(exc)))
+                else:
+                    written += 1
+        return written, []
+
+    def _statement(self, table: str, n_rows: int) -> str:
+        spec = TABLES[table]
+        columns = spec["columns"]
+        group = "(" + ", ".join([self._placeholder] * len(columns)) + ")"
+        sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES {', '.join([group] * n_rows)}"  # nosec B608
+        if "key" in spec:
+            updates = ", ".join(f"{c} = excluded.{c}" for c in columns if c != spec["key"])
+            sql += f" ON CONFLICT ({spec['key']}) DO UPDATE SET {updates}"
+            if "version" in spec:
+                sql += f" WHERE excluded.{spec['version']} >= {table}.{spec['version']}"
+        return sql
@@ -0,0 +1,443 @@
+"""
+Scheduled publishing for skill_publish_video.
+
+``skill_publish_video`` answers ``SCHEDULED`` for a future ``schedule_time``;
+``PublishScheduler`` is what holds those posts and releases them:
+
+* pending posts sit in a heap keyed by release time, so finding the next due
+  post is O(1) and popping it O(log n); nothing polls every row. Cancelled
+  posts are dropped lazily when they reach the top of the heap
+* every platform has a token bucket (``PLATFORM_LIMITS``). Due posts beyond
+  the available tokens are deferred until the bucket refills rather than
+  sent to be rejected, and a ``RATE_LIMITED`` answer empties the bucket for
+  ``cooldown`` seconds, so a throttled platform does not trigger a storm of
+  rejections
+* the due posts for one platform go out as one batched MCP call of up to
+  ``batch_size`` posts
+* transport failures are retried with exponential backoff, up to
+  ``max_attempts``; any other ``SkillError`` is final
+* with an ``AssetStore`` (``assets``), each post's video is pinned while it
+  waits, so a ``delete`` is deferred and ``gc`` cannot sweep it, and the
+  released post carries an open ``AssetReader`` as ``post["media"]``, as an
+  immediate publish does
+
+The queue is kept in an append-only JSON-lines journal (``add`` / ``retry`` /
+``done`` records) that is replayed on start-up and compacted once most of its
+lines are dead. A post is marked done only after the platform has answered,
+so a crash can cause a post to be re-sent but never lost.
+
+Time is read from ``clock`` (epoch seconds), so tests drive the scheduler
+with a simulated clock.
+"""
+
+import asyncio
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from skills.contracts import SkillError, parse_timestamp
+
+if TYPE_CHECKING:
+    from skills.asset_store import AssetStore
+
+# (tokens per second, burst) per platform.
+PLATFORM_LIMITS: dict[str, tuple[float, int]] = {
+    "tiktok": (0.5, 5),
+    "youtube": (0.2, 3),
+    "instagram": (0.5, 5),
+    "twitter": (1.0, 10),
+}
+DEFAULT_LIMIT = (0.2, 2)
+DEFAULT_BATCH_SIZE = 25
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_RETRY_BACKOFF = 30.0
+DEFAULT_COOLDOWN = 60.0
+
+# Error codes that mean "try again later" rather than "this post is bad".
+RETRYABLE_CODES = frozenset({"RATE_LIMITED", "BACKEND_UNAVAILABLE", "TIMEOUT"})
+
+# Batch publisher: (platform, posts) -> one entry per post, in order: the
+# platform_post_id, or a SkillError for that post. Raising fails the whole batch.
+BatchPublisher = Callable[[str, list[dict]], list]
+# Receives (schedule_id, skill_publish_video-shaped status dict) once a post is final.
+ResultCallback = Callable[[str, dict], None]
+
+
+class TokenBucket:
+    """Classic token bucket; time is passed in so it follows the scheduler's clock."""
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: int, now: float):
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be > 0 and burst >= 1")
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = now
+
+    def take(self, n: int, now: float) -> int:
+        """Take up to ``n`` whole tokens; returns how many were granted."""
+        self._refill(now)
+        granted = max(0, min(n, int(self.tokens)))
+        self.tokens -= granted
+        return granted
+
+    def delay(self, now: float, n: int = 1) -> float:
+        """Seconds until ``n`` tokens are available."""
+        self._refill(now)
+        return max(0.0, (n - self.tokens) / self.rate)
+
+    def drain(self, now: float, cooldown: float) -> None:
+        """Empty the bucket and owe ``cooldown`` seconds of tokens (platform said slow down)."""
+        self._refill(now)
+        self.tokens = min(self.tokens, 0.0) - cooldown * self.rate
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated:
+            self.tokens = min(float(self.burst), self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+
+def per_post(publish: Callable[[dict], str]) -> BatchPublisher:
+    """Adapt a one-post publisher (``publish_video.Publisher``) to the batch interface."""
+
+    def publish_batch(platform: str, posts: list[dict]) -> list:
+        answers = []
+        for post in posts:
+            try:
+                answers.append(publish(post))
+            except SkillError as exc:
+                answers.append(exc)
+        return answers
+
+    return publish_batch
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat()
+
+
+def _result(status: str, post_id: str | None = None, published_at: str | None = None, error: dict | None = None) -> dict:
+    return {"publication_status": status, "platform_post_id": post_id, "published_at": published_at, "error": error}
+
+
+class PublishScheduler:
+    """Heap-ordered, rate-limited, batched and journaled publish queue."""
+
+    def __init__(
+        self,
+        publish_batch: BatchPublisher,
+        *,
+        journal: str | Path | None = None,
+        limits: dict[str, tuple[float, int]] | None = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        retry_backoff: float = DEFAULT_RETRY_BACKOFF,
+        cooldown: float = DEFAULT_COOLDOWN,
+        on_result: ResultCallback | None = None,
+        assets: "AssetStore | None" = None,
+        fsync: bool = False,
+        clock: Callable[[], float] = time.time,
+    ):
+        if batch_size < 1 or max_attempts < 1:
+            raise ValueError("batch_size and max_attempts must be >= 1")
+        self._publish_batch = publish_batch
+        self.limits = dict(PLATFORM_LIMITS if limits is None else limits)
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.cooldown = cooldown
+        self._on_result = on_result
+        self._assets = assets
+        self._fsync = fsync
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._heap: list[tuple[float, int, str]] = []  # (release_at, seq, schedule_id)
+        self._seq = itertools.count()
+        self._posts: dict[str, dict] = {}
+        self._buckets: dict[str, TokenBucket] = {}
+        self.results: dict[str, dict] = {}
+        self.counters = {
+            "scheduled": 0,
+            "cancelled": 0,
+            "published": 0,
+            "failed": 0,
+            "deferred": 0,
+            "rate_limited": 0,
+            "retries": 0,
+            "batches": 0,
+        }
+        self._journal_path = None if journal is None else Path(journal)
+        self._journal = None
+        self._journal_lines = 0
+        if self._journal_path is not None:
+            self._replay()
+            self._journal = open(self._journal_path, "a", encoding="utf-8")
+        if self._assets is not None:
+            for record in self._posts.values():
+                self._assets.pin(record["post"]["video_asset_id"])
+
+    def __len__(self) -> int:
+        return len(self._posts)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+    def schedule(self, post: dict, schedule_time: str | float) -> str:
+        """
+        Hold ``post`` (platform, video_asset_id, caption, hashtags) until ``schedule_time``.
+
+        ``schedule_time`` is an ISO-8601 string (UTC if it has no offset) or epoch
+        seconds. Returns the schedule id.
+        """
+        if isinstance(schedule_time, str):
+            due = parse_timestamp(schedule_time).timestamp()
+        else:
+            due = float(schedule_time)
+        record = {
+            "id": uuid.uuid4().hex,
+            "post": {k: post[k] for k in ("platform", "video_asset_id", "caption", "hashtags")},
+            "due": due,
+            "attempts": 0,
+        }
+        if self._assets is not None:
+            self._assets.pin(record["post"]["video_asset_id"])
+        with self._lock:
+            self._append({"op": "add", **record})
+            self._add(record, due)
+            self.counters["scheduled"] += 1
+        return record["id"]
+
+    def cancel(self, schedule_id: str) -> bool:
+        with self._lock:
+            record = self._posts.pop(schedule_id, None)
+            if record is None:
+                return False
+            self._append({"op": "done", "id": schedule_id})
+            self.counters["cancelled"] += 1
+        self._unpin([record])
+        return True
+
+    def next_due(self) -> float | None:
+        """Release time of the next pending post (epoch seconds), or None."""
+        with self._lock:
+            self._discard_cancelled()
+            return self._heap[0][0] if self._heap else None
+
+    def pending(self, platform: str | None = None) -> list[dict]:
+        with self._lock:
+            return [
+                {"schedule_id": sid, **r["post"], "schedule_time": _iso(r["due"]), "attempts": r["attempts"]}
+                for sid, r in self._posts.items()
+                if platform is None or r["post"]["platform"] == platform
+            ]
+
+    def run_due(self) -> int:
+        """Release every due post the rate limits allow; returns how many got a final answer."""
+        now = self._clock()
+        with self._lock:
+            by_platform: dict[str, list[str]] = {}
+            while self._heap and self._heap[0][0] <= now:
+                _, _, sid = heapq.heappop(self._heap)
+                record = self._posts.get(sid)
+                if record is not None:
+                    by_platform.setdefault(record["post"]["platform"], []).append(sid)
+
+            sends: list[tuple[str, list[str]]] = []
+            for platform, sids in by_platform.items():
+                bucket = self._bucket(platform, now)
+                granted = bucket.take(len(sids), now)
+                if granted < len(sids):
+                    later = now + bucket.delay(now)
+                    for sid in sids[granted:]:
+                        heapq.heappush(self._heap, (later, next(self._seq), sid))
+                    self.counters["deferred"] += len(sids) - granted
+                for i in range(0, granted, self.batch_size):
+                    sends.append((platform, sids[i : min(granted, i + self.batch_size)]))
+
+        finished = 0
+        for platform, sids in sends:
+            with self._lock:
+                batch = [self._posts[sid] for sid in sids if sid in self._posts]
+            if batch:
+                finished += self._send(platform, batch, now)
+        return finished
+
+    def tick(self) -> int:
+        """Alias of ``run_due`` for drivers that poll."""
+        return self.run_due()
+
+    async def run(self, stop: asyncio.Event, max_sleep: float = 1.0) -> None:
+        """Sleep until the next post is due (or ``max_sleep``), release, repeat until ``stop``."""
+        while not stop.is_set():
+            self.run_due()
+            due = self.next_due()
+            delay = max_sleep if due is None else min(max_sleep, max(0.0, due - self._clock()))
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def compact(self) -> None:
+        """Rewrite the journal with one ``add`` line per pending post."""
+        with self._lock:
+            self._compact()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self.counters,
+                "pending": len(self._posts),
+                "tokens": {p: round(b.tokens, 3) for p, b in self._buckets.items()},
+            }
+
+    def _send(self, platform: str, batch: list[dict], now: float) -> int:
+        answers: dict[str, object] = {}
+        sent, posts, readers = [], [], []
+        for record in batch:
+            post = record["post"]
+            if self._assets is not None:
+                try:
+                    media = self._assets.open(post["video_asset_id"])
+                except KeyError:
+                    message = f"video {post['video_asset_id']!r} is not in the asset store"
+                    answers[record["id"]] = SkillError("ASSET_NOT_FOUND", message)
+                    continue
+                readers.append(media)
+                post = {**post, "media": media}
+            sent.append(record)
+            posts.append(post)
+        try:
+            replies = self._publish_batch(platform, posts) if posts else []
+            if len(replies) != len(posts):
+                raise SkillError("BACKEND_UNAVAILABLE", f"{platform} answered {len(replies)} of {len(posts)} posts")
+        except SkillError as exc:
+            replies = [exc] * len(posts)
+        except Exception as exc:
+            replies = [SkillError("BACKEND_UNAVAILABLE", f"{platform} publish failed: {exc}")] * len(posts)
+        finally:
+            for reader in readers:
+                reader.close()
+        answers.update(zip((record["id"] for record in sent), replies))
+
+        finished = []
+        with self._lock:
+            self.counters["batches"] += 1
+            throttled = False
+            for record in batch:
+                sid = record["id"]
+                answer = answers[sid]
+                if sid not in self._posts:  # cancelled while in flight
+                    continue
+                if not isinstance(answer, SkillError):
+                    finished.append((sid, _result("SUCCESS", str(answer), _iso(self._clock()))))
+                    self.counters["published"] += 1
+                elif answer.code in RETRYABLE_CODES and record["attempts"] + 1 < self.max_attempts:
+                    record["attempts"] += 1
+                    if answer.code == "RATE_LIMITED":
+                        throttled = True
+                        self.counters["rate_limited"] += 1
+                    retry_at = record["release_at"] = now + self.retry_backoff * 2 ** (record["attempts"] - 1)
+                    self._append({"op": "retry", "id": sid, "release_at": retry_at, "attempts": record["attempts"]})
+                    heapq.heappush(self._heap, (retry_at, next(self._seq), sid))
+                    self.counters["retries"] += 1
+                else:
+                    finished.append((sid, _result("FAILED", error=answer.to_dict())))
+                    self.counters["failed"] += 1
+            if throttled:
+                self._bucket(platform, now).drain(now, self.cooldown)
+            done = [self._posts.pop(sid) for sid, _ in finished]
+            for sid, result in finished:
+                self._append({"op": "done", "id": sid})
+                self.results[sid] = result
+            if self._journal_lines > 2 * len(self._posts) + 1024:
+                self._compact()
+        self._unpin(done)
+        if self._on_result is not None:
+            for sid, result in finished:
+                self._on_result(sid, result)
+        return len(finished)
+
+    def _unpin(self, records: list[dict]) -> None:
+        if self._assets is not None:
+            for record in records:
+                self._assets.unpin(record["post"]["video_asset_id"])
+
+    def _bucket(self, platform: str, now: float) -> TokenBucket:
+        # Caller holds self._lock.
+        bucket = self._buckets.get(platform)
+        if bucket is None:
+            rate, burst = self.limits.get(platform, DEFAULT_LIMIT)
+            bucket = self._buckets[platform] = TokenBucket(rate, burst, now)
+        return bucket
+
+    def _add(self, record: dict, release_at: float) -> None:
+        # Caller holds self._lock.
+        self._posts[record["id"]] = record
+        heapq.heappush(self._heap, (release_at, next(self._seq), record["id"]))
+
+    def _discard_cancelled(self) -> None:
+        # Caller holds self._lock.
+        while self._heap and self._heap[0][2] not in self._posts:
+            heapq.heappop(self._heap)
+
+    def _append(self, entry: dict) -> None:
+        # Caller holds self._lock.
+        if self._journal is None:
+            return
+        self._journal.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        self._journal.flush()
+        if self._fsync:
+            os.fsync(self._journal.fileno())
+        self._journal_lines += 1
+
+    def _compact(self) -> None:
+        # Caller holds self._lock.
+        if self._journal is None:
+            return
+        tmp = self._journal_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            for record in self._posts.values():
+                fh.write(json.dumps({"op": "add", **record}, separators=(",", ":")) + "\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+        self._journal.close()
+        os.replace(tmp, self._journal_path)
+        self._journal = open(self._journal_path, "a", encoding="utf-8")
+        self._journal_lines = len(self._posts)
+
+    def _replay(self) -> None:
+        if not self._journal_path.exists():
+            return
+        good = 0
+        with open(self._journal_path, "rb") as fh:
+            for line in fh:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break  # torn final write from a crash
+                good += len(line)
+                self._journal_lines += 1
+                op = entry.pop("op")
+                if op == "add":
+                    self._posts[entry["id"]] = entry
+                elif op == "retry" and entry["id"] in self._posts:
+                    self._posts[entry["id"]].update(release_at=entry["release_at"], attempts=entry["attempts"])
+                elif op == "done":
+                    self._posts.pop(entry["id"], None)
+        if good < self._journal_path.stat().st_size:
+            os.truncate(self._journal_path, good)  # later appends must not land after the torn line
+        for record in self._posts.values():
+            heapq.heappush(self._heap, (record.get("release_at", record["due"]), next(self._seq), record["id"]))
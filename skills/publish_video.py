@@ -0,0 +1,100 @@
+"""
+skill_publish_video - Skill 4 in skills/README.md.
+
+Publishing is an external side effect, so it goes through a pluggable
+publisher (an MCP tool call in production). With no publisher configured the
+skill reports ``FAILED`` with a structured error rather than pretending to
+succeed.
+
+With an ``AssetStore`` installed via ``set_asset_store``, the video must
+exist in the store; the publisher receives an open ``AssetReader`` as
+``post["media"]`` and uploads straight from its mmap-backed chunks.
+
+Future ``schedule_time`` values are handed to the ``PublishScheduler``
+installed via ``set_scheduler`` (skills/publish_scheduler.py), which holds
+the post and releases it under the platform's rate limit. Give the scheduler
+the same ``AssetStore`` so released posts carry ``post["media"]`` too. With no
+scheduler the skill reports ``FAILED`` (``SCHEDULER_UNAVAILABLE``), since
+nothing would hold the post.
+"""
+
+from collections.abc import Callable
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING
+
+from skills import SkillError, skill
+from skills.contracts import parse_timestamp
+
+if TYPE_CHECKING:
+    from skills.asset_store import AssetStore
+    from skills.publish_scheduler import PublishScheduler
+
+# Publisher signature: post dict -> platform_post_id; raises SkillError on rejection.
+Publisher = Callable[[dict], str]
+
+_publisher: Publisher | None = None
+_assets: "AssetStore | None" = None
+_scheduler: "PublishScheduler | None" = None
+
+
+def set_publisher(publisher: Publisher | None) -> None:
+    """Install the backend used for immediate publishes (None to disable)."""
+    global _publisher
+    _publisher = publisher
+
+
+def set_asset_store(store: "AssetStore | None") -> None:
+    """Install the store videos are read from (None to pass asset ids only)."""
+    global _assets
+    _assets = store
+
+
+def set_scheduler(scheduler: "PublishScheduler | None") -> None:
+    """Install the queue that holds scheduled posts (None: scheduled publishes fail)."""
+    global _scheduler
+    _scheduler = scheduler
+
+
+def _missing(video_asset_id: str) -> SkillError:
+    return SkillError("ASSET_NOT_FOUND", f"video {video_asset_id!r} is not in the asset store")
+
+
+def _status(status: str, post_id: str | None = None, published_at: str | None = None, error: dict | None = None) -> dict:
+    return {
+        "publication_status": status,
+        "platform_post_id": post_id,
+        "published_at": published_at,
+        "error": error,
+    }
+
+
+@skill("skill_publish_video")
+def skill_publish_video(
+    platform: str, video_asset_id: str, caption: str, hashtags: list[str], schedule_time: str | None
+) -> dict:
+    """Publish (or schedule) a finalized video on ``platform``."""
+    post = {"platform": platform, "video_asset_id": video_asset_id, "caption": caption, "hashtags": hashtags}
+    now = datetime.now(timezone.utc)
+    if schedule_time is not None and parse_timestamp(schedule_time) > now:
+        if _scheduler is None:
+            return _status("FAILED", error={"code": "SCHEDULER_UNAVAILABLE", "message": "no publish scheduler configured"})
+        if _assets is not None and not _assets.exists(video_asset_id):
+            return _status("FAILED", error=_missing(video_asset_id).to_dict())
+        _scheduler.schedule(post, schedule_time)
+        return _status("SCHEDULED")
+    if _publisher is None:
+        return _status("FAILED", error={"code": "PUBLISHER_UNAVAILABLE", "message": "no publishing backend configured"})
+
+    try:
+        if _assets is None:
+            post_id = _publisher(post)
+        else:
+            try:
+                media = _assets.open(video_asset_id)
+            except KeyError:
+                raise _missing(video_asset_id) from None
+            with media:
+                post_id = _publisher({**post, "media": media})
+    except SkillError as exc:
+        return _status("FAILED", error=exc.to_dict())
+    return _status("SUCCESS", post_id, datetime.now(timezone.utc).isoformat())
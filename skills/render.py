@@ -0,0 +1,357 @@
+"""
+Render pipeline behind skill_generate_video.
+
+Rendering is CPU-bound, so segments run in a ``ProcessPoolExecutor`` sized
+to the node's cores rather than on the caller's thread. A script is split
+into ``segment_seconds`` segments; each finished segment is written to the
+object store straight away (in whatever order they complete), and as soon as
+the first ``preview_chunks`` segments exist a low-res preview is assembled
+and published, so the Judge can start reviewing before the render finishes.
+
+``RenderEngine.start`` returns a ``RenderJob`` immediately; use
+``wait_preview`` / ``result`` to block. ``render`` is ``start(...).result()``.
+A caller that returned at the preview polls ``RenderEngine.status``, which
+reports a failure that happened after the preview. The engine keeps the
+``max_finished_jobs`` most recently finished jobs for that; older ones are
+dropped.
+
+Object layout (``FileObjectStore`` is the local stand-in for S3)::
+
+    videos/{asset_id}/chunk-00000 ...   segment bytes
+    videos/{asset_id}/manifest.json     written last; marks the asset complete
+    previews/{asset_id}                 preview built from the first chunks
+
+With an ``AssetStore`` (skills/asset_store.py) attached, the finished chunks
+are also ingested into the deduplicating store before the manifest is
+written, which is where skill_publish_video reads them from.
+
+Assets are content-addressed, so a complete manifest means the render is
+skipped. No real renderer ships with the repo: ``render_segment``
+synthesises deterministic frame bytes at a cost proportional to duration.
+"""
+
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, wait
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from skills import telemetry
+
+if TYPE_CHECKING:
+    from skills.asset_store import AssetStore
+
+DEFAULT_FPS = 24
+DEFAULT_FRAME_BYTES = 4096
+DEFAULT_SEGMENT_SECONDS = 2.0
+DEFAULT_PREVIEW_CHUNKS = 2
+DEFAULT_MAX_FINISHED_JOBS = 256
+ENGINE = "process_pool"
+
+PREVIEW_URL = "mcp://media/previews/{asset_id}"
+
+
+class FileObjectStore:
+    """Filesystem stand-in for an S3 bucket: flat keys, atomic puts."""
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def put(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def get(self, key: str) -> bytes:
+        return self._path(key).read_bytes()
+
+    def exists(self, key: str) -> bool:
+        return self._path(key).is_file()
+
+    def list(self, prefix: str) -> list[str]:
+        base = self._path(prefix)
+        if not base.is_dir():
+            return []
+        return sorted(f"{prefix.rstrip('/')}/{p.name}" for p in base.iterdir() if not p.name.startswith("."))
+
+    def _path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if self.root.resolve() not in path.parents and path != self.root.resolve():
+            raise ValueError(f"key escapes the store: {key!r}")
+        return path
+
+
+def render_segment(asset_id: str, index: int, text: str, seconds: float, fps: int, frame_bytes: int):
+    """Render one segment in a worker process; returns ``(index, bytes, cpu_seconds)``."""
+    started = time.process_time()
+    frames = max(1, math.ceil(seconds * fps))
+    out = bytearray()
+    state = hashlib.blake2b(f"{asset_id}:{index}:{text}".encode()).digest()
+    for _ in range(frames):
+        frame = bytearray()
+        while len(frame) < frame_bytes:
+            state = hashlib.blake2b(state).digest()
+            frame += state
+        out += frame[:frame_bytes]
+    return index, bytes(out), time.process_time() - started
+
+
+def preview_from(chunks: list[bytes], stride: int = 4) -> bytes:
+    """Low-res preview: every ``stride``-th byte of the leading chunks."""
+    return b"".join(chunk[::stride] for chunk in chunks)
+
+
+class RenderJob:
+    """Handle for an in-progress render."""
+
+    def __init__(self, asset_id: str, segments: int, duration_seconds: float):
+        self.asset_id = asset_id
+        self.segments = segments
+        self.duration_seconds = duration_seconds
+        self.completed = 0
+        self.preview_url: str | None = None
+        self.timings: dict[str, float] = {}
+        self.error: BaseException | None = None
+        self.cached = False
+        self.manifest: dict | None = None
+        self.asset: dict | None = None
+        self._preview_ready = threading.Event()
+        self._done = threading.Event()
+
+    @property
+    def progress(self) -> float:
+        return self.completed / self.segments if self.segments else 1.0
+
+    def wait_preview(self, timeout: float | None = None) -> str:
+        """Block until the preview is published; returns its URL."""
+        if not self._preview_ready.wait(timeout):
+            raise TimeoutError(f"preview for {self.asset_id} not ready")
+        if self.preview_url is None:
+            raise self.error
+        return self.preview_url
+
+    def result(self, timeout: float | None = None) -> dict:
+        """Block until every chunk and the manifest are stored; returns the manifest."""
+        if not self._done.wait(timeout):
+            raise TimeoutError(f"render of {self.asset_id} not finished")
+        if self.error is not None:
+            raise self.error
+        return self.manifest
+
+    def status(self) -> dict:
+        """Where the render stands: ``RENDERING``, ``COMPLETE`` or ``FAILED`` (with the error)."""
+        if not self._done.is_set():
+            state, error = "RENDERING", None
+        elif self.error is not None:
+            state = "FAILED"
+            error = {"code": "BACKEND_UNAVAILABLE", "message": f"render failed: {self.error}"}
+        else:
+            state, error = "COMPLETE", None
+        return {
+            "video_asset_id": self.asset_id,
+            "render_status": state,
+            "progress": round(self.progress, 4),
+            "preview_url": self.preview_url,
+            "error": error,
+        }
+
+    def generation_metadata(self) -> dict:
+        metadata = {
+            "engine": ENGINE,
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "segments": self.segments,
+            "progress": round(self.progress, 4),
+            "cached": self.cached,
+            "timings_ms": {stage: round(1000 * s, 3) for stage, s in self.timings.items()},
+        }
+        if self.asset is not None:
+            metadata["asset"] = self.asset
+        return metadata
+
+
+class RenderEngine:
+    """Process-pool renderer that streams chunks to an object store."""
+
+    def __init__(
+        self,
+        store: FileObjectStore,
+        *,
+        max_workers: int | None = None,
+        executor: Executor | None = None,
+        segment_seconds: float = DEFAULT_SEGMENT_SECONDS,
+        preview_chunks: int = DEFAULT_PREVIEW_CHUNKS,
+        fps: int = DEFAULT_FPS,
+        frame_bytes: int = DEFAULT_FRAME_BYTES,
+        assets: "AssetStore | None" = None,
+        max_finished_jobs: int = DEFAULT_MAX_FINISHED_JOBS,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        self.store = store
+        self.assets = assets
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._lock = threading.Lock()
+        self.segment_seconds = segment_seconds
+        self.preview_chunks = preview_chunks
+        self.fps = fps
+        self.frame_bytes = frame_bytes
+        self._clock = clock
+        self.max_finished_jobs = max_finished_jobs
+        self._jobs: dict[str, RenderJob] = {}
+        self._finished: OrderedDict[str, None] = OrderedDict()  # finished asset ids, oldest first
+
+    def __enter__(self) -> "RenderEngine":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._owns_executor and self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+    def job(self, asset_id: str) -> RenderJob | None:
+        """The in-progress (or a recently finished) render of ``asset_id`` started by this engine."""
+        with self._lock:
+            return self._jobs.get(asset_id)
+
+    def status(self, asset_id: str) -> dict | None:
+        """``RenderJob.status`` of ``job(asset_id)``; None once the job has been dropped."""
+        job = self.job(asset_id)
+        return None if job is None else job.status()
+
+    def start(self, asset_id: str, script_text: str, duration_seconds: float) -> RenderJob:
+        """
+        Submit every segment and return at once; a collector thread streams the output.
+
+        A second ``start`` for an asset that is still rendering returns the same job.
+        """
+        with self._lock:
+            running = self._jobs.get(asset_id)
+            if running is not None and not running._done.is_set():
+                return running
+            job = self._start(asset_id, script_text, duration_seconds)
+            self._jobs[asset_id] = job
+            self._finished.pop(asset_id, None)
+            if job._done.is_set():
+                self._retire(job)
+            return job
+
+    def _retire(self, job: RenderJob) -> None:
+        # Caller holds self._lock.
+        if self._jobs.get(job.asset_id) is not job:
+            return  # already replaced by a newer render
+        self._finished[job.asset_id] = None
+        while len(self._finished) > self.max_finished_jobs:
+            asset_id, _ = self._finished.popitem(last=False)
+            del self._jobs[asset_id]
+
+    def _start(self, asset_id: str, script_text: str, duration_seconds: float) -> RenderJob:
+        t0 = self._clock()
+        segments = self.split(script_text, duration_seconds)
+        job = RenderJob(asset_id, len(segments), duration_seconds)
+        job.timings["split"] = self._clock() - t0
+
+        manifest_key = f"videos/{asset_id}/manifest.json"
+        if self.store.exists(manifest_key) and self.store.exists(f"previews/{asset_id}"):
+            job.manifest = json.loads(self.store.get(manifest_key))
+            job.cached = True
+            job.completed = job.segments
+            job.preview_url = PREVIEW_URL.format(asset_id=asset_id)
+            job.timings["total"] = self._clock() - t0
+            job._preview_ready.set()
+            job._done.set()
+            return job
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        pool = self._executor
+        futures = [
+            pool.submit(render_segment, asset_id, i, text, seconds, self.fps, self.frame_bytes)
+            for i, (text, seconds) in enumerate(segments)
+        ]
+        threading.Thread(target=self._collect, args=(job, futures, t0), daemon=True).start()
+        return job
+
+    def render(self, asset_id: str, script_text: str, duration_seconds: float) -> RenderJob:
+        job = self.start(asset_id, script_text, duration_seconds)
+        job.result()
+        return job
+
+    def split(self, script_text: str, duration_seconds: float) -> list[tuple[str, float]]:
+        """Cut the script into ``segment_seconds`` pieces with their share of the words."""
+        n = max(1, math.ceil(duration_seconds / self.segment_seconds))
+        words = script_text.split()
+        per = math.ceil(len(words) / n) if words else 0
+        out = []
+        for i in range(n):
+            seconds = min(self.segment_seconds, duration_seconds - i * self.segment_seconds)
+            out.append((" ".join(words[i * per : (i + 1) * per]), max(seconds, 1.0 / self.fps)))
+        return out
+
+    def _collect(self, job: RenderJob, futures: list[Future], t0: float) -> None:
+        leading: dict[int, bytes] = {}
+        chunks: list[dict | None] = [None] * len(futures)
+        cpu = upload = 0.0
+        want_preview = min(self.preview_chunks, len(futures))
+        try:
+            pending = {f: i for i, f in enumerate(futures)}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    del pending[future]
+                    index, data, seconds = future.result()
+                    cpu += seconds
+                    key = f"videos/{job.asset_id}/chunk-{index:05d}"
+                    started = self._clock()
+                    self.store.put(key, data)
+                    upload += self._clock() - started
+                    chunks[index] = {"key": key, "bytes": len(data), "sha256": hashlib.sha256(data).hexdigest()}
+                    job.completed += 1
+                    if index < want_preview:
+                        leading[index] = data
+                        if len(leading) == want_preview:
+                            self.store.put(f"previews/{job.asset_id}", preview_from([leading[i] for i in range(want_preview)]))
+                            job.preview_url = PREVIEW_URL.format(asset_id=job.asset_id)
+                            job.timings["preview_ready"] = self._clock() - t0
+                            job._preview_ready.set()
+            job.timings["render_wall"] = self._clock() - t0 - job.timings["split"]
+            job.timings["render_cpu"] = cpu
+            job.timings["upload"] = upload
+            if self.assets is not None:
+                started = self._clock()
+                job.asset = self.assets.put_parts(job.asset_id, (self.store.get(c["key"]) for c in chunks))
+                job.timings["dedupe"] = self._clock() - started
+            job.manifest = {
+                "asset_id": job.asset_id,
+                "duration_seconds": job.duration_seconds,
+                "fps": self.fps,
+                "chunks": chunks,
+            }
+            self.store.put(f"videos/{job.asset_id}/manifest.json", json.dumps(job.manifest).encode())
+            job.timings["total"] = self._clock() - t0
+            for stage, seconds in job.timings.items():
+                telemetry.observe("stage", f"render.{stage}", seconds)
+        except BaseException as exc:
+            for future in futures:
+                future.cancel()
+            job.error = exc
+        finally:
+            job._preview_ready.set()
+            with self._lock:
+                self._retire(job)  # before _done: whoever waited on result() finds the cap applied
+            job._done.set()
+
@@ -0,0 +1,245 @@
+"""
+Content-addressed memo cache for skill_generate_script.
+
+Agents in the same niche ask for the same script at about the same time, so
+results are keyed by the normalised input contract:
+
+    sha256(lower-cased topic with whitespace collapsed, persona_id, language, target_duration_seconds)
+
+The generator is called with the requested duration and a hit needs the same
+duration, because the script length and ``confidence_score`` both depend on
+it. The topic is only lower-cased and whitespace-collapsed, the same view of
+it the safety screen takes, so topics sharing a key always get the same flags
+and score. A hit is indistinguishable from a miss to the Judge.
+
+Tiers:
+
+* memory - LRU bounded by ``max_bytes`` of encoded results
+* disk (optional ``disk_dir``) - one JSON file per key, LRU bounded by
+  ``max_disk_bytes``, promoted to memory on a hit; survives restarts
+
+Identical in-flight requests coalesce onto one generator call (single
+flight). ``clear`` bumps a generation counter, and a fill that started before
+it is handed to its waiters but not stored. ``stats`` counts hits per tier, misses, coalesced waits, evictions,
+and ``saved_seconds`` (generation latency avoided by hits).
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Future
+from pathlib import Path
+
+from skills import telemetry
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_DISK_BYTES = 1024 * 1024 * 1024
+
+# Generator signature: the skill_generate_script inputs as keywords -> output dict.
+Generator = Callable[..., dict]
+
+
+class ScriptCache:
+    """Two-tier, single-flight result cache for generated scripts."""
+
+    def __init__(
+        self,
+        *,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        disk_dir: str | Path | None = None,
+        max_disk_bytes: int = DEFAULT_MAX_DISK_BYTES,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be >= 1")
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._memory: OrderedDict[str, tuple[bytes, float]] = OrderedDict()  # key -> (encoded, latency)
+        self._memory_bytes = 0
+        self._inflight: dict[str, Future] = {}
+        self.disk_dir = None if disk_dir is None else Path(disk_dir)
+        self._disk: OrderedDict[str, int] = OrderedDict()  # key -> file size
+        self._disk_bytes = 0
+        if self.disk_dir is not None:
+            self._scan_disk()
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "evictions": 0,
+            "disk_evictions": 0,
+            "saved_seconds": 0.0,
+            "generate_seconds": 0.0,
+        }
+
+    @property
+    def hit_rate(self) -> float:
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"] + self.stats["coalesced"]
+        total = hits + self.stats["misses"]
+        return hits / total if total else 0.0
+
+    def key(self, trend_topic: str, persona_id: str, target_duration_seconds: float, language: str) -> str:
+        canonical = json.dumps(
+            [
+                " ".join(trend_topic.lower().split()),
+                persona_id,
+                language.strip().lower(),
+                float(target_duration_seconds),
+            ],
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def get(
+        self, generate: Generator, *, trend_topic: str, persona_id: str, target_duration_seconds: float, language: str
+    ) -> dict:
+        """Return the cached result for these inputs, calling ``generate`` at most once per key."""
+        key = self.key(trend_topic, persona_id, target_duration_seconds, language)
+        with self._lock:
+            found = self._memory.get(key)
+            if found is not None:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                self.stats["saved_seconds"] += found[1]
+                telemetry.count("cache", "script_cache", "memory_hit")
+                return json.loads(found[0])
+            future = self._inflight.get(key)
+            owner = future is None
+            generation = self._generation
+            if owner:
+                future = self._inflight[key] = Future()
+            else:
+                self.stats["coalesced"] += 1
+                telemetry.count("cache", "script_cache", "coalesced")
+
+        if not owner:
+            encoded, latency = future.result()
+            with self._lock:
+                self.stats["saved_seconds"] += latency
+            return json.loads(encoded)
+
+        try:
+            encoded, latency = self._from_disk(key)
+            if encoded is None:
+                started = self._clock()
+                value = generate(
+                    trend_topic=trend_topic,
+                    persona_id=persona_id,
+                    target_duration_seconds=target_duration_seconds,
+                    language=language,
+                )
+                latency = self._clock() - started
+                encoded = json.dumps(value, separators=(",", ":")).encode()
+                with self._lock:
+                    self.stats["misses"] += 1
+                    self.stats["generate_seconds"] += latency
+                telemetry.count("cache", "script_cache", "miss")
+                self._to_disk(key, encoded, latency, generation)
+        except BaseException as exc:
+            with self._lock:
+                self._release(key, future)
+            future.set_exception(exc)
+            raise
+        with self._lock:
+            self._release(key, future)
+            if generation == self._generation:  # not cleared while we generated
+                self._store(key, encoded, latency)
+        future.set_result((encoded, latency))
+        return json.loads(encoded)
+
+    def clear(self) -> None:
+        """Drop both tiers (e.g. after the generator's behaviour changes)."""
+        with self._lock:
+            self._generation += 1
+            self._inflight.clear()  # later requests must not join a fill that predates this
+            self._memory.clear()
+            self._memory_bytes = 0
+            for key in list(self._disk):
+                self._drop_disk(key)
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def _release(self, key: str, future: Future) -> None:
+        # Caller holds self._lock.
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+
+    def _store(self, key: str, encoded: bytes, latency: float) -> None:
+        # Caller holds self._lock.
+        if len(encoded) > self.max_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous[0])
+        self._memory[key] = (encoded, latency)
+        self._memory_bytes += len(encoded)
+        while self._memory_bytes > self.max_bytes:
+            _, (dropped, _) = self._memory.popitem(last=False)
+            self._memory_bytes -= len(dropped)
+            self.stats["evictions"] += 1
+
+    def _path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / f"{key}.json"
+
+    def _scan_disk(self) -> None:
+        files = sorted(self.disk_dir.glob("*/*.json"), key=lambda p: p.stat().st_mtime)
+        for path in files:
+            size = path.stat().st_size
+            self._disk[path.stem] = size
+            self._disk_bytes += size
+
+    def _from_disk(self, key: str) -> tuple[bytes | None, float]:
+        if self.disk_dir is None:
+            return None, 0.0
+        with self._lock:
+            if key not in self._disk:
+                return None, 0.0
+            self._disk.move_to_end(key)
+        try:
+            record = json.loads(self._path(key).read_bytes())
+        except (OSError, ValueError):
+            with self._lock:
+                self._drop_disk(key)
+            return None, 0.0
+        encoded = json.dumps(record["value"], separators=(",", ":")).encode()
+        with self._lock:
+            self.stats["disk_hits"] += 1
+            self.stats["saved_seconds"] += record["latency"]
+        telemetry.count("cache", "script_cache", "disk_hit")
+        return encoded, record["latency"]
+
+    def _to_disk(self, key: str, encoded: bytes, latency: float, generation: int) -> None:
+        if self.disk_dir is None:
+            return
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = b'{"latency":' + json.dumps(latency).encode() + b',"value":' + encoded + b"}"
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        with self._lock:
+            if generation != self._generation:
+                tmp.unlink()
+                return
+            os.replace(tmp, path)
+            self._disk_bytes += len(data) - self._disk.pop(key, 0)
+            self._disk[key] = len(data)
+            while self._disk_bytes > self.max_disk_bytes and len(self._disk) > 1:
+                self._drop_disk(next(iter(self._disk)))
+                self.stats["disk_evictions"] += 1
+
+    def _drop_disk(self, key: str) -> None:
+        # Caller holds self._lock.
+        self._disk_bytes -= self._disk.pop(key, 0)
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
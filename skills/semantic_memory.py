@@ -0,0 +1,287 @@
+"""
+In-process semantic memory of past high-performing posts (functional.md:
+"remember past high-performing posts"; research/architecture_strategy.md puts
+this in Weaviate - this is the offline, low-latency equivalent).
+
+* embeddings are rows of one contiguous float32 matrix, L2-normalised so a
+  dot product is cosine similarity
+* ``build`` trains an IVF index (spherical k-means, ``nlist`` lists) and
+  reorders the matrix so every list is a contiguous slice; a query scores
+  only the ``nprobe`` closest lists
+* ``search`` takes one query or a batch; ``persona_id`` and
+  ``min_engagement`` filters are applied to the candidate slice before
+  ranking, and a query that finds fewer than ``k`` matches widens to an
+  exact scan
+* ``save`` writes ``.npy`` files plus ``meta.json``; ``PostMemory.load``
+  memory-maps the matrices, so a warm start does not copy the vectors.
+  Every file is written aside and renamed into place, so saving over the
+  directory a live index was loaded from leaves its mappings intact
+
+No embedding model ships with the repo, so ``embed_text`` uses signed
+feature hashing of words and word bigrams. Pass precomputed vectors to
+``add`` when a real model is available.
+"""
+
+import json
+import os
+import re
+import zlib
+from collections.abc import Iterable, Sequence
+from pathlib import Path
+
+import numpy as np
+
+DEFAULT_DIM = 256
+DEFAULT_NPROBE = 8
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+_ARRAYS = ("vectors", "engagement", "persona", "offsets", "centroids")
+
+
+def embed_text(text: str, dim: int = DEFAULT_DIM) -> np.ndarray:
+    """Deterministic hashed bag of words and bigrams, L2-normalised float32."""
+    vector = np.zeros(dim, dtype=np.float32)
+    words = _WORD.findall(text.lower())
+    for feature in (*words, *(f"{a} {b}" for a, b in zip(words, words[1:]))):
+        h = zlib.crc32(feature.encode())
+        vector[h % dim] += 1.0 if h & 0x80000000 else -1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class PostMemory:
+    """IVF approximate-nearest-neighbour index over post embeddings."""
+
+    def __init__(self, dim: int = DEFAULT_DIM, *, nprobe: int = DEFAULT_NPROBE, seed: int = 0):
+        self.dim = dim
+        self.nprobe = nprobe
+        self.seed = seed
+        self._vectors = np.empty((0, dim), dtype=np.float32)
+        self._engagement = np.empty(0, dtype=np.float32)
+        self._persona = np.empty(0, dtype=np.int32)
+        self._offsets = np.zeros(1, dtype=np.int64)  # list i is rows offsets[i]:offsets[i+1]
+        self._centroids = np.empty((0, dim), dtype=np.float32)
+        self._post_ids: list[str] = []
+        self._texts: list[str] = []
+        self._personas: dict[str, int] = {}
+        self._persona_names: list[str] = []
+        self._pending: list[tuple[np.ndarray, float, int, str, str]] = []
+        self.version = 0  # bumped whenever search results may change
+
+    def __len__(self) -> int:
+        return len(self._post_ids) + len(self._pending)
+
+    @property
+    def nlist(self) -> int:
+        return len(self._centroids)
+
+    def add(
+        self,
+        post_id: str,
+        text: str,
+        persona_id: str,
+        engagement: float,
+        vector: Sequence[float] | np.ndarray | None = None,
+    ) -> None:
+        """Queue a post; it is searchable immediately and indexed on the next ``build``."""
+        vector = embed_text(text, self.dim) if vector is None else _normalise(np.asarray(vector, dtype=np.float32))
+        if vector.shape != (self.dim,):
+            raise ValueError(f"vector must have shape ({self.dim},), got {vector.shape}")
+        self._pending.append((vector, float(engagement), self._persona_code(persona_id), post_id, text))
+        self.version += 1
+
+    def add_many(self, posts: Iterable[dict]) -> None:
+        """Add dicts with ``post_id``, ``text``, ``persona_id``, ``engagement`` (and optional ``vector``)."""
+        for post in posts:
+            self.add(post["post_id"], post["text"], post["persona_id"], post["engagement"], post.get("vector"))
+
+    def build(self, nlist: int | None = None, *, iterations: int = 10) -> None:
+        """(Re)train the IVF lists over every post and lay rows out list by list."""
+        self._merge_pending()
+        n = len(self._post_ids)
+        if n == 0:
+            return
+        nlist = max(1, min(nlist or int(np.sqrt(n)), n))
+        vectors = np.ascontiguousarray(self._vectors)
+        centroids = _kmeans(vectors, nlist, iterations, np.random.default_rng(self.seed))
+        assign = _assign(vectors, centroids)
+        order = np.argsort(assign, kind="stable")
+
+        self._vectors = np.ascontiguousarray(vectors[order])
+        self._engagement = np.ascontiguousarray(self._engagement[order])
+        self._persona = np.ascontiguousarray(self._persona[order])
+        self._post_ids = [self._post_ids[i] for i in order]
+        self._texts = [self._texts[i] for i in order]
+        self._offsets = np.concatenate(([0], np.cumsum(np.bincount(assign, minlength=nlist)))).astype(np.int64)
+        self._centroids = centroids
+        self.version += 1
+
+    def search(
+        self,
+        queries: str | np.ndarray | Sequence[str],
+        k: int = 5,
+        *,
+        persona_id: str | None = None,
+        min_engagement: float | None = None,
+        nprobe: int | None = None,
+        exact: bool = False,
+    ) -> list[dict] | list[list[dict]]:
+        """
+        Top-``k`` most similar posts, best first.
+
+        A single query (string or 1-D vector) returns one list; a batch
+        (sequence of strings or 2-D array) returns one list per query.
+        """
+        single = isinstance(queries, str) or (isinstance(queries, np.ndarray) and queries.ndim == 1)
+        matrix = self._query_matrix([queries] if single else queries)
+        self._merge_pending()
+
+        mask = None
+        if persona_id is not None:
+            code = self._personas.get(persona_id)
+            mask = self._persona == (-1 if code is None else code)
+        if min_engagement is not None:
+            passing = self._engagement >= min_engagement
+            mask = passing if mask is None else mask & passing
+
+        if exact or self.nlist == 0:
+            hits = self._exact(matrix, k, mask)
+        else:
+            hits = self._probe(matrix, k, mask, nprobe or self.nprobe)
+        results = [[self._describe(i, s) for i, s in row] for row in hits]
+        return results[0] if single else results
+
+    def save(self, path: str | Path) -> None:
+        """Write the index to directory ``path`` (building pending posts first)."""
+        self._merge_pending()
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        for name in _ARRAYS:
+            target = path / f"{name}.npy"
+            tmp = target.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp, "wb") as fh:
+                np.save(fh, np.ascontiguousarray(getattr(self, f"_{name}")))
+            os.replace(tmp, target)  # a mapping of the old file keeps its inode
+        meta = {
+            "dim": self.dim,
+            "nprobe": self.nprobe,
+            "seed": self.seed,
+            "post_ids": self._post_ids,
+            "texts": self._texts,
+            "personas": self._persona_names,
+        }
+        tmp = path / f"meta.{os.getpid()}.tmp"
+        tmp.write_text(json.dumps(meta))
+        os.replace(tmp, path / "meta.json")
+
+    @classmethod
+    def load(cls, path: str | Path, *, mmap: bool = True) -> "PostMemory":
+        path = Path(path)
+        meta = json.loads((path / "meta.json").read_text())
+        memory = cls(meta["dim"], nprobe=meta["nprobe"], seed=meta["seed"])
+        for name in _ARRAYS:
+            setattr(memory, f"_{name}", np.load(path / f"{name}.npy", mmap_mode="r" if mmap else None))
+        memory._post_ids = meta["post_ids"]
+        memory._texts = meta["texts"]
+        memory._persona_names = meta["personas"]
+        memory._personas = {name: code for code, name in enumerate(memory._persona_names)}
+        return memory
+
+    def _exact(self, matrix: np.ndarray, k: int, mask: np.ndarray | None) -> list[list[tuple[int, float]]]:
+        if mask is None:
+            rows = np.arange(len(self._post_ids))
+            scores = matrix @ self._vectors.T
+        else:
+            rows = np.flatnonzero(mask)
+            scores = matrix @ self._vectors[rows].T
+        return [_top(scores[q], rows, k) for q in range(len(matrix))]
+
+    def _probe(self, matrix: np.ndarray, k: int, mask: np.ndarray | None, nprobe: int) -> list[list[tuple[int, float]]]:
+        nprobe = min(nprobe, self.nlist)
+        closest = np.argpartition(-(matrix @ self._centroids.T), nprobe - 1, axis=1)[:, :nprobe]
+        tail = np.arange(self._offsets[-1], len(self._post_ids))
+        out = []
+        for q, lists in enumerate(closest):
+            rows = np.concatenate([*(np.arange(self._offsets[i], self._offsets[i + 1]) for i in lists), tail])
+            if mask is not None:
+                rows = rows[mask[rows]]
+            if rows.size < k and nprobe < self.nlist:
+                # filters or tiny lists left too few candidates: go exact
+                rows = np.arange(len(self._post_ids)) if mask is None else np.flatnonzero(mask)
+            out.append(_top(self._vectors[rows] @ matrix[q], rows, k))
+        return out
+
+    def _query_matrix(self, queries) -> np.ndarray:
+        if isinstance(queries, np.ndarray) and queries.ndim == 2:
+            return np.ascontiguousarray(_normalise(queries.astype(np.float32, copy=False)))
+        rows = [embed_text(q, self.dim) if isinstance(q, str) else _normalise(np.asarray(q, np.float32)) for q in queries]
+        return np.vstack(rows) if rows else np.empty((0, self.dim), dtype=np.float32)
+
+    def _merge_pending(self) -> None:
+        """Append pending posts as an unindexed tail (scanned by every query until ``build``)."""
+        if not self._pending:
+            return
+        vectors, engagement, persona, post_ids, texts = zip(*self._pending)
+        self._pending.clear()
+        self._vectors = np.concatenate((self._vectors, np.vstack(vectors)))
+        self._engagement = np.concatenate((self._engagement, np.asarray(engagement, dtype=np.float32)))
+        self._persona = np.concatenate((self._persona, np.asarray(persona, dtype=np.int32)))
+        self._post_ids.extend(post_ids)
+        self._texts.extend(texts)
+
+    def _persona_code(self, persona_id: str) -> int:
+        code = self._personas.get(persona_id)
+        if code is None:
+            code = self._personas[persona_id] = len(self._persona_names)
+            self._persona_names.append(persona_id)
+        return code
+
+    def _describe(self, row: int, score: float) -> dict:
+        return {
+            "post_id": self._post_ids[row],
+            "text": self._texts[row],
+            "persona_id": self._persona_names[self._persona[row]],
+            "engagement": float(self._engagement[row]),
+            "score": round(float(score), 6),
+        }
+
+
+def _normalise(x: np.ndarray) -> np.ndarray:
+    norm = np.linalg.norm(x, axis=-1, keepdims=True)
+    return np.divide(x, norm, out=np.zeros_like(x), where=norm > 0)
+
+
+def _top(scores: np.ndarray, rows: np.ndarray, k: int) -> list[tuple[int, float]]:
+    if scores.size == 0:
+        return []
+    if scores.size > k:
+        part = np.argpartition(-scores, k - 1)[:k]
+    else:
+        part = np.arange(scores.size)
+    best = part[np.argsort(-scores[part], kind="stable")]
+    return [(int(rows[i]), float(scores[i])) for i in best]
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray, chunk: int = 65_536) -> np.ndarray:
+    return np.concatenate(
+        [np.argmax(vectors[i : i + chunk] @ centroids.T, axis=1) for i in range(0, len(vectors), chunk)]
+    )
+
+
+def _kmeans(vectors: np.ndarray, nlist: int, iterations: int, rng: np.random.Generator) -> np.ndarray:
+    """Spherical k-means on a sample of at most 256 points per list."""
+    sample = vectors
+    if len(vectors) > 256 * nlist:
+        sample = vectors[rng.choice(len(vectors), 256 * nlist, replace=False)]
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assign = _assign(sample, centroids)
+        order = np.argsort(assign, kind="stable")
+        counts = np.bincount(assign, minlength=nlist)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        sums = np.empty_like(centroids)
+        filled = counts > 0
+        sums[filled] = np.add.reduceat(sample[order], starts[filled])
+        sums[~filled] = sample[rng.choice(len(sample), int((~filled).sum()))]
+        centroids = _normalise(sums)
+    return np.ascontiguousarray(centroids, dtype=np.float32)
@@ -0,0 +1,471 @@
+"""
+Per-agent spend control for ``transact`` work (specs/_meta.md: agents pay for
+API credits through Coinbase AgentKit; unbounded spending is out of scope).
+
+``SpendLedger`` has three parts:
+
+* an in-memory budget index. Each agent has a ``limit``, ``spent`` and
+  ``reserved`` amount behind its own lock. ``reserve`` checks and holds the
+  amount atomically before a task runs, so the hot path never waits on a
+  database or on other agents. An agent without a budget cannot spend
+* an append-only JSON-lines ledger of every money-moving event (``budget``,
+  ``spend``, ``submitting``, ``submit``, ``failed``). Each line carries the
+  SHA-256 of the line before it, so ``verify_ledger`` detects edits and gaps.
+  Replaying it on start-up restores limits, spend and unsubmitted purchases
+  (resending in-doubt submissions under their original key). Reservations
+  are not journaled: a hold that was never committed is released by a
+  restart
+* purchase batching. Committed spends queue per (agent, payee) and go out
+  as one wallet submission per agent once ``batch_size`` spends,
+  ``min_batch_amount`` or ``max_delay`` seconds is reached. Amounts to the
+  same payee are summed into one transfer. ``RETRYABLE_CODES`` failures are
+  retried with backoff; any other ``SkillError`` is recorded as ``failed``
+  and the spend still counts against the budget
+* at-most-once payment. A ``submitting`` intent is written and synced before
+  the wallet is called, and the ``submit`` record right after. Each
+  submission has an idempotency key derived from its spend ids, and a retry
+  (after a timeout or a crash) resends the same transfers with the same key,
+  so the wallet can drop a duplicate
+
+Amounts are integers in the asset's smallest unit (USDC has 6 decimals), so
+budgets never drift through float rounding. Time is read from ``clock``
+(epoch seconds).
+"""
+
+import asyncio
+import hashlib
+import itertools
+import json
+import os
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from skills.contracts import SkillError
+
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_MIN_BATCH_AMOUNT = 1_000_000  # 1 USDC
+DEFAULT_MAX_DELAY = 60.0
+DEFAULT_RETRY_BACKOFF = 5.0
+MAX_RETRY_BACKOFF = 300.0
+
+RETRYABLE_CODES = frozenset({"RATE_LIMITED", "BACKEND_UNAVAILABLE", "TIMEOUT"})
+
+# Wallet: (agent_id, transfers, idempotency_key) -> transaction id. One call is one
+# on-chain or AgentKit submission; each transfer is {"to", "amount", "memo"}. A call
+# repeating an accepted key must return that transaction without paying again.
+# Raises SkillError.
+Wallet = Callable[[str, list[dict], str], str]
+
+_GENESIS = "0" * 64
+
+
+class BudgetError(SkillError):
+    """A reservation or commit the budget index refused."""
+
+    BUDGET_EXCEEDED = "BUDGET_EXCEEDED"
+    NO_BUDGET = "NO_BUDGET"
+    UNKNOWN_RESERVATION = "UNKNOWN_RESERVATION"
+
+    def __init__(self, code: str, message: str, agent_id: str | None = None):
+        super().__init__(code, message)
+        self.agent_id = agent_id
+
+    def to_dict(self) -> dict:
+        return {"code": self.code, "message": self.message, "agent_id": self.agent_id}
+
+
+class _Account:
+    __slots__ = ("limit", "spent", "reserved", "reservations", "denials", "lock")
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.spent = 0
+        self.reserved = 0
+        self.reservations = 0
+        self.denials = 0
+        self.lock = threading.Lock()
+
+
+class _Batch:
+    __slots__ = ("spends", "amount", "since")
+
+    def __init__(self, since: float):
+        self.spends: list[dict] = []
+        self.amount = 0
+        self.since = since
+
+
+class _Submission:
+    __slots__ = ("agent", "key", "ids", "transfers", "attempts", "retry_at")
+
+    def __init__(self, agent: str, ids: list[str], transfers: list[dict]):
+        self.agent = agent
+        self.key = hashlib.sha256(",".join(ids).encode()).hexdigest()[:32]
+        self.ids = ids
+        self.transfers = transfers
+        self.attempts = 0
+        self.retry_at = 0.0
+
+
+def _amount(value) -> int:
+    if type(value) is not int or value < 0:
+        raise ValueError(f"amounts are non-negative integers in the smallest unit, got {value!r}")
+    return value
+
+
+def _chain(prev: str, body: str) -> str:
+    return hashlib.sha256(f"{prev}{body}".encode()).hexdigest()
+
+
+def verify_ledger(path: str | Path) -> int:
+    """Check the hash chain of a ledger file; return its entry count or raise ValueError."""
+    prev, n = _GENESIS, 0
+    with open(path, encoding="utf-8") as fh:
+        for n, line in enumerate(fh, 1):
+            entry = json.loads(line)
+            digest = entry.pop("hash")
+            if entry.get("prev") != prev or _chain(prev, json.dumps(entry, separators=(",", ":"))) != digest:
+                raise ValueError(f"ledger entry {n} does not match the chain")
+            prev = digest
+    return n
+
+
+class SpendLedger:
+    """Budget reservations, audit ledger and batched wallet submissions."""
+
+    def __init__(
+        self,
+        wallet: Wallet,
+        *,
+        ledger: str | Path | None = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        min_batch_amount: int = DEFAULT_MIN_BATCH_AMOUNT,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        retry_backoff: float = DEFAULT_RETRY_BACKOFF,
+        fsync: bool = False,
+        clock: Callable[[], float] = time.time,
+    ):
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+        self._wallet = wallet
+        self.batch_size = batch_size
+        self.min_batch_amount = min_batch_amount
+        self.max_delay = max_delay
+        self.retry_backoff = retry_backoff
+        self._fsync = fsync
+        self._clock = clock
+        self._accounts: dict[str, _Account] = {}
+        self._holds: dict[int, tuple[str, int, str, str]] = {}  # id -> (agent_id, amount, payee, memo)
+        self._hold_ids = itertools.count(1)
+        self._lock = threading.Lock()  # ledger file, spend ids, batches and submissions
+        self._spend_ids = itertools.count(1)
+        self._batches: dict[tuple[str, str], _Batch] = {}
+        self._retrying: list[_Submission] = []  # sent without a definite answer; resent as-is
+        self._spends: dict[str, dict] = {}  # spend id -> spend, while in a submission
+        self._in_flight = 0
+        self.failed: list[dict] = []
+        self.counters = {
+            "commits": 0,
+            "releases": 0,
+            "submissions": 0,
+            "transfers": 0,
+            "submitted_spends": 0,
+            "submit_errors": 0,
+            "failed_spends": 0,
+        }
+        self._path = None if ledger is None else Path(ledger)
+        self._file = None
+        self._prev = _GENESIS
+        if self._path is not None:
+            self._replay()
+            self._file = open(self._path, "a", encoding="utf-8")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+                self._file.close()
+                self._file = None
+
+    # -- budget index ------------------------------------------------------
+
+    def set_budget(self, agent_id: str, limit: int) -> None:
+        """Set ``agent_id``'s spending cap (total spend, including what is already spent)."""
+        _amount(limit)
+        with self._lock:
+            self._append({"op": "budget", "agent": agent_id, "limit": limit})
+            account = self._accounts.get(agent_id)
+            if account is None:
+                self._accounts[agent_id] = _Account(limit)
+            else:
+                with account.lock:
+                    account.limit = limit
+
+    def remaining(self, agent_id: str) -> int:
+        account = self._account(agent_id)
+        with account.lock:
+            return account.limit - account.spent - account.reserved
+
+    def reserve(self, agent_id: str, amount: int, *, payee: str, memo: str = "") -> int:
+        """Hold ``amount`` of ``agent_id``'s budget for a purchase from ``payee``; returns the hold id."""
+        _amount(amount)
+        account = self._account(agent_id)
+        with account.lock:
+            if account.spent + account.reserved + amount > account.limit:
+                account.denials += 1
+                raise BudgetError(
+                    BudgetError.BUDGET_EXCEEDED,
+                    f"{agent_id} has {account.limit - account.spent - account.reserved} left, needs {amount}",
+                    agent_id,
+                )
+            account.reserved += amount
+            account.reservations += 1
+        hold_id = next(self._hold_ids)
+        self._holds[hold_id] = (agent_id, amount, payee, memo)
+        return hold_id
+
+    def commit(self, hold_id: int, amount: int | None = None) -> str:
+        """Turn a hold into spend (``amount`` may be less than held); queues the purchase. Returns the spend id."""
+        if amount is not None:
+            _amount(amount)
+            held = self._holds.get(hold_id, (None, amount))[1]
+            if amount > held:
+                raise BudgetError(BudgetError.BUDGET_EXCEEDED, f"commit of {amount} exceeds hold of {held}")
+        agent_id, held, payee, memo = self._take(hold_id)
+        spend = held if amount is None else amount
+        account = self._accounts[agent_id]
+        with account.lock:
+            account.reserved -= held
+            account.spent += spend
+        with self._lock:
+            entry = {
+                "op": "spend",
+                "id": f"sp{next(self._spend_ids)}",
+                "agent": agent_id,
+                "to": payee,
+                "amount": spend,
+                "memo": memo,
+                "at": self._clock(),
+            }
+            self._append(entry)
+            self._queue(entry)
+            self.counters["commits"] += 1
+        return entry["id"]
+
+    def release(self, hold_id: int) -> None:
+        agent_id, held, _, _ = self._take(hold_id)
+        account = self._accounts[agent_id]
+        with account.lock:
+            account.reserved -= held
+        with self._lock:
+            self.counters["releases"] += 1
+
+    @contextmanager
+    def hold(self, agent_id: str, amount: int, *, payee: str, memo: str = "") -> Iterator[int]:
+        """Reserve for the body; commit the full hold on success (unless the body settled it), release on error."""
+        hold_id = self.reserve(agent_id, amount, payee=payee, memo=memo)
+        try:
+            yield hold_id
+        except BaseException:
+            if hold_id in self._holds:
+                self.release(hold_id)
+            raise
+        if hold_id in self._holds:
+            self.commit(hold_id)
+
+    # -- purchase batching -------------------------------------------------
+
+    def flush(self, force: bool = False) -> int:
+        """Submit every due batch (all of them with ``force``); returns how many submissions succeeded."""
+        now = self._clock()
+        with self._lock:
+            due: dict[str, list[tuple[str, _Batch]]] = {}
+            for key, batch in list(self._batches.items()):
+                if (
+                    force
+                    or len(batch.spends) >= self.batch_size
+                    or batch.amount >= self.min_batch_amount
+                    or now - batch.since >= self.max_delay
+                ):
+                    del self._batches[key]
+                    due.setdefault(key[0], []).append((key[1], batch))
+            sending = [sub for sub in self._retrying if sub.retry_at <= now]
+            self._retrying = [sub for sub in self._retrying if sub.retry_at > now]
+            for agent_id, items in due.items():
+                spends = [spend for _, batch in items for spend in batch.spends]
+                transfers = [
+                    {"to": payee, "amount": batch.amount, "memo": f"{len(batch.spends)} credit purchases"}
+                    for payee, batch in items
+                ]
+                sub = _Submission(agent_id, [spend["id"] for spend in spends], transfers)
+                self._spends.update((spend["id"], spend) for spend in spends)
+                self._append(
+                    {"op": "submitting", "agent": agent_id, "key": sub.key, "ids": sub.ids, "transfers": transfers}
+                )
+                sending.append(sub)
+            self._in_flight += sum(len(sub.ids) for sub in sending)
+            if sending:
+                self._sync()  # intents reach disk before money moves
+
+        submitted = 0
+        for sub in sending:
+            try:
+                tx = self._wallet(sub.agent, sub.transfers, sub.key)
+            except SkillError as exc:
+                self._failed_submission(sub, exc, now)
+                continue
+            except Exception as exc:
+                self._failed_submission(sub, SkillError("BACKEND_UNAVAILABLE", f"wallet error: {exc}"), now)
+                continue
+            with self._lock:
+                self._append({"op": "submit", "agent": sub.agent, "key": sub.key, "tx": str(tx), "ids": sub.ids})
+                self._sync()
+                self._in_flight -= len(sub.ids)
+                for spend_id in sub.ids:
+                    del self._spends[spend_id]
+                self.counters["submissions"] += 1
+                self.counters["transfers"] += len(sub.transfers)
+                self.counters["submitted_spends"] += len(sub.ids)
+            submitted += 1
+        return submitted
+
+    def tick(self) -> int:
+        """Alias of ``flush`` for drivers that poll."""
+        return self.flush()
+
+    async def run(self, stop: asyncio.Event, interval: float = 1.0) -> None:
+        """Flush due batches every ``interval`` seconds until ``stop``, then flush everything."""
+        while not stop.is_set():
+            await asyncio.to_thread(self.flush)
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+        await asyncio.to_thread(self.flush, True)
+
+    def pending(self) -> list[dict]:
+        """Committed spends not yet submitted to the wallet."""
+        with self._lock:
+            retrying = [self._spends[spend_id] for sub in self._retrying for spend_id in sub.ids]
+            queued = [spend for batch in self._batches.values() for spend in batch.spends]
+            return [dict(spend) for spend in retrying + queued]
+
+    def stats(self) -> dict:
+        accounts = {}
+        for agent_id, account in list(self._accounts.items()):
+            with account.lock:
+                accounts[agent_id] = {
+                    "limit": account.limit,
+                    "spent": account.spent,
+                    "reserved": account.reserved,
+                    "reservations": account.reservations,
+                    "denials": account.denials,
+                }
+        with self._lock:
+            queued = sum(len(batch.spends) for batch in self._batches.values())
+            return {
+                **self.counters,
+                "reservations": sum(a["reservations"] for a in accounts.values()),
+                "denials": sum(a["denials"] for a in accounts.values()),
+                "open_holds": len(self._holds),
+                "queued_spends": queued,
+                "retrying_spends": sum(len(sub.ids) for sub in self._retrying),
+                "in_flight_spends": self._in_flight,
+                "accounts": accounts,
+            }
+
+    # -- internals ---------------------------------------------------------
+
+    def _account(self, agent_id: str) -> _Account:
+        account = self._accounts.get(agent_id)
+        if account is None:
+            raise BudgetError(BudgetError.NO_BUDGET, f"no budget set for {agent_id}", agent_id)
+        return account
+
+    def _take(self, hold_id: int) -> tuple[str, int, str, str]:
+        hold = self._holds.pop(hold_id, None)
+        if hold is None:
+            raise BudgetError(BudgetError.UNKNOWN_RESERVATION, f"no open hold {hold_id}")
+        return hold
+
+    def _queue(self, spend: dict) -> None:
+        # Caller holds self._lock.
+        key = (spend["agent"], spend["to"])
+        batch = self._batches.get(key)
+        if batch is None:
+            batch = self._batches[key] = _Batch(spend["at"])
+        batch.spends.append(spend)
+        batch.amount += spend["amount"]
+
+    def _failed_submission(self, sub: _Submission, exc: SkillError, now: float) -> None:
+        with self._lock:
+            self.counters["submit_errors"] += 1
+            self._in_flight -= len(sub.ids)
+            if exc.code in RETRYABLE_CODES:
+                sub.attempts += 1
+                sub.retry_at = now + min(MAX_RETRY_BACKOFF, self.retry_backoff * 2 ** (sub.attempts - 1))
+                self._retrying.append(sub)
+                return
+            self._append({"op": "failed", "agent": sub.agent, "key": sub.key, "ids": sub.ids, "error": exc.to_dict()})
+            self._sync()
+            self.failed.extend(self._spends.pop(spend_id) for spend_id in sub.ids)
+            self.counters["failed_spends"] += len(sub.ids)
+
+    def _append(self, entry: dict) -> None:
+        # Caller holds self._lock. Buffered; _sync() before and after each wallet call.
+        if self._file is None:
+            return
+        body = json.dumps({**entry, "prev": self._prev}, separators=(",", ":"))
+        self._prev = _chain(self._prev, body)
+        self._file.write(f'{body[:-1]},"hash":"{self._prev}"}}\n')
+        if self._fsync:
+            self._sync()
+
+    def _sync(self) -> None:
+        # Caller holds self._lock.
+        if self._file is None:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _replay(self) -> None:
+        if not self._path.exists():
+            return
+        spends: dict[str, dict] = {}
+        intents: dict[str, dict] = {}
+        last = good = 0
+        with open(self._path, "rb") as fh:
+            for line in fh:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break  # torn final write from a crash
+                good += len(line)
+                self._prev = entry.pop("hash")
+                entry.pop("prev")
+                op = entry.pop("op")
+                if op == "budget":
+                    account = self._accounts.setdefault(entry["agent"], _Account(entry["limit"]))
+                    account.limit = entry["limit"]
+                elif op == "spend":
+                    self._accounts[entry["agent"]].spent += entry["amount"]
+                    spends[entry["id"]] = {"op": "spend", **entry}
+                    last = max(last, int(entry["id"][2:]))
+                elif op == "submitting":
+                    intents[entry["key"]] = entry
+                elif op in ("submit", "failed"):
+                    intents.pop(entry["key"], None)
+                    for spend_id in entry["ids"]:
+                        spends.pop(spend_id, None)
+        if good < self._path.stat().st_size:
+            os.truncate(self._path, good)  # keep the chain intact for the next append
+        for intent in intents.values():  # the wallet may have paid these: resend under the same key
+            sub = _Submission(intent["agent"], intent["ids"], intent["transfers"])
+            self._spends.update((spend_id, spends.pop(spend_id)) for spend_id in sub.ids)
+            self._retrying.append(sub)
+        for spend in spends.values():
+            self._queue(spend)
+        self._spend_ids = itertools.count(last + 1)
@@ -0,0 +1,478 @@
+"""
+Priority-aware task queue with aging, batching and visibility timeouts.
+
+Tasks carry ``priority: high | medium | low`` (specs/technical.md) and the
+architecture calls for Redis-backed queues. ``TaskQueue`` keeps one FIFO lane
+per priority and serves lanes strictly in priority order, except that a
+lane's head is promoted one level for every ``aging_seconds`` it has waited,
+so low-priority work cannot starve forever.
+
+Deliveries are leased, not removed: a dequeued message is invisible for
+``visibility_timeout`` seconds and is redelivered (front of its lane) unless
+acked first. After ``max_deliveries`` attempts it moves to a dead-letter list.
+Enqueue, dequeue and ack all work on batches, so a Worker's cost does not grow
+with the batch: enqueue and ack are one round-trip each, and dequeue is three
+(reclaim expired leases, read the lane heads, pop and lease).
+
+Backends:
+
+* ``MemoryBackend`` - in-process, for tests and single-node runs
+* ``RedisBackend`` - speaks RESP over a plain socket (``RespClient``), no
+  client library needed; uses LIST lanes, a ZSET of lease deadlines and a
+  HASH of leased payloads. Every step that moves a message between those
+  keys is one Lua script (``POP_AND_LEASE``, ``RECLAIM``, ``RELEASE``), so a
+  crash cannot lose a message between dropping it from one key and adding it
+  to the next
+
+Lane choice is made per batch from the lane heads, so within one batch a
+promoted lane may contribute a few younger items as well.
+"""
+
+import bisect
+import json
+import socket
+import threading
+import time
+import uuid
+from collections import deque
+from collections.abc import Callable, Iterable
+
+from skills.models import PRIORITIES, Task
+
+DEFAULT_AGING_SECONDS = 60.0
+DEFAULT_VISIBILITY_TIMEOUT = 300.0
+DEFAULT_MAX_DELIVERIES = 5
+
+# Upper bounds (seconds) of the wait-time histogram buckets; the last bucket is +Inf.
+WAIT_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 1800.0)
+
+_RANK = {priority: rank for rank, priority in enumerate(PRIORITIES)}
+
+# KEYS: leases ZSET, payloads HASH, then one lane LIST per ARGV count after the deadline.
+# The delivery is counted in the stored payload. Messages are written by
+# json.dumps with ``attempts`` as the first numeric key, so it is patched in
+# place rather than re-encoded (cjson would turn empty lists into objects).
+POP_AND_LEASE = """
+local out = {}
+for i = 3, #KEYS do
+  local popped = redis.call('LPOP', KEYS[i], ARGV[i - 1])
+  if popped then
+    for _, raw in ipairs(popped) do
+      local message = cjson.decode(raw)
+      raw = string.gsub(raw, '"attempts": %d+', '"attempts": ' .. (message['attempts'] + 1), 1)
+      redis.call('ZADD', KEYS[1], ARGV[1], message['id'])
+      redis.call('HSET', KEYS[2], message['id'], raw)
+      out[#out + 1] = raw
+    end
+  end
+end
+return out
+"""
+
+# KEYS: leases ZSET, payloads HASH, dead LIST, then the lane LISTs.
+# ARGV: max_deliveries, the lanes' priorities in KEYS order, then the script's own.
+# Leases are handed back newest first so LPUSH leaves them in their original order.
+_REQUEUE = """
+local lanes, base = {}, #KEYS - 1
+for i = 4, #KEYS do lanes[ARGV[i - 2]] = KEYS[i] end
+local out = {0, 0}
+local function requeue(id)
+  local raw = redis.call('HGET', KEYS[2], id)
+  redis.call('HDEL', KEYS[2], id)
+  if not raw then return end
+  local message = cjson.decode(raw)
+  if message['attempts'] >= tonumber(ARGV[1]) then
+    redis.call('RPUSH', KEYS[3], raw)
+    out[2] = out[2] + 1
+  else
+    redis.call('LPUSH', lanes[message['priority']], raw)
+    out[1] = out[1] + 1
+  end
+end
+"""
+
+# ARGV after the common ones: now, limit. Returns {redelivered, dead}.
+RECLAIM = _REQUEUE + """
+local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[base + 1], 'LIMIT', 0, ARGV[base + 2])
+for j = #ids, 1, -1 do
+  redis.call('ZREM', KEYS[1], ids[j])
+  requeue(ids[j])
+end
+return out
+"""
+
+# ARGV after the common ones: message ids. Only leases still held are requeued.
+RELEASE = _REQUEUE + """
+for j = #ARGV, base + 1, -1 do
+  if redis.call('ZREM', KEYS[1], ARGV[j]) == 1 then requeue(ARGV[j]) end
+end
+return out
+"""
+
+
+class Delivery:
+    """A leased message handed to a consumer; ack it by ``message_id``."""
+
+    __slots__ = ("message_id", "task", "priority", "attempts", "enqueued_at")
+
+    def __init__(self, message: dict):
+        self.message_id = message["id"]
+        self.task = Task.from_dict(message["task"])
+        self.priority = message["priority"]
+        self.attempts = message["attempts"]
+        self.enqueued_at = message["enqueued_at"]
+
+
+class WaitHistogram:
+    """Cumulative-bucket histogram of queue wait times."""
+
+    def __init__(self, bounds: tuple[float, ...] = WAIT_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def snapshot(self) -> dict:
+        cumulative, running = {}, 0
+        for bound, n in zip((*self.bounds, float("inf")), self.counts):
+            running += n
+            cumulative["+Inf" if bound == float("inf") else f"{bound:g}"] = running
+        return {"buckets": cumulative, "count": self.count, "sum": round(self.total, 6)}
+
+
+class MemoryBackend:
+    """In-process backend with the same semantics as RedisBackend."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._lanes = {priority: deque() for priority in PRIORITIES}
+        self._leased: dict[str, tuple[float, dict]] = {}
+        self.dead: list[dict] = []
+
+    def push(self, messages: list[dict], front: bool = False) -> None:
+        with self._lock:
+            for message in reversed(messages) if front else messages:
+                lane = self._lanes[message["priority"]]
+                if front:
+                    lane.appendleft(message)
+                else:
+                    lane.append(message)
+
+    def heads(self) -> dict[str, tuple[dict | None, int]]:
+        with self._lock:
+            return {p: (lane[0] if lane else None, len(lane)) for p, lane in self._lanes.items()}
+
+    def pop_and_lease(self, plan: list[tuple[str, int]], deadline: float) -> list[dict]:
+        out = []
+        with self._lock:
+            for priority, count in plan:
+                lane = self._lanes[priority]
+                while count and lane:
+                    message = lane.popleft()
+                    message["attempts"] += 1
+                    self._leased[message["id"]] = (deadline, message)
+                    out.append(message)
+                    count -= 1
+        return out
+
+    def ack(self, message_ids: Iterable[str]) -> int:
+        with self._lock:
+            return sum(self._leased.pop(mid, None) is not None for mid in message_ids)
+
+    def release(self, message_ids: Iterable[str], max_deliveries: int) -> tuple[int, int]:
+        """Requeue the leases still held; returns (redelivered, dead-lettered)."""
+        with self._lock:
+            held = [mid for mid in dict.fromkeys(message_ids) if mid in self._leased]
+            return self._requeue(held, max_deliveries)
+
+    def reclaim(self, now: float, limit: int, max_deliveries: int) -> tuple[int, int]:
+        """Requeue expired leases; returns (redelivered, dead-lettered)."""
+        with self._lock:
+            expired = sorted((deadline, mid) for mid, (deadline, _) in self._leased.items() if deadline <= now)
+            return self._requeue([mid for _, mid in expired[:limit]], max_deliveries)
+
+    def _requeue(self, message_ids: list[str], max_deliveries: int) -> tuple[int, int]:
+        # Caller holds self._lock.
+        redelivered = dead = 0
+        for mid in reversed(message_ids):
+            _, message = self._leased.pop(mid)
+            if message["attempts"] >= max_deliveries:
+                self.dead.append(message)
+                dead += 1
+            else:
+                self._lanes[message["priority"]].appendleft(message)
+                redelivered += 1
+        return redelivered, dead
+
+    def depths(self) -> dict[str, int]:
+        with self._lock:
+            depths = {p: len(lane) for p, lane in self._lanes.items()}
+            depths["inflight"] = len(self._leased)
+            depths["dead"] = len(self.dead)
+            return depths
+
+
+class RedisError(RuntimeError):
+    """Error reply from a RESP server."""
+
+
+class RespClient:
+    """
+    Minimal RESP2 client with pipelining over one socket.
+
+    If a send or read fails part-way (e.g. a timeout), the socket is dropped
+    and the next command reconnects: a late reply on the old stream would
+    otherwise be read as the answer to the next command.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 6379, timeout: float = 5.0):
+        self._address = (host, port)
+        self._timeout = timeout
+        self._sock: socket.socket | None = None
+        self._lock = threading.Lock()
+        self._connect()
+
+    def execute(self, *args):
+        return self.pipeline([args])[0]
+
+    def pipeline(self, commands: list[tuple]) -> list:
+        """Send every command in one write, then read the replies in order."""
+        payload = b"".join(_encode(command) for command in commands)
+        with self._lock:
+            if self._sock is None:
+                self._connect()
+            try:
+                self._sock.sendall(payload)
+                replies = [self._read() for _ in commands]
+            except OSError:
+                self._disconnect()
+                raise
+        for reply in replies:
+            if isinstance(reply, RedisError):
+                raise reply
+        return replies
+
+    def close(self) -> None:
+        with self._lock:
+            self._disconnect()
+
+    def _connect(self) -> None:
+        self._sock = socket.create_connection(self._address, timeout=self._timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._reader = self._sock.makefile("rb")
+
+    def _disconnect(self) -> None:
+        # Caller holds self._lock (or is __init__).
+        if self._sock is not None:
+            self._reader.close()
+            self._sock.close()
+            self._sock = None
+
+    def _read(self):
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("connection closed by server")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode()
+        if kind == b"-":
+            return RedisError(rest.decode())
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            size = int(rest)
+            if size < 0:
+                return None
+            data = self._reader.read(size + 2)
+            return data[:-2]
+        if kind == b"*":
+            size = int(rest)
+            return None if size < 0 else [self._read() for _ in range(size)]
+        raise RedisError(f"unexpected RESP type {kind!r}")
+
+
+def _encode(args: tuple) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        data = arg if isinstance(arg, bytes) else str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+
+class RedisBackend:
+    """Redis backend: LIST per lane, ZSET of lease deadlines, HASH of leased payloads."""
+
+    def __init__(self, client: RespClient, name: str = "tasks"):
+        self.client = client
+        prefix = f"chimera:queue:{name}"
+        self._lane = {priority: f"{prefix}:{priority}" for priority in PRIORITIES}
+        self._leases = f"{prefix}:leases"
+        self._payloads = f"{prefix}:payloads"
+        self._dead = f"{prefix}:dead"
+
+    def push(self, messages: list[dict], front: bool = False) -> None:
+        by_lane: dict[str, list[str]] = {}
+        for message in messages:
+            by_lane.setdefault(self._lane[message["priority"]], []).append(json.dumps(message))
+        if front:
+            # LPUSH reverses its arguments; reverse first so order is kept.
+            commands = [("LPUSH", key, *reversed(values)) for key, values in by_lane.items()]
+        else:
+            commands = [("RPUSH", key, *values) for key, values in by_lane.items()]
+        if commands:
+            self.client.pipeline(commands)
+
+    def heads(self) -> dict[str, tuple[dict | None, int]]:
+        commands = []
+        for priority in PRIORITIES:
+            commands += [("LINDEX", self._lane[priority], 0), ("LLEN", self._lane[priority])]
+        replies = self.client.pipeline(commands)
+        return {
+            p: (json.loads(raw) if raw is not None else None, depth)
+            for p, raw, depth in zip(PRIORITIES, replies[::2], replies[1::2])
+        }
+
+    def pop_and_lease(self, plan: list[tuple[str, int]], deadline: float) -> list[dict]:
+        plan = [(priority, count) for priority, count in plan if count > 0]
+        if not plan:
+            return []
+        keys = [self._leases, self._payloads, *(self._lane[p] for p, _ in plan)]
+        raws = self.client.execute(
+            "EVAL", POP_AND_LEASE, len(keys), *keys, repr(deadline), *(count for _, count in plan)
+        )
+        return [json.loads(raw) for raw in raws or ()]
+
+    def ack(self, message_ids: Iterable[str]) -> int:
+        ids = list(message_ids)
+        if not ids:
+            return 0
+        removed, _ = self.client.pipeline([("ZREM", self._leases, *ids), ("HDEL", self._payloads, *ids)])
+        return removed
+
+    def release(self, message_ids: Iterable[str], max_deliveries: int) -> tuple[int, int]:
+        """Requeue the leases still held; returns (redelivered, dead-lettered)."""
+        ids = list(message_ids)
+        if not ids:
+            return 0, 0
+        return self._requeue(RELEASE, max_deliveries, *ids)
+
+    def reclaim(self, now: float, limit: int, max_deliveries: int) -> tuple[int, int]:
+        """Requeue expired leases; returns (redelivered, dead-lettered)."""
+        return self._requeue(RECLAIM, max_deliveries, repr(now), limit)
+
+    def _requeue(self, script: str, max_deliveries: int, *args) -> tuple[int, int]:
+        keys = [self._leases, self._payloads, self._dead, *(self._lane[p] for p in PRIORITIES)]
+        redelivered, dead = self.client.execute(
+            "EVAL", script, len(keys), *keys, max_deliveries, *PRIORITIES, *args
+        )
+        return redelivered, dead
+
+    def depths(self) -> dict[str, int]:
+        replies = self.client.pipeline(
+            [("LLEN", self._lane[p]) for p in PRIORITIES] + [("ZCARD", self._leases), ("LLEN", self._dead)]
+        )
+        depths = dict(zip(PRIORITIES, replies))
+        depths["inflight"], depths["dead"] = replies[-2], replies[-1]
+        return depths
+
+
+class TaskQueue:
+    """Priority lanes with aging, leases and per-priority wait-time metrics."""
+
+    def __init__(
+        self,
+        backend: MemoryBackend | RedisBackend | None = None,
+        *,
+        aging_seconds: float = DEFAULT_AGING_SECONDS,
+        visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT,
+        max_deliveries: int = DEFAULT_MAX_DELIVERIES,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.backend = MemoryBackend() if backend is None else backend
+        self.aging_seconds = aging_seconds
+        self.visibility_timeout = visibility_timeout
+        self.max_deliveries = max_deliveries
+        self._clock = clock
+        self.wait_times = {priority: WaitHistogram() for priority in PRIORITIES}
+        self.counters = {"enqueued": 0, "delivered": 0, "acked": 0, "redelivered": 0, "dead_lettered": 0}
+
+    def enqueue(self, task: Task) -> str:
+        return self.enqueue_many([task])[0]
+
+    def enqueue_many(self, tasks: Iterable[Task]) -> list[str]:
+        """Enqueue a batch in one backend round-trip; returns message ids."""
+        now = self._clock()
+        messages = [
+            {"id": uuid.uuid4().hex, "priority": t.priority, "attempts": 0, "enqueued_at": now, "task": t.to_dict()}
+            for t in tasks
+        ]
+        self.backend.push(messages)
+        self.counters["enqueued"] += len(messages)
+        return [m["id"] for m in messages]
+
+    def dequeue(self, max_items: int = 1) -> list[Delivery]:
+        """Lease up to ``max_items`` tasks, highest effective priority first."""
+        now = self._clock()
+        self.redeliver_expired(now)
+        plan = self._plan(self.backend.heads(), max_items, now)
+        messages = self.backend.pop_and_lease(plan, now + self.visibility_timeout)
+        deliveries = []
+        for message in messages:
+            if message["attempts"] == 1:
+                self.wait_times[message["priority"]].observe(max(0.0, now - message["enqueued_at"]))
+            deliveries.append(Delivery(message))
+        self.counters["delivered"] += len(deliveries)
+        return deliveries
+
+    def ack(self, message_ids: Iterable[str]) -> int:
+        acked = self.backend.ack(message_ids)
+        self.counters["acked"] += acked
+        return acked
+
+    def nack(self, deliveries: Iterable[Delivery]) -> None:
+        """Give leased tasks back for immediate redelivery."""
+        # A lease that already expired may have been reclaimed by another consumer: not ours to requeue.
+        self._count(*self.backend.release([d.message_id for d in deliveries], self.max_deliveries))
+
+    def redeliver_expired(self, now: float | None = None, limit: int = 1000) -> int:
+        """Return expired leases to the front of their lanes (or dead-letter them)."""
+        now = self._clock() if now is None else now
+        redelivered, dead = self.backend.reclaim(now, limit, self.max_deliveries)
+        self._count(redelivered, dead)
+        return redelivered + dead
+
+    def effective_rank(self, priority: str, waited: float) -> int:
+        if self.aging_seconds <= 0:
+            return _RANK[priority]
+        return max(0, _RANK[priority] - int(waited // self.aging_seconds))
+
+    def metrics(self) -> dict:
+        """Queue depth per priority plus wait-time histograms (Operator view)."""
+        return {
+            "depth": self.backend.depths(),
+            "wait_seconds": {p: h.snapshot() for p, h in self.wait_times.items()},
+            "counters": dict(self.counters),
+        }
+
+    def _plan(self, heads: dict[str, tuple[dict | None, int]], max_items: int, now: float) -> list[tuple[str, int]]:
+        ranked = sorted(
+            (self.effective_rank(p, now - head["enqueued_at"]), head["enqueued_at"], p, depth)
+            for p, (head, depth) in heads.items()
+            if head is not None
+        )
+        plan, remaining = [], max_items
+        for _, _, priority, depth in ranked:
+            take = min(remaining, depth)
+            if take:
+                plan.append((priority, take))
+                remaining -= take
+        return plan
+
+    def _count(self, redelivered: int, dead: int) -> None:
+        self.counters["redelivered"] += redelivered
+        self.counters["dead_lettered"] += dead
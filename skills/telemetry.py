@@ -0,0 +1,496 @@
+"""
+Execution tracing and hot-path metrics for skills (skills/README.md:
+"Observable: every execution emits metadata").
+
+Every skill invocation, DAG task, MCP request and render stage runs inside a
+``Span``. Finishing a span:
+
+* records its duration in an HDR-style histogram keyed by ``(kind, name)``.
+  Buckets are log-linear: 32 sub-buckets per power of two, about 3% relative
+  error from nanoseconds to hours, at a fixed size
+* bumps an error counter keyed by ``(kind, name, error)`` if it raised. The
+  error is a ``SkillError.code`` or the exception class name
+* keeps the span in a bounded ring buffer if its trace is sampled
+  (``sample_rate``), for export as OTLP traces
+
+Cache hits and misses are plain counters (``count``).
+
+Recording is lock-free: each thread writes only to its own ``_ThreadState``.
+Readers merge every thread's state when they export, so the cost lands on
+the scrape, not the skill. When a thread exits its state is folded into one
+retired state, so short-lived threads (a render job, a cache refresh) do not
+pile up. Parent/child links ride on a ``ContextVar``, so
+they follow ``asyncio`` tasks and ``asyncio.to_thread``.
+
+Exports: ``prometheus()`` (text exposition format, histograms rebucketed to
+``EXPORT_BOUNDS``), ``otlp_metrics()`` and ``otlp_traces()`` (OTLP/JSON
+request bodies).
+
+The process-wide instance is on by default. ``set_telemetry(None)`` turns it
+off, after which ``span`` hands out a shared no-op span.
+"""
+
+import itertools
+import random
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from collections import deque
+from collections.abc import Callable
+from contextvars import ContextVar
+
+SERVICE_NAME = "project-chimera"
+SCOPE_NAME = "chimera.skills"
+DEFAULT_MAX_SPANS = 10_000
+
+SUB_BITS = 5
+_SUB = 1 << SUB_BITS
+_LINEAR = 2 * _SUB  # values below this get one bucket each
+_MAX_BITS = 44  # ~4.9 hours in ns; longer durations land in the last bucket
+N_BUCKETS = (_MAX_BITS - SUB_BITS - 1) * _SUB + _LINEAR
+
+# Upper bounds (seconds) of exported histogram buckets; the last bucket is +Inf.
+EXPORT_BOUNDS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0)
+
+# OTLP SpanKind per span kind: MCP requests leave the process (CLIENT), the rest is INTERNAL.
+_OTLP_KIND = {"mcp": 3}
+
+_current: ContextVar["Span | None"] = ContextVar("chimera_span", default=None)
+
+# Ids only need to be unique, not unpredictable: a random per-process prefix
+# plus a counter is much cheaper than drawing random bits per span.
+_ID_PREFIX = random.getrandbits(63) << 64
+_span_ids = itertools.count(random.getrandbits(40) + 1)
+_trace_ids = itertools.count(1)
+
+
+def bucket_index(ns: int) -> int:
+    """HDR bucket of a non-negative duration in nanoseconds."""
+    bits = ns.bit_length()
+    if bits <= SUB_BITS + 1:
+        return ns
+    shift = bits - SUB_BITS - 1
+    index = shift * _SUB + (ns >> shift)
+    return index if index < N_BUCKETS else N_BUCKETS - 1
+
+
+def bucket_upper(index: int) -> int:
+    """Exclusive upper bound (ns) of HDR bucket ``index``."""
+    if index < _LINEAR:
+        return index + 1
+    shift, top = divmod(index - _SUB, _SUB)
+    return (top + _SUB + 1) << shift
+
+
+_EXPORT_NS = [round(b * 1e9) for b in EXPORT_BOUNDS]
+# HDR bucket -> export bucket whose bound covers the HDR bucket's largest value.
+_EXPORT_SLOT = [bisect_left(_EXPORT_NS, bucket_upper(i) - 1) for i in range(N_BUCKETS)]
+
+
+class _ThreadState:
+    """One thread's private counters; only that thread writes here."""
+
+    __slots__ = ("hist", "errors", "events")
+
+    def __init__(self):
+        self.hist: dict[tuple, list[int]] = {}  # key -> N_BUCKETS counts + [count, sum_ns]
+        self.errors: dict[tuple, int] = {}
+        self.events: dict[tuple, int] = {}
+
+
+class _Owner:
+    """Thread-local marker; its finalizer retires the thread's state when the thread exits."""
+
+    __slots__ = ("__weakref__",)
+
+
+class Span:
+    """One timed unit of work; use as a context manager."""
+
+    __slots__ = (
+        "kind",
+        "name",
+        "attributes",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "sampled",
+        "start_ns",
+        "end_ns",
+        "error",
+        "_telemetry",
+        "_token",
+    )
+
+    def __init__(self, telemetry: "Telemetry", kind: str, name: str, attributes: dict | None):
+        self._telemetry = telemetry
+        self.kind = kind
+        self.name = name
+        self.attributes = attributes
+        self.error: str | None = None
+        self.end_ns = 0
+
+    def __enter__(self) -> "Span":
+        parent = _current.get()
+        if parent is None:
+            self.trace_id = _ID_PREFIX | next(_trace_ids)
+            self.parent_id = 0
+            rate = self._telemetry.sample_rate
+            self.sampled = rate >= 1.0 or random.random() < rate
+        else:
+            self.trace_id = parent.trace_id
+            self.parent_id = parent.span_id
+            self.sampled = parent.sampled
+        self.span_id = next(_span_ids) & 0xFFFFFFFFFFFFFFFF
+        self._token = _current.set(self)
+        self.start_ns = self._telemetry._clock_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.end_ns = self._telemetry._clock_ns()
+        _current.reset(self._token)
+        if exc is not None:
+            self.error = getattr(exc, "code", None) or exc_type.__name__
+        self._telemetry._finish(self)
+
+    def set(self, key: str, value) -> None:
+        if self.attributes is None:
+            self.attributes = {}
+        self.attributes[key] = value
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+
+class _NullSpan:
+    """Shared stand-in when telemetry is off."""
+
+    __slots__ = ()
+    duration_ms = 0.0
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+    def set(self, key: str, value) -> None:
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Telemetry:
+    """Per-thread histograms and counters plus a sampled span ring buffer."""
+
+    def __init__(
+        self,
+        *,
+        max_spans: int = DEFAULT_MAX_SPANS,
+        sample_rate: float = 1.0,
+        service_name: str = SERVICE_NAME,
+        clock_ns: Callable[[], int] = time.perf_counter_ns,
+    ):
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("sample_rate must be within [0, 1]")
+        self.sample_rate = sample_rate
+        self.service_name = service_name
+        self._clock_ns = clock_ns
+        self._epoch_offset_ns = time.time_ns() - clock_ns()
+        self._started_unix_ns = time.time_ns()
+        self._local = threading.local()
+        self._states: list[_ThreadState] = []
+        self._retired = _ThreadState()  # merged states of exited threads
+        self._states_lock = threading.Lock()
+        self.spans: deque[Span] = deque(maxlen=max_spans)
+
+    def span(self, kind: str, name: str, attributes: dict | None = None) -> Span:
+        return Span(self, kind, name, attributes)
+
+    def observe(self, kind: str, name: str, seconds: float) -> None:
+        """Record an already-measured duration (e.g. render stage timings)."""
+        self._record(self._state(), (kind, name), int(seconds * 1e9))
+
+    def count(self, kind: str, name: str, outcome: str, n: int = 1) -> None:
+        """Bump an event counter, e.g. ``count("cache", "script_cache", "hit")``."""
+        events = self._state().events
+        key = (kind, name, outcome)
+        events[key] = events.get(key, 0) + n
+
+    def _finish(self, span: Span) -> None:
+        try:
+            state = self._local.state
+        except AttributeError:
+            state = self._state()
+        key = (span.kind, span.name)
+        ns = span.end_ns - span.start_ns
+        counts = state.hist.get(key)
+        if counts is None:
+            counts = state.hist[key] = [0] * (N_BUCKETS + 2)
+        # bucket_index(), inlined: this is the per-span hot path.
+        bits = ns.bit_length()
+        if bits <= SUB_BITS + 1:
+            index = ns if ns > 0 else 0
+        else:
+            shift = bits - SUB_BITS - 1
+            index = min(shift * _SUB + (ns >> shift), N_BUCKETS - 1)
+        counts[index] += 1
+        counts[-2] += 1
+        counts[-1] += ns
+        if span.error is not None:
+            error_key = (span.kind, span.name, span.error)
+            state.errors[error_key] = state.errors.get(error_key, 0) + 1
+        if span.sampled:
+            self.spans.append(span)
+
+    @staticmethod
+    def _record(state: _ThreadState, key: tuple, ns: int) -> None:
+        counts = state.hist.get(key)
+        if counts is None:
+            counts = state.hist[key] = [0] * (N_BUCKETS + 2)
+        counts[bucket_index(ns if ns > 0 else 0)] += 1
+        counts[-2] += 1
+        counts[-1] += ns
+
+    def _state(self) -> _ThreadState:
+        try:
+            return self._local.state
+        except AttributeError:
+            state = self._local.state = _ThreadState()
+            owner = self._local.owner = _Owner()
+            weakref.finalize(owner, self._retire, state).atexit = False
+            with self._states_lock:
+                self._states.append(state)
+            return state
+
+    def _retire(self, state: _ThreadState) -> None:
+        # Runs once the exited thread's locals are gone, so nothing writes to ``state`` any more.
+        with self._states_lock:
+            _merge(state, self._retired.hist, self._retired.errors, self._retired.events)
+            self._states.remove(state)
+
+    # -- reading -----------------------------------------------------------
+
+    def snapshot(self) -> dict:
+        """Merge every thread's state: ``{"histograms", "errors", "events"}``."""
+        histograms: dict[tuple, list[int]] = {}
+        errors: dict[tuple, int] = {}
+        events: dict[tuple, int] = {}
+        with self._states_lock:
+            states = list(self._states)
+            _merge(self._retired, histograms, errors, events)  # with the list, so a retiring state counts once
+        for state in states:
+            _merge(state, histograms, errors, events)
+        return {"histograms": histograms, "errors": errors, "events": events}
+
+    def quantile(self, kind: str, name: str, q: float) -> float | None:
+        """Approximate ``q`` quantile of span durations, in seconds."""
+        counts = self.snapshot()["histograms"].get((kind, name))
+        if counts is None or not counts[-2]:
+            return None
+        target = q * counts[-2]
+        seen = 0
+        for i in range(N_BUCKETS):
+            seen += counts[i]
+            if seen >= target and counts[i]:
+                return bucket_upper(i) / 1e9
+        return bucket_upper(N_BUCKETS - 1) / 1e9
+
+    def summary(self) -> dict:
+        """``{"kind/name": {count, mean_ms, p50_ms, p99_ms, errors}}`` for dashboards and tests."""
+        snap = self.snapshot()
+        out = {}
+        for (kind, name), counts in sorted(snap["histograms"].items()):
+            errors = sum(n for (k, nm, _), n in snap["errors"].items() if (k, nm) == (kind, name))
+            out[f"{kind}/{name}"] = {
+                "count": counts[-2],
+                "mean_ms": round(counts[-1] / counts[-2] / 1e6, 4) if counts[-2] else 0.0,
+                "p50_ms": round(1000 * self.quantile(kind, name, 0.5), 4),
+                "p99_ms": round(1000 * self.quantile(kind, name, 0.99), 4),
+                "errors": errors,
+            }
+        return out
+
+    # -- exporters ---------------------------------------------------------
+
+    def prometheus(self, prefix: str = "chimera") -> str:
+        """Prometheus text exposition format."""
+        snap = self.snapshot()
+        lines = [
+            f"# HELP {prefix}_span_duration_seconds Duration of skill, stage, task and MCP spans.",
+            f"# TYPE {prefix}_span_duration_seconds histogram",
+        ]
+        for (kind, name), counts in sorted(snap["histograms"].items()):
+            labels = f'kind="{_escape(kind)}",name="{_escape(name)}"'
+            cumulative = 0
+            for bound, n in zip(EXPORT_BOUNDS, _rebucket(counts)):
+                cumulative += n
+                lines.append(f'{prefix}_span_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{prefix}_span_duration_seconds_bucket{{{labels},le="+Inf"}} {counts[-2]}')
+            lines.append(f"{prefix}_span_duration_seconds_sum{{{labels}}} {counts[-1] / 1e9}")
+            lines.append(f"{prefix}_span_duration_seconds_count{{{labels}}} {counts[-2]}")
+        for metric, help_text, series, label in (
+            ("errors_total", "Spans that raised, by error class.", snap["errors"], "error"),
+            ("events_total", "Counted events such as cache hits and misses.", snap["events"], "outcome"),
+        ):
+            lines.append(f"# HELP {prefix}_{metric} {help_text}")
+            lines.append(f"# TYPE {prefix}_{metric} counter")
+            for (kind, name, value), n in sorted(series.items()):
+                lines.append(
+                    f'{prefix}_{metric}{{kind="{_escape(kind)}",name="{_escape(name)}",{label}="{_escape(value)}"}} {n}'
+                )
+        return "\n".join(lines) + "\n"
+
+    def otlp_metrics(self) -> dict:
+        """OTLP/JSON ``ExportMetricsServiceRequest`` body (cumulative temporality)."""
+        snap = self.snapshot()
+        now = str(time.time_ns())
+        start = str(self._started_unix_ns)
+        histogram_points = [
+            {
+                "attributes": _attributes({"kind": kind, "name": name}),
+                "startTimeUnixNano": start,
+                "timeUnixNano": now,
+                "count": str(counts[-2]),
+                "sum": counts[-1] / 1e9,
+                "bucketCounts": [str(n) for n in _rebucket(counts)],
+                "explicitBounds": list(EXPORT_BOUNDS),
+            }
+            for (kind, name), counts in sorted(snap["histograms"].items())
+        ]
+        metrics = [
+            {
+                "name": "chimera.span.duration",
+                "unit": "s",
+                "histogram": {"dataPoints": histogram_points, "aggregationTemporality": 2},
+            }
+        ]
+        for metric, series, label in (
+            ("chimera.errors", snap["errors"], "error"),
+            ("chimera.events", snap["events"], "outcome"),
+        ):
+            points = [
+                {
+                    "attributes": _attributes({"kind": kind, "name": name, label: value}),
+                    "startTimeUnixNano": start,
+                    "timeUnixNano": now,
+                    "asInt": str(n),
+                }
+                for (kind, name, value), n in sorted(series.items())
+            ]
+            metrics.append(
+                {"name": metric, "unit": "1", "sum": {"dataPoints": points, "aggregationTemporality": 2, "isMonotonic": True}}
+            )
+        return {"resourceMetrics": [{"resource": self._resource(), "scopeMetrics": [{"scope": {"name": SCOPE_NAME}, "metrics": metrics}]}]}
+
+    def otlp_traces(self, *, clear: bool = True) -> dict:
+        """OTLP/JSON ``ExportTraceServiceRequest`` body for the buffered spans."""
+        if clear:
+            spans = []
+            while self.spans:
+                try:
+                    spans.append(self.spans.popleft())
+                except IndexError:  # drained concurrently
+                    break
+        else:
+            spans = list(self.spans)
+        offset = self._epoch_offset_ns
+        encoded = []
+        for span in spans:
+            item = {
+                "traceId": f"{span.trace_id:032x}",
+                "spanId": f"{span.span_id:016x}",
+                "name": f"{span.kind}/{span.name}",
+                "kind": _OTLP_KIND.get(span.kind, 1),
+                "startTimeUnixNano": str(span.start_ns + offset),
+                "endTimeUnixNano": str(span.end_ns + offset),
+                "attributes": _attributes({"chimera.kind": span.kind, **(span.attributes or {})}),
+                "status": {"code": 2, "message": span.error} if span.error else {"code": 0},
+            }
+            if span.parent_id:
+                item["parentSpanId"] = f"{span.parent_id:016x}"
+            encoded.append(item)
+        return {"resourceSpans": [{"resource": self._resource(), "scopeSpans": [{"scope": {"name": SCOPE_NAME}, "spans": encoded}]}]}
+
+    def _resource(self) -> dict:
+        return {"attributes": _attributes({"service.name": self.service_name})}
+
+
+def _merge(state: _ThreadState, histograms: dict, errors: dict, events: dict) -> None:
+    for key, counts in list(state.hist.items()):
+        merged = histograms.get(key)
+        if merged is None:
+            histograms[key] = list(counts)
+        else:
+            for i, c in enumerate(counts):
+                if c:
+                    merged[i] += c
+    for source, target in ((state.errors, errors), (state.events, events)):
+        for key, n in list(source.items()):
+            target[key] = target.get(key, 0) + n
+
+
+def _rebucket(counts: list[int]) -> list[int]:
+    """HDR counts -> per-``EXPORT_BOUNDS`` counts (non-cumulative, +Inf last)."""
+    out = [0] * (len(EXPORT_BOUNDS) + 1)
+    for i in range(N_BUCKETS):
+        if counts[i]:
+            out[_EXPORT_SLOT[i]] += counts[i]
+    return out
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _attributes(values: dict) -> list[dict]:
+    out = []
+    for key, value in values.items():
+        if isinstance(value, bool):
+            encoded = {"boolValue": value}
+        elif isinstance(value, int):
+            encoded = {"intValue": str(value)}
+        elif isinstance(value, float):
+            encoded = {"doubleValue": value}
+        else:
+            encoded = {"stringValue": str(value)}
+        out.append({"key": key, "value": encoded})
+    return out
+
+
+_telemetry: Telemetry | None = Telemetry()
+
+
+def set_telemetry(telemetry: Telemetry | None) -> None:
+    """Install the process-wide collector (None to switch instrumentation off)."""
+    global _telemetry
+    _telemetry = telemetry
+
+
+def get_telemetry() -> Telemetry | None:
+    return _telemetry
+
+
+def span(kind: str, name: str, attributes: dict | None = None) -> "Span | _NullSpan":
+    """Span on the process-wide collector, or the shared no-op span when it is off."""
+    telemetry = _telemetry
+    return NULL_SPAN if telemetry is None else Span(telemetry, kind, name, attributes)
+
+
+def count(kind: str, name: str, outcome: str, n: int = 1) -> None:
+    telemetry = _telemetry
+    if telemetry is not None:
+        telemetry.count(kind, name, outcome, n)
+
+
+def observe(kind: str, name: str, seconds: float) -> None:
+    telemetry = _telemetry
+    if telemetry is not None:
+        telemetry.observe(kind, name, seconds)
+
+
+def current_span() -> Span | None:
+    return _current.get()
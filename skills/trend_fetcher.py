@@ -0,0 +1,353 @@
+"""
+Trend fetching capability backing skill_fetch_trends.
+
+Contract: skills/README.md (Skill 1). Every agent polls the same handful of
+platform/region pairs, so results are served from a shared in-process cache:
+
+* per-platform TTLs, LRU eviction beyond ``max_entries``
+* stale-while-revalidate: an expired entry is still served for ``stale_ttl``
+  seconds while a single background refresh runs
+* one cached superset per (platform, region, category), sliced to ``limit``
+* concurrent misses on the same key are coalesced into one upstream fetch
+* upstream lists are de-duplicated and ranked once per fetch (trend_merge)
+
+``fetch_trends_many`` fans several platform requests out concurrently with a
+per-platform deadline and returns partial results plus structured errors.
+The blocking cache lookups run on a dedicated, bounded thread pool: a fetch
+that misses its deadline keeps its thread until the source answers, and it
+must not take the event loop's default executor down with it.
+
+``metadata.fetched_at`` always reports when the upstream fetch happened, not
+when the cache answered, so the Judge can reason about freshness.
+"""
+
+import asyncio
+import contextvars
+import functools
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from skills import telemetry
+from skills.contracts import SkillError
+from skills.trend_merge import merge_trends
+
+# Upstream signature: (platform, region, category, limit) -> list of trend dicts
+TrendSource = Callable[[str, str, str | None, int], list[dict]]
+
+# Seconds a cached trend list is considered fresh, per platform.
+PLATFORM_TTLS: dict[str, float] = {
+    "twitter": 60.0,
+    "tiktok": 120.0,
+    "reddit": 300.0,
+    "youtube": 600.0,
+}
+DEFAULT_TTL = 300.0
+DEFAULT_STALE_TTL = 300.0
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_SUPERSET_LIMIT = 50
+DEFAULT_FETCH_TIMEOUT = 5.0
+DEFAULT_FAN_OUT_WORKERS = 16
+
+
+class TrendFetchError(SkillError):
+    """Structured failure from a trend source (see Skill 1 failure modes)."""
+
+    API_UNAVAILABLE = "API_UNAVAILABLE"
+    RATE_LIMITED = "RATE_LIMITED"
+    INVALID_REGION = "INVALID_REGION_OR_CATEGORY"
+    INVALID_REQUEST = "INVALID_REQUEST"
+    TIMEOUT = "TIMEOUT"
+
+    def __init__(self, code: str, message: str, platform: str | None = None):
+        super().__init__(code, message)
+        self.platform = platform
+
+    def to_dict(self) -> dict:
+        return {"code": self.code, "message": self.message, "platform": self.platform}
+
+
+def _utc_now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def offline_trend_source(platform: str, region: str, category: str | None, limit: int) -> list[dict]:
+    """
+    Deterministic trend source used until an MCP trend server is configured.
+
+    Produces stable, descending-score topics per (platform, region, category)
+    so agents and tests get contract-shaped data without network access.
+    """
+    observed_at = _utc_now_iso()
+    seed = f"{platform}:{region}:{category or '*'}"
+    trends = []
+    for rank in range(limit):
+        digest = hashlib.sha256(f"{seed}:{rank}".encode()).hexdigest()
+        trends.append(
+            {
+                "topic": f"#{category or 'trending'}_{digest[:8]}",
+                "score": round(100.0 / (rank + 1), 4),
+                "source": platform,
+                "observed_at": observed_at,
+            }
+        )
+    return trends
+
+
+class _Entry:
+    __slots__ = ("trends", "requested", "exhausted", "fetched_at", "stored_at", "refreshing")
+
+    def __init__(self, trends: list[dict], requested: int, exhausted: bool, fetched_at: str, stored_at: float):
+        self.trends = trends
+        self.requested = requested
+        self.exhausted = exhausted
+        self.fetched_at = fetched_at
+        self.stored_at = stored_at
+        self.refreshing = False
+
+    def covers(self, limit: int) -> bool:
+        # A short upstream answer means the source is exhausted: any limit fits.
+        return limit <= self.requested or self.exhausted
+
+
+class TrendCache:
+    """Shared TTL/LRU cache with stale-while-revalidate in front of a TrendSource."""
+
+    def __init__(
+        self,
+        source: TrendSource,
+        *,
+        ttls: dict[str, float] | None = None,
+        default_ttl: float = DEFAULT_TTL,
+        stale_ttl: float = DEFAULT_STALE_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        superset_limit: int = DEFAULT_SUPERSET_LIMIT,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.source = source
+        self.ttls = dict(PLATFORM_TTLS if ttls is None else ttls)
+        self.default_ttl = default_ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.superset_limit = superset_limit
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple, _Entry] = OrderedDict()
+        self._inflight: dict[tuple, Future] = {}
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "upstream_calls": 0, "evictions": 0}
+
+    @staticmethod
+    def key(platform: str, region: str, category: str | None) -> tuple:
+        return (platform.lower(), region.lower(), category.lower() if category else None)
+
+    def ttl_for(self, platform: str) -> float:
+        return self.ttls.get(platform.lower(), self.default_ttl)
+
+    def get(self, platform: str, region: str, category: str | None, limit: int) -> dict:
+        """Return a contract-shaped response, fetching upstream only when needed."""
+        key = self.key(platform, region, category)
+        ttl = self.ttl_for(platform)
+        refresh = False
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.covers(limit):
+                age = self._clock() - entry.stored_at
+                if age < ttl + self.stale_ttl:
+                    self._entries.move_to_end(key)
+                    if age < ttl:
+                        self.stats["hits"] += 1
+                        telemetry.count("cache", "trend_cache", "hit")
+                    else:
+                        self.stats["stale_hits"] += 1
+                        telemetry.count("cache", "trend_cache", "stale_hit")
+                        if not entry.refreshing and key not in self._inflight:
+                            entry.refreshing = True
+                            refresh = True
+                    response = self._response(platform, entry, limit)
+                    want = entry.requested
+                else:
+                    entry = None
+            else:
+                entry = None
+
+            if entry is None:
+                self.stats["misses"] += 1
+                telemetry.count("cache", "trend_cache", "miss")
+                future, owner = self._claim(key)
+
+        if entry is not None:
+            if refresh:
+                threading.Thread(
+                    target=self._refresh, args=(key, platform, region, category, want), daemon=True
+                ).start()
+            return response
+
+        if owner:
+            self._fetch(future, key, platform, region, category, max(limit, self.superset_limit))
+        entry = future.result()
+        if not entry.covers(limit):
+            # Coalesced onto a smaller in-flight fetch; go again with our own size.
+            return self.get(platform, region, category, limit)
+        return self._response(platform, entry, limit)
+
+    def invalidate(self, platform: str | None = None) -> None:
+        """Drop every entry, or only those belonging to one platform."""
+        with self._lock:
+            if platform is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if k[0] == platform.lower()]:
+                del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _claim(self, key: tuple) -> tuple[Future, bool]:
+        # Caller holds self._lock.
+        future = self._inflight.get(key)
+        if future is not None:
+            return future, False
+        future = Future()
+        self._inflight[key] = future
+        return future, True
+
+    def _fetch(self, future: Future, key: tuple, platform, region, category, want: int) -> None:
+        try:
+            with self._lock:
+                self.stats["upstream_calls"] += 1
+            raw = list(self.source(platform, region, category, want))
+            fetched_at = _utc_now_iso()
+            trends = merge_trends(raw, want, calibrate=False)
+            entry = _Entry(trends, want, len(raw) < want, fetched_at, self._clock())
+        except BaseException as exc:
+            with self._lock:
+                self._inflight.pop(key, None)
+                stale = self._entries.get(key)
+                if stale is not None:
+                    stale.refreshing = False
+            future.set_exception(exc)
+            return
+        with self._lock:
+            self._inflight.pop(key, None)
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+        future.set_result(entry)
+
+    def _refresh(self, key: tuple, platform, region, category, want: int) -> None:
+        with self._lock:
+            future, owner = self._claim(key)
+        if owner:
+            self._fetch(future, key, platform, region, category, want)
+        # Refresh failures are swallowed: the stale entry keeps serving until hard expiry.
+
+    @staticmethod
+    def _response(platform: str, entry: _Entry, limit: int) -> dict:
+        return {
+            "trends": [dict(trend) for trend in entry.trends[:limit]],
+            "metadata": {"platform": platform, "fetched_at": entry.fetched_at},
+        }
+
+
+default_cache = TrendCache(offline_trend_source)
+
+
+def fetch_trends(platform: str, region: str, category: str | None, limit: int) -> dict:
+    """
+    Fetch trending topics for a platform/region, served from the shared cache.
+
+    Returns ``{"trends": [...], "metadata": {"platform", "fetched_at"}}`` as
+    defined in skills/README.md.
+    """
+    return default_cache.get(platform, region, category, limit)
+
+
+fan_out_executor = ThreadPoolExecutor(max_workers=DEFAULT_FAN_OUT_WORKERS, thread_name_prefix="trend-fetch")
+
+
+async def _fetch_one(cache: TrendCache, request: dict, timeout: float, executor: Executor) -> dict:
+    # Like asyncio.to_thread, but on our own pool; the context copy keeps telemetry spans attached.
+    call = functools.partial(
+        contextvars.copy_context().run,
+        cache.get, request["platform"], request["region"], request.get("category"), request["limit"],
+    )
+    return await asyncio.wait_for(asyncio.get_running_loop().run_in_executor(executor, call), timeout)
+
+
+def _invalid(request) -> str | None:
+    if not isinstance(request, dict) or not all(k in request for k in ("platform", "region", "limit")):
+        return "request requires platform, region and limit"
+    limit = request["limit"]
+    if not isinstance(limit, int) or isinstance(limit, bool) or limit < 0:
+        return "limit must be a non-negative integer"
+    return None
+
+
+async def fetch_trends_many(
+    requests: list[dict],
+    *,
+    timeout: float = DEFAULT_FETCH_TIMEOUT,
+    timeouts: dict[str, float] | None = None,
+    cache: TrendCache | None = None,
+    executor: Executor | None = None,
+) -> dict:
+    """
+    Fetch several ``{platform, region, category, limit}`` requests concurrently.
+
+    Lookups run on ``executor`` (default: the module's ``fan_out_executor``).
+
+    Each request gets its own deadline (``timeouts[platform]`` or ``timeout``),
+    so end-to-end latency is bounded by the slowest platform rather than the
+    sum. Failures do not cancel siblings; they are reported alongside the
+    successful responses::
+
+        {
+          "results": [<fetch_trends response>, ...],   # in request order
+          "errors": [{"platform", "region", "code", "message"}, ...]
+        }
+    """
+    cache = default_cache if cache is None else cache
+    executor = fan_out_executor if executor is None else executor
+    timeouts = timeouts or {}
+    jobs = []
+    errors = []
+    for request in requests:
+        problem = _invalid(request)
+        if problem is not None:
+            errors.append(_error(request, TrendFetchError.INVALID_REQUEST, problem))
+            continue
+        deadline = timeouts.get(request["platform"], timeout)
+        jobs.append((request, _fetch_one(cache, request, deadline, executor)))
+
+    outcomes = await asyncio.gather(*(job for _, job in jobs), return_exceptions=True)
+
+    results = []
+    for (request, _), outcome in zip(jobs, outcomes):
+        if isinstance(outcome, TrendFetchError):
+            errors.append(_error(request, outcome.code, outcome.message))
+        elif isinstance(outcome, TimeoutError):
+            errors.append(_error(request, TrendFetchError.TIMEOUT, "platform did not answer before its deadline"))
+        elif isinstance(outcome, BaseException):
+            errors.append(_error(request, TrendFetchError.API_UNAVAILABLE, str(outcome) or type(outcome).__name__))
+        else:
+            results.append(outcome)
+    return {"results": results, "errors": errors}
+
+
+def _error(request, code: str, message: str) -> dict:
+    request = request if isinstance(request, dict) else {}
+    return {
+        "platform": request.get("platform"),
+        "region": request.get("region"),
+        "code": code,
+        "message": message,
+    }
@@ -0,0 +1,154 @@
+"""
+Trend deduplication and cross-platform score merging.
+
+One topic trending on several platforms shows up as near-duplicate strings
+("#AINews", "ai_news", "AI News") with scores on unrelated scales. This stage:
+
+* normalises topics to a canonical key (unicode NFKC, accents, case,
+  hashtag/mention prefixes and separators). Symbols stay, so "C++" and "C#"
+  remain different topics
+* calibrates ``score`` per source to [0, 1] (score / source max, optionally
+  weighted) before combining sources
+* keeps only the best ``limit`` topics with a bounded heap, O(n log k), so a
+  10k-item raw feed is never fully sorted
+
+Within one source, duplicates collapse to their best score; across sources
+the calibrated scores add up, so cross-platform topics rank higher. Output
+items keep the skill_fetch_trends trend shape (skills/README.md);
+``merge_responses`` adds ``sources``, every platform behind an item.
+"""
+
+import heapq
+import unicodedata
+from collections.abc import Iterable
+
+from skills.contracts import parse_timestamp
+
+# Kept in a topic key besides letters, digits and symbols (C#, AT&T).
+_KEPT_PUNCTUATION = frozenset("#&")
+
+
+def normalize_topic(topic: str) -> str:
+    """Canonical dedup key for a topic string."""
+    text = unicodedata.normalize("NFKC", topic)
+    text = "".join(ch for ch in unicodedata.normalize("NFKD", text) if not unicodedata.combining(ch))
+    text = text.casefold().strip().lstrip("#@")
+    key = "".join(
+        ch for ch in text if ch.isalnum() or ch in _KEPT_PUNCTUATION or unicodedata.category(ch).startswith("S")
+    )
+    return key or text
+
+
+class _Merged:
+    __slots__ = ("topic", "topic_score", "per_source", "observed_at", "observed_ts")
+
+    def __init__(self, topic: str, observed_at: str):
+        self.topic = topic
+        self.topic_score = float("-inf")
+        self.per_source: dict[str, float] = {}
+        self.observed_at = observed_at
+        self.observed_ts = parse_timestamp(observed_at)
+
+
+def merge_trends(
+    trends: Iterable[dict],
+    limit: int,
+    *,
+    calibrate: bool = True,
+    weights: dict[str, float] | None = None,
+    sources: bool = False,
+) -> list[dict]:
+    """
+    Deduplicate and rank trend items, returning at most ``limit`` of them.
+
+    With ``calibrate=False`` raw scores are combined as-is, which is what a
+    single-platform feed wants. ``source`` stays a single platform, as the
+    contract describes it: the one that scored the item highest. With
+    ``sources=True`` each item also lists every contributing platform, sorted.
+    """
+    if limit <= 0:
+        return []
+    trends = trends if isinstance(trends, list) else list(trends)
+
+    scale: dict[str, float] = {}
+    if calibrate:
+        for trend in trends:
+            source, score = trend["source"], trend["score"]
+            if score > scale.get(source, 0.0):
+                scale[source] = score
+
+    merged: dict[str, _Merged] = {}
+    for trend in trends:
+        source = trend["source"]
+        score = float(trend["score"])
+        if calibrate:
+            top = scale.get(source, 0.0)
+            score = score / top if top > 0 else 0.0
+        if weights:
+            score *= weights.get(source, 1.0)
+
+        key = normalize_topic(trend["topic"])
+        item = merged.get(key)
+        if item is None:
+            item = merged[key] = _Merged(trend["topic"], trend["observed_at"])
+        if score > item.per_source.get(source, float("-inf")):
+            item.per_source[source] = score
+        if score > item.topic_score:
+            item.topic, item.topic_score = trend["topic"], score
+        if trend["observed_at"] != item.observed_at:
+            observed = parse_timestamp(trend["observed_at"])
+            if observed > item.observed_ts:
+                item.observed_at, item.observed_ts = trend["observed_at"], observed
+
+    best = top_k(merged.values(), limit, key=lambda item: sum(item.per_source.values()))
+    out = []
+    for total, item in best:
+        entry = {
+            "topic": item.topic,
+            "score": round(total, 6),
+            "source": max(sorted(item.per_source), key=item.per_source.__getitem__),
+            "observed_at": item.observed_at,
+        }
+        if sources:
+            entry["sources"] = sorted(item.per_source)
+        out.append(entry)
+    return out
+
+
+def top_k(items: Iterable, k: int, *, key) -> list[tuple[float, object]]:
+    """
+    Return the ``k`` highest ``(key(item), item)`` pairs, best first.
+
+    Uses a min-heap capped at ``k`` entries; ties keep first-seen order.
+    """
+    if k <= 0:
+        return []
+    heap: list[tuple[float, int, object]] = []
+    for seq, item in enumerate(items):
+        entry = (key(item), -seq, item)
+        if len(heap) < k:
+            heapq.heappush(heap, entry)
+        elif entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+    heap.sort(key=lambda entry: entry[:2], reverse=True)
+    return [(score, item) for score, _, item in heap]
+
+
+def merge_responses(responses: Iterable[dict], limit: int, *, weights: dict[str, float] | None = None) -> dict:
+    """
+    Merge several fetch_trends responses (e.g. fetch_trends_many results) into one.
+
+    ``metadata.platform`` lists the merged platforms and ``metadata.fetched_at``
+    is the oldest contributing fetch, the conservative freshness bound.
+    """
+    responses = list(responses)
+    trends = [trend for response in responses for trend in response["trends"]]
+    platforms = [response["metadata"]["platform"] for response in responses]
+    fetched = [response["metadata"]["fetched_at"] for response in responses]
+    return {
+        "trends": merge_trends(trends, limit, weights=weights, sources=True),
+        "metadata": {
+            "platform": ",".join(dict.fromkeys(platforms)),
+            "fetched_at": min(fetched) if fetched else None,
+        },
+    }
@@ -0,0 +1,193 @@
+"""
+Incremental trend velocity index ("identify high-growth topics", functional.md).
+
+skill_fetch_trends only returns point-in-time ``score``/``observed_at``
+snapshots. This index consumes those snapshots as a stream and keeps, per
+(region, topic):
+
+* an exponentially-decayed score, velocity and acceleration, updated in O(1)
+* a ring of ``num_buckets`` time buckets holding the latest score seen as of
+  each bucket, so "growth over the last N minutes" is two array reads
+
+State lives in preallocated ``array`` slabs indexed by slot number, not in
+per-observation dicts. Topic slots are capped at ``max_topics`` with LRU
+recycling, so memory is fixed no matter how long the index runs.
+"""
+
+import math
+import time
+from array import array
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+
+from skills.contracts import parse_timestamp
+from skills.trend_merge import normalize_topic, top_k
+
+DEFAULT_BUCKET_SECONDS = 60.0
+DEFAULT_NUM_BUCKETS = 60
+DEFAULT_HALF_LIFE = 300.0
+DEFAULT_MAX_TOPICS = 10_000
+
+_NAN = float("nan")
+
+
+def _parse_ts(value: str) -> float:
+    return parse_timestamp(value).timestamp()
+
+
+class TrendVelocityIndex:
+    """Rolling, time-bucketed growth index over streamed trend observations."""
+
+    def __init__(
+        self,
+        *,
+        bucket_seconds: float = DEFAULT_BUCKET_SECONDS,
+        num_buckets: int = DEFAULT_NUM_BUCKETS,
+        half_life: float = DEFAULT_HALF_LIFE,
+        max_topics: int = DEFAULT_MAX_TOPICS,
+        clock: Callable[[], float] = time.time,
+    ):
+        if num_buckets < 2 or max_topics < 1 or bucket_seconds <= 0 or half_life <= 0:
+            raise ValueError("num_buckets >= 2, max_topics >= 1, bucket_seconds > 0 and half_life > 0 required")
+        self.bucket_seconds = bucket_seconds
+        self.num_buckets = num_buckets
+        self.half_life = half_life
+        self.max_topics = max_topics
+        self._tau = half_life / math.log(2)
+        self._clock = clock
+
+        self._ring = array("d", [_NAN]) * (max_topics * num_buckets)
+        self._score = array("d", bytes(8 * max_topics))
+        self._velocity = array("d", bytes(8 * max_topics))
+        self._accel = array("d", bytes(8 * max_topics))
+        self._last_value = array("d", bytes(8 * max_topics))
+        self._last_ts = array("d", bytes(8 * max_topics))
+        self._first_bucket = array("q", bytes(8 * max_topics))
+        self._last_bucket = array("q", bytes(8 * max_topics))
+
+        self._slots: OrderedDict[tuple[str, str], int] = OrderedDict()
+        self._topics: list[str | None] = [None] * max_topics
+        self._regions: dict[str, dict[str, int]] = {}
+        self._free = list(range(max_topics - 1, -1, -1))
+        self.stats = {"observations": 0, "late_dropped": 0, "evictions": 0}
+
+    @property
+    def window_seconds(self) -> float:
+        """Longest look-back the ring can answer."""
+        return self.bucket_seconds * (self.num_buckets - 1)
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def observe(self, region: str, topic: str, score: float, ts: float) -> None:
+        """Fold one ``score`` snapshot for ``topic`` observed at epoch ``ts``."""
+        self.stats["observations"] += 1
+        key = (region, normalize_topic(topic))
+        bucket = int(ts // self.bucket_seconds)
+        slot = self._slots.get(key)
+
+        if slot is None:
+            slot = self._allocate(key, topic)
+            self._score[slot] = score
+            self._velocity[slot] = 0.0
+            self._accel[slot] = 0.0
+            self._last_ts[slot] = ts
+            self._first_bucket[slot] = bucket
+            self._last_bucket[slot] = bucket
+        else:
+            self._slots.move_to_end(key)
+            last_bucket = self._last_bucket[slot]
+            if bucket < last_bucket or ts <= self._last_ts[slot]:
+                # Older than what we hold (an earlier bucket, or earlier in this one): the newer value stands.
+                self.stats["late_dropped"] += 1
+                return
+            # Carry the previous value forward over skipped buckets (bounded by the ring size).
+            base = slot * self.num_buckets
+            carried = self._last_value[slot]
+            for b in range(last_bucket + 1, min(bucket, last_bucket + self.num_buckets + 1)):
+                self._ring[base + b % self.num_buckets] = carried
+            self._last_bucket[slot] = bucket
+            self._fold(slot, score, ts)
+
+        self._last_value[slot] = score
+        self._ring[slot * self.num_buckets + bucket % self.num_buckets] = score
+
+    def observe_trends(self, region: str, trends: Iterable[dict]) -> None:
+        """Fold a skill_fetch_trends ``trends`` list (topic/score/observed_at)."""
+        for trend in trends:
+            self.observe(region, trend["topic"], float(trend["score"]), _parse_ts(trend["observed_at"]))
+
+    def fastest_growing(self, region: str, n: int, window_seconds: float, *, now: float | None = None) -> list[dict]:
+        """
+        Top-``n`` topics in ``region`` by score growth over the last ``window_seconds``.
+
+        Cost is one ring lookup per live topic in the region; history is never
+        rescanned. Topics first seen inside the window grow from zero.
+        """
+        if window_seconds > self.window_seconds:
+            raise ValueError(f"window_seconds exceeds the ring capacity of {self.window_seconds:g}s")
+        now = self._clock() if now is None else now
+        now_bucket = int(now // self.bucket_seconds)
+        start_bucket = now_bucket - int(math.ceil(window_seconds / self.bucket_seconds))
+        slots = self._regions.get(region, {})
+
+        def growth(slot: int) -> float:
+            return self._value_at(slot, now_bucket) - self._value_at(slot, start_bucket)
+
+        ranked = top_k(slots.values(), n, key=growth)
+        return [self._describe(slot, round(g, 6)) for g, slot in ranked]
+
+    def fastest_accelerating(self, region: str, n: int) -> list[dict]:
+        """Top-``n`` topics in ``region`` by decayed velocity."""
+        slots = self._regions.get(region, {})
+        ranked = top_k(slots.values(), n, key=lambda slot: self._velocity[slot])
+        return [self._describe(slot, None) for _, slot in ranked]
+
+    def snapshot(self, region: str, topic: str) -> dict | None:
+        slot = self._slots.get((region, normalize_topic(topic)))
+        return None if slot is None else self._describe(slot, None)
+
+    def _fold(self, slot: int, score: float, ts: float) -> None:
+        dt = ts - self._last_ts[slot]  # > 0: observe drops anything not newer
+        alpha = 1.0 - math.exp(-dt / self._tau)
+        prev_score, prev_velocity = self._score[slot], self._velocity[slot]
+        new_score = prev_score + alpha * (score - prev_score)
+        new_velocity = prev_velocity + alpha * ((new_score - prev_score) / dt - prev_velocity)
+        self._accel[slot] += alpha * ((new_velocity - prev_velocity) / dt - self._accel[slot])
+        self._score[slot] = new_score
+        self._velocity[slot] = new_velocity
+        self._last_ts[slot] = ts
+
+    def _value_at(self, slot: int, bucket: int) -> float:
+        if bucket < self._first_bucket[slot]:
+            return 0.0
+        if bucket >= self._last_bucket[slot]:
+            return self._last_value[slot]
+        if bucket <= self._last_bucket[slot] - self.num_buckets:
+            return self._ring[slot * self.num_buckets + (self._last_bucket[slot] + 1) % self.num_buckets]
+        return self._ring[slot * self.num_buckets + bucket % self.num_buckets]
+
+    def _allocate(self, key: tuple[str, str], topic: str) -> int:
+        if not self._free:
+            old_key, old_slot = self._slots.popitem(last=False)
+            del self._regions[old_key[0]][old_key[1]]
+            self.stats["evictions"] += 1
+            self._free.append(old_slot)
+        slot = self._free.pop()
+        base = slot * self.num_buckets
+        self._ring[base:base + self.num_buckets] = array("d", [_NAN]) * self.num_buckets
+        self._slots[key] = slot
+        self._topics[slot] = topic
+        self._regions.setdefault(key[0], {})[key[1]] = slot
+        return slot
+
+    def _describe(self, slot: int, growth: float | None) -> dict:
+        item = {
+            "topic": self._topics[slot],
+            "score": round(self._score[slot], 6),
+            "velocity": self._velocity[slot],
+            "acceleration": self._accel[slot],
+        }
+        if growth is not None:
+            item["growth"] = growth
+        return item
@@ -0,0 +1,155 @@
+"""
+Local stand-in for an MCP server, speaking newline-delimited JSON-RPC over TCP.
+
+Runs on 127.0.0.1 with an ephemeral port in a background thread. Implements
+``initialize``, ``tools/list`` and ``tools/call`` for three tools (``echo``,
+``sleep``, ``fail``). Every response is delayed by ``latency`` seconds to
+stand in for a network round-trip. Requests on one connection are served
+concurrently, as a real server may do.
+"""
+
+import json
+import socket
+import socketserver
+import threading
+import time
+
+TOOLS = [
+    {"name": "echo", "description": "Return the arguments", "inputSchema": {"type": "object"}},
+    {"name": "sleep", "description": "Sleep for `seconds`", "inputSchema": {"type": "object"}},
+    {"name": "fail", "description": "Always report a tool error", "inputSchema": {"type": "object"}},
+]
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def setup(self):
+        super().setup()
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.write_lock = threading.Lock()
+
+    def handle(self):
+        server = self.server
+        if not server.available:
+            return
+        with server.lock:
+            server.stats["connections"] += 1
+            server.handlers.add(self)
+        try:
+            while True:
+                line = self.rfile.readline()
+                if not line:
+                    return
+                message = json.loads(line)
+                if "id" in message:
+                    threading.Thread(target=self._answer, args=(message,), daemon=True).start()
+        except OSError:
+            pass
+        finally:
+            with server.lock:
+                server.handlers.discard(self)
+
+    def send(self, message: dict) -> None:
+        with self.write_lock:
+            self.wfile.write(json.dumps(message).encode() + b"\n")
+            self.wfile.flush()
+
+    def _answer(self, message: dict) -> None:
+        server = self.server
+        method, params = message["method"], message.get("params", {})
+        with server.lock:
+            server.stats["requests"] += 1
+            server.inflight += 1
+            server.stats["max_inflight"] = max(server.stats["max_inflight"], server.inflight)
+        try:
+            time.sleep(server.latency)
+            if method == "initialize":
+                with server.lock:
+                    server.stats["initializations"] += 1
+                result = {
+                    "protocolVersion": params.get("protocolVersion"),
+                    "capabilities": {"tools": {"listChanged": True}},
+                    "serverInfo": {"name": "mcp-standin", "version": "0"},
+                }
+            elif method == "tools/list":
+                with server.lock:
+                    server.stats["tools_list"] += 1
+                result = {"tools": TOOLS}
+            elif method == "tools/call":
+                with server.lock:
+                    server.stats["tool_calls"] += 1
+                name, args = params["name"], params.get("arguments", {})
+                if name == "sleep":
+                    time.sleep(args.get("seconds", 0))
+                if name == "fail":
+                    result = {"content": [{"type": "text", "text": "tool refused"}], "isError": True}
+                elif name in ("echo", "sleep"):
+                    result = {"content": [{"type": "text", "text": json.dumps(args)}], "isError": False}
+                else:
+                    self.send({"jsonrpc": "2.0", "id": message["id"], "error": {"code": -32602, "message": f"unknown tool {name}"}})
+                    return
+            else:
+                self.send({"jsonrpc": "2.0", "id": message["id"], "error": {"code": -32601, "message": "method not found"}})
+                return
+            self.send({"jsonrpc": "2.0", "id": message["id"], "result": result})
+        except (OSError, ValueError):  # client went away mid-request
+            pass
+        finally:
+            with server.lock:
+                server.inflight -= 1
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class McpStandIn:
+    """Context manager running the stand-in server; exposes ``port`` and ``stats``."""
+
+    def __init__(self, latency: float = 0.0):
+        self._server = _Server(("127.0.0.1", 0), _Handler)
+        self._server.latency = latency
+        self._server.available = True
+        self._server.lock = threading.Lock()
+        self._server.handlers = set()
+        self._server.inflight = 0
+        self._server.stats = {
+            "connections": 0,
+            "initializations": 0,
+            "tools_list": 0,
+            "tool_calls": 0,
+            "requests": 0,
+            "max_inflight": 0,
+        }
+        self.port = self._server.server_address[1]
+
+    @property
+    def stats(self) -> dict:
+        return self._server.stats
+
+    def notify_tools_changed(self) -> None:
+        with self._server.lock:
+            handlers = list(self._server.handlers)
+        for handler in handlers:
+            handler.send({"jsonrpc": "2.0", "method": "notifications/tools/list_changed"})
+
+    def set_available(self, available: bool) -> None:
+        """Take the server down (drops live connections, refuses new ones) or back up."""
+        self._server.available = available
+        if not available:
+            with self._server.lock:
+                handlers = list(self._server.handlers)
+            for handler in handlers:
+                try:
+                    handler.request.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+    def __enter__(self):
+        threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.set_available(False)
+        self._server.shutdown()
+        self._server.server_close()
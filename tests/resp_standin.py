@@ -0,0 +1,214 @@
+"""
+Local stand-in for a Redis server, speaking enough RESP2 for the task queue.
+
+Runs on 127.0.0.1 with an ephemeral port in a background thread. Supports
+only the LIST, ZSET and HASH commands RedisBackend issues, plus DEBUG SLEEP. There is no Lua
+interpreter: EVAL runs a Python port of each script the backend sends,
+looked up by its source, and like Redis runs it without interleaving.
+"""
+
+import json
+import re
+import socket
+import socketserver
+import threading
+import time
+
+
+class _Store:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.lists: dict[bytes, list[bytes]] = {}
+        self.zsets: dict[bytes, dict[bytes, float]] = {}
+        self.hashes: dict[bytes, dict[bytes, bytes]] = {}
+
+
+def _pop_and_lease(store: _Store, keys: list[bytes], argv: list[bytes]):
+    out = []
+    for lane, count in zip(keys[2:], argv[1:]):
+        popped = _run(store, [b"LPOP", lane, count])
+        for raw in popped if isinstance(popped, list) else ():
+            message = json.loads(raw)
+            raw = re.sub(rb'"attempts": \d+', b'"attempts": %d' % (message["attempts"] + 1), raw, count=1)
+            mid = message["id"].encode()
+            _run(store, [b"ZADD", keys[0], argv[0], mid])
+            _run(store, [b"HSET", keys[1], mid, raw])
+            out.append(raw)
+    return out
+
+
+def _requeue(store: _Store, keys: list[bytes], argv: list[bytes], ids: list[bytes]) -> list[int]:
+    lanes = dict(zip(argv[1 : len(keys) - 2], keys[3:]))
+    out = [0, 0]
+    for mid in reversed(ids):
+        raw = _run(store, [b"HGET", keys[1], mid])
+        _run(store, [b"HDEL", keys[1], mid])
+        if raw is None:
+            continue
+        message = json.loads(raw)
+        if message["attempts"] >= int(argv[0]):
+            _run(store, [b"RPUSH", keys[2], raw])
+            out[1] += 1
+        else:
+            _run(store, [b"LPUSH", lanes[message["priority"].encode()], raw])
+            out[0] += 1
+    return out
+
+
+def _reclaim(store: _Store, keys: list[bytes], argv: list[bytes]):
+    now, limit = argv[len(keys) - 2 :]
+    ids = _run(store, [b"ZRANGEBYSCORE", keys[0], b"-inf", now, b"LIMIT", b"0", limit])
+    for mid in ids:
+        _run(store, [b"ZREM", keys[0], mid])
+    return _requeue(store, keys, argv, ids)
+
+
+def _release(store: _Store, keys: list[bytes], argv: list[bytes]):
+    ids = list(dict.fromkeys(argv[len(keys) - 2 :]))
+    held = [mid for mid in ids if _run(store, [b"ZREM", keys[0], mid])]
+    return _requeue(store, keys, argv, held)
+
+
+def _scripts() -> dict:
+    from skills.task_queue import POP_AND_LEASE, RECLAIM, RELEASE
+
+    return {POP_AND_LEASE.encode(): _pop_and_lease, RECLAIM.encode(): _reclaim, RELEASE.encode(): _release}
+
+
+def _run(store: _Store, cmd: list[bytes]):
+    name, args = cmd[0].upper(), cmd[1:]
+    if name == b"EVAL":
+        script = _scripts().get(args[0])
+        if script is None:
+            return "-NOSCRIPT no Python port of this script"
+        n = int(args[1])
+        return script(store, args[2:2 + n], args[2 + n:])
+    if name == b"PING":
+        return "+PONG"
+    if name == b"FLUSHALL":
+        store.lists.clear()
+        store.zsets.clear()
+        store.hashes.clear()
+        return "+OK"
+    if name in (b"RPUSH", b"LPUSH"):
+        lst = store.lists.setdefault(args[0], [])
+        if name == b"RPUSH":
+            lst.extend(args[1:])
+        else:
+            lst[:0] = reversed(args[1:])
+        return len(lst)
+    if name == b"LPOP":
+        lst = store.lists.get(args[0])
+        if len(args) == 1:
+            return lst.pop(0) if lst else None
+        if not lst:
+            return "*-1"
+        count = int(args[1])
+        out, store.lists[args[0]] = lst[:count], lst[count:]
+        return out
+    if name == b"LINDEX":
+        lst = store.lists.get(args[0], [])
+        i = int(args[1])
+        return lst[i] if -len(lst) <= i < len(lst) else None
+    if name == b"LLEN":
+        return len(store.lists.get(args[0], []))
+    if name == b"ZADD":
+        zset = store.zsets.setdefault(args[0], {})
+        added = 0
+        for score, member in zip(args[1::2], args[2::2]):
+            added += member not in zset
+            zset[member] = float(score)
+        return added
+    if name == b"ZREM":
+        zset = store.zsets.get(args[0], {})
+        return sum(zset.pop(member, None) is not None for member in args[1:])
+    if name == b"ZCARD":
+        return len(store.zsets.get(args[0], {}))
+    if name == b"ZRANGEBYSCORE":
+        zset = store.zsets.get(args[0], {})
+        low, high = float(args[1]), float(args[2])
+        members = sorted((score, member) for member, score in zset.items() if low <= score <= high)
+        out = [member for _, member in members]
+        if len(args) >= 6 and args[3].upper() == b"LIMIT":
+            offset, count = int(args[4]), int(args[5])
+            out = out[offset:offset + count]
+        return out
+    if name == b"HSET":
+        h = store.hashes.setdefault(args[0], {})
+        added = 0
+        for field, value in zip(args[1::2], args[2::2]):
+            added += field not in h
+            h[field] = value
+        return added
+    if name == b"HGET":
+        return store.hashes.get(args[0], {}).get(args[1])
+    if name == b"HDEL":
+        h = store.hashes.get(args[0], {})
+        return sum(h.pop(field, None) is not None for field in args[1:])
+    return f"-ERR unknown command '{name.decode()}'"
+
+
+def _encode(reply) -> bytes:
+    if reply is None:
+        return b"$-1\r\n"
+    if isinstance(reply, str):
+        return reply.encode() + b"\r\n"
+    if isinstance(reply, int):
+        return b":%d\r\n" % reply
+    if isinstance(reply, bytes):
+        return b"$%d\r\n%s\r\n" % (len(reply), reply)
+    return b"*%d\r\n" % len(reply) + b"".join(_encode(item) for item in reply)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def setup(self):
+        super().setup()
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def handle(self):
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            count = int(line[1:-2])
+            cmd = []
+            for _ in range(count):
+                size = int(self.rfile.readline()[1:-2])
+                cmd.append(self.rfile.read(size + 2)[:-2])
+            if cmd[0].upper() == b"DEBUG" and cmd[1].upper() == b"SLEEP":
+                time.sleep(float(cmd[2]))  # outside the store lock, like a slow reply
+                reply = "+OK"
+            else:
+                with self.server.store.lock:
+                    self.server.calls += 1
+                    reply = _run(self.server.store, cmd)
+            self.wfile.write(_encode(reply))
+            self.wfile.flush()
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class RespStandIn:
+    """Context manager running the stand-in server; exposes ``port``."""
+
+    def __init__(self):
+        self._server = _Server(("127.0.0.1", 0), _Handler)
+        self._server.store = _Store()
+        self._server.calls = 0
+        self.port = self._server.server_address[1]
+
+    @property
+    def commands_served(self) -> int:
+        return self._server.calls
+
+    def __enter__(self):
+        threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
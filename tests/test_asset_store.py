@@ -0,0 +1,197 @@
+"""
+Tests for the content-addressed asset store and its skill wiring.
+"""
+
+import os
+import random
+
+import pytest
+
+SMALL = dict(avg_chunk=1024, min_chunk=256, max_chunk=4096)
+
+
+def media(size, seed=0):
+    return random.Random(seed).randbytes(size)
+
+
+@pytest.fixture
+def assets(tmp_path):
+    from skills.asset_store import AssetStore
+
+    return AssetStore(tmp_path / "assets", **SMALL)
+
+
+class TestChunking:
+    """Test suite for chunk_boundaries."""
+
+    def test_boundaries_respect_bounds_and_cover_input(self):
+        from skills.asset_store import chunk_boundaries
+
+        data = media(200_000)
+        ends = chunk_boundaries(data, avg_size=1024, min_size=256, max_size=4096)
+        sizes = [b - a for a, b in zip([0] + ends, ends)]
+
+        assert ends[-1] == len(data)
+        assert all(256 <= s <= 4096 for s in sizes[:-1])
+        assert 500 < sum(sizes) / len(sizes) < 3000
+
+    def test_boundaries_are_content_defined(self):
+        from skills.asset_store import chunk_boundaries
+
+        data = media(100_000)
+        shifted = b"inserted prefix" + data
+        a = set(chunk_boundaries(data, avg_size=1024, min_size=256, max_size=4096))
+        b = {e - 15 for e in chunk_boundaries(shifted, avg_size=1024, min_size=256, max_size=4096)}
+
+        assert len(a & b) >= 0.9 * len(a)
+
+    def test_rejects_bad_sizes(self):
+        from skills.asset_store import chunk_boundaries
+
+        with pytest.raises(ValueError):
+            chunk_boundaries(b"x", avg_size=1000)
+
+
+class TestAssetStore:
+    """Test suite for AssetStore."""
+
+    def test_round_trip_is_zero_copy(self, assets):
+        data = media(50_000)
+        assets.put("vid_a", data)
+
+        with assets.open("vid_a") as reader:
+            views = list(reader.chunks())
+            assert all(isinstance(v, memoryview) and v.readonly for v in views)
+            assert b"".join(views) == data
+            assert b"".join(reader.read(10_000, 5_000)) == data[10_000:15_000]
+            del views
+
+    def test_identical_and_edited_assets_deduplicate(self, assets):
+        data = media(100_000)
+        first = assets.put("vid_a", data)
+        again = assets.put("vid_b", data)
+        edited = assets.put("vid_c", data[:50_000] + b"new frame" + data[50_000:])
+
+        assert first["new_bytes"] == len(data)
+        assert again["new_chunks"] == 0
+        assert edited["new_bytes"] < 10_000
+        stats = assets.stats()
+        assert stats["logical_bytes"] == 3 * len(data) + 9
+        assert stats["dedup_ratio"] > 2.5
+
+    def test_put_file_uses_mmap(self, assets, tmp_path):
+        path = tmp_path / "clip.mp4"
+        path.write_bytes(media(30_000, seed=3))
+        assets.put_file("vid_f", path)
+        (tmp_path / "empty").write_bytes(b"")
+        assets.put_file("vid_empty", tmp_path / "empty")
+
+        with assets.open("vid_f") as reader:
+            assert b"".join(reader.chunks()) == path.read_bytes()
+        assert len(assets.open("vid_empty")) == 0
+
+    def test_gc_keeps_shared_chunks_and_honours_grace(self, assets):
+        shared = media(40_000)
+        assets.put("vid_a", shared + media(20_000, seed=1))
+        assets.put("vid_b", shared)
+        assets.delete("vid_a")
+
+        assert assets.gc()["deleted_chunks"] == 0  # still inside the grace period
+        swept = assets.gc(grace_seconds=-1)
+        assert swept["deleted_chunks"] > 0
+        with assets.open("vid_b") as reader:
+            assert b"".join(reader.chunks()) == shared
+        assert assets.stats()["stored_bytes"] == len(shared)
+
+    def test_gc_waits_for_a_put_that_reuses_orphaned_chunks(self, tmp_path):
+        import threading
+
+        from skills.asset_store import AssetStore, FilesystemBackend
+
+        touched, resume = threading.Event(), threading.Event()
+
+        class PausingBackend(FilesystemBackend):
+            def touch_chunk(self, digest):
+                super().touch_chunk(digest)
+                touched.set()
+                resume.wait(5)  # the put stalls between reusing a chunk and writing its manifest
+
+        store = AssetStore(PausingBackend(tmp_path / "assets"), **SMALL)
+        data = media(20_000)
+        store.put("vid_old", data)
+        store.delete("vid_old")  # every chunk is now unreferenced
+
+        put = threading.Thread(target=store.put, args=("vid_new", data))
+        put.start()
+        assert touched.wait(5)
+        gc = threading.Thread(target=store.gc, kwargs={"grace_seconds": -1})
+        gc.start()
+        gc.join(0.1)
+        assert gc.is_alive()  # held back until the put's manifest lands
+        resume.set()
+        put.join(5)
+        gc.join(5)
+
+        with store.open("vid_new") as reader:
+            assert b"".join(reader.chunks()) == data
+
+    def test_delete_of_a_pinned_asset_waits_for_the_last_unpin(self, assets):
+        assets.put("vid_a", media(10_000))
+        assets.pin("vid_a")
+        assets.pin("vid_a")
+
+        assert assets.delete("vid_a")
+        assert not assets.delete("vid_a")
+        assets.gc(grace_seconds=-1)
+        assets.unpin("vid_a")
+        with assets.open("vid_a") as reader:
+            assert len(reader) == 10_000
+        assets.unpin("vid_a")
+
+        assert not assets.exists("vid_a")
+        assert assets.gc(grace_seconds=-1)["deleted_chunks"] > 0
+
+    def test_unknown_and_invalid_ids(self, assets):
+        assert not assets.exists("vid_missing")
+        with pytest.raises(KeyError):
+            assets.open("vid_missing")
+        with pytest.raises(ValueError):
+            assets.put("../escape", b"x")
+
+
+class TestSkillWiring:
+    """Render ingestion and skill_publish_video reads."""
+
+    def test_render_ingests_and_publish_streams_from_store(self, tmp_path, assets):
+        from skills import publish_video
+        from skills.render import FileObjectStore, RenderEngine
+
+        store = FileObjectStore(tmp_path / "objects")
+        with RenderEngine(store, max_workers=1, fps=2, frame_bytes=512, assets=assets) as engine:
+            job = engine.render("vid_r", "one two three four five six", 4.0)
+        assert job.generation_metadata()["asset"]["size"] == sum(c["bytes"] for c in job.manifest["chunks"])
+
+        received = []
+
+        def publisher(post):
+            received.append(b"".join(post["media"].chunks()))
+            return "post_1"
+
+        publish_video.set_publisher(publisher)
+        publish_video.set_asset_store(assets)
+        try:
+            ok = publish_video.skill_publish_video(
+                platform="tiktok", video_asset_id="vid_r", caption="c", hashtags=[], schedule_time=None
+            )
+            missing = publish_video.skill_publish_video(
+                platform="tiktok", video_asset_id="vid_none", caption="c", hashtags=[], schedule_time=None
+            )
+        finally:
+            publish_video.set_publisher(None)
+            publish_video.set_asset_store(None)
+
+        assert ok["publication_status"] == "SUCCESS"
+        assert received == [b"".join(store.get(c["key"]) for c in job.manifest["chunks"])]
+        assert missing["publication_status"] == "FAILED"
+        assert missing["error"]["code"] == "ASSET_NOT_FOUND"
+        assert os.listdir(tmp_path / "assets" / "assets") == ["vid_r.json"]
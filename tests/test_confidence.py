@@ -0,0 +1,101 @@
+"""
+Tests for the incremental per-agent confidence aggregator.
+"""
+
+import random
+import statistics
+
+import pytest
+
+
+class TestConfidenceAggregator:
+    """Test suite for ConfidenceAggregator."""
+
+    def test_windowed_mean_matches_full_recompute(self):
+        from skills.confidence import ConfidenceAggregator
+
+        agg = ConfidenceAggregator(window=10)
+        rng = random.Random(1)
+        history = {"a": [], "b": []}
+        for _ in range(1000):
+            agent = rng.choice("ab")
+            score = rng.random()
+            history[agent].append(score)
+            agg.observe(agent, score)
+
+        for agent, scores in history.items():
+            assert agg.mean(agent) == pytest.approx(statistics.fmean(scores[-10:]), abs=1e-12)
+            assert agg.count(agent) == 10
+
+    def test_partial_window(self):
+        from skills.confidence import ConfidenceAggregator
+
+        agg = ConfidenceAggregator(window=5)
+        assert agg.observe("a", 0.8) == pytest.approx(0.8)
+        assert agg.observe("a", 0.6) == pytest.approx(0.7)
+        assert agg.count("a") == 2
+        assert agg.mean("unknown") is None
+
+    def test_ewma(self):
+        from skills.confidence import ConfidenceAggregator
+
+        agg = ConfidenceAggregator(alpha=0.5, kind="ewma")
+        agg.observe("a", 1.0)
+        agg.observe("a", 0.0)
+        agg.observe("a", 1.0)
+
+        assert agg.confidence_avg("a") == pytest.approx(0.75)
+
+    def test_invalid_scores_and_options(self):
+        from skills.confidence import ConfidenceAggregator
+
+        agg = ConfidenceAggregator()
+        for bad in (-0.1, 1.5, float("nan")):
+            with pytest.raises(ValueError):
+                agg.observe("a", bad)
+        assert "a" not in agg
+        with pytest.raises(ValueError):
+            ConfidenceAggregator(kind="median")
+        with pytest.raises(ValueError):
+            ConfidenceAggregator(window=0)
+
+    def test_checkpoint_round_trip_then_replay(self, tmp_path):
+        from skills.confidence import ConfidenceAggregator
+
+        rng = random.Random(2)
+        results = [(f"r{i:05d}", f"agent-{rng.randrange(20)}", rng.random()) for i in range(3000)]
+        live = ConfidenceAggregator(window=50)
+        live.observe_many((agent, score) for _, agent, score in results[:2000])
+        live.checkpoint(tmp_path / "confidence.ckpt", watermark=results[1999][0])
+        live.observe_many((agent, score) for _, agent, score in results[2000:])
+
+        recovered, watermark = ConfidenceAggregator.restore(tmp_path / "confidence.ckpt")
+        assert recovered.observations == 2000 and watermark == "r01999"
+        recovered.observe_many((agent, score) for rid, agent, score in results if rid > watermark)
+
+        assert recovered.snapshot() == live.snapshot()
+        assert {a: recovered.ewma(a) for a in recovered.snapshot()} == {a: live.ewma(a) for a in live.snapshot()}
+
+    def test_corrupt_checkpoint(self):
+        from skills.confidence import ConfidenceAggregator
+
+        agg = ConfidenceAggregator(window=4)
+        agg.observe("a", 0.5)
+        data = agg.to_bytes()
+
+        with pytest.raises(ValueError):
+            ConfidenceAggregator.from_bytes(b"nope" + data)
+        with pytest.raises(ValueError):
+            ConfidenceAggregator.from_bytes(data[:-3])
+        assert ConfidenceAggregator.from_bytes(data)[1] is None
+
+    def test_state_is_fixed_size_per_agent(self):
+        from skills.confidence import ConfidenceAggregator
+
+        agg = ConfidenceAggregator(window=8)
+        agg.observe("a", 0.5)
+        size = len(agg.to_bytes())
+        for _ in range(10_000):
+            agg.observe("a", 0.9)
+
+        assert len(agg.to_bytes()) == size + len(str(10_000)) - 1
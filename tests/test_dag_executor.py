@@ -0,0 +1,421 @@
+"""
+Tests for bounded-concurrency execution of Planner task DAGs.
+"""
+
+import asyncio
+
+import pytest
+
+
+def task(tid, task_type="generate_content", priority="medium"):
+    from skills.models import Task
+
+    return Task(task_id=tid, task_type=task_type, priority=priority, goal=f"goal {tid}")
+
+
+class Recorder:
+    """Async handler that records start order and live concurrency."""
+
+    def __init__(self, delay=0.01, fail=()):
+        self.delay = delay
+        self.fail = set(fail)
+        self.live = 0
+        self.peak = 0
+        self.order = []
+
+    async def __call__(self, t):
+        self.order.append(t.task_id)
+        self.live += 1
+        self.peak = max(self.peak, self.live)
+        try:
+            await asyncio.sleep(self.delay)
+            if t.task_id in self.fail:
+                raise RuntimeError(f"{t.task_id} broke")
+            return f"done:{t.task_id}"
+        finally:
+            self.live -= 1
+
+
+class TestTaskGraph:
+    """Test suite for TaskGraph structure checks."""
+
+    def test_cycle_detected(self):
+        from skills.dag_executor import TaskGraph
+
+        graph = TaskGraph()
+        graph.add(task("a"), depends_on=["b"])
+        graph.add(task("b"), depends_on=["a"])
+        with pytest.raises(ValueError, match="cycle"):
+            graph.topological_order()
+
+    def test_unknown_dependency(self):
+        from skills.dag_executor import TaskGraph
+
+        graph = TaskGraph()
+        graph.add(task("a"), depends_on=["ghost"])
+        with pytest.raises(ValueError, match="ghost"):
+            graph.topological_order()
+
+    def test_bottom_levels(self):
+        from skills.dag_executor import TaskGraph
+
+        graph = TaskGraph()
+        graph.add(task("a"), cost=1)
+        graph.add(task("b"), depends_on=["a"], cost=5)
+        graph.add(task("c"), depends_on=["a"], cost=1)
+        assert graph.bottom_levels() == {"a": 6, "b": 5, "c": 1}
+
+
+class TestDagExecutor:
+    """Test suite for DagExecutor scheduling."""
+
+    async def test_dependencies_respected(self):
+        from skills.dag_executor import DagExecutor, TaskGraph
+
+        graph = TaskGraph()
+        graph.add(task("trend"))
+        graph.add(task("script"), depends_on=["trend"])
+        graph.add(task("video", "render_video"), depends_on=["script"])
+        recorder = Recorder()
+
+        run = await DagExecutor({"generate_content": recorder, "render_video": recorder}).run(graph)
+
+        assert run.ok
+        assert recorder.order == ["trend", "script", "video"]
+        assert run.results["video"] == "done:video"
+
+    async def test_per_type_limits(self):
+        from skills.dag_executor import DagExecutor, TaskGraph
+
+        graph = TaskGraph()
+        for i in range(12):
+            graph.add(task(f"r{i}", "render_video"))
+        for i in range(12):
+            graph.add(task(f"p{i}", "reply"))
+        render, reply = Recorder(), Recorder()
+
+        run = await DagExecutor(
+            {"render_video": render, "reply": reply}, limits={"render_video": 2, "reply": 6}
+        ).run(graph)
+
+        assert render.peak == 2 and reply.peak == 6
+        assert run.peak_concurrency == {"render_video": 2, "reply": 6}
+        assert len(run.results) == 24
+
+    async def test_critical_path_scheduled_first(self):
+        from skills.dag_executor import DagExecutor, TaskGraph
+
+        graph = TaskGraph()
+        graph.add(task("short", priority="high"), cost=1)
+        graph.add(task("long_head"), cost=1)
+        graph.add(task("long_tail"), depends_on=["long_head"], cost=10)
+        recorder = Recorder()
+
+        await DagExecutor({"generate_content": recorder}, limits={"generate_content": 1}).run(graph)
+
+        assert recorder.order[0] == "long_head"
+
+    async def test_priority_breaks_ties(self):
+        from skills.dag_executor import DagExecutor, TaskGraph
+
+        graph = TaskGraph()
+        graph.add(task("low", priority="low"))
+        graph.add(task("high", priority="high"))
+        recorder = Recorder()
+
+        await DagExecutor({"generate_content": recorder}, limits={"generate_content": 1}).run(graph)
+
+        assert recorder.order == ["high", "low"]
+
+    async def test_failure_skips_descendants_only(self):
+        from skills.dag_executor import DagExecutor, TaskGraph
+
+        graph = TaskGraph()
+        graph.add(task("a"))
+        graph.add(task("b"), depends_on=["a"])
+        graph.add(task("c"), depends_on=["b"])
+        graph.add(task("other"))
+
+        run = await DagExecutor({"generate_content": Recorder(fail={"a"})}).run(graph)
+
+        assert not run.ok
+        assert run.errors == {"a": {"code": "RuntimeError", "message": "a broke"}}
+        assert run.skipped == {"b", "c"}
+        assert "other" in run.results
+
+    async def test_sync_handlers_and_missing_handler(self):
+        from skills.dag_executor import DagExecutor, TaskGraph
+
+        graph = TaskGraph()
+        graph.add(task("x"))
+        graph.add(task("pay", "transact"))
+
+        run = await DagExecutor({"generate_content": lambda t: t.goal.upper()}).run(graph)
+
+        assert run.results == {"x": "GOAL X"}
+        assert run.errors["pay"]["code"] == "NO_HANDLER"
+
+    async def test_global_cap(self):
+        from skills.dag_executor import DagExecutor, TaskGraph
+
+        graph = TaskGraph()
+        for i in range(10):
+            graph.add(task(f"g{i}"))
+            graph.add(task(f"r{i}", "reply"))
+        recorder = Recorder()
+
+        await DagExecutor({"generate_content": recorder, "reply": recorder}, max_concurrency=3).run(graph)
+
+        assert recorder.peak == 3
+
+    async def test_wide_graph_runs_in_parallel(self):
+        from skills.dag_executor import DagExecutor, TaskGraph
+
+        graph = TaskGraph()
+        for i in range(200):
+            graph.add(task(f"n{i}", "reply"))
+
+        run = await DagExecutor({"reply": Recorder(delay=0.05)}, limits={"reply": 200}).run(graph)
+
+        assert len(run.results) == 200
+        assert run.elapsed < 1.0
+
+
+    async def test_sync_handlers_reach_limits_above_the_default_executor(self):
+        import threading
+
+        from skills.dag_executor import DagExecutor, TaskGraph
+
+        graph = TaskGraph()
+        for i in range(64):
+            graph.add(task(f"n{i}", "reply"))
+        barrier = threading.Barrier(64)
+
+        def handler(t):
+            barrier.wait(5)  # breaks unless all 64 run at once
+            return t.task_id
+
+        with DagExecutor({"reply": handler}, limits={"reply": 64}) as executor:
+            run = await executor.run(graph)
+
+        assert run.ok and len(run.results) == 64
+
+
+class Gated:
+    """Async handler whose tasks finish only when their gate is opened."""
+
+    def __init__(self):
+        self.gates = {}
+        self.calls = []
+
+    def gate(self, tid):
+        return self.gates.setdefault(tid, asyncio.Event())
+
+    async def __call__(self, t):
+        self.calls.append(t.task_id)
+        await self.gate(t.task_id).wait()
+        return f"{t.goal}"
+
+    def open(self, *tids):
+        for tid in tids:
+            self.gate(tid).set()
+
+
+async def until(predicate):
+    for _ in range(200):
+        if predicate():
+            return
+        await asyncio.sleep(0)
+    raise AssertionError("condition not reached")
+
+
+def chain_graph():
+    from skills.dag_executor import TaskGraph
+
+    graph = TaskGraph()
+    graph.add(task("trend"))
+    graph.add(task("script"), depends_on=["trend"])
+    graph.add(task("video"), depends_on=["script"])
+    graph.add(task("side"))
+    return graph
+
+
+class TestReplanning:
+    """Test suite for RunningDag.replan and diff."""
+
+    def test_diff_classifies_nodes(self):
+        from skills.dag_executor import diff
+
+        old, new = chain_graph(), chain_graph()
+        new.replace(task("script", priority="high"), ["trend"])
+        new.replace(task("video"), ["script", "side"])
+        new.remove(["video"])
+        new.remove(["side"])
+        new.add(task("thumb"), depends_on=["script"])
+
+        delta = diff(old, new)
+
+        assert delta.added == ["thumb"]
+        assert delta.reprioritised == ["script"]
+        assert sorted(delta.removed) == ["side", "video"]
+        assert delta.changed == []
+
+    async def test_unchanged_nodes_keep_running_and_results(self):
+        from skills.dag_executor import DagExecutor
+
+        handler = Gated()
+        running = DagExecutor({"generate_content": handler}).start(chain_graph())
+        waiter = asyncio.ensure_future(running.wait())
+        handler.open("trend")
+        await until(lambda: running.state("script") == "running")
+
+        plan = chain_graph()
+        plan.add(task("thumb"), depends_on=["trend"])
+        stats = running.replan(plan)
+        handler.open("script", "video", "side", "thumb")
+        run = await waiter
+
+        assert stats["added"] == 1 and stats["invalidated"] == 0
+        assert run.ok and set(run.results) == {"trend", "script", "video", "side", "thumb"}
+        assert handler.calls.count("trend") == 1 and handler.calls.count("script") == 1
+
+    async def test_changed_node_invalidates_started_dependants_only(self):
+        from skills.dag_executor import DagExecutor
+        from skills.models import Task
+
+        handler = Gated()
+        running = DagExecutor({"generate_content": handler}).start(chain_graph())
+        waiter = asyncio.ensure_future(running.wait())
+        handler.open("trend", "script", "side")
+        await until(lambda: "video" in handler.calls)
+
+        plan = chain_graph()
+        plan.replace(Task("script", "generate_content", goal="new angle"), ["trend"])
+        stats = running.replan(plan)
+        handler.open("video")
+        run = await waiter
+
+        assert stats["changed"] == 1 and stats["cancelled"] == 1 and stats["invalidated"] == 2
+        assert run.cancelled == {"video"}
+        assert run.results["script"] == "new angle"
+        assert handler.calls.count("trend") == 1 and handler.calls.count("side") == 1
+        assert handler.calls.count("script") == 2 and handler.calls.count("video") == 2
+
+    async def test_removed_subtree_is_cancelled(self):
+        from skills.dag_executor import DagExecutor
+
+        handler = Gated()
+        running = DagExecutor({"generate_content": handler}).start(chain_graph())
+        waiter = asyncio.ensure_future(running.wait())
+        handler.open("trend")
+        await until(lambda: running.state("script") == "running")
+
+        plan = chain_graph()
+        plan.remove(["script", "video"])
+        stats = running.replan(plan)
+        handler.open("side")
+        run = await waiter
+
+        assert stats["removed"] == 2 and stats["cancelled"] == 1
+        assert run.removed == {"script", "video"} and run.cancelled == {"script"}
+        assert set(run.results) == {"trend", "side"}
+        assert "script" not in running.graph.tasks
+
+    async def test_reprioritise_queued_task_in_place(self):
+        from skills.dag_executor import DagExecutor, TaskGraph
+
+        graph = TaskGraph()
+        for tid in ("first", "a", "b", "c"):
+            graph.add(task(tid))
+        handler = Gated()
+        running = DagExecutor({"generate_content": handler}, limits={"generate_content": 1}).start(graph)
+        waiter = asyncio.ensure_future(running.wait())
+        await until(lambda: handler.calls == ["first"])
+
+        plan = TaskGraph()
+        for tid in ("first", "a", "b"):
+            plan.add(graph.tasks[tid])
+        plan.add(task("c", priority="high"))
+        assert running.replan(plan)["reprioritised"] == 1
+        handler.open("first", "a", "b", "c")
+        await waiter
+
+        assert handler.calls == ["first", "c", "a", "b"]
+
+    async def test_replan_retries_failed_node_and_unskips(self):
+        from skills.dag_executor import DagExecutor
+        from skills.models import Task
+
+        side_done = asyncio.Event()
+
+        async def handler(t):
+            if t.task_id == "side":
+                await side_done.wait()  # keeps the run open while it is replanned
+            if t.goal == "goal trend":
+                raise RuntimeError("no trends")
+            return t.goal
+
+        running = DagExecutor({"generate_content": handler}).start(chain_graph())
+        waiter = asyncio.ensure_future(running.wait())
+        await until(lambda: running.state("trend") == "failed")
+        assert running.state("video") == "skipped"
+
+        plan = chain_graph()
+        plan.replace(Task("trend", "generate_content", goal="retry"), [])
+        running.replan(plan)
+        side_done.set()
+        run = await waiter
+
+        assert run.ok and run.results["trend"] == "retry" and "video" in run.results
+
+    async def test_invalid_replans_rejected_without_changes(self):
+        from skills.dag_executor import DagExecutor, PlanDelta, TaskGraph
+
+        running = DagExecutor({"generate_content": Gated()}).start(chain_graph())
+        cyclic = TaskGraph()
+        cyclic.add(task("trend"), depends_on=["video"])
+        dangling = TaskGraph()
+        dangling.add(task("extra"), depends_on=["ghost"])
+
+        with pytest.raises(ValueError, match="cycle"):
+            running.replan(PlanDelta(cyclic, changed=["trend"]))
+        with pytest.raises(ValueError, match="ghost"):
+            running.replan(PlanDelta(dangling, added=["extra"]))
+        with pytest.raises(ValueError, match="still depends"):
+            running.replan(PlanDelta(TaskGraph(), removed=["script"]))
+        assert running.graph.deps["trend"] == () and running.state("trend") == "ready"
+
+    async def test_random_replans_converge_to_final_plan(self):
+        import random
+
+        from skills.dag_executor import DagExecutor, TaskGraph
+        from skills.models import Task
+
+        rng = random.Random(7)
+
+        def random_plan(n, version):
+            graph = TaskGraph()
+            for i in range(n):
+                deps = rng.sample(range(i), k=min(i, rng.randint(0, 2)))
+                goal = f"v{version}" if rng.random() < 0.3 else "v0"
+                graph.add(Task(f"n{i}", "generate_content", rng.choice(("high", "low")), goal), [f"n{d}" for d in deps])
+            return graph
+
+        async def handler(t):
+            await asyncio.sleep(rng.random() / 1000)
+            return t.goal
+
+        running = DagExecutor({"generate_content": handler}, limits={"generate_content": 4}).start(random_plan(60, 0))
+        waiter = asyncio.ensure_future(running.wait())
+        plan = None
+        for version in range(1, 8):
+            await asyncio.sleep(rng.random() / 500)
+            if waiter.done():
+                break
+            plan = random_plan(rng.randint(40, 80), version)
+            running.replan(plan)
+        run = await waiter
+
+        assert run.ok and run.replans >= 3
+        final = plan.tasks if plan is not None else running.graph.tasks
+        assert {tid: r for tid, r in run.results.items() if tid in final} == {tid: t.goal for tid, t in final.items()}
@@ -0,0 +1,193 @@
+"""
+Tests for the coalesced OpenClaw heartbeat service (simulated clock).
+"""
+
+import asyncio
+import json
+import random
+
+import pytest
+
+
+class FakeClock:
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def service(clock, **kwargs):
+    from skills.heartbeat import HeartbeatService, hmac_signer
+
+    sent = []
+    hb = HeartbeatService(sent.append, hmac_signer(b"k"), clock=clock, rng=random.Random(7), **kwargs)
+    return hb, sent
+
+
+def run_for(hb, clock, seconds):
+    published = 0
+    for _ in range(int(seconds)):
+        clock.now += 1
+        published += hb.tick()
+    return published
+
+
+class TestTimingWheel:
+    """Test suite for TimingWheel."""
+
+    def test_fires_after_delay_including_rounds(self):
+        from skills.heartbeat import TimingWheel
+
+        wheel = TimingWheel(slots=4)
+        wheel.schedule("a", 2)
+        wheel.schedule("b", 9)
+        fired = {i: wheel.advance() for i in range(1, 10)}
+
+        assert fired[2] == ["a"]
+        assert fired[9] == ["b"]
+        assert sum(len(v) for v in fired.values()) == 2
+        assert len(wheel) == 0
+
+    def test_cancel_and_reschedule(self):
+        from skills.heartbeat import TimingWheel
+
+        wheel = TimingWheel(slots=4)
+        wheel.schedule("a", 1)
+        wheel.schedule("a", 3)
+        assert wheel.advance() == []
+        wheel.cancel("a")
+        assert "a" not in wheel
+        assert wheel.advance() == [] and wheel.advance() == []
+
+
+class TestHeartbeatService:
+    """Test suite for HeartbeatService."""
+
+    def test_every_agent_heartbeats_once_per_interval_spread_out(self):
+        clock = FakeClock()
+        hb, sent = service(clock, jitter=0.0)
+        for i in range(600):
+            hb.register(f"a{i}", capabilities=["content"])
+
+        per_tick = [run_for(hb, clock, 1) for _ in range(60)]
+
+        assert sum(per_tick) == 600
+        assert max(per_tick) < 30  # no herd: ~10 per tick on average
+        assert {p["agent_id"] for env in sent for p in env["payloads"]} == {f"a{i}" for i in range(600)}
+
+    def test_unchanged_status_is_not_republished_until_keepalive(self):
+        clock = FakeClock()
+        hb, sent = service(clock, keepalive=300)
+        hb.register("a1")
+        run_for(hb, clock, 70)
+        assert hb.stats()["published"] == 1
+
+        run_for(hb, clock, 120)
+        assert hb.stats()["published"] == 1
+        assert hb.stats()["unchanged"] >= 1
+
+        run_for(hb, clock, 300)
+        assert hb.stats()["keepalives"] >= 1
+
+    def test_change_is_published_on_next_slot(self):
+        clock = FakeClock()
+        hb, sent = service(clock)
+        hb.register("a1", confidence_avg=0.8)
+        run_for(hb, clock, 70)
+        hb.update("a1", state="working", confidence_avg=0.85)
+        run_for(hb, clock, 70)
+
+        assert [env["payloads"][0]["state"] for env in sent] == ["idle", "working"]
+        assert sent[-1]["payloads"][0]["confidence_avg"] == 0.85
+
+    def test_setting_same_value_is_not_a_change(self):
+        clock = FakeClock()
+        hb, _ = service(clock)
+        hb.register("a1", capabilities=["content", "commerce"])
+        run_for(hb, clock, 70)
+        hb.update("a1", capabilities=["commerce", "content"], state="idle")
+        run_for(hb, clock, 70)
+
+        assert hb.stats()["published"] == 1
+
+    def test_batch_is_signed_once_and_verifies(self):
+        from skills.heartbeat import hmac_signer, verify_batch
+
+        clock = FakeClock()
+        hb, sent = service(clock, tick_seconds=60, interval=60)
+        for i in range(10):
+            hb.register(f"a{i}")
+        run_for(hb, clock, 60)
+
+        assert len(sent) == 1 and len(sent[0]["payloads"]) == 10
+        assert verify_batch(sent[0], hmac_signer(b"k"))
+        sent[0]["payloads"][3]["state"] = "working"
+        assert not verify_batch(sent[0], hmac_signer(b"k"))
+
+    def test_batches_split_at_batch_size(self):
+        clock = FakeClock()
+        hb, sent = service(clock, tick_seconds=60, interval=60, batch_size=4)
+        for i in range(10):
+            hb.register(f"a{i}")
+        run_for(hb, clock, 60)
+
+        assert [len(env["payloads"]) for env in sent] == [4, 4, 2]
+
+    def test_reads_come_from_preserialised_snapshot(self):
+        clock = FakeClock()
+        hb, _ = service(clock)
+        hb.register("a1", state="working", capabilities=["content"], confidence_avg=0.92)
+        hb.register("a2")
+        assert hb.read("agent://status/a1") is None  # not yet snapshotted
+
+        run_for(hb, clock, 1)
+        body = hb.read("agent://status/a1")
+        assert isinstance(body, bytes)
+        assert json.loads(body) == {
+            "agent_id": "a1",
+            "state": "working",
+            "capabilities": ["content"],
+            "confidence_avg": 0.92,
+            "current_bid_price": None,
+        }
+        assert {s["agent_id"] for s in json.loads(hb.read("agent://status/*"))} == {"a1", "a2"}
+        with pytest.raises(ValueError):
+            hb.read("mcp://media/x")
+
+    def test_operator_can_disable_broadcast(self):
+        clock = FakeClock()
+        hb, sent = service(clock)
+        hb.register("a1")
+        hb.set_broadcast("a1", False)
+        run_for(hb, clock, 120)
+
+        assert sent == []
+        assert hb.read("agent://status/a1") is None
+
+        hb.set_broadcast("a1", True)
+        run_for(hb, clock, 70)
+        assert len(sent) == 1
+
+    def test_invalid_updates(self):
+        clock = FakeClock()
+        hb, _ = service(clock)
+        hb.register("a1")
+        with pytest.raises(ValueError):
+            hb.update("a1", state="busy")
+        with pytest.raises(ValueError):
+            hb.update("a1", wallet="0x0")
+
+    async def test_run_loop_stops(self):
+        from skills.heartbeat import HeartbeatService, hmac_signer
+
+        sent = []
+        hb = HeartbeatService(sent.append, hmac_signer(b"k"), interval=0.05, tick_seconds=0.01)
+        hb.register("a1")
+        stop = asyncio.Event()
+        task = asyncio.create_task(hb.run(stop))
+        await asyncio.sleep(0.12)
+        stop.set()
+        await asyncio.wait_for(task, 1)
+
+        assert len(sent) == 1
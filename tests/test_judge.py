@@ -0,0 +1,159 @@
+"""
+Tests for the vectorised batch Judge and the HITL routing table.
+"""
+
+import numpy as np
+import pytest
+
+
+def result(tid, confidence, flags=(), persona=None):
+    from skills.models import Result
+
+    return Result(task_id=tid, output="x", confidence_score=confidence, safety_flags=list(flags), persona_id=persona)
+
+
+class TestRoutingTable:
+    """Test suite for the approval logic in research/architecture_strategy.md."""
+
+    @pytest.mark.parametrize(
+        "confidence, expected",
+        [
+            (0.95, "approve"),
+            (0.90, "escalate"),
+            (0.80, "escalate"),
+            (0.70, "escalate"),
+            (0.50, "escalate"),
+        ],
+    )
+    def test_confidence_thresholds(self, confidence, expected):
+        from skills.judge import Judge
+
+        assert Judge().judge_one(result("t", confidence)).decision == expected
+
+    def test_review_lane_in_reason(self):
+        from skills.judge import Judge
+
+        decisions = Judge().judge([result("a", 0.95), result("b", 0.8), result("c", 0.5)])
+
+        assert [d.reason.split(":")[0] for d in decisions] == ["auto_approved", "async_review", "mandatory_review"]
+
+    def test_sensitive_topic_forces_mandatory_review(self):
+        from skills.judge import Judge
+
+        decision = Judge().judge_one(result("t", 0.99, flags=["political"]))
+
+        assert decision.decision == "escalate"
+        assert decision.reason.startswith("mandatory_review")
+
+    def test_nan_confidence_is_never_approved(self):
+        from skills.judge import Judge
+
+        assert Judge().judge_one(result("t", float("nan"))).reason.startswith("mandatory_review")
+
+    def test_decisions_match_contract(self):
+        from skills.judge import Judge
+
+        decision = Judge().judge_one(result("task-1", 0.95))
+        assert set(decision.to_dict()) == {"task_id", "decision", "reason"}
+        assert decision.task_id == "task-1"
+
+
+class TestPersonaPolicies:
+    """Test suite for per-persona thresholds and blocked flags."""
+
+    def test_per_persona_thresholds(self):
+        from skills.judge import Judge, PersonaPolicy
+
+        judge = Judge({"strict": PersonaPolicy(auto_approve=0.98, human_review=0.85)})
+        decisions = judge.judge([result("a", 0.95, persona="strict"), result("b", 0.95, persona="other")])
+
+        assert [d.decision for d in decisions] == ["escalate", "approve"]
+        assert decisions[0].reason.startswith("async_review")
+
+    def test_blocked_flag_rejects(self):
+        from skills.judge import Judge, PersonaPolicy
+
+        judge = Judge({"kids": PersonaPolicy(blocked_flags=frozenset({"gambling"}))})
+        decisions = judge.judge(
+            [result("a", 0.99, ["gambling"], "kids"), result("b", 0.99, ["gambling"], "adults")]
+        )
+
+        assert [d.decision for d in decisions] == ["reject", "escalate"]
+
+    def test_blocking_one_flag_leaves_unblocked_flags_to_review(self):
+        from skills.judge import Judge, PersonaPolicy
+
+        judge = Judge()
+        for i in range(70):
+            judge.flag_mask([f"topic_{i}"])
+        judge.set_policy("kids", PersonaPolicy(blocked_flags=frozenset({"topic_69"})))
+        decisions = judge.judge(
+            [result("a", 0.99, ["topic_68"], "kids"), result("b", 0.99, ["topic_69"], "kids")]
+        )
+
+        assert [d.decision for d in decisions] == ["escalate", "reject"]
+
+    def test_full_blocked_flag_vocabulary_raises(self):
+        from skills.judge import Judge, PersonaPolicy
+
+        judge = Judge({"p": PersonaPolicy(blocked_flags=frozenset(f"flag_{i}" for i in range(63)))})
+        with pytest.raises(ValueError):
+            judge.set_policy("q", PersonaPolicy(blocked_flags=frozenset({"flag_63"})))
+        assert judge.persona_index("q") == 0
+
+    def test_mask_cache_is_bounded(self):
+        from skills.judge import _MASK_CACHE_SIZE, Judge
+
+        judge = Judge()
+        for i in range(_MASK_CACHE_SIZE + 100):
+            judge.flag_mask([f"topic_{i}"])
+
+        assert len(judge._mask_cache) == _MASK_CACHE_SIZE
+
+    def test_invalid_thresholds(self):
+        from skills.judge import PersonaPolicy
+
+        with pytest.raises(ValueError):
+            PersonaPolicy(auto_approve=0.6, human_review=0.7)
+
+    def test_policy_update_takes_effect(self):
+        from skills.judge import Judge, PersonaPolicy
+
+        judge = Judge({"p": PersonaPolicy()})
+        assert judge.judge_one(result("a", 0.92, persona="p")).decision == "approve"
+        judge.set_policy("p", PersonaPolicy(auto_approve=0.95))
+        assert judge.judge_one(result("a", 0.92, persona="p")).decision == "escalate"
+
+
+class TestVectorisedRouting:
+    """route_columns must agree with a scalar reference implementation."""
+
+    def test_matches_scalar_reference(self):
+        from skills.judge import ASYNC_REVIEW, AUTO_APPROVED, BLOCKED, MANDATORY_REVIEW, Judge, PersonaPolicy
+
+        judge = Judge({"p1": PersonaPolicy(0.8, 0.6, frozenset({"violence"})), "p2": PersonaPolicy(0.95, 0.75)})
+        rng = np.random.default_rng(3)
+        n = 5000
+        confidence = rng.random(n)
+        personas = rng.choice([None, "p1", "p2"], n)
+        options = [(), ("violence",), ("medical",)]
+        flags = [options[i] for i in rng.choice(3, n, p=[0.8, 0.1, 0.1])]
+
+        codes = judge.route_columns(
+            confidence,
+            np.array([judge.flag_mask(f) for f in flags], dtype=np.uint64),
+            np.array([judge.persona_index(p) for p in personas]),
+        )
+
+        policies = {None: PersonaPolicy(), "p1": judge._policies[1], "p2": judge._policies[2]}
+        for c, p, f, code in zip(confidence, personas, flags, codes):
+            policy = policies[p]
+            if set(f) & policy.blocked_flags:
+                expected = BLOCKED
+            elif f or c < policy.human_review:
+                expected = MANDATORY_REVIEW
+            elif c > policy.auto_approve:
+                expected = AUTO_APPROVED
+            else:
+                expected = ASYNC_REVIEW
+            assert code == expected
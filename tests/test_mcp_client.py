@@ -0,0 +1,210 @@
+"""
+Tests for the pooled MCP client, against a local stand-in MCP server.
+"""
+
+import json
+import threading
+import time
+
+import pytest
+
+from tests.mcp_standin import McpStandIn
+
+
+@pytest.fixture
+def server():
+    with McpStandIn() as standin:
+        yield standin
+
+
+def pool_for(server, **kwargs):
+    from skills.mcp_client import McpPool, tcp
+
+    return McpPool({"git": tcp("127.0.0.1", server.port)}, **kwargs)
+
+
+class TestMcpPool:
+    """Test suite for McpPool."""
+
+    def test_session_is_reused_across_calls(self, server):
+        with pool_for(server) as pool:
+            for i in range(20):
+                result = pool.call_tool("git", "echo", {"i": i})
+                assert json.loads(result["content"][0]["text"]) == {"i": i}
+
+        assert server.stats["connections"] == 1
+        assert server.stats["initializations"] == 1
+        assert pool.counters["calls"] == 20
+
+    def test_concurrent_calls_multiplex_over_one_session(self, server):
+        errors = []
+        with pool_for(server, max_sessions=1) as pool:
+
+            def call():
+                try:
+                    pool.call_tool("git", "sleep", {"seconds": 0.2})
+                except Exception as exc:  # pragma: no cover - reported below
+                    errors.append(exc)
+
+            threads = [threading.Thread(target=call) for _ in range(10)]
+            started = time.perf_counter()
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            elapsed = time.perf_counter() - started
+
+        assert errors == []
+        assert server.stats["connections"] == 1
+        assert server.stats["max_inflight"] >= 5
+        assert elapsed < 1.0  # 10 x 0.2s serialised would be 2s
+
+    def test_saturated_sessions_grow_up_to_the_limit(self, server):
+        with pool_for(server, max_sessions=3, streams_per_session=1) as pool:
+            threads = [threading.Thread(target=pool.call_tool, args=("git", "sleep", {"seconds": 0.2})) for _ in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            assert 1 < pool.stats()["servers"]["git"]["sessions"] <= 3
+
+    def test_tool_discovery_is_cached_and_invalidated(self, server):
+        clock = [0.0]
+        with pool_for(server, tools_ttl=60, clock=lambda: clock[0]) as pool:
+            names = [t["name"] for t in pool.list_tools("git")]
+            pool.list_tools("git")
+            assert names == ["echo", "sleep", "fail"]
+            assert server.stats["tools_list"] == 1
+
+            clock[0] = 61
+            pool.list_tools("git")
+            assert server.stats["tools_list"] == 2
+
+            server.notify_tools_changed()
+            deadline = time.monotonic() + 2
+            while pool._servers["git"].tools is not None and time.monotonic() < deadline:
+                time.sleep(0.01)
+            pool.list_tools("git")
+            assert server.stats["tools_list"] == 3
+
+            pool.invalidate("git")
+            pool.list_tools("git")
+            assert server.stats["tools_list"] == 4
+            assert pool.counters["discovery_hits"] == 1
+
+    def test_concurrency_cap(self, server):
+        from skills.mcp_client import McpError
+
+        with pool_for(server, max_concurrency=2) as pool:
+            threads = [threading.Thread(target=pool.call_tool, args=("git", "sleep", {"seconds": 0.3})) for _ in range(2)]
+            for t in threads:
+                t.start()
+            time.sleep(0.05)
+            with pytest.raises(McpError) as exc_info:
+                pool.call_tool("git", "echo", timeout=0.05)
+            for t in threads:
+                t.join()
+
+        assert exc_info.value.code == "TIMEOUT"
+        assert server.stats["max_inflight"] <= 2
+
+    def test_our_own_concurrency_cap_does_not_trip_the_breaker(self, server):
+        from skills.mcp_client import McpError
+
+        with pool_for(server, max_concurrency=1, failure_threshold=1) as pool:
+            busy = threading.Thread(target=pool.call_tool, args=("git", "sleep", {"seconds": 0.3}))
+            busy.start()
+            time.sleep(0.05)
+            for _ in range(3):
+                with pytest.raises(McpError) as exc_info:
+                    pool.call_tool("git", "echo", timeout=0.02)
+                assert exc_info.value.code == "TIMEOUT"
+            busy.join()
+
+            assert pool.stats()["servers"]["git"]["circuit"] == "closed"
+            assert pool.call_tool("git", "echo")["isError"] is False
+
+    def test_unexpected_error_in_a_probe_reopens_the_circuit(self, server):
+        from skills.mcp_client import McpError, McpPool, tcp
+
+        def refused():
+            raise OSError("refused")
+
+        def broken():
+            raise TypeError("bad connector")
+
+        clock = [0.0]
+        connector = [refused]
+        pool = McpPool({"git": lambda: connector[0]()}, failure_threshold=1, reset_timeout=10, clock=lambda: clock[0])
+        with pool:
+            with pytest.raises(McpError):
+                pool.call_tool("git", "echo")
+            clock[0] = 10
+            connector[0] = broken
+            with pytest.raises(TypeError):
+                pool.call_tool("git", "echo")  # the half-open probe
+            assert pool.stats()["servers"]["git"]["circuit"] == "open"
+
+            clock[0] = 20
+            connector[0] = tcp("127.0.0.1", server.port)
+            assert pool.call_tool("git", "echo")["isError"] is False
+            assert pool.stats()["servers"]["git"]["circuit"] == "closed"
+
+    def test_tool_errors_do_not_trip_the_breaker(self, server):
+        from skills.mcp_client import McpError
+
+        with pool_for(server, failure_threshold=2) as pool:
+            for _ in range(5):
+                with pytest.raises(McpError) as exc_info:
+                    pool.call_tool("git", "fail")
+                assert exc_info.value.code == "TOOL_ERROR"
+            assert pool.stats()["servers"]["git"]["circuit"] == "closed"
+
+    def test_protocol_errors_trip_the_breaker(self, server):
+        from skills.mcp_client import McpError
+
+        with pool_for(server, failure_threshold=2) as pool:
+            for _ in range(2):
+                with pytest.raises(McpError) as exc_info:
+                    pool.call_tool("git", "no_such_tool")
+                assert exc_info.value.code == "PROTOCOL_ERROR" and "-32602" in exc_info.value.message
+            assert pool.stats()["servers"]["git"]["circuit"] == "open"
+
+    def test_handshake_is_bounded_by_the_call_deadline(self):
+        from skills.mcp_client import McpError
+
+        with McpStandIn(latency=0.5) as slow, pool_for(slow, timeout=30) as pool:
+            started = time.monotonic()
+            with pytest.raises(McpError) as exc_info:
+                pool.call_tool("git", "echo", timeout=0.05)
+            assert exc_info.value.code == "TIMEOUT"
+            assert time.monotonic() - started < 0.4
+
+    def test_circuit_opens_then_recovers_after_probe(self, server):
+        from skills.mcp_client import McpError
+
+        clock = [0.0]
+        with pool_for(server, failure_threshold=2, reset_timeout=10, clock=lambda: clock[0]) as pool:
+            pool.call_tool("git", "echo")
+            server.set_available(False)
+            for _ in range(2):
+                with pytest.raises(McpError) as exc_info:
+                    pool.call_tool("git", "echo", timeout=1)
+                assert exc_info.value.code == "BACKEND_UNAVAILABLE"
+            with pytest.raises(McpError) as exc_info:
+                pool.call_tool("git", "echo")
+            assert exc_info.value.code == "CIRCUIT_OPEN"
+            assert pool.counters["rejected_open_circuit"] == 1
+
+            server.set_available(True)
+            clock[0] = 10
+            assert pool.call_tool("git", "echo", {"ok": 1})["isError"] is False
+            assert pool.stats()["servers"]["git"]["circuit"] == "closed"
+            assert pool.counters["sessions_dropped"] >= 1
+
+    def test_unknown_server(self, server):
+        from skills.mcp_client import McpError
+
+        with pool_for(server) as pool, pytest.raises(McpError) as exc_info:
+            pool.call_tool("nope", "echo")
+        assert exc_info.value.to_dict()["code"] == "UNKNOWN_SERVER"
@@ -0,0 +1,119 @@
+"""
+Tests for the contract models and the columnar RecordBatch.
+"""
+
+import json
+
+import pytest
+
+
+def sample_records():
+    from skills.models import AgentStatus, Decision, Result, Task, Trend
+
+    return [
+        Task("t1", "generate_content", "high", "goal", ["calm"], ["mcp://a"], "2026-01-01T00:00:00+00:00"),
+        Result("t1", "mcp://media/v1", 0.93, "m", 41, ["politics"], "p1"),
+        Decision("t1", "escalate", "async_review"),
+        Trend("#x", 12.5, "tiktok", "2026-01-01T00:00:00+00:00"),
+        AgentStatus("a1", "working", ["video"], 0.8, None, "2026-01-01T00:00:00+00:00"),
+    ]
+
+
+class TestModels:
+    """Test suite for model JSON round-trips."""
+
+    @pytest.mark.parametrize("record", sample_records(), ids=lambda r: type(r).__name__)
+    def test_json_round_trip_matches_spec_dict(self, record):
+        text = record.to_json()
+
+        assert json.loads(text) == record.to_dict()
+        assert type(record).from_json(text) == record
+        assert not hasattr(record, "__dict__")
+
+    def test_invalid_agent_state(self):
+        from skills.models import AgentStatus
+
+        with pytest.raises(ValueError, match="state must be one of"):
+            AgentStatus("a1", "sleeping")
+
+
+class TestRecordBatch:
+    """Test suite for RecordBatch."""
+
+    @pytest.mark.parametrize("record", sample_records(), ids=lambda r: type(r).__name__)
+    def test_rows_round_trip(self, record):
+        from skills.models import RecordBatch
+
+        batch = RecordBatch(type(record), [record, record])
+
+        assert len(batch) == 2
+        assert batch[0] == record
+        assert batch[-1] == record
+        assert list(batch.to_dicts()) == [record.to_dict()] * 2
+        assert list(RecordBatch.from_json_lines(type(record), batch.to_json_lines())) == [record, record]
+
+    def test_numeric_and_categorical_columns(self):
+        from skills.models import RecordBatch, Result
+
+        batch = RecordBatch(Result, [Result(f"t{i}", "o", i / 10, "m", i, persona_id=f"p{i % 2}") for i in range(5)])
+
+        assert batch.column("confidence_score").tolist() == [0.0, 0.1, 0.2, 0.3, 0.4]
+        assert batch.column("latency_ms").sum() == 10
+        codes, levels = batch.codes("persona_id")
+        assert levels == ["p0", "p1"]
+        assert codes.tolist() == [0, 1, 0, 1, 0]
+        assert batch.column("task_id") == ["t0", "t1", "t2", "t3", "t4"]
+
+    def test_optional_float_uses_nan(self):
+        from skills.models import AgentStatus, RecordBatch
+
+        batch = RecordBatch(AgentStatus, [AgentStatus("a1", "idle"), AgentStatus("a2", "idle", current_bid_price=2.5)])
+
+        prices = batch.column("current_bid_price")
+        assert prices[0] != prices[0] and prices[1] == 2.5
+        assert batch[0].current_bid_price is None
+
+    def test_views_are_read_only_and_pin_the_batch(self):
+        from skills.models import RecordBatch, Trend
+
+        batch = RecordBatch(Trend, [Trend("#a", 1.0, "x")])
+        view = batch.column("score")
+
+        with pytest.raises(ValueError):
+            view[0] = 2.0
+        with pytest.raises(BufferError):
+            batch.append(Trend("#b", 2.0, "x"))
+        del view
+        batch.append(Trend("#b", 2.0, "x"))
+        assert len(batch) == 2
+
+    def test_failed_append_leaves_columns_aligned(self):
+        from skills.models import RecordBatch, Result
+
+        batch = RecordBatch(Result, [Result("a", "o", 0.1, "m", 1, persona_id="p0"), Result("b", "o", 0.2, "m", 2)])
+        view = batch.column("confidence_score")
+        with pytest.raises(BufferError):
+            batch.append(Result("c", "o", 0.3, "m", 3, persona_id="new"))
+        del view
+        with pytest.raises(TypeError):
+            batch.append(Result("x", "o", 0.5, "m", "slow"))
+        batch.append(Result("d", "o", 0.4, "m", 4))
+
+        assert [(r.task_id, r.confidence_score, r.latency_ms) for r in batch] == [("a", 0.1, 1), ("b", 0.2, 2), ("d", 0.4, 4)]
+        assert batch.codes("persona_id")[1] == ["p0", None]
+
+    def test_from_dicts_validates_choices(self):
+        from skills.models import Decision, RecordBatch
+
+        with pytest.raises(ValueError, match="decision must be one of"):
+            RecordBatch.from_dicts(Decision, [{"task_id": "t", "decision": "maybe", "reason": "r"}])
+
+    def test_codes_rejects_non_categorical(self):
+        from skills.models import RecordBatch, Trend
+
+        with pytest.raises(ValueError):
+            RecordBatch(Trend).codes("topic")
+        with pytest.raises(ValueError):
+            RecordBatch(Trend).codes("observed_at")  # near-unique per row: a level list would only grow
+        with pytest.raises(KeyError):
+            RecordBatch(Trend).column("nope")
@@ -0,0 +1,120 @@
+"""
+Tests for the optimistic-concurrency video store (memory and SQLite).
+"""
+
+import threading
+
+import pytest
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    from skills.occ_store import MemoryVideoStore, SQLVideoStore
+
+    if request.param == "memory":
+        return MemoryVideoStore()
+    return SQLVideoStore.sqlite(str(tmp_path / "chimera.db"))
+
+
+class TestCompareAndSwap:
+    """Test suite for the version-checked commit primitive."""
+
+    def test_create_and_get(self, store):
+        assert store.create({"id": "v1", "agent_id": "a1", "platform": "tiktok"}) == 1
+
+        row, version = store.get("v1")
+        assert version == 1
+        assert row["status"] == "draft"
+        assert row["agent_id"] == "a1"
+
+    def test_duplicate_create_conflicts(self, store):
+        from skills.occ_store import VersionConflict
+
+        store.create({"id": "v1"})
+        with pytest.raises(VersionConflict):
+            store.create({"id": "v1"})
+
+    def test_stale_version_is_rejected(self, store):
+        store.create({"id": "v1"})
+
+        assert store.compare_and_swap("v1", 1, {"status": "approved"}) is True
+        assert store.compare_and_swap("v1", 1, {"status": "failed"}) is False
+        assert store.get("v1")[1] == 2
+        assert store.get("v1")[0]["status"] == "approved"
+        assert store.stats == {"commits": 1, "conflicts": 1}
+
+    def test_missing_video(self, store):
+        assert store.get("nope") is None
+        assert store.compare_and_swap("nope", 1, {"status": "approved"}) is False
+
+
+class TestTransitions:
+    """Test suite for draft -> approved -> published."""
+
+    def test_happy_path(self, store):
+        from skills.occ_store import transition
+
+        store.create({"id": "v1"})
+        row, version, attempts = transition(store, "v1", "approved")
+        assert (row["status"], version, attempts) == ("approved", 2, 1)
+        row, version, _ = transition(store, "v1", "published")
+        assert (row["status"], version) == ("published", 3)
+
+    def test_illegal_transition(self, store):
+        from skills.occ_store import InvalidTransition, transition
+
+        store.create({"id": "v1"})
+        with pytest.raises(InvalidTransition):
+            transition(store, "v1", "published")
+        with pytest.raises(InvalidTransition):
+            transition(store, "v1", "archived")
+
+    def test_repeat_transition_is_idempotent(self, store):
+        from skills.occ_store import transition
+
+        store.create({"id": "v1"})
+        transition(store, "v1", "approved")
+        _, version, _ = transition(store, "v1", "approved")
+        assert version == 2
+
+    def test_new_media_invalidates_judged_version(self, store):
+        from skills.occ_store import VersionConflict, add_version, transition
+
+        store.create({"id": "v1"})
+        _, judged = store.get("v1")
+        add_version(store, "v1", "mcp://media/v1-take2", 0.93)
+
+        with pytest.raises(VersionConflict):
+            transition(store, "v1", "approved", expected_version=judged)
+        assert store.get("v1")[0]["status"] == "draft"
+        assert [v["media_url"] for v in store.versions("v1")] == ["mcp://media/v1-take2"]
+
+    def test_concurrent_judges_commit_exactly_once(self, store):
+        from skills.occ_store import add_version, transition
+
+        videos = [f"v{i}" for i in range(20)]
+        for vid in videos:
+            store.create({"id": vid})
+        errors = []
+
+        def judge():
+            try:
+                for vid in videos:
+                    add_version(store, vid, f"mcp://media/{vid}", 0.9)
+                    transition(store, vid, "approved")
+            except Exception as exc:  # pragma: no cover - surfaced below
+                errors.append(exc)
+
+        threads = [threading.Thread(target=judge) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert errors == []
+        for vid in videos:
+            row, version = store.get(vid)
+            assert row["status"] == "approved"
+            # one bump per appended version plus exactly one approval
+            assert version == 1 + 8 + 1
+            assert len(store.versions(vid)) == 8
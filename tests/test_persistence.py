@@ -0,0 +1,276 @@
+"""
+Tests for the pooled, batched persistence layer (SQLite).
+"""
+
+import threading
+import time
+
+import pytest
+
+
+@pytest.fixture
+def pool(tmp_path):
+    from skills.persistence import ConnectionPool, create_schema
+
+    pool = ConnectionPool.sqlite(str(tmp_path / "chimera.db"), size=2)
+    create_schema(pool)
+    yield pool
+    pool.close()
+
+
+class Psycopg3Like:
+    """sqlite3 connection with psycopg 3's context semantics: ``with conn`` closes it."""
+
+    def __init__(self, path):
+        import sqlite3
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self.closed = False
+
+    def cursor(self):
+        if self.closed:
+            raise RuntimeError("the connection is closed")
+        return self._conn.cursor()
+
+    def transaction(self):
+        return self._conn  # sqlite3's own context manager: commit or roll back, stay open
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.closed = True
+        self._conn.close()
+
+
+def count(pool, table):
+    with pool.connection() as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]  # nosec B608
+
+
+class TestConnectionPool:
+    """Test suite for ConnectionPool."""
+
+    def test_connections_are_reused(self, pool):
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            assert second is first
+
+    def test_exhausted_pool_times_out(self, tmp_path):
+        from skills.persistence import ConnectionPool
+
+        pool = ConnectionPool.sqlite(str(tmp_path / "x.db"), size=1)
+        pool.timeout = 0.05
+        with pool.connection():
+            with pytest.raises(TimeoutError):
+                with pool.connection():
+                    pass
+
+    def test_failed_connect_gives_its_slot_back(self, tmp_path):
+        import sqlite3
+
+        from skills.persistence import ConnectionPool
+
+        attempts = []
+
+        def connect():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise sqlite3.OperationalError("could not connect")
+            return sqlite3.connect(str(tmp_path / "x.db"), check_same_thread=False)
+
+        pool = ConnectionPool(connect, size=1, timeout=0.05)
+        with pytest.raises(sqlite3.OperationalError):
+            with pool.connection():
+                pass
+        with pool.connection() as conn:
+            assert conn.execute("SELECT 1").fetchone() == (1,)
+        pool.close()
+
+
+class TestBatchWriter:
+    """Test suite for size/time flushing, coalescing and backpressure."""
+
+    def test_size_triggered_batches(self, pool):
+        from skills.models import Task
+        from skills.persistence import BatchWriter
+
+        writer = BatchWriter(pool, batch_size=100, flush_interval=60)
+        for _ in range(300):
+            writer.write_task(Task.new("reply", goal="g"), agent_id="a1")
+        deadline = time.monotonic() + 5
+        while count(pool, "tasks") < 300 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert count(pool, "tasks") == 300
+        assert writer.metrics()["counters"]["batches"] == 3
+        writer.close()
+
+    def test_time_triggered_flush(self, pool):
+        from skills.models import Decision
+        from skills.persistence import BatchWriter
+
+        writer = BatchWriter(pool, batch_size=1000, flush_interval=0.02)
+        writer.write_decision(Decision("t1", "approve", "auto_approved"))
+        deadline = time.monotonic() + 5
+        while count(pool, "decisions") < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert count(pool, "decisions") == 1
+        writer.close()
+
+    def test_multi_statement_batches_respect_param_limit(self, pool):
+        from skills.models import Result
+        from skills.persistence import BatchWriter
+
+        writer = BatchWriter(pool, batch_size=500, flush_interval=60, max_params=70)
+        for i in range(500):
+            writer.write_result(Result(f"t{i}", "out", 0.9, model="m", latency_ms=5))
+        writer.flush(timeout=5)
+
+        assert count(pool, "results") == 500
+        writer.close()
+
+    def test_agent_status_coalesces_and_upserts(self, pool):
+        from skills.persistence import BatchWriter
+
+        writer = BatchWriter(pool, batch_size=1000, flush_interval=60)
+        writer.write_agent_status("a1", "idle", confidence_avg=0.5)
+        writer.write_agent_status("a1", "working", confidence_avg=0.7)
+        writer.flush(timeout=5)
+        writer.write_agent_status("a1", "awaiting_review", capabilities=["video"])
+        writer.close()
+
+        with pool.connection() as conn:
+            rows = conn.execute("SELECT agent_id, state, capabilities FROM agent_status").fetchall()
+        assert rows == [("a1", "awaiting_review", '["video"]')]
+        assert writer.metrics()["counters"]["coalesced"] == 1
+
+    def test_older_status_never_overwrites_a_newer_one(self, pool):
+        from skills.persistence import BatchWriter, agent_status_row
+
+        writer = BatchWriter(pool, batch_size=1000, flush_interval=60)
+        newer = {**agent_status_row("a1", "working"), "updated_at": "2030-01-01T00:00:02Z"}
+        older = {**agent_status_row("a1", "idle"), "updated_at": "2030-01-01T00:00:01Z"}
+        writer.write("agent_status", newer)
+        writer.flush(timeout=5)
+        writer.write("agent_status", older)  # e.g. a batch another worker took earlier
+        writer.close()
+
+        with pool.connection() as conn:
+            rows = conn.execute("SELECT state, updated_at FROM agent_status").fetchall()
+        assert rows == [("working", "2030-01-01T00:00:02Z")]
+
+    def test_transient_errors_are_retried_not_rejected(self, pool, tmp_path):
+        import sqlite3
+
+        from skills.persistence import BatchWriter, ConnectionPool
+
+        path = str(tmp_path / "chimera.db")
+        failures = [sqlite3.OperationalError("database is locked")] * 3
+
+        class Flaky:
+            def __init__(self):
+                self._conn = sqlite3.connect(path, check_same_thread=False)
+
+            def cursor(self):
+                if failures:
+                    raise failures.pop()
+                return self._conn.cursor()
+
+            def commit(self):
+                self._conn.commit()
+
+            def rollback(self):
+                self._conn.rollback()
+
+        writer = BatchWriter(ConnectionPool(Flaky, size=1), batch_size=5, flush_interval=60, retry_backoff=0.001)
+        for i in range(5):
+            writer.write("decisions", {"id": f"d{i}", "task_id": "t", "decision": "approve", "decided_at": "now"})
+        writer.close(timeout=5)
+
+        assert count(pool, "decisions") == 5
+        assert writer.rejected == []
+        assert writer.metrics()["counters"]["retries"] == 3
+
+    def test_bad_row_is_rejected_without_losing_batch(self, pool):
+        from skills.persistence import BatchWriter
+
+        writer = BatchWriter(pool, batch_size=10, flush_interval=60)
+        for i in range(9):
+            writer.write("decisions", {"id": f"d{i}", "task_id": "t", "decision": "approve", "decided_at": "now"})
+        writer.write("decisions", {"id": "bad", "task_id": "t", "decision": "maybe", "decided_at": "now"})
+        writer.close()
+
+        assert count(pool, "decisions") == 9
+        assert [row[1][0] for row in writer.rejected] == ["bad"]
+        assert writer.metrics()["counters"]["batch_errors"] == 1
+
+    def test_pooled_connections_survive_transactions(self, pool, tmp_path):
+        from skills.persistence import BatchWriter, ConnectionPool
+
+        path = str(tmp_path / "chimera.db")
+        opened = []
+        psycopg_pool = ConnectionPool(lambda: opened.append(Psycopg3Like(path)) or opened[-1], size=1)
+        writer = BatchWriter(psycopg_pool, batch_size=5, flush_interval=60)
+        for i in range(4):
+            writer.write("decisions", {"id": f"d{i}", "task_id": "t", "decision": "approve", "decided_at": "now"})
+        writer.write("decisions", {"id": "bad", "task_id": "t", "decision": "maybe", "decided_at": "now"})
+        writer.write("decisions", {"id": "d9", "task_id": "t", "decision": "approve", "decided_at": "now"})
+        writer.close()
+
+        assert count(pool, "decisions") == 5
+        assert len(opened) == 1 and not opened[0].closed
+        assert [row[1][0] for row in writer.rejected] == ["bad"]
+
+    def test_backpressure_blocks_then_times_out(self, pool):
+        from skills.persistence import BatchWriter, BufferFull
+
+        with pool.connection():
+            with pool.connection():
+                # every pooled connection is busy, so flushes stall
+                writer = BatchWriter(pool, batch_size=5, flush_interval=60, max_buffered=10, workers=1)
+                pool.timeout = 1
+                for i in range(15):
+                    writer.write("decisions", {"id": f"d{i}", "task_id": "t", "decision": "approve", "decided_at": "x"})
+                with pytest.raises(BufferFull):
+                    for i in range(15, 30):
+                        writer.write(
+                            "decisions",
+                            {"id": f"d{i}", "task_id": "t", "decision": "approve", "decided_at": "x"},
+                            timeout=0.05,
+                        )
+        writer.close()
+        assert writer.metrics()["counters"]["backpressure_waits"] >= 1
+
+    def test_concurrent_writers(self, pool):
+        from skills.models import Decision
+        from skills.persistence import BatchWriter
+
+        writer = BatchWriter(pool, batch_size=200, flush_interval=0.01, max_buffered=400)
+
+        def agent(n):
+            for i in range(500):
+                writer.write_decision(Decision(f"{n}-{i}", "escalate", "async_review"))
+
+        threads = [threading.Thread(target=agent, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        writer.close()
+
+        metrics = writer.metrics()
+        assert count(pool, "decisions") == 4000
+        assert metrics["counters"]["rows_written"] == 4000
+        assert metrics["rows_per_second"] > 0
+        assert metrics["flush_seconds"]["count"] == metrics["counters"]["batches"]
+
+    def test_unknown_table(self, pool):
+        from skills.persistence import BatchWriter
+
+        writer = BatchWriter(pool)
+        with pytest.raises(ValueError):
+            writer.write("videos", {})
+        writer.close()
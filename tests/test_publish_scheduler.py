@@ -0,0 +1,315 @@
+"""
+Tests for the scheduled publishing engine, driven by a simulated clock.
+"""
+
+import pytest
+
+T0 = 1_700_000_000.0
+
+
+class FakeClock:
+    def __init__(self, now=T0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class RecordingPlatform:
+    """Batch publisher that records calls and can answer with per-post errors."""
+
+    def __init__(self, errors=None):
+        self.calls = []
+        self.errors = errors or {}
+
+    def __call__(self, platform, posts):
+        from skills import SkillError
+
+        self.calls.append((platform, [p["caption"] for p in posts]))
+        return [
+            SkillError(self.errors[p["caption"]], "no") if p["caption"] in self.errors else f"{platform}-{p['caption']}"
+            for p in posts
+        ]
+
+
+def post(caption, platform="tiktok"):
+    return {"platform": platform, "video_asset_id": "vid_1", "caption": caption, "hashtags": []}
+
+
+class TestTokenBucket:
+    """Test suite for TokenBucket."""
+
+    def test_burst_then_refill(self):
+        from skills.publish_scheduler import TokenBucket
+
+        bucket = TokenBucket(rate=2.0, burst=4, now=0.0)
+        assert bucket.take(10, now=0.0) == 4
+        assert bucket.take(1, now=0.0) == 0
+        assert bucket.delay(now=0.0) == pytest.approx(0.5)
+        assert bucket.take(10, now=1.0) == 2
+        assert bucket.take(10, now=100.0) == 4
+
+    def test_drain_imposes_cooldown(self):
+        from skills.publish_scheduler import TokenBucket
+
+        bucket = TokenBucket(rate=1.0, burst=5, now=0.0)
+        bucket.drain(now=0.0, cooldown=10)
+        assert bucket.take(1, now=9.0) == 0
+        assert bucket.take(1, now=11.0) == 1
+
+
+class TestPublishScheduler:
+    """Test suite for PublishScheduler."""
+
+    def test_releases_in_time_order_only_when_due(self):
+        from skills.publish_scheduler import PublishScheduler
+
+        clock, platform = FakeClock(), RecordingPlatform()
+        scheduler = PublishScheduler(platform, clock=clock)
+        scheduler.schedule(post("late"), T0 + 20)
+        scheduler.schedule(post("early"), T0 + 10)
+
+        assert scheduler.next_due() == T0 + 10
+        assert scheduler.run_due() == 0 and platform.calls == []
+        clock.advance(10)
+        assert scheduler.run_due() == 1
+        clock.advance(10)
+        scheduler.run_due()
+
+        assert platform.calls == [("tiktok", ["early"]), ("tiktok", ["late"])]
+        assert len(scheduler) == 0 and scheduler.next_due() is None
+
+    def test_due_posts_are_batched_per_platform(self):
+        from skills.publish_scheduler import PublishScheduler
+
+        clock, platform = FakeClock(), RecordingPlatform()
+        scheduler = PublishScheduler(platform, limits={"tiktok": (10, 100), "youtube": (10, 100)}, batch_size=3, clock=clock)
+        for i in range(5):
+            scheduler.schedule(post(f"t{i}"), T0)
+        scheduler.schedule(post("y0", "youtube"), T0)
+
+        assert scheduler.run_due() == 6
+        assert sorted(platform.calls) == [("tiktok", ["t0", "t1", "t2"]), ("tiktok", ["t3", "t4"]), ("youtube", ["y0"])]
+        assert scheduler.counters["batches"] == 3
+
+    def test_token_bucket_defers_instead_of_rejecting(self):
+        from skills.publish_scheduler import PublishScheduler
+
+        clock, platform = FakeClock(), RecordingPlatform()
+        scheduler = PublishScheduler(platform, limits={"tiktok": (0.5, 2)}, clock=clock)
+        for i in range(5):
+            scheduler.schedule(post(f"p{i}"), T0)
+
+        assert scheduler.run_due() == 2
+        assert scheduler.counters["deferred"] == 3
+        assert scheduler.next_due() == pytest.approx(T0 + 2)
+        clock.advance(2)
+        assert scheduler.run_due() == 1
+        clock.advance(60)
+        assert scheduler.run_due() == 2
+        assert [c for _, batch in platform.calls for c in batch] == ["p0", "p1", "p2", "p3", "p4"]
+
+    def test_rate_limited_answer_retries_and_cools_down(self):
+        from skills.publish_scheduler import PublishScheduler
+
+        clock, platform = FakeClock(), RecordingPlatform(errors={"a": "RATE_LIMITED"})
+        results = {}
+        scheduler = PublishScheduler(
+            platform, limits={"tiktok": (1, 5)}, retry_backoff=5, cooldown=30, clock=clock, on_result=results.__setitem__
+        )
+        sid = scheduler.schedule(post("a"), T0)
+        scheduler.run_due()
+
+        assert sid not in results and scheduler.counters["rate_limited"] == 1
+        platform.errors.clear()
+        clock.advance(5)
+        scheduler.run_due()
+        assert len(platform.calls) == 1  # bucket still cooling down
+        clock.advance(30)
+        scheduler.run_due()
+        assert results[sid]["publication_status"] == "SUCCESS"
+        assert results[sid]["platform_post_id"] == "tiktok-a"
+
+    def test_permanent_errors_and_exhausted_retries_fail(self):
+        from skills.publish_scheduler import PublishScheduler
+
+        clock = FakeClock()
+        platform = RecordingPlatform(errors={"bad": "AUTH_EXPIRED", "flaky": "BACKEND_UNAVAILABLE"})
+        scheduler = PublishScheduler(platform, limits={"tiktok": (100, 100)}, max_attempts=2, retry_backoff=1, clock=clock)
+        bad = scheduler.schedule(post("bad"), T0)
+        flaky = scheduler.schedule(post("flaky"), T0)
+        scheduler.run_due()
+        clock.advance(1)
+        scheduler.run_due()
+
+        assert scheduler.results[bad]["error"]["code"] == "AUTH_EXPIRED"
+        assert scheduler.results[flaky]["publication_status"] == "FAILED"
+        assert len(platform.calls) == 2 and scheduler.counters["failed"] == 2
+
+    def test_transport_exception_fails_the_batch_softly(self):
+        from skills.publish_scheduler import PublishScheduler
+
+        def down(platform, posts):
+            raise ConnectionError("mcp gone")
+
+        clock = FakeClock()
+        scheduler = PublishScheduler(down, retry_backoff=1, clock=clock)
+        scheduler.schedule(post("x"), T0)
+        scheduler.run_due()
+
+        assert len(scheduler) == 1 and scheduler.counters["retries"] == 1
+        assert scheduler.next_due() == T0 + 1
+
+    def test_cancel_is_lazy_but_exact(self):
+        from skills.publish_scheduler import PublishScheduler
+
+        clock, platform = FakeClock(), RecordingPlatform()
+        scheduler = PublishScheduler(platform, clock=clock)
+        first = scheduler.schedule(post("a"), T0 + 1)
+        scheduler.schedule(post("b"), T0 + 2)
+
+        assert scheduler.cancel(first) and not scheduler.cancel(first)
+        assert scheduler.next_due() == T0 + 2
+        clock.advance(5)
+        scheduler.run_due()
+        assert platform.calls == [("tiktok", ["b"])]
+
+    def test_queue_survives_restart(self, tmp_path):
+        from skills.publish_scheduler import PublishScheduler
+
+        journal = tmp_path / "publish.jsonl"
+        clock, platform = FakeClock(), RecordingPlatform(errors={"retry": "TIMEOUT"})
+        scheduler = PublishScheduler(platform, journal=journal, retry_backoff=10, clock=clock)
+        scheduler.schedule(post("now"), T0)
+        scheduler.schedule(post("retry"), T0)
+        later = scheduler.schedule(post("later"), T0 + 100)
+        scheduler.cancel(scheduler.schedule(post("cancelled"), T0 + 50))
+        scheduler.run_due()
+        scheduler.close()
+        with open(journal, "a") as fh:
+            fh.write('{"op": "add", "id": "torn')  # crash mid-write
+
+        restarted = PublishScheduler(RecordingPlatform(), journal=journal, clock=clock)
+        pending = {p["caption"]: p for p in restarted.pending()}
+        assert set(pending) == {"retry", "later"}
+        assert pending["retry"]["attempts"] == 1
+        assert restarted.next_due() == T0 + 10
+        restarted.compact()
+        assert len(journal.read_text().splitlines()) == 2
+        clock.advance(100)
+        restarted.run_due()
+        assert later in restarted.results and len(restarted) == 0
+
+    def test_posts_scheduled_after_a_torn_write_survive_the_next_restart(self, tmp_path):
+        from skills.publish_scheduler import PublishScheduler
+
+        journal = tmp_path / "publish.jsonl"
+        clock = FakeClock()
+        scheduler = PublishScheduler(RecordingPlatform(), journal=journal, clock=clock)
+        scheduler.schedule(post("a"), T0 + 100)
+        scheduler.close()
+        with open(journal, "a") as fh:
+            fh.write('{"op": "add", "id": "torn')
+
+        restarted = PublishScheduler(RecordingPlatform(), journal=journal, clock=clock)
+        restarted.schedule(post("b"), T0 + 100)
+        restarted.close()
+        again = PublishScheduler(RecordingPlatform(), journal=journal, clock=clock)
+
+        assert sorted(p["caption"] for p in again.pending()) == ["a", "b"]
+        again.close()
+
+
+class TestSkillIntegration:
+    """skill_publish_video hands future posts to an installed scheduler."""
+
+    def test_future_post_is_queued(self):
+        from skills import publish_video
+        from skills.publish_scheduler import PublishScheduler
+
+        platform = RecordingPlatform()
+        scheduler = PublishScheduler(platform)
+        publish_video.set_scheduler(scheduler)
+        try:
+            out = publish_video.skill_publish_video(
+                platform="tiktok", video_asset_id="vid_1", caption="hi", hashtags=["#a"], schedule_time="2999-01-01T00:00:00Z"
+            )
+        finally:
+            publish_video.set_scheduler(None)
+
+        assert out["publication_status"] == "SCHEDULED"
+        [queued] = scheduler.pending()
+        assert queued["caption"] == "hi" and queued["schedule_time"].startswith("2999-01-01")
+
+    def test_naive_schedule_time_is_utc(self, monkeypatch):
+        import time
+
+        from skills.publish_scheduler import PublishScheduler
+
+        monkeypatch.setenv("TZ", "America/New_York")
+        time.tzset()
+        try:
+            scheduler = PublishScheduler(RecordingPlatform())
+            scheduler.schedule(post("naive"), "2030-01-01T00:00:00")
+            scheduler.schedule(post("utc"), "2030-01-01T00:00:00+00:00")
+        finally:
+            monkeypatch.undo()
+            time.tzset()
+
+        assert {p["schedule_time"] for p in scheduler.pending()} == {"2030-01-01T00:00:00+00:00"}
+
+    def test_released_post_carries_its_pinned_asset(self, tmp_path):
+        from skills.asset_store import AssetStore
+        from skills.publish_scheduler import PublishScheduler
+
+        assets = AssetStore(tmp_path / "assets", avg_chunk=1024, min_chunk=256, max_chunk=4096)
+        video = bytes(range(256)) * 40
+        assets.put("vid_1", video)
+        received = []
+
+        def publish_batch(platform, posts):
+            received.extend(b"".join(p["media"].chunks()) for p in posts)
+            return [f"{platform}-{p['caption']}" for p in posts]
+
+        clock = FakeClock()
+        scheduler = PublishScheduler(publish_batch, assets=assets, clock=clock)
+        scheduler.schedule(post("a"), T0 + 60)
+        scheduler.schedule({**post("gone"), "video_asset_id": "vid_missing"}, T0 + 60)
+
+        assert assets.delete("vid_1")  # deferred: a scheduled post still needs it
+        assets.gc(grace_seconds=-1)
+        clock.advance(60)
+        scheduler.run_due()
+
+        assert received == [video]
+        assert [r["publication_status"] for r in scheduler.results.values()] == ["SUCCESS", "FAILED"]
+        assert list(scheduler.results.values())[1]["error"]["code"] == "ASSET_NOT_FOUND"
+        assert not assets.exists("vid_1")  # the delete lands once the post is out
+
+    def test_pins_survive_restart(self, tmp_path):
+        from skills.asset_store import AssetStore
+        from skills.publish_scheduler import PublishScheduler
+
+        assets = AssetStore(tmp_path / "assets")
+        assets.put("vid_1", b"clip")
+        journal = tmp_path / "publish.jsonl"
+        PublishScheduler(RecordingPlatform(), journal=journal, clock=FakeClock()).schedule(post("a"), T0 + 60)
+
+        PublishScheduler(RecordingPlatform(), journal=journal, assets=assets, clock=FakeClock())
+        assets.delete("vid_1")
+        assert assets.exists("vid_1")
+
+    def test_per_post_adapter(self):
+        from skills import SkillError
+        from skills.publish_scheduler import per_post
+
+        def publish(p):
+            if p["caption"] == "bad":
+                raise SkillError("PLATFORM_REJECTED", "no")
+            return "id-" + p["caption"]
+
+        answers = per_post(publish)("tiktok", [post("ok"), post("bad")])
+        assert answers[0] == "id-ok" and answers[1].code == "PLATFORM_REJECTED"
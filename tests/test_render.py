@@ -0,0 +1,209 @@
+"""
+Tests for the process-pool render pipeline and skill_generate_video wiring.
+"""
+
+import json
+import threading
+from concurrent.futures import Executor, Future
+
+import pytest
+
+SCRIPT = " ".join(f"word{i}" for i in range(50))  # 20 seconds at 2.5 words/s
+
+
+class GatedExecutor(Executor):
+    """Runs segments on threads; segments at index >= ``open_first`` wait for ``release``."""
+
+    def __init__(self, open_first=2):
+        self.open_first = open_first
+        self.release = threading.Event()
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+
+        def run():
+            if args[1] >= self.open_first:
+                self.release.wait(5)
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as exc:  # pragma: no cover - surfaced via future
+                future.set_exception(exc)
+
+        threading.Thread(target=run, daemon=True).start()
+        return future
+
+
+@pytest.fixture
+def store(tmp_path):
+    from skills.render import FileObjectStore
+
+    return FileObjectStore(tmp_path / "objects")
+
+
+class TestRenderEngine:
+    """Test suite for RenderEngine."""
+
+    def test_split_covers_duration(self, store):
+        from skills.render import RenderEngine
+
+        engine = RenderEngine(store, segment_seconds=4)
+        segments = engine.split(SCRIPT, 18)
+
+        assert len(segments) == 5
+        assert sum(s for _, s in segments) == pytest.approx(18)
+        assert " ".join(t for t, _ in segments).split() == SCRIPT.split()
+
+    def test_process_pool_render_streams_chunks_and_manifest(self, store):
+        from skills.render import RenderEngine, render_segment
+
+        with RenderEngine(store, max_workers=2, fps=4, frame_bytes=256) as engine:
+            job = engine.render("vid_abc", SCRIPT, 20.0)
+
+        manifest = job.result()
+        assert job.progress == 1.0
+        assert [c["key"] for c in manifest["chunks"]] == store.list("videos/vid_abc")[:-1]
+        assert store.exists("previews/vid_abc")
+        _, expected, _ = render_segment("vid_abc", 3, engine.split(SCRIPT, 20.0)[3][0], 2.0, 4, 256)
+        assert store.get("videos/vid_abc/chunk-00003") == expected
+        assert {"split", "preview_ready", "render_wall", "render_cpu", "upload", "total"} <= set(job.timings)
+
+    def test_preview_is_ready_before_full_render(self, store):
+        from skills.render import RenderEngine
+
+        gate = GatedExecutor(open_first=2)
+        engine = RenderEngine(store, executor=gate, fps=2, frame_bytes=64)
+        job = engine.start("vid_early", SCRIPT, 20.0)
+
+        assert job.wait_preview(5) == "mcp://media/previews/vid_early"
+        assert job.progress < 1.0
+        assert not store.exists("videos/vid_early/manifest.json")
+        gate.release.set()
+        job.result(5)
+        assert store.exists("videos/vid_early/manifest.json")
+
+    def test_concurrent_start_shares_job_and_rerender_is_cached(self, store):
+        from skills.render import RenderEngine
+
+        gate = GatedExecutor(open_first=0)
+        engine = RenderEngine(store, executor=gate, fps=2, frame_bytes=64)
+        first = engine.start("vid_same", SCRIPT, 6.0)
+        assert engine.start("vid_same", SCRIPT, 6.0) is first
+        gate.release.set()
+        first.result(5)
+
+        again = engine.start("vid_same", SCRIPT, 6.0)
+        assert again is not first and again.cached
+        assert again.result() == first.result()
+
+    def test_segment_failure_surfaces(self, store):
+        from skills.render import RenderEngine
+
+        class Broken(Executor):
+            def submit(self, fn, *args, **kwargs):
+                future = Future()
+                future.set_exception(RuntimeError("gpu on fire"))
+                return future
+
+        job = RenderEngine(store, executor=Broken()).start("vid_bad", SCRIPT, 4.0)
+        with pytest.raises(RuntimeError):
+            job.result(5)
+        with pytest.raises(RuntimeError):
+            job.wait_preview(5)
+
+    def test_finished_jobs_are_dropped_beyond_the_cap(self, store):
+        from skills.render import RenderEngine
+
+        with RenderEngine(store, executor=GatedExecutor(open_first=99), fps=2, frame_bytes=64, max_finished_jobs=2) as engine:
+            for i in range(4):
+                engine.render(f"vid_{i}", SCRIPT, 2.0)
+
+            assert [a for a in ("vid_0", "vid_1", "vid_2", "vid_3") if engine.job(a)] == ["vid_2", "vid_3"]
+            assert engine.status("vid_0") is None
+            assert engine.status("vid_3")["render_status"] == "COMPLETE"
+
+    def test_keys_cannot_escape_store(self, store):
+        with pytest.raises(ValueError):
+            store.put("../outside", b"x")
+
+
+class TestSkillGenerateVideoRendering:
+    """skill_generate_video with an installed engine."""
+
+    def test_returns_after_preview_with_progress_metadata(self, store):
+        from skills import generate_video
+        from skills.render import RenderEngine
+
+        gate = GatedExecutor(open_first=2)
+        generate_video.set_render_engine(RenderEngine(store, executor=gate, fps=2, frame_bytes=64), timeout=5)
+        try:
+            out = generate_video.skill_generate_video(
+                script_text=SCRIPT, persona_id="p", video_style="modern", aspect_ratio="9:16", language="en"
+            )
+        finally:
+            generate_video.set_render_engine(None)
+            gate.release.set()
+
+        meta = out["generation_metadata"]
+        assert out["preview_url"] == f"mcp://media/previews/{out['video_asset_id']}"
+        assert meta["engine"] == "process_pool"
+        assert 0 < meta["progress"] < 1
+        assert "preview_ready" in meta["timings_ms"]
+        json.dumps(out)
+
+    def test_failure_after_preview_is_reported_by_status(self, store):
+        from skills import generate_video
+        from skills.render import RenderEngine
+
+        class FailsLate(GatedExecutor):
+            def submit(self, fn, *args, **kwargs):
+                if args[1] < self.open_first:
+                    return super().submit(fn, *args, **kwargs)
+                future = Future()
+
+                def fail():
+                    self.release.wait(5)
+                    if future.set_running_or_notify_cancel():  # the first failure cancels the rest
+                        future.set_exception(OSError("disk full"))
+
+                threading.Thread(target=fail, daemon=True).start()
+                return future
+
+        gate = FailsLate(open_first=2)
+        engine = RenderEngine(store, executor=gate, fps=2, frame_bytes=64)
+        generate_video.set_render_engine(engine, timeout=5)
+        try:
+            out = generate_video.skill_generate_video(
+                script_text=SCRIPT, persona_id="p", video_style="modern", aspect_ratio="9:16", language="en"
+            )
+            asset_id = out["video_asset_id"]
+            assert generate_video.render_status(asset_id)["render_status"] == "RENDERING"
+            gate.release.set()
+            with pytest.raises(OSError):
+                engine.job(asset_id).result(5)
+            status = generate_video.render_status(asset_id)
+        finally:
+            generate_video.set_render_engine(None)
+
+        assert status["render_status"] == "FAILED"
+        assert status["preview_url"] == out["preview_url"]
+        assert status["error"] == {"code": "BACKEND_UNAVAILABLE", "message": "render failed: disk full"}
+
+    def test_render_failure_is_skill_error(self, store):
+        from skills import SkillError, generate_video
+        from skills.render import RenderEngine
+
+        class Broken(Executor):
+            def submit(self, fn, *args, **kwargs):
+                future = Future()
+                future.set_exception(OSError("renderer gone"))
+                return future
+
+        generate_video.set_render_engine(RenderEngine(store, executor=Broken()), wait="complete", timeout=5)
+        try:
+            with pytest.raises(SkillError) as exc_info:
+                generate_video.skill_generate_video(
+                    script_text=SCRIPT, persona_id="p", video_style="modern", aspect_ratio="9:16", language="en"
+                )
+        finally:
+            generate_video.set_render_engine(None)
+        assert exc_info.value.code == "BACKEND_UNAVAILABLE"
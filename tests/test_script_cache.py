@@ -0,0 +1,212 @@
+"""
+Tests for the memoised skill_generate_script cache.
+"""
+
+import threading
+import time
+
+import pytest
+
+INPUTS = dict(trend_topic="Retro Gaming", persona_id="gamer", target_duration_seconds=30, language="en")
+
+
+class CountingGenerator:
+    def __init__(self, delay=0.0):
+        self.calls = []
+        self.delay = delay
+
+    def __call__(self, **inputs):
+        from skills.generate_script import generate_script
+
+        self.calls.append(inputs)
+        time.sleep(self.delay)
+        return generate_script(**inputs)
+
+
+class TestScriptCache:
+    """Test suite for ScriptCache."""
+
+    def test_normalised_inputs_share_a_key(self):
+        from skills.script_cache import ScriptCache
+
+        cache = ScriptCache()
+        key = cache.key("Retro Gaming", "gamer", 30, "en")
+
+        assert cache.key("  retro   gaming ", "gamer", 30.0, "EN") == key
+        assert cache.key("Retro Gaming", "gamer", 31, "en") != key
+        assert cache.key("Retro Gaming", "chef", 30, "en") != key
+
+    def test_topics_sharing_a_key_share_safety_flags(self):
+        from skills.generate_script import generate_script
+        from skills.script_cache import ScriptCache
+
+        cache = ScriptCache()
+        spaced = cache.get(generate_script, **{**INPUTS, "trend_topic": "Win Vests"})
+        joined = cache.get(generate_script, **{**INPUTS, "trend_topic": "winvests"})
+
+        assert spaced["safety_flags"] == [] and joined["safety_flags"] == ["financial_advice"]
+        assert cache.stats["misses"] == 2
+
+    def test_hit_returns_identical_judge_inputs(self):
+        from skills.script_cache import ScriptCache
+
+        cache, generate = ScriptCache(), CountingGenerator()
+        miss = cache.get(generate, **INPUTS)
+        hit = cache.get(generate, **{**INPUTS, "trend_topic": "retro  gaming"})
+
+        assert hit == miss
+        assert {"confidence_score", "safety_flags"} <= set(hit)
+        assert len(generate.calls) == 1
+        assert cache.stats["memory_hits"] == 1 and cache.stats["misses"] == 1
+        assert cache.hit_rate == 0.5
+
+    def test_cached_output_matches_uncached_at_every_duration(self):
+        from skills.generate_script import generate_script
+        from skills.script_cache import ScriptCache
+
+        cache = ScriptCache()
+        for seconds in (2, 7, 30, 7, 2):
+            inputs = {**INPUTS, "target_duration_seconds": seconds}
+            assert cache.get(generate_script, **inputs) == generate_script(**inputs)
+        assert cache.stats["misses"] == 3 and cache.stats["memory_hits"] == 2
+
+    def test_fill_started_before_clear_is_not_stored(self, tmp_path):
+        from skills.script_cache import ScriptCache
+
+        cache = ScriptCache(disk_dir=tmp_path)
+        started, release = threading.Event(), threading.Event()
+
+        def slow(**inputs):
+            started.set()
+            release.wait(5)
+            return {"script": {"text": "stale", "estimated_duration_seconds": 1}, "safety_flags": [], "confidence_score": 0.5}
+
+        stale = []
+        filler = threading.Thread(target=lambda: stale.append(cache.get(slow, **INPUTS)))
+        filler.start()
+        assert started.wait(5)
+        cache.clear()
+        release.set()
+        filler.join(5)
+
+        assert stale[0]["script"]["text"] == "stale"  # its own caller still gets an answer
+        assert len(cache) == 0 and list(tmp_path.glob("*/*.json")) == []
+        generate = CountingGenerator()
+        assert cache.get(generate, **INPUTS)["script"]["text"] != "stale"
+        assert len(generate.calls) == 1
+
+    def test_hits_are_copies(self):
+        from skills.script_cache import ScriptCache
+
+        cache, generate = ScriptCache(), CountingGenerator()
+        cache.get(generate, **INPUTS)["safety_flags"].append("tampered")
+
+        assert cache.get(generate, **INPUTS)["safety_flags"] == []
+
+    def test_single_flight(self):
+        from skills.script_cache import ScriptCache
+
+        cache, generate = ScriptCache(), CountingGenerator(delay=0.05)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get(generate, **INPUTS))) for _ in range(10)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(generate.calls) == 1
+        assert all(r == results[0] for r in results)
+        assert cache.stats["coalesced"] + cache.stats["memory_hits"] == 9
+        assert cache.stats["saved_seconds"] >= 9 * 0.05
+
+    def test_errors_are_not_cached(self):
+        from skills.script_cache import ScriptCache
+
+        cache = ScriptCache()
+        calls = []
+
+        def flaky(**inputs):
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError("model down")
+            return {"script": {"text": "x", "estimated_duration_seconds": 1}, "safety_flags": [], "confidence_score": 0.5}
+
+        with pytest.raises(RuntimeError):
+            cache.get(flaky, **INPUTS)
+        assert cache.get(flaky, **INPUTS)["confidence_score"] == 0.5
+
+    def test_size_bounded_eviction(self):
+        from skills.script_cache import ScriptCache
+
+        cache, generate = ScriptCache(max_bytes=2000), CountingGenerator()
+        for topic in ("a", "b", "c", "d", "e", "f"):
+            cache.get(generate, **{**INPUTS, "trend_topic": topic})
+
+        assert cache._memory_bytes <= 2000
+        assert cache.stats["evictions"] > 0
+        cache.get(generate, **{**INPUTS, "trend_topic": "a"})
+        assert len(generate.calls) == 7  # "a" was evicted and regenerated
+
+    def test_disk_tier_survives_restart(self, tmp_path):
+        from skills.script_cache import ScriptCache
+
+        generate = CountingGenerator()
+        first = ScriptCache(disk_dir=tmp_path).get(generate, **INPUTS)
+        restarted = ScriptCache(disk_dir=tmp_path)
+        second = restarted.get(generate, **INPUTS)
+        restarted.get(generate, **INPUTS)
+
+        assert second == first
+        assert len(generate.calls) == 1
+        assert restarted.stats["disk_hits"] == 1 and restarted.stats["memory_hits"] == 1
+
+    def test_disk_tier_is_bounded(self, tmp_path):
+        from skills.script_cache import ScriptCache
+
+        cache, generate = ScriptCache(disk_dir=tmp_path, max_disk_bytes=1500), CountingGenerator()
+        for topic in "abcdef":
+            cache.get(generate, **{**INPUTS, "trend_topic": topic})
+
+        assert sum(p.stat().st_size for p in tmp_path.glob("*/*.json")) <= 1500
+        assert cache.stats["disk_evictions"] > 0
+
+
+class TestSkillIntegration:
+    """skill_generate_script routes through an installed cache."""
+
+    def test_skill_uses_cache_and_still_validates(self):
+        from skills import SkillError
+        from skills import generate_script as module
+        from skills.script_cache import ScriptCache
+
+        cache = ScriptCache()
+        module.set_cache(cache)
+        try:
+            a = module.skill_generate_script(**INPUTS)
+            b = module.skill_generate_script(**{**INPUTS, "trend_topic": "retro gaming"})
+            with pytest.raises(SkillError):
+                module.skill_generate_script(**{**INPUTS, "language": "xx"})
+        finally:
+            module.set_cache(None)
+
+        assert a == b
+        assert cache.stats["memory_hits"] == 1
+
+    def test_memory_additions_invalidate_cached_scripts(self):
+        from skills import generate_script as module
+        from skills.script_cache import ScriptCache
+        from skills.semantic_memory import PostMemory
+
+        memory, cache = PostMemory(dim=64), ScriptCache()
+        module.set_cache(cache)
+        module.set_memory(memory)
+        try:
+            before = module.skill_generate_script(**INPUTS)
+            memory.add("p1", "Retro gaming is back in a big way. Dust off the cartridges", "gamer", 0.9)
+            after = module.skill_generate_script(**INPUTS)
+        finally:
+            module.set_memory(None)
+            module.set_cache(None)
+
+        assert after["script"]["text"].startswith("Retro gaming is back in a big way.")
+        assert after != before and cache.stats["misses"] == 2
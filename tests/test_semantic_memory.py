@@ -0,0 +1,184 @@
+"""
+Tests for the IVF semantic memory and its use by skill_generate_script.
+"""
+
+import numpy as np
+import pytest
+
+TOPICS = ["ai tools", "street food", "football transfers", "budget travel", "home workouts", "retro gaming"]
+
+
+def corpus(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    posts = []
+    for i in range(n):
+        topic = TOPICS[i % len(TOPICS)]
+        posts.append(
+            {
+                "post_id": f"p{i}",
+                "text": f"{topic} tip number {rng.integers(50)}. more about {topic}",
+                "persona_id": ("chef", "coach", "gamer")[i % 3],
+                "engagement": float(rng.random()),
+            }
+        )
+    return posts
+
+
+def clustered_vectors(n, dim, centers=40, seed=1):
+    rng = np.random.default_rng(seed)
+    c = rng.standard_normal((centers, dim)).astype(np.float32)
+    return (c[rng.integers(centers, size=n)] + 0.3 * rng.standard_normal((n, dim))).astype(np.float32)
+
+
+class TestEmbedding:
+    """Test suite for embed_text."""
+
+    def test_deterministic_and_normalised(self):
+        from skills.semantic_memory import embed_text
+
+        a, b = embed_text("Retro gaming is back"), embed_text("retro GAMING is back")
+        assert a.dtype == np.float32
+        assert np.allclose(a, b)
+        assert np.linalg.norm(a) == pytest.approx(1.0, abs=1e-6)
+        assert not embed_text("").any()
+
+    def test_similar_text_scores_higher(self):
+        from skills.semantic_memory import embed_text
+
+        q = embed_text("budget travel hacks")
+        assert q @ embed_text("cheap budget travel tips") > q @ embed_text("football transfer news")
+
+
+class TestPostMemory:
+    """Test suite for PostMemory."""
+
+    def test_search_before_and_after_build(self):
+        from skills.semantic_memory import PostMemory
+
+        memory = PostMemory(dim=128)
+        memory.add_many(corpus(600))
+        before = memory.search("street food", 3)
+        memory.build()
+        after = memory.search("street food", 3)
+
+        assert memory.nlist > 1
+        for hits in (before, after):
+            assert len(hits) == 3
+            assert all("street food" in h["text"] for h in hits)
+            assert hits[0]["score"] >= hits[-1]["score"]
+
+    def test_filters(self):
+        from skills.semantic_memory import PostMemory
+
+        memory = PostMemory(dim=128, nprobe=1)
+        memory.add_many(corpus(600))
+        memory.build()
+        hits = memory.search("ai tools", 10, persona_id="gamer", min_engagement=0.5)
+
+        assert len(hits) == 10
+        assert all(h["persona_id"] == "gamer" and h["engagement"] >= 0.5 for h in hits)
+        assert memory.search("ai tools", 5, persona_id="nobody") == []
+
+    def test_batched_queries_match_single(self):
+        from skills.semantic_memory import PostMemory
+
+        memory = PostMemory(dim=128)
+        memory.add_many(corpus(600))
+        memory.build()
+        batch = memory.search(["ai tools", "home workouts"], 4)
+
+        assert batch == [memory.search("ai tools", 4), memory.search("home workouts", 4)]
+
+    def test_posts_added_after_build_are_searchable(self):
+        from skills.semantic_memory import PostMemory
+
+        memory = PostMemory(dim=128, nprobe=1)
+        memory.add_many(corpus(300))
+        memory.build()
+        memory.add("new", "underwater basket weaving", "chef", 0.99)
+
+        assert memory.search("underwater basket weaving", 1)[0]["post_id"] == "new"
+        assert len(memory) == 301
+
+    def test_ivf_recall_against_exact(self):
+        from skills.semantic_memory import PostMemory
+
+        dim = 32
+        vectors = clustered_vectors(5000, dim)
+        memory = PostMemory(dim=dim, nprobe=8)
+        for i, v in enumerate(vectors):
+            memory.add(f"p{i}", "", "p", 1.0, v)
+        memory.build()
+        queries = clustered_vectors(50, dim, seed=2)
+
+        approx = memory.search(queries, 10)
+        exact = memory.search(queries, 10, exact=True)
+        recall = np.mean(
+            [len({h["post_id"] for h in a} & {h["post_id"] for h in e}) / 10 for a, e in zip(approx, exact)]
+        )
+        assert recall >= 0.9
+
+    def test_save_and_mmap_load(self, tmp_path):
+        from skills.semantic_memory import PostMemory
+
+        memory = PostMemory(dim=64)
+        memory.add_many(corpus(400))
+        memory.build()
+        memory.save(tmp_path / "memory")
+
+        loaded = PostMemory.load(tmp_path / "memory")
+        assert isinstance(loaded._vectors, np.memmap)
+        assert loaded.search("retro gaming", 5, persona_id="coach") == memory.search("retro gaming", 5, persona_id="coach")
+
+    def test_save_over_the_mapped_directory(self, tmp_path):
+        from skills.semantic_memory import PostMemory
+
+        memory = PostMemory(dim=64)
+        memory.add_many(corpus(400))
+        memory.build()
+        memory.save(tmp_path / "memory")
+        live = PostMemory.load(tmp_path / "memory")
+        before = live.search("retro gaming", 5)
+
+        memory.add_many(corpus(100, seed=7))
+        memory.build()
+        memory.save(tmp_path / "memory")
+
+        assert live.search("retro gaming", 5) == before
+        assert len(PostMemory.load(tmp_path / "memory")._post_ids) == 500
+        assert not list((tmp_path / "memory").glob("*.tmp"))
+
+    def test_bad_vector_shape(self):
+        from skills.semantic_memory import PostMemory
+
+        with pytest.raises(ValueError):
+            PostMemory(dim=8).add("p", "t", "x", 1.0, [1.0, 2.0])
+
+
+class TestGenerateScriptRecall:
+    """skill_generate_script opens with the hook of a similar past high performer."""
+
+    def test_recalled_hook_leads_script(self):
+        from skills import generate_script
+        from skills.generate_script import skill_generate_script
+        from skills.semantic_memory import PostMemory
+
+        memory = PostMemory(dim=128)
+        memory.add("p1", "Nobody talks about retro gaming prices. Here is why", "gamer", 0.97)
+        memory.add("p2", "Retro gaming hot take from a chef", "chef", 0.99)
+        memory.add("p3", "Retro gaming flop", "gamer", 0.05)
+        generate_script.set_memory(memory, min_engagement=0.5)
+        try:
+            out = skill_generate_script(
+                trend_topic="retro gaming", persona_id="gamer", target_duration_seconds=10, language="en"
+            )
+        finally:
+            generate_script.set_memory(None)
+
+        assert out["script"]["text"].startswith("Nobody talks about retro gaming prices.")
+
+    def test_no_memory_leaves_script_unchanged(self):
+        from skills.generate_script import skill_generate_script
+
+        out = skill_generate_script(trend_topic="retro gaming", persona_id="gamer", target_duration_seconds=10, language="en")
+        assert out["script"]["text"].startswith("Quick take on retro gaming.")
@@ -0,0 +1,186 @@
+"""
+Tests for the skill registry and the validators compiled from skills/README.md.
+"""
+
+import pytest
+
+
+class TestContractParsing:
+    """Test suite for contract loading."""
+
+    def test_all_readme_skills_are_loaded(self):
+        from skills import CONTRACTS
+
+        assert set(CONTRACTS) == {
+            "skill_fetch_trends",
+            "skill_generate_script",
+            "skill_generate_video",
+            "skill_publish_video",
+        }
+
+    def test_inputs_match_readme(self):
+        from skills import CONTRACTS
+
+        assert CONTRACTS["skill_fetch_trends"].inputs == {
+            "platform": "string",
+            "region": "string",
+            "category": "string | null",
+            "limit": "number",
+        }
+
+    def test_nullable_object_output_parses(self):
+        from skills import CONTRACTS
+
+        error = CONTRACTS["skill_publish_video"].outputs["error"]
+        assert error["code"] == "string"
+
+
+class TestCompiledValidators:
+    """Test suite for compile_validator."""
+
+    def test_nullable_fields_may_be_omitted(self):
+        from skills import CONTRACTS
+
+        params = CONTRACTS["skill_fetch_trends"].validate_input({"platform": "x", "region": "us", "limit": 1})
+        assert params["category"] is None
+
+    def test_bool_is_not_a_number(self):
+        from skills import CONTRACTS
+
+        with pytest.raises(TypeError, match="limit"):
+            CONTRACTS["skill_fetch_trends"].validate_input(
+                {"platform": "x", "region": "us", "category": None, "limit": True}
+            )
+
+    def test_unknown_parameter_rejected(self):
+        from skills import CONTRACTS
+
+        with pytest.raises(TypeError, match="unexpected"):
+            CONTRACTS["skill_fetch_trends"].validate_input(
+                {"platform": "x", "region": "us", "category": None, "limit": 1, "extra": 1}
+            )
+
+    def test_malformed_timestamp_is_value_error(self):
+        from skills.publish_video import skill_publish_video
+
+        with pytest.raises(ValueError, match="schedule_time"):
+            skill_publish_video(
+                platform="youtube", video_asset_id="a", caption="c", hashtags=[], schedule_time="tomorrow"
+            )
+
+    def test_array_items_checked(self):
+        from skills.publish_video import skill_publish_video
+
+        with pytest.raises(TypeError, match=r"hashtags\[1\]"):
+            skill_publish_video(platform="youtube", video_asset_id="a", caption="c", hashtags=["ok", 3], schedule_time=None)
+
+    def test_output_validator_checks_enum_and_nested_objects(self):
+        from skills import CONTRACTS
+
+        validate = CONTRACTS["skill_publish_video"].validate_output
+        ok = {"publication_status": "SUCCESS", "platform_post_id": "p1", "published_at": "2026-01-01T00:00:00Z", "error": None}
+        assert validate(dict(ok)) == ok
+        with pytest.raises(ValueError, match="publication_status"):
+            validate({**ok, "publication_status": "DONE"})
+        with pytest.raises(TypeError, match="error.message"):
+            validate({**ok, "error": {"code": "X"}})
+
+
+class TestRegistry:
+    """Test suite for skill registration and invocation."""
+
+    def test_positional_arguments_rejected(self):
+        from skills.fetch_trends import skill_fetch_trends
+
+        with pytest.raises(TypeError, match="keyword"):
+            skill_fetch_trends("twitter", "us", None, 5)
+
+    def test_invoke_by_name_and_outputs_match_contract(self):
+        from skills import CONTRACTS, invoke
+
+        calls = {
+            "skill_fetch_trends": dict(platform="twitter", region="us", category=None, limit=3),
+            "skill_generate_script": dict(trend_topic="AI", persona_id="p", target_duration_seconds=30, language="en"),
+            "skill_generate_video": dict(script_text="hi there", persona_id="p", video_style="modern", aspect_ratio="9:16", language="en"),
+            "skill_publish_video": dict(platform="youtube", video_asset_id="a", caption="c", hashtags=["x"], schedule_time=None),
+        }
+        for name, params in calls.items():
+            CONTRACTS[name].validate_output(invoke(name, **params))
+
+    def test_outputs_are_checked_against_the_contract(self, monkeypatch):
+        import skills
+
+        monkeypatch.setattr(skills, "_REGISTRY", dict(skills._REGISTRY))
+
+        @skills.skill("skill_fetch_trends")
+        def broken(platform, region, category, limit):
+            return {"trends": [{"topic": "x", "score": None, "source": platform, "observed_at": "now"}], "metadata": {}}
+
+        with pytest.raises(TypeError, match="score"):
+            broken(platform="twitter", region="us", category=None, limit=1)
+
+    def test_unknown_skill(self):
+        from skills import get_skill, skill
+
+        with pytest.raises(KeyError):
+            get_skill("skill_teleport")
+        with pytest.raises(KeyError):
+            skill("skill_teleport")
+
+    def test_structured_skill_errors(self):
+        from skills import SkillError
+        from skills.generate_script import skill_generate_script
+
+        with pytest.raises(SkillError) as exc_info:
+            skill_generate_script(trend_topic="AI", persona_id="p", target_duration_seconds=30, language="xx")
+        assert exc_info.value.to_dict()["code"] == "UNSUPPORTED_LANGUAGE"
+
+    def test_publish_without_backend_fails_structurally(self):
+        from skills.publish_video import set_publisher, skill_publish_video
+
+        set_publisher(None)
+        result = skill_publish_video(platform="youtube", video_asset_id="a", caption="c", hashtags=[], schedule_time=None)
+        assert result["publication_status"] == "FAILED"
+        assert result["error"]["code"] == "PUBLISHER_UNAVAILABLE"
+
+    def test_publish_with_backend_and_schedule(self):
+        from skills.publish_scheduler import PublishScheduler
+        from skills.publish_video import set_publisher, set_scheduler, skill_publish_video
+
+        set_publisher(lambda post: f"{post['platform']}-123")
+        set_scheduler(PublishScheduler(lambda platform, posts: []))
+        try:
+            now = skill_publish_video(platform="youtube", video_asset_id="a", caption="c", hashtags=[], schedule_time=None)
+            later = skill_publish_video(
+                platform="youtube", video_asset_id="a", caption="c", hashtags=[], schedule_time="2999-01-01T00:00:00Z"
+            )
+        finally:
+            set_publisher(None)
+            set_scheduler(None)
+        assert now["publication_status"] == "SUCCESS"
+        assert now["platform_post_id"] == "youtube-123"
+        assert later["publication_status"] == "SCHEDULED"
+
+    def test_schedule_without_scheduler_fails(self):
+        from skills.publish_video import skill_publish_video
+
+        later = skill_publish_video(platform="youtube", video_asset_id="a", caption="c", hashtags=[], schedule_time="2999-01-01T00:00:00Z")
+
+        assert later["publication_status"] == "FAILED"
+        assert later["error"]["code"] == "SCHEDULER_UNAVAILABLE"
+
+    def test_naive_schedule_time_is_utc(self):
+        from skills.contracts import parse_timestamp
+        from skills.publish_scheduler import PublishScheduler
+        from skills.publish_video import set_scheduler, skill_publish_video
+
+        set_scheduler(PublishScheduler(lambda platform, posts: []))
+        try:
+            later = skill_publish_video(
+                platform="youtube", video_asset_id="a", caption="c", hashtags=[], schedule_time="2999-01-01T00:00:00"
+            )
+        finally:
+            set_scheduler(None)
+
+        assert later["publication_status"] == "SCHEDULED"
+        assert parse_timestamp("2026-01-01T00:00:00") == parse_timestamp("2026-01-01T00:00:00Z")
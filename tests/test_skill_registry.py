@@ -0,0 +1,106 @@
+"""
+Tests for the lazy skill registry and Worker cold start.
+
+Start-up checks run in a fresh interpreter with ``python -X importtime`` so
+modules already imported by the test session do not hide anything. Which
+modules got loaded is read from ``sys.modules`` at exit: importtime does not
+log a module loaded through ``importlib.import_module`` itself.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+PUBLISH = (
+    "from skills import invoke\n"
+    "invoke('skill_publish_video', platform='tiktok', video_asset_id='a', caption='c', hashtags=[], schedule_time=None)\n"
+)
+
+# Backends a publish-only Worker must never pay for at start.
+HEAVY = {
+    "numpy",
+    "dataclasses",
+    "sqlite3",
+    "multiprocessing",
+    "concurrent.futures.process",
+    "skills.render",
+    "skills.asset_store",
+    "skills.mcp_client",
+    "skills.semantic_memory",
+    "skills.trend_fetcher",
+    "skills.generate_script",
+    "skills.generate_video",
+}
+
+
+def import_report(code: str, env: dict | None = None) -> tuple[dict[str, int], set[str]]:
+    """Run ``code`` under ``-X importtime``; return ``{module: cumulative microseconds}`` and the loaded modules."""
+    proc = subprocess.run(  # nosec B603 - fixed interpreter and test-owned code
+        [sys.executable, "-X", "importtime", "-c", f"{code}\nimport sys\nprint(*sys.modules, sep='\\n')"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        timeout=60,
+        env={**os.environ, **(env or {})},
+    )
+    assert proc.returncode == 0, proc.stderr
+    report = {}
+    for line in proc.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line and "cumulative" not in line:
+            _, cumulative, name = line.split("|")
+            report[name.strip()] = int(cumulative)
+    return report, set(proc.stdout.split())
+
+
+class TestLazyRegistry:
+    """Test suite for on-demand skill imports and warm-up."""
+
+    def test_publish_worker_cold_start(self):
+        report, loaded = import_report(PUBLISH)
+
+        slowest = sorted(report.items(), key=lambda kv: -kv[1])[:10]
+        print("\n".join(f"{us / 1000:8.2f} ms  {name}" for name, us in slowest))
+        assert "skills.publish_video" in loaded
+        assert not HEAVY & loaded
+        assert report["skills"] < 250_000  # tens of ms in practice; generous for shared CI
+
+    def test_warm_up_role_imports_only_its_skills(self):
+        code = "import skills, sys\nprint(skills.warm_up('publisher'), skills.loaded_skills())"
+        _, loaded = import_report(code)
+
+        assert "skills.publish_video" in loaded
+        assert "skills.generate_video" not in loaded
+
+    def test_warm_up_reads_role_from_environment(self):
+        proc = subprocess.run(  # nosec B603 - fixed interpreter and test-owned code
+            [sys.executable, "-c", "import skills\nprint(','.join(skills.warm_up(skills=['skill_publish_video'])))"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            timeout=60,
+            env={**os.environ, "CHIMERA_WORKER_ROLE": "content"},
+        )
+
+        assert proc.stdout.strip() == "skill_fetch_trends,skill_generate_script,skill_publish_video"
+
+    def test_get_skill_loads_on_first_use(self):
+        import skills
+
+        impl = skills.get_skill("skill_fetch_trends")
+
+        assert "skill_fetch_trends" in skills.loaded_skills()
+        assert skills.get_skill("skill_fetch_trends") is impl
+        assert impl.contract is skills.CONTRACTS["skill_fetch_trends"]
+
+    def test_unknown_skill_and_role(self):
+        import skills
+
+        with pytest.raises(KeyError):
+            skills.get_skill("skill_does_not_exist")
+        with pytest.raises(KeyError):
+            skills.warm_up("no-such-role")
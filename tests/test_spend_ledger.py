@@ -0,0 +1,334 @@
+"""
+Tests for the spend ledger, against the local mock wallet and a simulated clock.
+"""
+
+import json
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from tests.wallet_standin import MockWallet
+
+T0 = 1_700_000_000.0
+USDC = 1_000_000
+ROOT = Path(__file__).resolve().parents[1]
+
+# Pays once from a fresh process, logging the wallet call, then dies without
+# closing the ledger: "during" between the payment and its ``submit`` record,
+# "after" right after flush() returns.
+CRASH = """
+import json, os, sys
+from skills.spend_ledger import SpendLedger
+
+path, when = sys.argv[1], sys.argv[2]
+
+def wallet(agent_id, transfers, key):
+    with open(path + ".wallet", "a") as fh:
+        fh.write(json.dumps([agent_id, transfers, key]) + "\\n")
+    if when == "during":
+        os._exit(0)
+    return "0xtx000001"
+
+ledger = SpendLedger(wallet, ledger=path)
+ledger.set_budget("a1", 50)
+ledger.commit(ledger.reserve("a1", 5, payee="p"))
+ledger.flush(force=True)
+os._exit(0)
+"""
+
+
+class FakeClock:
+    def __init__(self, now=T0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+def make_ledger(tmp_path=None, wallet=None, **kw):
+    from skills.spend_ledger import SpendLedger
+
+    kw.setdefault("clock", FakeClock())
+    ledger = SpendLedger(
+        wallet or MockWallet({"a1": 100 * USDC, "a2": 100 * USDC}),
+        ledger=None if tmp_path is None else tmp_path / "ledger.jsonl",
+        **kw,
+    )
+    return ledger
+
+
+class TestBudgetIndex:
+    """Test suite for reservations against per-agent budgets."""
+
+    def test_reserve_commit_release(self):
+        ledger = make_ledger()
+        ledger.set_budget("a1", 10 * USDC)
+
+        first = ledger.reserve("a1", 4 * USDC, payee="openai")
+        second = ledger.reserve("a1", 5 * USDC, payee="openai")
+        assert ledger.remaining("a1") == USDC
+        ledger.commit(first, 3 * USDC)
+        ledger.release(second)
+
+        assert ledger.remaining("a1") == 7 * USDC
+        assert ledger.stats()["accounts"]["a1"] == {
+            "limit": 10 * USDC, "spent": 3 * USDC, "reserved": 0, "reservations": 2, "denials": 0,
+        }
+
+    def test_over_budget_and_unknown(self):
+        from skills.spend_ledger import BudgetError
+
+        ledger = make_ledger()
+        ledger.set_budget("a1", USDC)
+        hold = ledger.reserve("a1", USDC, payee="p")
+
+        with pytest.raises(BudgetError) as exc:
+            ledger.reserve("a1", 1, payee="p")
+        assert exc.value.to_dict()["code"] == "BUDGET_EXCEEDED" and exc.value.agent_id == "a1"
+        with pytest.raises(BudgetError, match="exceeds hold"):
+            ledger.commit(hold, 2 * USDC)
+        with pytest.raises(BudgetError) as exc:
+            ledger.reserve("ghost", 1, payee="p")
+        assert exc.value.code == "NO_BUDGET"
+        ledger.commit(hold)
+        with pytest.raises(BudgetError) as exc:
+            ledger.commit(hold)
+        assert exc.value.code == "UNKNOWN_RESERVATION"
+        with pytest.raises(ValueError):
+            ledger.reserve("a1", 0.5, payee="p")
+
+    def test_concurrent_reservations_never_overspend(self):
+        from skills.spend_ledger import BudgetError
+
+        ledger = make_ledger()
+        ledger.set_budget("a1", 1000)
+        won = []
+
+        def worker():
+            for _ in range(200):
+                try:
+                    hold = ledger.reserve("a1", 3, payee="p")
+                except BudgetError:
+                    continue
+                ledger.commit(hold)
+                won.append(3)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        stats = ledger.stats()["accounts"]["a1"]
+        assert sum(won) == stats["spent"] == 999
+        assert stats["reserved"] == 0 and stats["denials"] == 8 * 200 - 333
+
+    def test_hold_context_commits_or_releases(self):
+        ledger = make_ledger()
+        ledger.set_budget("a1", 10)
+
+        with ledger.hold("a1", 4, payee="p"):
+            pass
+        with pytest.raises(RuntimeError):
+            with ledger.hold("a1", 4, payee="p"):
+                raise RuntimeError("render failed")
+        with ledger.hold("a1", 4, payee="p") as hold:
+            ledger.commit(hold, 1)
+
+        assert ledger.remaining("a1") == 5
+        assert ledger.stats()["commits"] == 2 and ledger.stats()["releases"] == 1
+
+
+class TestBatching:
+    """Test suite for batched wallet submissions."""
+
+    def test_small_purchases_share_a_submission(self):
+        wallet = MockWallet({"a1": 100 * USDC})
+        ledger = make_ledger(wallet=wallet, batch_size=20)
+        ledger.set_budget("a1", 10 * USDC)
+
+        for i in range(25):
+            ledger.commit(ledger.reserve("a1", 1000, payee="openai" if i % 2 else "runway"))
+        ledger.flush()
+        assert wallet.submissions == []  # no single (agent, payee) batch is due yet
+        ledger.commit(ledger.reserve("a1", 1000, payee="runway"))
+        ledger.flush(force=True)
+
+        assert len(wallet.submissions) == 1
+        agent, transfers = wallet.submissions[0]
+        assert agent == "a1"
+        assert sorted((t["to"], t["amount"]) for t in transfers) == [("openai", 12_000), ("runway", 14_000)]
+        assert ledger.stats()["submitted_spends"] == 26 and ledger.pending() == []
+
+    def test_due_on_size_amount_or_age(self):
+        wallet = MockWallet({"a1": 100 * USDC})
+        clock = FakeClock()
+        ledger = make_ledger(wallet=wallet, clock=clock, batch_size=3, min_batch_amount=5 * USDC, max_delay=30)
+        ledger.set_budget("a1", 50 * USDC)
+
+        for _ in range(3):
+            ledger.commit(ledger.reserve("a1", 1, payee="size"))
+        ledger.commit(ledger.reserve("a1", 5 * USDC, payee="amount"))
+        ledger.commit(ledger.reserve("a1", 1, payee="age"))
+        assert ledger.flush() == 1
+        assert sorted(t["to"] for t in wallet.submissions[0][1]) == ["amount", "size"]
+        clock.advance(30)
+        ledger.tick()
+
+        assert [t["to"] for t in wallet.submissions[1][1]] == ["age"]
+
+    def test_retryable_failure_backs_off_then_resends(self):
+        wallet = MockWallet({"a1": 100 * USDC})
+        clock = FakeClock()
+        ledger = make_ledger(wallet=wallet, clock=clock, retry_backoff=10)
+        ledger.set_budget("a1", 10 * USDC)
+        ledger.commit(ledger.reserve("a1", 5, payee="p"))
+        wallet.fail_next = ["RATE_LIMITED"]
+
+        assert ledger.flush(force=True) == 0
+        ledger.commit(ledger.reserve("a1", 7, payee="p"))
+        assert ledger.flush(force=True) == 1  # the new spend goes; the failed one is backing off
+        assert [s["amount"] for s in ledger.pending()] == [5]
+        clock.advance(10)
+        assert ledger.flush(force=True) == 1
+
+        assert [ts[0]["amount"] for _, ts in wallet.submissions] == [7, 5]
+        assert ledger.stats()["submit_errors"] == 1 and ledger.pending() == []
+
+    def test_timeout_after_payment_is_not_paid_twice(self):
+        from skills import SkillError
+
+        wallet = MockWallet({"a1": 100})
+        timeouts = []
+
+        def flaky(agent_id, transfers, key):
+            tx = wallet(agent_id, transfers, key)
+            if not timeouts:
+                timeouts.append(key)
+                raise SkillError("TIMEOUT", "no answer from the wallet")
+            return tx
+
+        ledger = make_ledger(wallet=flaky, retry_backoff=0)
+        ledger.set_budget("a1", 50)
+        ledger.commit(ledger.reserve("a1", 5, payee="p"))
+
+        assert ledger.flush(force=True) == 0
+        assert ledger.flush() == 1
+
+        assert wallet.balances["a1"] == 95 and wallet.duplicates == 1
+        assert list(wallet.accepted) == timeouts
+
+    def test_permanent_failure_is_recorded(self):
+        wallet = MockWallet({"a1": 3})
+        ledger = make_ledger(wallet=wallet)
+        ledger.set_budget("a1", 10)
+        spend_id = ledger.commit(ledger.reserve("a1", 5, payee="p"))
+
+        ledger.flush(force=True)
+
+        assert [s["id"] for s in ledger.failed] == [spend_id]
+        assert ledger.remaining("a1") == 5  # the budget stays spent until an operator resolves it
+        assert ledger.pending() == []
+
+    def test_run_flushes_on_stop(self):
+        import asyncio
+
+        wallet = MockWallet({"a1": 100})
+        ledger = make_ledger(wallet=wallet)
+        ledger.set_budget("a1", 10)
+        ledger.commit(ledger.reserve("a1", 2, payee="p"))
+
+        async def main():
+            stop = asyncio.Event()
+            stop.set()
+            await ledger.run(stop, interval=0.01)
+
+        asyncio.run(main())
+        assert len(wallet.submissions) == 1
+
+
+class TestAuditLedger:
+    """Test suite for the append-only ledger file."""
+
+    def test_restart_restores_budgets_and_pending(self, tmp_path):
+        wallet = MockWallet({"a1": 100, "a2": 100})
+        ledger = make_ledger(tmp_path, wallet=wallet)
+        ledger.set_budget("a1", 50)
+        ledger.set_budget("a2", 20)
+        ledger.commit(ledger.reserve("a1", 10, payee="p"))
+        ledger.flush(force=True)
+        ledger.commit(ledger.reserve("a1", 5, payee="p"))
+        ledger.reserve("a2", 20, payee="p")  # open hold, lost on restart
+        ledger.close()
+
+        reopened = make_ledger(tmp_path, wallet=wallet)
+
+        assert reopened.remaining("a1") == 35 and reopened.remaining("a2") == 20
+        assert [(s["id"], s["amount"]) for s in reopened.pending()] == [("sp2", 5)]
+        assert reopened.commit(reopened.reserve("a1", 1, payee="p")) == "sp3"
+        reopened.flush(force=True)
+        assert [t["amount"] for _, ts in wallet.submissions for t in ts] == [10, 6]
+        reopened.close()
+
+    def test_hash_chain_detects_tampering(self, tmp_path):
+        from skills.spend_ledger import verify_ledger
+
+        ledger = make_ledger(tmp_path)
+        ledger.set_budget("a1", 50)
+        for amount in (1, 2, 3):
+            ledger.commit(ledger.reserve("a1", amount, payee="p"))
+        ledger.flush(force=True)
+        ledger.close()
+        path = tmp_path / "ledger.jsonl"
+
+        assert verify_ledger(path) == 6
+        lines = path.read_text().splitlines()
+        entry = json.loads(lines[2])
+        entry["amount"] = 0
+        lines[2] = json.dumps(entry, separators=(",", ":"))
+        path.write_text("\n".join(lines) + "\n")
+        with pytest.raises(ValueError, match="entry 3"):
+            verify_ledger(path)
+
+    @pytest.mark.parametrize("when", ["during", "after"])
+    def test_crash_around_payment_never_pays_twice(self, tmp_path, when):
+        path = tmp_path / "ledger.jsonl"
+        proc = subprocess.run(  # nosec B603 - fixed interpreter and test-owned code
+            [sys.executable, "-c", CRASH, str(path), when], cwd=ROOT, capture_output=True, text=True, timeout=60
+        )
+        assert proc.returncode == 0, proc.stderr
+        [(agent_id, transfers, key)] = [json.loads(line) for line in open(f"{path}.wallet")]
+        wallet = MockWallet({"a1": 95})  # the crashed process already paid 5
+        wallet.accepted[key] = "0xtx000001"
+
+        reopened = make_ledger(tmp_path, wallet=wallet)
+        reopened.flush(force=True)
+        reopened.close()
+
+        assert wallet.submissions == [] and wallet.balances["a1"] == 95
+        assert wallet.duplicates == (1 if when == "during" else 0)
+        assert make_ledger(tmp_path, wallet=wallet).pending() == []
+        assert transfers == [{"to": "p", "amount": 5, "memo": "1 credit purchases"}]
+
+    def test_torn_final_line_is_dropped(self, tmp_path):
+        from skills.spend_ledger import verify_ledger
+
+        ledger = make_ledger(tmp_path)
+        ledger.set_budget("a1", 50)
+        ledger.commit(ledger.reserve("a1", 4, payee="p"))
+        ledger.close()
+        with open(tmp_path / "ledger.jsonl", "a") as fh:
+            fh.write('{"op":"spend","agent":"a1","amo')
+
+        reopened = make_ledger(tmp_path)
+
+        assert reopened.remaining("a1") == 46
+        reopened.commit(reopened.reserve("a1", 1, payee="p"))
+        reopened.close()
+        assert verify_ledger(tmp_path / "ledger.jsonl") == 3
@@ -0,0 +1,231 @@
+"""
+Tests for the priority task queue, against the in-memory backend and the
+Redis backend talking to a local RESP stand-in.
+"""
+
+import pytest
+
+from tests.resp_standin import RespStandIn
+
+
+class FakeClock:
+    def __init__(self, now=1_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def task(tid, priority="medium"):
+    from skills.models import Task
+
+    return Task(task_id=tid, task_type="reply", priority=priority)
+
+
+@pytest.fixture(params=["memory", "redis"])
+def backend(request):
+    from skills.task_queue import MemoryBackend, RedisBackend, RespClient
+
+    if request.param == "memory":
+        yield MemoryBackend()
+        return
+    with RespStandIn() as server:
+        client = RespClient(port=server.port)
+        yield RedisBackend(client)
+        client.close()
+
+
+def make_queue(backend, clock, **kwargs):
+    from skills.task_queue import TaskQueue
+
+    return TaskQueue(backend, clock=clock, **kwargs)
+
+
+class TestTaskQueue:
+    """Test suite for TaskQueue semantics shared by every backend."""
+
+    def test_strict_priority_then_fifo(self, backend):
+        queue = make_queue(backend, FakeClock())
+        queue.enqueue_many([task("l1", "low"), task("m1"), task("h1", "high"), task("m2"), task("h2", "high")])
+
+        got = [d.task.task_id for d in queue.dequeue(5)]
+
+        assert got == ["h1", "h2", "m1", "m2", "l1"]
+
+    def test_aging_promotes_starved_low_priority(self, backend):
+        clock = FakeClock()
+        queue = make_queue(backend, clock, aging_seconds=30)
+        queue.enqueue(task("old_low", "low"))
+        clock.now += 61
+        queue.enqueue(task("new_high", "high"))
+
+        assert [d.task.task_id for d in queue.dequeue(1)] == ["old_low"]
+
+    def test_partial_aging_does_not_jump_higher_lane(self, backend):
+        clock = FakeClock()
+        queue = make_queue(backend, clock, aging_seconds=30)
+        queue.enqueue(task("low", "low"))
+        clock.now += 31
+        queue.enqueue(task("high", "high"))
+
+        assert [d.task.task_id for d in queue.dequeue(1)] == ["high"]
+
+    def test_batched_dequeue_respects_max_items(self, backend):
+        queue = make_queue(backend, FakeClock())
+        queue.enqueue_many([task(f"t{i}") for i in range(10)])
+
+        assert len(queue.dequeue(4)) == 4
+        assert len(queue.dequeue(100)) == 6
+        assert queue.dequeue(5) == []
+
+    def test_unacked_delivery_is_redelivered_after_visibility_timeout(self, backend):
+        clock = FakeClock()
+        queue = make_queue(backend, clock, visibility_timeout=10)
+        queue.enqueue_many([task("a"), task("b")])
+
+        first = queue.dequeue(2)
+        queue.ack([first[1].message_id])
+        clock.now += 5
+        assert queue.dequeue(2) == []
+
+        clock.now += 6
+        again = queue.dequeue(2)
+        assert [d.task.task_id for d in again] == ["a"]
+        assert again[0].attempts == 2
+        assert queue.metrics()["counters"]["redelivered"] == 1
+
+    def test_acked_message_is_never_redelivered(self, backend):
+        clock = FakeClock()
+        queue = make_queue(backend, clock, visibility_timeout=10)
+        queue.enqueue(task("a"))
+
+        assert queue.ack([d.message_id for d in queue.dequeue(1)]) == 1
+        clock.now += 100
+        assert queue.dequeue(1) == []
+
+    def test_nack_requeues_at_front(self, backend):
+        queue = make_queue(backend, FakeClock())
+        queue.enqueue_many([task("a"), task("b")])
+
+        queue.nack(queue.dequeue(1))
+
+        assert [d.task.task_id for d in queue.dequeue(2)] == ["a", "b"]
+
+    def test_nack_after_lease_was_reclaimed_does_not_duplicate(self, backend):
+        clock = FakeClock()
+        slow = make_queue(backend, clock, visibility_timeout=1)
+        other = make_queue(backend, clock, visibility_timeout=1)
+        slow.enqueue(task("a"))
+        stale = slow.dequeue(1)
+        clock.now += 2
+        [redelivered] = other.dequeue(1)  # reclaims the expired lease, then leases it again
+
+        other.ack([redelivered.message_id])
+        slow.nack(stale)
+
+        assert other.dequeue(5) == []
+        assert backend.depths()["inflight"] == 0
+
+    def test_dead_letter_after_max_deliveries(self, backend):
+        clock = FakeClock()
+        queue = make_queue(backend, clock, visibility_timeout=1, max_deliveries=2)
+        queue.enqueue(task("poison"))
+
+        queue.dequeue(1)
+        clock.now += 2
+        assert len(queue.dequeue(1)) == 1
+        clock.now += 2
+        assert queue.dequeue(1) == []
+        assert queue.metrics()["depth"]["dead"] == 1
+
+    def test_metrics_depth_and_wait_histograms(self, backend):
+        clock = FakeClock()
+        queue = make_queue(backend, clock)
+        queue.enqueue_many([task("h", "high"), task("l1", "low"), task("l2", "low")])
+        clock.now += 2
+
+        queue.dequeue(2)
+        metrics = queue.metrics()
+
+        assert metrics["depth"]["low"] == 1
+        assert metrics["depth"]["inflight"] == 2
+        assert metrics["wait_seconds"]["high"]["count"] == 1
+        assert metrics["wait_seconds"]["high"]["buckets"]["5"] == 1
+        assert metrics["wait_seconds"]["high"]["buckets"]["1"] == 0
+        assert metrics["wait_seconds"]["low"]["sum"] == 2.0
+
+    def test_task_round_trips_through_backend(self, backend):
+        from skills.models import Task
+
+        queue = make_queue(backend, FakeClock())
+        original = Task.new("render_video", goal="make a clip", priority="high", resources=["mcp://media/x"])
+        queue.enqueue(original)
+
+        assert queue.dequeue(1)[0].task == original
+
+
+class TestRedisRoundTrips:
+    """Batched operations cost a constant number of round-trips."""
+
+    def test_batch_enqueue_is_one_command_per_lane(self):
+        from skills.task_queue import RedisBackend, RespClient, TaskQueue
+
+        with RespStandIn() as server:
+            client = RespClient(port=server.port)
+            queue = TaskQueue(RedisBackend(client))
+            before = server.commands_served
+            queue.enqueue_many([task(f"t{i}") for i in range(500)])
+            assert server.commands_served - before == 1
+            client.close()
+
+    def test_pop_and_lease_is_one_command(self):
+        from skills.task_queue import RedisBackend, RespClient, TaskQueue
+
+        with RespStandIn() as server:
+            client = RespClient(port=server.port)
+            queue = TaskQueue(RedisBackend(client))
+            queue.enqueue_many([task(f"t{i}", p) for i, p in enumerate(["high", "low"] * 50)])
+            before = server.commands_served
+            deliveries = queue.dequeue(100)
+            assert len(deliveries) == 100 and {d.attempts for d in deliveries} == {1}
+            # reclaim + heads + one EVAL that pops and leases both lanes
+            assert server.commands_served - before == 1 + 6 + 1
+            client.close()
+
+    def test_nack_and_reclaim_are_one_command_each(self):
+        from skills.task_queue import RedisBackend, RespClient, TaskQueue
+
+        clock = FakeClock()
+        with RespStandIn() as server:
+            client = RespClient(port=server.port)
+            queue = TaskQueue(RedisBackend(client), clock=clock, visibility_timeout=1)
+            queue.enqueue_many([task(f"t{i}") for i in range(20)])
+            deliveries = queue.dequeue(20)
+
+            before = server.commands_served
+            queue.nack(deliveries[:10])
+            assert server.commands_served - before == 1
+
+            clock.now += 2
+            before = server.commands_served
+            assert queue.redeliver_expired() == 10
+            assert server.commands_served - before == 1
+
+            redelivered = queue.dequeue(20)
+            assert sorted(d.task.task_id for d in redelivered) == sorted(f"t{i}" for i in range(20))
+            assert {d.attempts for d in redelivered} == {2}
+            client.close()
+
+
+class TestRespClient:
+    """Test suite for RespClient."""
+
+    def test_timeout_drops_the_connection_so_a_late_reply_is_not_misread(self):
+        from skills.task_queue import RespClient
+
+        with RespStandIn() as server:
+            client = RespClient(port=server.port, timeout=0.05)
+            with pytest.raises(TimeoutError):
+                client.execute("DEBUG", "SLEEP", "0.2")
+            assert client.execute("PING") == "PONG"
+            client.close()
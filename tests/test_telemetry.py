@@ -0,0 +1,179 @@
+"""
+Tests for skill tracing, HDR histograms and the Prometheus/OTLP exporters.
+"""
+
+import asyncio
+import json
+import threading
+
+import pytest
+
+
+@pytest.fixture
+def tel():
+    from skills import telemetry
+
+    previous = telemetry.get_telemetry()
+    fresh = telemetry.Telemetry()
+    telemetry.set_telemetry(fresh)
+    yield fresh
+    telemetry.set_telemetry(previous)
+
+
+class TestHistogram:
+    """Test suite for the HDR bucket layout."""
+
+    def test_bucket_bounds_contain_value_within_precision(self):
+        from skills.telemetry import bucket_index, bucket_upper
+
+        for ns in (0, 1, 63, 64, 100, 999, 12_345, 10**6, 7 * 10**9):
+            i = bucket_index(ns)
+            lower = bucket_upper(i - 1) if i else 0
+            assert lower <= ns < bucket_upper(i)
+            assert bucket_upper(i) - lower <= max(1, ns / 32)
+
+    def test_quantiles_from_observations(self, tel):
+        for ms in range(1, 101):
+            tel.observe("stage", "render.total", ms / 1000)
+
+        assert tel.quantile("stage", "render.total", 0.5) == pytest.approx(0.050, rel=0.04)
+        assert tel.quantile("stage", "render.total", 0.99) == pytest.approx(0.099, rel=0.04)
+        assert tel.quantile("stage", "missing", 0.5) is None
+
+    def test_per_thread_states_merge(self, tel):
+        def work():
+            for _ in range(1000):
+                tel.observe("stage", "x", 0.001)
+                tel.count("cache", "c", "hit")
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        snap = tel.snapshot()
+        assert snap["histograms"][("stage", "x")][-2] == 8000
+        assert snap["events"][("cache", "c", "hit")] == 8000
+
+    def test_exited_threads_are_retired(self, tel):
+        def job():
+            tel.observe("stage", "render.total", 0.002)
+            with tel.span("skill", "s"):
+                pass
+
+        for _ in range(50):
+            t = threading.Thread(target=job)
+            t.start()
+            t.join()
+        tel.count("cache", "c", "hit")
+
+        snap = tel.snapshot()
+        assert len(tel._states) == 1  # only this thread's live state
+        assert snap["histograms"][("stage", "render.total")][-2] == 50
+        assert snap["histograms"][("skill", "s")][-2] == 50
+
+
+class TestSpans:
+    """Test suite for Span and the skill wrapper."""
+
+    def test_nested_spans_share_trace_and_record_errors(self, tel):
+        from skills import SkillError, telemetry
+
+        with telemetry.span("skill", "outer") as outer:
+            with telemetry.span("mcp", "git/echo") as inner:
+                pass
+            with pytest.raises(SkillError):
+                with telemetry.span("mcp", "git/push"):
+                    raise SkillError("AUTH_EXPIRED", "token")
+
+        assert inner.trace_id == outer.trace_id and inner.parent_id == outer.span_id
+        assert outer.parent_id == 0 and outer.duration_ms >= inner.duration_ms
+        assert tel.snapshot()["errors"] == {("mcp", "git/push", "AUTH_EXPIRED"): 1}
+        assert len(tel.spans) == 3
+
+    def test_every_skill_call_is_traced(self, tel):
+        from skills import SkillError, invoke
+
+        invoke("skill_generate_script", trend_topic="x", persona_id="p", target_duration_seconds=10, language="en")
+        with pytest.raises(SkillError):
+            invoke("skill_generate_script", trend_topic="x", persona_id="p", target_duration_seconds=10, language="zz")
+
+        summary = tel.summary()["skill/skill_generate_script"]
+        assert summary["count"] == 2 and summary["errors"] == 1
+
+    def test_disabled_telemetry_is_a_no_op(self, tel):
+        from skills import invoke, telemetry
+
+        telemetry.set_telemetry(None)
+        assert telemetry.span("skill", "x") is telemetry.NULL_SPAN
+        telemetry.count("cache", "c", "hit")
+        invoke("skill_generate_script", trend_topic="x", persona_id="p", target_duration_seconds=10, language="en")
+        assert tel.snapshot()["histograms"] == {}
+
+    def test_sampling_keeps_metrics_drops_spans(self):
+        from skills.telemetry import Telemetry
+
+        tel = Telemetry(sample_rate=0.0)
+        for _ in range(10):
+            with tel.span("skill", "x"):
+                with tel.span("stage", "y"):
+                    pass
+
+        assert len(tel.spans) == 0
+        assert tel.snapshot()["histograms"][("stage", "y")][-2] == 10
+
+    def test_dag_tasks_get_spans_and_result_latency(self, tel):
+        from skills.dag_executor import DagExecutor, TaskGraph
+        from skills.models import Result, Task
+
+        def handler(task):
+            return Result(task_id=task.task_id, output="ok", confidence_score=0.9)
+
+        graph = TaskGraph()
+        graph.add(Task.new("reply"))
+        run = asyncio.run(DagExecutor({"reply": handler}).run(graph))
+
+        [result] = run.results.values()
+        assert tel.summary()["task/reply"]["count"] == 1
+        assert result.latency_ms == round(tel.spans[-1].duration_ms)
+
+
+class TestExporters:
+    """Prometheus text and OTLP/JSON output."""
+
+    def test_prometheus_text(self, tel):
+        from skills import telemetry
+
+        tel.observe("skill", 'we"ird', 0.002)
+        tel.observe("skill", 'we"ird', 20)
+        telemetry.count("cache", "script_cache", "miss")
+        text = tel.prometheus()
+
+        assert "# TYPE chimera_span_duration_seconds histogram" in text
+        assert 'chimera_span_duration_seconds_bucket{kind="skill",name="we\\"ird",le="0.005"} 1' in text
+        assert 'chimera_span_duration_seconds_bucket{kind="skill",name="we\\"ird",le="30.0"} 2' in text
+        assert 'chimera_span_duration_seconds_count{kind="skill",name="we\\"ird"} 2' in text
+        assert 'chimera_events_total{kind="cache",name="script_cache",outcome="miss"} 1' in text
+
+    def test_otlp_metrics_and_traces(self, tel):
+        from skills.telemetry import EXPORT_BOUNDS
+
+        with tel.span("skill", "s", {"persona": "p", "retries": 2}):
+            with tel.span("mcp", "git/echo"):
+                pass
+        metrics = json.loads(json.dumps(tel.otlp_metrics()))
+        traces = tel.otlp_traces()
+
+        [histogram] = [m for m in metrics["resourceMetrics"][0]["scopeMetrics"][0]["metrics"] if "histogram" in m]
+        point = histogram["histogram"]["dataPoints"][0]
+        assert len(point["bucketCounts"]) == len(EXPORT_BOUNDS) + 1
+        assert sum(int(c) for c in point["bucketCounts"]) == int(point["count"])
+
+        spans = traces["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        by_name = {s["name"]: s for s in spans}
+        assert by_name["mcp/git/echo"]["parentSpanId"] == by_name["skill/s"]["spanId"]
+        assert by_name["mcp/git/echo"]["kind"] == 3
+        assert {"key": "retries", "value": {"intValue": "2"}} in by_name["skill/s"]["attributes"]
+        assert len(by_name["skill/s"]["traceId"]) == 32
+        assert len(tel.spans) == 0  # drained by the export
@@ -0,0 +1,179 @@
+"""
+Tests for the shared trend cache in front of fetch_trends.
+
+Covers per-platform TTLs, LRU eviction, stale-while-revalidate, superset
+slicing across limits and coalescing of concurrent misses.
+"""
+
+import threading
+import time
+
+import pytest
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingSource:
+    def __init__(self, gate=None):
+        self.calls = []
+        self.gate = gate
+
+    def __call__(self, platform, region, category, limit):
+        self.calls.append((platform, region, category, limit))
+        if self.gate is not None:
+            self.gate.wait(timeout=5)
+        return [
+            {"topic": f"t{i}", "score": float(100 - i), "source": platform, "observed_at": "2026-01-01T00:00:00+00:00"}
+            for i in range(limit)
+        ]
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            pytest.fail("condition not reached in time")
+        time.sleep(0.005)
+
+
+class TestTrendCache:
+    """Test suite for TrendCache behaviour."""
+
+    def test_hit_within_ttl_does_not_refetch(self):
+        from skills.trend_fetcher import TrendCache
+
+        source, clock = CountingSource(), FakeClock()
+        cache = TrendCache(source, ttls={"twitter": 60}, clock=clock)
+
+        first = cache.get("twitter", "us", None, 5)
+        clock.now = 59
+        second = cache.get("twitter", "us", None, 5)
+
+        assert len(source.calls) == 1
+        assert first == second
+        assert cache.stats["hits"] == 1
+
+    def test_different_limits_share_one_superset(self):
+        from skills.trend_fetcher import TrendCache
+
+        source = CountingSource()
+        cache = TrendCache(source, superset_limit=20, clock=FakeClock())
+
+        assert len(cache.get("reddit", "us", "tech", 3)["trends"]) == 3
+        assert len(cache.get("reddit", "us", "tech", 15)["trends"]) == 15
+        assert len(source.calls) == 1
+        assert source.calls[0][3] == 20
+
+    def test_limit_above_superset_refetches_larger(self):
+        from skills.trend_fetcher import TrendCache
+
+        source = CountingSource()
+        cache = TrendCache(source, superset_limit=10, clock=FakeClock())
+
+        cache.get("reddit", "us", None, 5)
+        assert len(cache.get("reddit", "us", None, 30)["trends"]) == 30
+        assert [call[3] for call in source.calls] == [10, 30]
+
+    def test_fetched_at_reports_upstream_fetch_time(self):
+        from skills.trend_fetcher import TrendCache
+
+        clock = FakeClock()
+        cache = TrendCache(CountingSource(), ttls={"twitter": 60}, stale_ttl=0, clock=clock)
+
+        first = cache.get("twitter", "us", None, 5)["metadata"]["fetched_at"]
+        time.sleep(0.002)
+        clock.now = 30
+        assert cache.get("twitter", "us", None, 5)["metadata"]["fetched_at"] == first
+
+        clock.now = 61
+        assert cache.get("twitter", "us", None, 5)["metadata"]["fetched_at"] > first
+
+    def test_stale_entry_served_while_refreshing(self):
+        from skills.trend_fetcher import TrendCache
+
+        source, clock = CountingSource(), FakeClock()
+        cache = TrendCache(source, ttls={"twitter": 60}, stale_ttl=60, clock=clock)
+
+        fresh = cache.get("twitter", "us", None, 5)
+        clock.now = 90
+        stale = cache.get("twitter", "us", None, 5)
+
+        assert stale["metadata"]["fetched_at"] == fresh["metadata"]["fetched_at"]
+        assert cache.stats["stale_hits"] == 1
+        wait_for(lambda: len(source.calls) == 2)
+
+    def test_hard_expiry_fetches_synchronously(self):
+        from skills.trend_fetcher import TrendCache
+
+        source, clock = CountingSource(), FakeClock()
+        cache = TrendCache(source, ttls={"twitter": 60}, stale_ttl=10, clock=clock)
+
+        cache.get("twitter", "us", None, 5)
+        clock.now = 100
+        cache.get("twitter", "us", None, 5)
+
+        assert len(source.calls) == 2
+        assert cache.stats["misses"] == 2
+
+    def test_lru_eviction(self):
+        from skills.trend_fetcher import TrendCache
+
+        source = CountingSource()
+        cache = TrendCache(source, max_entries=2, clock=FakeClock())
+
+        cache.get("twitter", "us", None, 5)
+        cache.get("twitter", "uk", None, 5)
+        cache.get("twitter", "us", None, 5)
+        cache.get("twitter", "de", None, 5)
+
+        assert len(cache) == 2
+        assert cache.stats["evictions"] == 1
+        cache.get("twitter", "us", None, 5)
+        assert len(source.calls) == 3
+
+    def test_concurrent_misses_are_coalesced(self):
+        from skills.trend_fetcher import TrendCache
+
+        gate = threading.Event()
+        source = CountingSource(gate=gate)
+        cache = TrendCache(source, clock=FakeClock())
+        results = []
+
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get("tiktok", "us", None, 5)))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        wait_for(lambda: len(source.calls) == 1)
+        gate.set()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        assert len(source.calls) == 1
+        assert len(results) == 8
+
+    def test_upstream_error_propagates_on_miss(self):
+        from skills.trend_fetcher import TrendCache, TrendFetchError
+
+        def failing(platform, region, category, limit):
+            raise TrendFetchError(TrendFetchError.RATE_LIMITED, "slow down", platform)
+
+        cache = TrendCache(failing, clock=FakeClock())
+        with pytest.raises(TrendFetchError) as exc_info:
+            cache.get("twitter", "us", None, 5)
+        assert exc_info.value.code == "RATE_LIMITED"
+
+    def test_callers_cannot_mutate_cached_trends(self):
+        from skills.trend_fetcher import TrendCache
+
+        cache = TrendCache(CountingSource(), clock=FakeClock())
+        cache.get("twitter", "us", None, 5)["trends"][0]["topic"] = "mutated"
+
+        assert cache.get("twitter", "us", None, 5)["trends"][0]["topic"] == "t0"
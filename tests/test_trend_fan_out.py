@@ -0,0 +1,116 @@
+"""
+Tests for concurrent multi-platform trend fan-out (fetch_trends_many).
+
+Latency must be bounded by the slowest platform, and per-platform failures
+must come back as structured errors next to the partial results.
+"""
+
+import time
+
+
+def make_cache(delays, failures=None):
+    from skills.trend_fetcher import TrendCache, TrendFetchError
+
+    failures = failures or {}
+
+    def source(platform, region, category, limit):
+        time.sleep(delays.get(platform, 0))
+        if platform in failures:
+            raise TrendFetchError(failures[platform], f"{platform} failed", platform)
+        return [{"topic": f"{platform}-{i}", "score": 1.0, "source": platform, "observed_at": "2026-01-01T00:00:00+00:00"} for i in range(limit)]
+
+    return TrendCache(source)
+
+
+def req(platform, limit=3):
+    return {"platform": platform, "region": "us", "category": None, "limit": limit}
+
+
+class TestFetchTrendsMany:
+    """Test suite for fetch_trends_many."""
+
+    async def test_fetches_run_concurrently(self):
+        from skills.trend_fetcher import fetch_trends_many
+
+        cache = make_cache({"twitter": 0.2, "tiktok": 0.2, "youtube": 0.2, "reddit": 0.2})
+        started = time.perf_counter()
+        out = await fetch_trends_many([req(p) for p in ("twitter", "tiktok", "youtube", "reddit")], cache=cache)
+        elapsed = time.perf_counter() - started
+
+        assert [r["metadata"]["platform"] for r in out["results"]] == ["twitter", "tiktok", "youtube", "reddit"]
+        assert out["errors"] == []
+        assert elapsed < 0.6
+
+    async def test_per_platform_timeout_returns_partial_results(self):
+        from skills.trend_fetcher import fetch_trends_many
+
+        cache = make_cache({"youtube": 1.0})
+        out = await fetch_trends_many(
+            [req("twitter"), req("youtube")], timeout=2.0, timeouts={"youtube": 0.05}, cache=cache
+        )
+
+        assert [r["metadata"]["platform"] for r in out["results"]] == ["twitter"]
+        assert out["errors"] == [
+            {"platform": "youtube", "region": "us", "code": "TIMEOUT", "message": "platform did not answer before its deadline"}
+        ]
+
+    async def test_upstream_errors_are_structured(self):
+        from skills.trend_fetcher import fetch_trends_many
+
+        cache = make_cache({}, failures={"reddit": "RATE_LIMITED"})
+        out = await fetch_trends_many([req("reddit"), req("tiktok")], cache=cache)
+
+        assert len(out["results"]) == 1
+        assert out["errors"][0]["platform"] == "reddit"
+        assert out["errors"][0]["code"] == "RATE_LIMITED"
+
+    async def test_invalid_request_reported_without_cancelling_others(self):
+        from skills.trend_fetcher import fetch_trends_many
+
+        out = await fetch_trends_many([{"platform": "twitter"}, req("tiktok")], cache=make_cache({}))
+
+        assert len(out["results"]) == 1
+        assert out["errors"][0]["code"] == "INVALID_REQUEST"
+
+    async def test_default_cache_contract_shape(self):
+        from skills.trend_fetcher import fetch_trends_many
+
+        out = await fetch_trends_many([req("twitter", 2), req("reddit", 2)])
+
+        for result in out["results"]:
+            assert set(result) == {"trends", "metadata"}
+            assert len(result["trends"]) == 2
+
+    async def test_non_integer_limit_is_an_invalid_request(self):
+        from skills.trend_fetcher import fetch_trends_many
+
+        out = await fetch_trends_many([req("twitter", "5"), req("tiktok", -1), req("reddit")], cache=make_cache({}))
+
+        assert [r["metadata"]["platform"] for r in out["results"]] == ["reddit"]
+        assert [e["code"] for e in out["errors"]] == ["INVALID_REQUEST", "INVALID_REQUEST"]
+
+    async def test_timed_out_fetches_hold_only_the_fan_out_pool(self):
+        import asyncio
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+
+        from skills.trend_fetcher import TrendCache, fetch_trends_many
+
+        release = threading.Event()
+        threads = []
+
+        def source(platform, region, category, limit):
+            threads.append(threading.current_thread().name)
+            release.wait(5)
+            return []
+
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="fan-out") as pool:
+            out = await fetch_trends_many(
+                [req(p) for p in ("twitter", "tiktok", "youtube")], timeout=0.05, cache=TrendCache(source), executor=pool
+            )
+            assert await asyncio.wait_for(asyncio.to_thread(lambda: "free"), 1) == "free"
+            release.set()
+
+        assert [e["code"] for e in out["errors"]] == ["TIMEOUT"] * 3
+        assert len(threads) == 2  # the third lookup never started: cancelled while queued
+        assert all(name.startswith("fan-out") for name in threads)
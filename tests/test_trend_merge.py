@@ -0,0 +1,130 @@
+"""
+Tests for trend deduplication and cross-platform score merging.
+"""
+
+import random
+
+
+def trend(topic, score, source, observed_at="2026-01-01T00:00:00+00:00"):
+    return {"topic": topic, "score": score, "source": source, "observed_at": observed_at}
+
+
+class TestNormalizeTopic:
+    """Test suite for canonical topic keys."""
+
+    def test_case_hashtag_and_separators(self):
+        from skills.trend_merge import normalize_topic
+
+        assert normalize_topic("#AINews") == normalize_topic("ai_news") == normalize_topic("AI News")
+
+    def test_symbols_keep_topics_apart(self):
+        from skills.trend_merge import normalize_topic
+
+        assert len({normalize_topic("C++"), normalize_topic("C#"), normalize_topic("C")}) == 3
+        assert normalize_topic("#C#") == normalize_topic("c #")
+
+    def test_unicode_forms_and_accents(self):
+        from skills.trend_merge import normalize_topic
+
+        assert normalize_topic("Café") == normalize_topic("café") == normalize_topic("ＣＡＦＥ")
+
+    def test_symbol_only_topic_keeps_a_key(self):
+        from skills.trend_merge import normalize_topic
+
+        assert normalize_topic("🔥🔥") != ""
+
+
+class TestMergeTrends:
+    """Test suite for merge_trends and merge_responses."""
+
+    def test_cross_platform_duplicates_merge_and_rank_first(self):
+        from skills.trend_merge import merge_trends
+
+        merged = merge_trends(
+            [
+                trend("#AINews", 1000, "twitter"),
+                trend("cats", 900, "twitter"),
+                trend("ai news", 8.0, "reddit"),
+                trend("dogs", 10.0, "reddit"),
+            ],
+            limit=10,
+            sources=True,
+        )
+
+        assert merged[0]["source"] == "twitter"  # 1000/1000 beats reddit's 8/10
+        assert merged[0]["sources"] == ["reddit", "twitter"]
+        assert merged[1]["sources"] == [merged[1]["source"]]
+        assert merged[0]["score"] == 1.8
+        assert {item["topic"] for item in merged} == {"#AINews", "cats", "dogs"}
+
+    def test_calibration_puts_sources_on_one_scale(self):
+        from skills.trend_merge import merge_trends
+
+        merged = merge_trends([trend("a", 1_000_000, "tiktok"), trend("b", 3, "reddit")], limit=2)
+
+        assert [item["score"] for item in merged] == [1.0, 1.0]
+
+    def test_same_source_duplicates_keep_best_score(self):
+        from skills.trend_merge import merge_trends
+
+        merged = merge_trends(
+            [trend("#Ai", 50, "twitter"), trend("AI", 80, "twitter", "2026-01-02T00:00:00+00:00")],
+            limit=5,
+            calibrate=False,
+        )
+
+        assert merged == [trend("AI", 80.0, "twitter", "2026-01-02T00:00:00+00:00")]
+
+    def test_observed_at_compares_instants_not_strings(self):
+        from skills.trend_merge import merge_trends
+
+        [merged] = merge_trends(
+            [trend("ai", 1, "twitter", "2026-01-01T10:00:00+00:00"), trend("AI", 1, "reddit", "2026-01-01T06:00:00-05:00")],
+            limit=1,
+        )
+
+        assert merged["observed_at"] == "2026-01-01T06:00:00-05:00"  # 11:00 UTC
+
+    def test_top_k_matches_full_sort_on_large_feed(self):
+        from skills.trend_merge import merge_trends
+
+        rng = random.Random(7)
+        feed = [trend(f"topic{i}", rng.random() * 100, "twitter") for i in range(10_000)]
+        merged = merge_trends(feed, limit=25, calibrate=False)
+
+        expected = sorted(feed, key=lambda t: t["score"], reverse=True)[:25]
+        assert [m["topic"] for m in merged] == [e["topic"] for e in expected]
+
+    def test_weights_and_zero_limit(self):
+        from skills.trend_merge import merge_trends
+
+        feed = [trend("a", 10, "twitter"), trend("b", 10, "reddit")]
+        assert merge_trends(feed, limit=1, weights={"reddit": 2.0})[0]["topic"] == "b"
+        assert merge_trends(feed, limit=0) == []
+
+    def test_merge_responses(self):
+        from skills.trend_merge import merge_responses
+
+        out = merge_responses(
+            [
+                {"trends": [trend("x", 5, "twitter")], "metadata": {"platform": "twitter", "fetched_at": "2026-01-01T00:00:05+00:00"}},
+                {"trends": [trend("#X", 2, "tiktok")], "metadata": {"platform": "tiktok", "fetched_at": "2026-01-01T00:00:01+00:00"}},
+            ],
+            limit=5,
+        )
+
+        assert out["metadata"] == {"platform": "twitter,tiktok", "fetched_at": "2026-01-01T00:00:01+00:00"}
+        assert len(out["trends"]) == 1
+        assert out["trends"][0]["source"] == "tiktok"  # calibrated scores tie; first platform by name
+        assert out["trends"][0]["sources"] == ["tiktok", "twitter"]
+
+    def test_fetcher_output_is_deduplicated(self):
+        from skills.trend_fetcher import TrendCache
+
+        def noisy(platform, region, category, limit):
+            return [trend("#Launch", 90, platform), trend("launch", 70, platform), trend("other", 60, platform)][:limit]
+
+        cache = TrendCache(noisy)
+        trends = cache.get("twitter", "us", None, 10)["trends"]
+        assert [t["topic"] for t in trends] == ["#Launch", "other"]
+        assert all(set(t) == {"topic", "score", "source", "observed_at"} for t in trends)
@@ -0,0 +1,122 @@
+"""
+Tests for the incremental trend velocity index.
+"""
+
+import pytest
+
+
+class TestTrendVelocityIndex:
+    """Test suite for TrendVelocityIndex."""
+
+    def test_fastest_growing_ranks_by_window_growth(self):
+        from skills.trend_velocity import TrendVelocityIndex
+
+        index = TrendVelocityIndex(bucket_seconds=60, num_buckets=30)
+        for minute in range(20):
+            ts = minute * 60.0
+            index.observe("us", "steady", 50.0, ts)
+            index.observe("us", "rocket", 10.0 + minute * 5, ts)
+            index.observe("us", "fading", 80.0 - minute * 2, ts)
+
+        top = index.fastest_growing("us", 2, window_seconds=600, now=19 * 60.0)
+
+        assert [item["topic"] for item in top] == ["rocket", "steady"]
+        assert top[0]["growth"] == 50.0
+        assert top[1]["growth"] == 0.0
+
+    def test_regions_are_isolated(self):
+        from skills.trend_velocity import TrendVelocityIndex
+
+        index = TrendVelocityIndex()
+        index.observe("us", "a", 1.0, 0.0)
+        index.observe("uk", "b", 1.0, 0.0)
+
+        assert [item["topic"] for item in index.fastest_growing("uk", 5, 600, now=0.0)] == ["b"]
+        assert index.fastest_growing("de", 5, 600, now=0.0) == []
+
+    def test_new_topic_grows_from_zero(self):
+        from skills.trend_velocity import TrendVelocityIndex
+
+        index = TrendVelocityIndex(bucket_seconds=60, num_buckets=30)
+        index.observe("us", "old", 100.0, 0.0)
+        index.observe("us", "old", 100.0, 1200.0)
+        index.observe("us", "new", 40.0, 1200.0)
+
+        top = index.fastest_growing("us", 1, window_seconds=300, now=1200.0)
+        assert top[0]["topic"] == "new"
+        assert top[0]["growth"] == 40.0
+
+    def test_velocity_and_acceleration_track_direction(self):
+        from skills.trend_velocity import TrendVelocityIndex
+
+        index = TrendVelocityIndex(half_life=120)
+        for step in range(10):
+            index.observe("us", "up", 10.0 * step * step, step * 60.0)
+            index.observe("us", "down", 1000.0 - 10.0 * step, step * 60.0)
+
+        up, down = index.snapshot("us", "up"), index.snapshot("us", "down")
+        assert up["velocity"] > 0 and up["acceleration"] > 0
+        assert down["velocity"] < 0
+        assert index.fastest_accelerating("us", 1)[0]["topic"] == "up"
+
+    def test_topic_variants_share_a_slot(self):
+        from skills.trend_velocity import TrendVelocityIndex
+
+        index = TrendVelocityIndex()
+        index.observe("us", "#AINews", 1.0, 0.0)
+        index.observe("us", "ai news", 2.0, 60.0)
+
+        assert len(index) == 1
+
+    def test_memory_is_bounded_by_max_topics(self):
+        from skills.trend_velocity import TrendVelocityIndex
+
+        index = TrendVelocityIndex(max_topics=100, num_buckets=10)
+        ring_size = len(index._ring)
+        for i in range(5000):
+            index.observe("us", f"topic{i}", float(i), float(i))
+
+        assert len(index) == 100
+        assert len(index._ring) == ring_size
+        assert index.stats["evictions"] == 4900
+
+    def test_long_gaps_and_late_observations(self):
+        from skills.trend_velocity import TrendVelocityIndex
+
+        index = TrendVelocityIndex(bucket_seconds=60, num_buckets=10)
+        index.observe("us", "t", 5.0, 0.0)
+        index.observe("us", "t", 9.0, 60.0 * 1000)
+        index.observe("us", "t", 1.0, 60.0)
+
+        assert index.stats["late_dropped"] == 1
+        assert index.fastest_growing("us", 1, 300, now=60.0 * 1000)[0]["growth"] == 4.0
+
+    def test_out_of_order_observation_in_a_bucket_keeps_the_newer_value(self):
+        from skills.trend_velocity import TrendVelocityIndex
+
+        index = TrendVelocityIndex(bucket_seconds=60, num_buckets=10)
+        index.observe("us", "t", 10.0, 0.0)
+        index.observe("us", "t", 20.0, 50.0)
+        index.observe("us", "t", 12.0, 30.0)  # arrives late, same bucket
+
+        assert index.stats["late_dropped"] == 1
+        assert index.fastest_growing("us", 1, 120, now=50.0)[0]["growth"] == 20.0
+        index.observe("us", "t", 25.0, 200.0)
+        # buckets 1-2 carry 20.0 forward, not the stale 12.0
+        assert index.fastest_growing("us", 1, 60, now=200.0)[0]["growth"] == 5.0
+
+    def test_observe_trends_accepts_fetch_output(self):
+        from skills.trend_fetcher import fetch_trends
+        from skills.trend_velocity import TrendVelocityIndex
+
+        index = TrendVelocityIndex()
+        index.observe_trends("us", fetch_trends("twitter", "us", None, 5)["trends"])
+
+        assert len(index) == 5
+
+    def test_window_beyond_ring_rejected(self):
+        from skills.trend_velocity import TrendVelocityIndex
+
+        index = TrendVelocityIndex(bucket_seconds=60, num_buckets=10)
+        with pytest.raises(ValueError):
+            index.fastest_growing("us", 5, window_seconds=3600)
@@ -0,0 +1,46 @@
+"""
+Local stand-in for an AgentKit wallet, shaped as a spend_ledger ``Wallet``.
+
+Keeps per-agent balances in memory and settles every transfer of a
+submission or none of them. A repeated idempotency key returns the first
+transaction id without moving money again. Failures and latency can be injected to exercise
+the ledger's retry path.
+"""
+
+import itertools
+import threading
+import time
+
+
+class MockWallet:
+    def __init__(self, balances: dict[str, int] | None = None, latency: float = 0.0):
+        self.balances = dict(balances or {})
+        self.received: dict[str, int] = {}
+        self.submissions: list[tuple[str, list[dict]]] = []
+        self.accepted: dict[str, str] = {}  # idempotency key -> transaction id
+        self.duplicates = 0
+        self.fail_next: list[str] = []  # SkillError codes raised by the next calls, in order
+        self.latency = latency
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def __call__(self, agent_id: str, transfers: list[dict], key: str) -> str:
+        from skills import SkillError
+
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            if self.fail_next:
+                raise SkillError(self.fail_next.pop(0), "injected wallet failure")
+            if key in self.accepted:
+                self.duplicates += 1
+                return self.accepted[key]
+            total = sum(t["amount"] for t in transfers)
+            if self.balances.get(agent_id, 0) < total:
+                raise SkillError("INSUFFICIENT_FUNDS", f"{agent_id} cannot cover {total}")
+            self.balances[agent_id] -= total
+            for t in transfers:
+                self.received[t["to"]] = self.received.get(t["to"], 0) + t["amount"]
+            self.submissions.append((agent_id, [dict(t) for t in transfers]))
+            tx = self.accepted[key] = f"0xtx{next(self._ids):06d}"
+            return tx